@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文检索索引回填脚本
+为已有的内容段落和文化实体生成jieba分词后的search_vector
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from uuid import UUID
+
+# 添加项目根目录和src到Python路径
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from database.connection_manager import get_database_manager, close_database_manager
+from database.search_index import get_search_indexer
+
+
+async def backfill(novel_id: UUID = None, batch_size: int = 500, rebuild: bool = False,
+                   targets=("segments", "entities")) -> None:
+    """回填检索索引"""
+    db_manager = await get_database_manager()
+    pool = db_manager.postgres._pool
+    indexer = get_search_indexer()
+
+    try:
+        if "segments" in targets:
+            print("📝 回填内容段落检索索引...")
+            count = await indexer.backfill_content_segments(
+                pool, novel_id=novel_id, batch_size=batch_size, only_missing=not rebuild
+            )
+            print(f"✅ 内容段落: {count} 条")
+
+        if "entities" in targets:
+            print("🏛️ 回填文化实体检索索引...")
+            count = await indexer.backfill_cultural_entities(
+                pool, novel_id=novel_id, batch_size=batch_size, only_missing=not rebuild
+            )
+            print(f"✅ 文化实体: {count} 条")
+    finally:
+        await close_database_manager()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全文检索索引回填工具')
+    parser.add_argument('--novel-id', type=UUID, help='只回填指定小说')
+    parser.add_argument('--batch-size', type=int, default=500, help='每批处理条数')
+    parser.add_argument('--rebuild', action='store_true', help='重建全部索引（默认只补缺失的）')
+    parser.add_argument('--only', choices=['segments', 'entities'], help='只回填指定类型')
+    parser.add_argument('--verbose', '-v', action='store_true', help='详细输出')
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    targets = (args.only,) if args.only else ("segments", "entities")
+    asyncio.run(backfill(args.novel_id, args.batch_size, args.rebuild, targets))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,17 @@ import hashlib
 import json
 import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional
 import logging
 from dataclasses import dataclass
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
 import redis.asyncio as redis
 from sqlalchemy import select, update, delete, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-import openai
+
+from src.ai.cache_tiers import LRUMemoryCache, SemanticIndex, estimate_size
+from src.ai.embedders import Embedder, OpenAIEmbedder
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +53,11 @@ class CacheManager:
         db_session: AsyncSession = None,
         embedding_model: str = "text-embedding-3-small",
         similarity_threshold: float = 0.85,
-        max_memory_cache: int = 1000
+        max_memory_cache: int = 1000,
+        max_memory_bytes: Optional[int] = 64 * 1024 * 1024,
+        max_semantic_cache: int = 20000,
+        ann_threshold: int = 5000,
+        embedder: Optional[Embedder] = None
     ):
         """
         Initialize Cache Manager
@@ -63,20 +68,26 @@ class CacheManager:
             embedding_model: Model for generating embeddings
             similarity_threshold: Threshold for semantic similarity
             max_memory_cache: Maximum items in memory cache
+            max_memory_bytes: Maximum total size of memory cache values in bytes
+            max_semantic_cache: Maximum entries in semantic cache
+            ann_threshold: Semantic cache size at which the ANN index is built
+            embedder: Embedding provider (defaults to OpenAI with embedding_model)
         """
         self.redis_client = redis_client
         self.db_session = db_session
         self.embedding_model = embedding_model
         self.similarity_threshold = similarity_threshold
         self.max_memory_cache = max_memory_cache
+        self.embedder = embedder or OpenAIEmbedder(embedding_model)
 
         # In-memory cache for ultra-fast access
-        self.memory_cache: Dict[str, CacheEntry] = {}
-        self.memory_cache_order: List[str] = []
+        self.memory_cache = LRUMemoryCache(max_memory_cache, max_memory_bytes)
 
         # Semantic cache
-        self.semantic_cache: List[CacheEntry] = []
-        self.embeddings_matrix: Optional[np.ndarray] = None
+        self.semantic_cache = SemanticIndex(
+            max_entries=max_semantic_cache,
+            ann_threshold=ann_threshold
+        )
 
         # Statistics
         self.stats = {
@@ -123,8 +134,8 @@ class CacheManager:
             Cached value or None
         """
         # Check memory cache first
-        if key in self.memory_cache:
-            entry = self.memory_cache[key]
+        entry = self.memory_cache.get(key)
+        if entry is not None:
             if self._is_valid(entry):
                 self._update_access(entry)
                 self.stats["hits"] += 1
@@ -230,9 +241,8 @@ class CacheManager:
         """
         if key:
             # Remove from memory cache
-            if key in self.memory_cache:
-                del self.memory_cache[key]
-                self.memory_cache_order.remove(key)
+            self.memory_cache.pop(key)
+            self.semantic_cache.remove(key)
 
             # Remove from Redis
             if self.redis_client:
@@ -272,7 +282,7 @@ class CacheManager:
         Returns:
             Best matching cached value or None
         """
-        if not self.semantic_cache or self.embeddings_matrix is None:
+        if not len(self.semantic_cache):
             return None
 
         # Generate embedding for query
@@ -280,55 +290,26 @@ class CacheManager:
         if query_embedding is None:
             return None
 
-        # Calculate similarities
-        similarities = cosine_similarity(
-            query_embedding.reshape(1, -1),
-            self.embeddings_matrix
-        )[0]
-
-        # Find best matches
-        best_indices = np.argsort(similarities)[-top_k:][::-1]
+        matches = self.semantic_cache.search(
+            query_embedding, top_k=top_k, min_score=self.similarity_threshold
+        )
 
-        for idx in best_indices:
-            if similarities[idx] >= self.similarity_threshold:
-                entry = self.semantic_cache[idx]
-                if self._is_valid(entry):
-                    self._update_access(entry)
-                    return entry.value
+        for key, similarity, entry in matches:
+            if self._is_valid(entry):
+                self._update_access(entry)
+                return entry.value
 
         return None
 
     async def _generate_embedding(self, text: str) -> Optional[np.ndarray]:
         """Generate embedding for text"""
-        try:
-            client = openai.AsyncOpenAI()
-            response = await client.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            return np.array(response.data[0].embedding)
-        except Exception as e:
-            logger.warning(f"Failed to generate embedding: {e}")
-            return None
+        return await self.embedder.embed(text)
 
     async def _add_to_memory_cache(self, key: str, value: Any, ttl: int = 3600):
         """Add entry to memory cache with LRU eviction"""
-        # Check if we need to evict
-        if len(self.memory_cache) >= self.max_memory_cache:
-            # Evict least recently used
-            lru_key = self.memory_cache_order[0]
-            del self.memory_cache[lru_key]
-            self.memory_cache_order.remove(lru_key)
-            self.stats["evictions"] += 1
-
-        # Add new entry
         entry = CacheEntry(key=key, value=value, ttl=ttl)
-        self.memory_cache[key] = entry
-
-        # Update order for LRU
-        if key in self.memory_cache_order:
-            self.memory_cache_order.remove(key)
-        self.memory_cache_order.append(key)
+        evicted = self.memory_cache.put(key, entry, estimate_size(value))
+        self.stats["evictions"] += len(evicted)
 
     async def _add_to_redis(self, key: str, value: Any, ttl: int = 3600):
         """Add entry to Redis cache"""
@@ -384,23 +365,8 @@ class CacheManager:
             logger.warning(f"Database cache set failed: {e}")
 
     async def _add_to_semantic_cache(self, entry: CacheEntry):
-        """Add entry to semantic cache"""
-        self.semantic_cache.append(entry)
-
-        # Update embeddings matrix
-        if self.embeddings_matrix is None:
-            self.embeddings_matrix = entry.embedding.reshape(1, -1)
-        else:
-            self.embeddings_matrix = np.vstack([
-                self.embeddings_matrix,
-                entry.embedding.reshape(1, -1)
-            ])
-
-        # Limit semantic cache size
-        if len(self.semantic_cache) > 1000:
-            # Remove oldest entries
-            self.semantic_cache = self.semantic_cache[-1000:]
-            self.embeddings_matrix = self.embeddings_matrix[-1000:]
+        """Add entry to semantic cache (oldest entries are evicted past the size limit)"""
+        self.semantic_cache.add(entry.key, entry.embedding, entry)
 
     async def _load_semantic_cache(self):
         """Load semantic cache from database"""
@@ -413,23 +379,18 @@ class CacheManager:
                     "embedding IS NOT NULL",
                     or_("expires_at IS NULL", "expires_at > CURRENT_TIMESTAMP")
                 )
-            ).order_by("hit_count DESC").limit(1000)
+            ).order_by("hit_count DESC").limit(self.semantic_cache.max_entries)
 
             result = await self.db_session.execute(query)
 
-            embeddings = []
             for row in result:
                 entry = CacheEntry(
                     key=row.cache_key,
                     value=json.loads(row.response),
-                    embedding=np.array(row.embedding),
+                    embedding=np.asarray(row.embedding, dtype=np.float32),
                     metadata=row.metadata
                 )
-                self.semantic_cache.append(entry)
-                embeddings.append(row.embedding)
-
-            if embeddings:
-                self.embeddings_matrix = np.array(embeddings)
+                self.semantic_cache.add(entry.key, entry.embedding, entry)
 
             logger.info(f"Loaded {len(self.semantic_cache)} entries into semantic cache")
         except Exception as e:
@@ -467,9 +428,7 @@ class CacheManager:
         entry.last_accessed = time.time()
 
         # Update LRU order
-        if entry.key in self.memory_cache_order:
-            self.memory_cache_order.remove(entry.key)
-            self.memory_cache_order.append(entry.key)
+        self.memory_cache.touch(entry.key)
 
     def _match_pattern(self, key: str, pattern: str) -> bool:
         """Check if key matches pattern (simple wildcard support)"""
@@ -489,8 +448,6 @@ class CacheManager:
                 ]
                 for key in expired_keys:
                     del self.memory_cache[key]
-                    if key in self.memory_cache_order:
-                        self.memory_cache_order.remove(key)
 
                 # Clean database cache
                 if self.db_session:
@@ -553,6 +510,7 @@ class CacheManager:
             "evictions": self.stats["evictions"],
             "hit_rate": round(hit_rate, 2),
             "memory_cache_size": len(self.memory_cache),
+            "memory_cache_bytes": self.memory_cache.total_bytes,
             "semantic_cache_size": len(self.semantic_cache)
         }
 
@@ -0,0 +1,412 @@
+"""
+In-process cache tiers used by CacheManager
+
+- LRUMemoryCache: O(1) LRU keyed by cache key with item and byte limits
+- SemanticIndex: cosine-similarity index over normalized float32 embeddings,
+  brute force below a threshold and an ANN index (hnswlib if installed,
+  otherwise a numpy IVF index) above it
+"""
+
+import json
+import logging
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate size in bytes of a cached value"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class LRUMemoryCache:
+    """
+    LRU cache with O(1) get/put/evict and size-in-bytes accounting
+    """
+
+    def __init__(self, max_items: int = 1000, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_items: Maximum number of entries
+            max_bytes: Maximum total size of entries in bytes (None for no limit)
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get entry and mark it most recently used"""
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        self._entries.move_to_end(key)
+        return item[0]
+
+    def touch(self, key: str):
+        """Mark entry most recently used"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+
+    def put(self, key: str, entry: Any, size: int) -> List[str]:
+        """
+        Insert or replace an entry
+
+        Returns:
+            Keys evicted to make room
+        """
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+
+        self._entries[key] = (entry, size)
+        self.total_bytes += size
+
+        evicted = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_items
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            lru_key, (_, lru_size) = self._entries.popitem(last=False)
+            self.total_bytes -= lru_size
+            evicted.append(lru_key)
+
+        return evicted
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove entry and return it"""
+        item = self._entries.pop(key, None)
+        if item is None:
+            return default
+        self.total_bytes -= item[1]
+        return item[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> Any:
+        return self._entries[key][0]
+
+    def __delitem__(self, key: str):
+        self.total_bytes -= self._entries.pop(key)[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def keys(self) -> List[str]:
+        return list(self._entries)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, item[0]) for key, item in self._entries.items()]
+
+
+class SemanticIndex:
+    """
+    Cosine-similarity index over cached prompt embeddings
+
+    Embeddings are L2-normalized into a preallocated float32 matrix, so a lookup
+    is a single matrix-vector product plus argpartition. Once the index holds
+    ann_threshold entries an approximate index is built: HNSW when hnswlib is
+    installed, otherwise an inverted-file (IVF) index with k-means centroids.
+    Entries beyond max_entries are evicted oldest first.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 20000,
+        ann_threshold: int = 5000,
+        ann_backend: str = "auto",
+        nprobe: int = 8
+    ):
+        """
+        Args:
+            max_entries: Maximum number of indexed entries (about 120 MB of
+                float32 vectors at 1536 dimensions)
+            ann_threshold: Entry count at which the ANN index is built; must be
+                below max_entries or the index stays brute force
+            ann_backend: "auto", "hnsw", "ivf" or "none"
+            nprobe: Number of IVF lists scanned per query
+        """
+        if ann_backend not in ("auto", "hnsw", "ivf", "none"):
+            raise ValueError(f"Unknown ANN backend: {ann_backend}")
+        if ann_backend == "hnsw" and not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib not installed, falling back to IVF index")
+            ann_backend = "ivf"
+        if ann_backend == "auto":
+            ann_backend = "hnsw" if HNSWLIB_AVAILABLE else "ivf"
+
+        self.max_entries = max_entries
+        self.ann_threshold = ann_threshold
+        self.ann_backend = ann_backend
+        self.nprobe = nprobe
+
+        self.dim: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._valid = np.zeros(0, dtype=bool)
+        self._payloads: List[Any] = []
+        self._slot_keys: List[Optional[str]] = []
+        self._slots: "OrderedDict[str, int]" = OrderedDict()  # insertion order for eviction
+        self._free_slots: List[int] = []
+        self._size = 0  # high-water mark of used slots
+
+        # ANN state
+        self._hnsw = None
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)  # slot -> IVF list
+        self._lists: List[List[int]] = []  # IVF list -> slots
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._ann_built_at = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    @property
+    def ann_active(self) -> bool:
+        return self._hnsw is not None or self._centroids is not None
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> Optional[np.ndarray]:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0 or not np.isfinite(norm):
+            return None
+        return vector / norm
+
+    def _ensure_capacity(self, needed: int):
+        """Grow storage geometrically"""
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, min(max(64, capacity * 2), self.max_entries + 1))
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        valid = np.zeros(new_capacity, dtype=bool)
+        assignments = np.full(new_capacity, -1, dtype=np.int32)
+        if self._vectors is not None:
+            vectors[:capacity] = self._vectors
+            valid[:capacity] = self._valid
+            assignments[:capacity] = self._assignments
+        self._vectors, self._valid, self._assignments = vectors, valid, assignments
+
+        if self._hnsw is not None:
+            self._hnsw.resize_index(new_capacity)
+
+    def add(self, key: str, embedding: np.ndarray, payload: Any = None) -> bool:
+        """
+        Add or replace an entry
+
+        Returns:
+            False if the embedding is unusable (zero or wrong dimension)
+        """
+        vector = self._normalize(embedding)
+        if vector is None:
+            return False
+        if self.dim is None:
+            self.dim = vector.shape[0]
+        elif vector.shape[0] != self.dim:
+            logger.warning(f"Embedding dimension {vector.shape[0]} does not match index dimension {self.dim}")
+            return False
+
+        if key in self._slots:
+            self.remove(key)
+
+        while len(self._slots) >= self.max_entries:
+            oldest_key = next(iter(self._slots))
+            self.remove(oldest_key)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = self._size
+            self._size += 1
+            self._ensure_capacity(self._size)
+            self._payloads.append(None)
+            self._slot_keys.append(None)
+
+        self._vectors[slot] = vector
+        self._valid[slot] = True
+        self._payloads[slot] = payload
+        self._slot_keys[slot] = key
+        self._slots[key] = slot
+
+        if self._hnsw is not None:
+            self._hnsw.add_items(vector.reshape(1, -1), np.array([slot]), replace_deleted=True)
+        elif self._centroids is not None:
+            list_id = int(np.argmax(self._centroids @ vector))
+            self._assignments[slot] = list_id
+            self._lists[list_id].append(slot)
+            self._list_arrays.pop(list_id, None)
+
+        self._maybe_build_ann()
+        return True
+
+    def remove(self, key: str) -> bool:
+        """Remove an entry"""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+
+        self._valid[slot] = False
+        self._vectors[slot] = 0.0
+        self._payloads[slot] = None
+        self._slot_keys[slot] = None
+        list_id = int(self._assignments[slot])
+        if list_id >= 0:
+            self._lists[list_id].remove(slot)
+            self._list_arrays.pop(list_id, None)
+            self._assignments[slot] = -1
+        self._free_slots.append(slot)
+
+        if self._hnsw is not None:
+            self._hnsw.mark_deleted(slot)
+        return True
+
+    def clear(self):
+        self.__init__(self.max_entries, self.ann_threshold, self.ann_backend, self.nprobe)
+
+    def search(self, embedding: np.ndarray, top_k: int = 1,
+               min_score: float = -1.0) -> List[Tuple[str, float, Any]]:
+        """
+        Find the most similar entries
+
+        Args:
+            embedding: Query embedding
+            top_k: Maximum number of results
+            min_score: Minimum cosine similarity
+
+        Returns:
+            (key, similarity, payload) tuples, best first
+        """
+        if not self._slots or self.dim is None:
+            return []
+
+        query = self._normalize(embedding)
+        if query is None or query.shape[0] != self.dim:
+            return []
+
+        top_k = max(1, min(top_k, len(self._slots)))
+
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(query.reshape(1, -1), k=top_k)
+            candidates = labels[0].astype(np.int64)
+            scores = 1.0 - distances[0]
+        else:
+            if self._centroids is not None:
+                candidates = self._ivf_candidates(query)
+                scores = self._vectors[candidates] @ query
+            else:
+                # contiguous scan; freed slots hold zero vectors and are filtered below
+                candidates = np.arange(self._size)
+                scores = self._vectors[:self._size] @ query
+
+            if len(candidates) == 0:
+                return []
+
+            if len(candidates) > top_k:
+                best = np.argpartition(scores, -top_k)[-top_k:]
+                candidates, scores = candidates[best], scores[best]
+
+        order = np.argsort(scores)[::-1]
+        results = []
+        for idx in order:
+            slot = int(candidates[idx])
+            score = float(scores[idx])
+            if score < min_score or not self._valid[slot]:
+                continue
+            results.append((self._slot_keys[slot], score, self._payloads[slot]))
+        return results
+
+    # ------------------------------------------------------------------ ANN
+
+    def _maybe_build_ann(self):
+        """Build the ANN index when crossing the threshold, rebuild IVF after it doubles"""
+        if self.ann_backend == "none" or len(self._slots) < self.ann_threshold:
+            return
+        if self._hnsw is not None:
+            return
+        if self._centroids is not None and len(self._slots) < 2 * self._ann_built_at:
+            return
+
+        if self.ann_backend == "hnsw":
+            self._build_hnsw()
+        else:
+            self._build_ivf()
+        self._ann_built_at = len(self._slots)
+
+    def _build_hnsw(self):
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.init_index(max_elements=self._vectors.shape[0], ef_construction=200, M=16,
+                         allow_replace_deleted=True)
+        slots = np.flatnonzero(self._valid[:self._size])
+        index.add_items(self._vectors[slots], slots)
+        index.set_ef(max(64, self.nprobe * 8))
+        self._hnsw = index
+        logger.info(f"Built HNSW semantic index over {len(slots)} entries")
+
+    def _build_ivf(self, iterations: int = 10, seed: int = 0):
+        """Spherical k-means coarse quantizer over a sample of the stored vectors"""
+        slots = np.flatnonzero(self._valid[:self._size])
+        n_lists = max(1, int(2 * np.sqrt(len(slots))))
+        rng = np.random.default_rng(seed)
+
+        sample = self._vectors[rng.choice(slots, min(len(slots), n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            nonempty = norms[:, 0] > 0
+            centroids[nonempty] = sums[nonempty] / norms[nonempty]
+
+        self._centroids = centroids
+        self._assignments[:] = -1
+        for start in range(0, len(slots), 8192):
+            chunk = slots[start:start + 8192]
+            self._assignments[chunk] = np.argmax(self._vectors[chunk] @ centroids.T, axis=1)
+
+        self._lists = [[] for _ in range(n_lists)]
+        for slot in slots.tolist():
+            self._lists[self._assignments[slot]].append(slot)
+        self._list_arrays = {}
+        logger.info(f"Built IVF semantic index with {n_lists} lists over {len(slots)} entries")
+
+    def _ivf_candidates(self, query: np.ndarray) -> np.ndarray:
+        centroid_scores = self._centroids @ query
+        nprobe = min(self.nprobe, len(centroid_scores))
+        probe = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+        arrays = []
+        for list_id in probe.tolist():
+            array = self._list_arrays.get(list_id)
+            if array is None:
+                array = self._list_arrays[list_id] = np.array(self._lists[list_id], dtype=np.int64)
+            arrays.append(array)
+        return np.concatenate(arrays)
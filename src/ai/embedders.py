@@ -0,0 +1,123 @@
+"""
+Pluggable text embedders for semantic caching
+
+CacheManager only needs an object with an async ``embed(text)`` method that
+returns a 1-D numpy array (or None on failure), so embeddings can come from a
+remote API or be computed locally and offline.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Optional, Protocol
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+
+class Embedder(Protocol):
+    """Embedding provider interface"""
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        ...
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI embeddings API"""
+
+    def __init__(self, model: str = "text-embedding-3-small", client=None):
+        """
+        Args:
+            model: Embedding model name
+            client: Optional openai.AsyncOpenAI client (created lazily)
+        """
+        self.model = model
+        self._client = client
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            if self._client is None:
+                import openai
+                self._client = openai.AsyncOpenAI()
+
+            response = await self._client.embeddings.create(model=self.model, input=text)
+            return np.asarray(response.data[0].embedding, dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Failed to generate embedding: {e}")
+            return None
+
+
+class HashingEmbedder:
+    """
+    Offline embedder based on feature hashing
+
+    Words and character n-grams (CJK text has no spaces, so bigrams/trigrams
+    carry most of the signal) are hashed into a fixed number of signed buckets.
+    Deterministic, dependency-free and fast; similar prompts share most n-grams
+    and therefore get a high cosine similarity.
+    """
+
+    _TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, dim: int = 256, ngram_range: tuple = (1, 3)):
+        """
+        Args:
+            dim: Embedding dimension
+            ngram_range: Character n-gram sizes (inclusive)
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str):
+        for token in self._TOKEN_PATTERN.findall(text.lower()):
+            yield token
+            low, high = self.ngram_range
+            for n in range(low, high + 1):
+                if n >= len(token):
+                    continue
+                for i in range(len(token) - n + 1):
+                    yield token[i:i + n]
+
+    def embed_sync(self, text: str) -> Optional[np.ndarray]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text or ""):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        return self.embed_sync(text)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model, run in a worker thread"""
+
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError("sentence-transformers is not installed")
+        self.model = SentenceTransformer(model_name)
+
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            loop = asyncio.get_running_loop()
+            vector = await loop.run_in_executor(
+                None, lambda: self.model.encode(text, normalize_embeddings=True)
+            )
+            return np.asarray(vector, dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Failed to generate embedding: {e}")
+            return None
@@ -12,7 +12,6 @@ from dataclasses import dataclass
 from collections import defaultdict, Counter
 import logging
 from pathlib import Path
-import itertools
 from scipy import stats
 from scipy.spatial.distance import pdist, squareform
 from sklearn.cluster import KMeans, SpectralClustering
@@ -45,6 +44,10 @@ except ImportError:
 
 # 从基础分析器导入
 from conflict_network_analyzer import ConflictNetworkAnalyzer, NetworkMetrics, CentralityMetrics
+from path_mining import (
+    CriticalPathMiner, path_strength, path_conflict_types, path_domains, escalation_potential
+)
+from percolation import PercolationEngine
 
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS']
@@ -106,6 +109,13 @@ class AdvancedNetworkAnalyzer(ConflictNetworkAnalyzer):
             '依赖': 0.4
         }
 
+        # 关键路径挖掘配置
+        self.random_seed = 42
+        self.path_mining_workers = None  # None为CPU核数，1表示串行
+
+        # 鲁棒性分析配置
+        self.robustness_runs = 20  # 随机攻击的移除顺序数量，用于置信区间
+
     def detect_communities_advanced(self, graph: nx.Graph = None, methods: List[str] = None) -> Dict[str, CommunityStructure]:
         """高级社群检测，使用多种算法对比"""
         if graph is None:
@@ -131,7 +141,11 @@ class AdvancedNetworkAnalyzer(ConflictNetworkAnalyzer):
 
                 elif method == 'greedy':
                     communities = nx.community.greedy_modularity_communities(undirected_graph)
-                    partition = {}\n                    for i, community in enumerate(communities):\n                        for node in community:\n                            partition[node] = i\n                    modularity = nx.community.modularity(undirected_graph, communities)
+                    partition = {}
+                    for i, community in enumerate(communities):
+                        for node in community:
+                            partition[node] = i
+                    modularity = nx.community.modularity(undirected_graph, communities)
 
                 elif method == 'label_propagation':
                     communities = nx.community.label_propagation_communities(undirected_graph)
@@ -260,159 +274,70 @@ class AdvancedNetworkAnalyzer(ConflictNetworkAnalyzer):
 
         return cross_domain, intra_domain
 
-    def identify_critical_paths_advanced(self, graph: nx.Graph = None, top_k: int = 50) -> List[ConflictPath]:
-        """高级关键路径识别"""
+    def identify_critical_paths_advanced(self, graph: nx.Graph = None, top_k: int = 50,
+                                         strategy: str = 'shortest', sample_size: int = 10,
+                                         paths_per_pair: int = 3, cutoff: int = 5,
+                                         max_workers: Optional[int] = None,
+                                         random_seed: Optional[int] = None) -> List[ConflictPath]:
+        """
+        高级关键路径识别
+
+        每个域对抽样节点对，惰性地只取每对节点的前paths_per_pair条路径，
+        全局只保留升级潜力最高的top_k条；域对分发到进程池并行挖掘
+
+        Args:
+            strategy: 'shortest' 为k最短路径（默认），'simple' 为截断的简单路径枚举
+            max_workers: 进程数，默认使用 path_mining_workers
+            random_seed: 抽样随机种子，默认使用 random_seed
+        """
         if graph is None:
             graph = self.main_network
 
         logger.info("识别关键冲突传播路径...")
 
-        critical_paths = []
-
-        # 获取所有域
-        domains = set()
-        node_domains = {}
-        for node, data in graph.nodes(data=True):
-            node_domains[node] = data.get('domains', [])
-            domains.update(data.get('domains', []))
-
-        # 分析跨域路径
-        for source_domain, target_domain in itertools.combinations(domains, 2):
-            source_nodes = [n for n, doms in node_domains.items() if source_domain in doms]
-            target_nodes = [n for n, doms in node_domains.items() if target_domain in doms]
-
-            # 限制节点数量以提高性能
-            source_sample = np.random.choice(source_nodes, min(10, len(source_nodes)), replace=False)
-            target_sample = np.random.choice(target_nodes, min(10, len(target_nodes)), replace=False)
-
-            for source in source_sample:
-                for target in target_sample:
-                    try:
-                        # 找到所有简单路径（长度限制）
-                        paths = list(nx.all_simple_paths(graph, source, target, cutoff=5))
-
-                        for path in paths[:3]:  # 每对节点最多3条路径
-                            # 计算路径特征
-                            path_strength = self._calculate_path_strength_advanced(graph, path)
-                            conflict_types = self._extract_path_conflict_types(graph, path)
-                            domains_involved = self._extract_path_domains(graph, path)
-                            escalation_potential = self._calculate_escalation_potential(graph, path)
-
-                            conflict_path = ConflictPath(
-                                source=source,
-                                target=target,
-                                path=path,
-                                length=len(path) - 1,
-                                strength=path_strength,
-                                conflict_types=conflict_types,
-                                domains_involved=domains_involved,
-                                escalation_potential=escalation_potential
-                            )
-
-                            critical_paths.append(conflict_path)
-
-                    except nx.NetworkXNoPath:
-                        continue
-                    except Exception as e:
-                        logger.warning(f"路径计算失败 {source}->{target}: {e}")
-                        continue
-
-        # 按升级潜力排序
-        critical_paths.sort(key=lambda x: x.escalation_potential, reverse=True)
+        miner = CriticalPathMiner(
+            graph,
+            sample_size=sample_size,
+            paths_per_pair=paths_per_pair,
+            cutoff=cutoff,
+            strategy=strategy,
+            max_workers=max_workers if max_workers is not None else self.path_mining_workers,
+            random_seed=random_seed if random_seed is not None else self.random_seed
+        )
 
-        self.critical_paths = critical_paths[:top_k]
+        critical_paths = []
+        for mined in miner.mine(top_k):
+            critical_paths.append(ConflictPath(
+                source=mined.source,
+                target=mined.target,
+                path=mined.path,
+                length=len(mined.path) - 1,
+                strength=self._calculate_path_strength_advanced(graph, mined.path),
+                conflict_types=self._extract_path_conflict_types(graph, mined.path),
+                domains_involved=self._extract_path_domains(graph, mined.path),
+                escalation_potential=mined.escalation_potential
+            ))
+
+        self.critical_paths = critical_paths
         logger.info(f"识别到 {len(self.critical_paths)} 条关键路径")
 
         return self.critical_paths
 
     def _calculate_path_strength_advanced(self, graph: nx.Graph, path: List[str]) -> float:
         """高级路径强度计算"""
-        if len(path) < 2:
-            return 0.0
-
-        total_strength = 0.0
-        conflict_bonus = 0.0
-
-        for i in range(len(path) - 1):
-            source, target = path[i], path[i + 1]
-            if graph.has_edge(source, target):
-                edge_data = graph[source][target]
-                base_strength = edge_data.get('strength', 1.0)
-                relation_type = edge_data.get('relation_type', '')
-
-                # 根据关系类型调整权重
-                type_weight = self.conflict_weights.get(relation_type, 0.5)
-                adjusted_strength = base_strength * type_weight
-
-                total_strength += adjusted_strength
-
-                # 冲突关系额外加分
-                if relation_type in ['对立', '竞争']:
-                    conflict_bonus += 0.2
-
-        # 考虑路径长度和冲突强度
-        path_score = (total_strength + conflict_bonus) / len(path)
-        return path_score
+        return path_strength(graph, path, self.conflict_weights)
 
     def _extract_path_conflict_types(self, graph: nx.Graph, path: List[str]) -> List[str]:
         """提取路径中的冲突类型"""
-        conflict_types = []
-
-        for i in range(len(path) - 1):
-            source, target = path[i], path[i + 1]
-            if graph.has_edge(source, target):
-                relation_type = graph[source][target].get('relation_type', '')
-                if relation_type and relation_type not in conflict_types:
-                    conflict_types.append(relation_type)
-
-        return conflict_types
+        return path_conflict_types(graph, path)
 
     def _extract_path_domains(self, graph: nx.Graph, path: List[str]) -> List[str]:
         """提取路径涉及的域"""
-        domains = set()
-
-        for node in path:
-            if node in graph.nodes:
-                node_domains = graph.nodes[node].get('domains', [])
-                domains.update(node_domains)
-
-        return list(domains)
+        return path_domains(graph, path)
 
     def _calculate_escalation_potential(self, graph: nx.Graph, path: List[str]) -> float:
         """计算冲突升级潜力"""
-        if len(path) < 2:
-            return 0.0
-
-        escalation_score = 0.0
-
-        # 因素1: 路径中的冲突强度
-        conflict_intensity = 0.0
-        for i in range(len(path) - 1):
-            source, target = path[i], path[i + 1]
-            if graph.has_edge(source, target):
-                relation_type = graph[source][target].get('relation_type', '')
-                if relation_type in ['对立', '竞争']:
-                    conflict_intensity += 1.0
-                elif relation_type == '制约':
-                    conflict_intensity += 0.5
-
-        escalation_score += conflict_intensity / (len(path) - 1)
-
-        # 因素2: 节点重要性
-        importance_bonus = 0.0
-        for node in path:
-            if node in graph.nodes:
-                importance = graph.nodes[node].get('importance_weight', 1.0)
-                importance_bonus += importance
-
-        escalation_score += importance_bonus / len(path) * 0.5
-
-        # 因素3: 跨域程度
-        domains = self._extract_path_domains(graph, path)
-        cross_domain_bonus = len(domains) / 4.0  # 假设最多4个域
-        escalation_score += cross_domain_bonus * 0.3
-
-        return min(escalation_score, 1.0)  # 限制在0-1之间
+        return escalation_potential(graph, path)
 
     def analyze_network_robustness_advanced(self, graph: nx.Graph = None) -> NetworkRobustness:
         """高级网络鲁棒性分析"""
@@ -435,8 +360,13 @@ class AdvancedNetworkAnalyzer(ConflictNetworkAnalyzer):
         betweenness_centrality = nx.betweenness_centrality(undirected_graph)
         closeness_centrality = nx.closeness_centrality(undirected_graph)
 
+        # 所有攻击模拟共用同一渗流引擎
+        percolation = PercolationEngine(undirected_graph)
+
         # 随机攻击模拟
-        random_attack_results = self._simulate_random_attack(undirected_graph, [0.1, 0.2, 0.3, 0.4, 0.5])
+        random_attack_results = self._simulate_random_attack(
+            undirected_graph, [0.1, 0.2, 0.3, 0.4, 0.5], percolation
+        )
 
         # 目标攻击模拟（不同策略）
         targeted_attacks = {
@@ -448,7 +378,7 @@ class AdvancedNetworkAnalyzer(ConflictNetworkAnalyzer):
         targeted_attack_results = {}
         for strategy, node_order in targeted_attacks.items():
             targeted_attack_results[strategy] = self._simulate_targeted_attack(
-                undirected_graph, node_order, [0.1, 0.2, 0.3, 0.4, 0.5]
+                undirected_graph, node_order, [0.1, 0.2, 0.3, 0.4, 0.5], percolation
             )
 
         # 识别关键节点
@@ -471,56 +401,32 @@ class AdvancedNetworkAnalyzer(ConflictNetworkAnalyzer):
 
         return robustness
 
-    def _simulate_random_attack(self, graph: nx.Graph, removal_fractions: List[float]) -> Dict[str, List]:
-        """模拟随机攻击"""
-        results = {'removal_fraction': [], 'largest_cc_size': [], 'num_components': []}
-
-        for fraction in removal_fractions:
-            num_nodes_to_remove = int(graph.number_of_nodes() * fraction)
-            nodes_to_remove = np.random.choice(
-                list(graph.nodes()), size=num_nodes_to_remove, replace=False
-            )
-
-            temp_graph = graph.copy()
-            temp_graph.remove_nodes_from(nodes_to_remove)
-
-            if temp_graph.number_of_nodes() > 0:
-                largest_cc_size = len(max(nx.connected_components(temp_graph), key=len))
-                num_components = nx.number_connected_components(temp_graph)
-            else:
-                largest_cc_size = 0
-                num_components = 0
-
-            results['removal_fraction'].append(fraction)
-            results['largest_cc_size'].append(largest_cc_size)
-            results['num_components'].append(num_components)
-
-        return results
+    def _simulate_random_attack(self, graph: nx.Graph, removal_fractions: List[float],
+                                engine: Optional[PercolationEngine] = None) -> Dict[str, List]:
+        """
+        模拟随机攻击
+
+        robustness_runs 个随机移除顺序各做一次逆向渗流，
+        返回各比例下的均值及95%区间（*_lower / *_upper）
+        """
+        engine = engine or PercolationEngine(graph)
+        return engine.random_attack(
+            removal_fractions, n_runs=self.robustness_runs, seed=self.random_seed
+        )
 
     def _simulate_targeted_attack(self, graph: nx.Graph, node_order: List[str],
-                                 removal_fractions: List[float]) -> Dict[str, List]:
-        """模拟目标攻击"""
-        results = {'removal_fraction': [], 'largest_cc_size': [], 'num_components': []}
-
-        for fraction in removal_fractions:
-            num_nodes_to_remove = int(graph.number_of_nodes() * fraction)
-            nodes_to_remove = node_order[:num_nodes_to_remove]
-
-            temp_graph = graph.copy()
-            temp_graph.remove_nodes_from(nodes_to_remove)
-
-            if temp_graph.number_of_nodes() > 0:
-                largest_cc_size = len(max(nx.connected_components(temp_graph), key=len))
-                num_components = nx.number_connected_components(temp_graph)
-            else:
-                largest_cc_size = 0
-                num_components = 0
-
-            results['removal_fraction'].append(fraction)
-            results['largest_cc_size'].append(largest_cc_size)
-            results['num_components'].append(num_components)
-
-        return results
+                                 removal_fractions: List[float],
+                                 engine: Optional[PercolationEngine] = None) -> Dict[str, List]:
+        """模拟目标攻击（按node_order依次移除，一次逆向渗流覆盖所有比例）"""
+        engine = engine or PercolationEngine(graph)
+        curve = engine.attack_curve(node_order)
+        removed = engine.removal_counts(removal_fractions)
+
+        return {
+            'removal_fraction': list(removal_fractions),
+            'largest_cc_size': curve['largest_cc_size'][removed].tolist(),
+            'num_components': curve['num_components'][removed].tolist()
+        }
 
     def _identify_critical_nodes(self, graph: nx.Graph, top_k: int = 10) -> List[str]:
         """识别关键节点"""
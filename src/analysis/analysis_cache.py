@@ -0,0 +1,218 @@
+"""
+内容寻址的分析结果缓存
+以图内容的规范指纹（节点、边及全部属性）加阶段参数和上游阶段的键作为缓存键，
+结果以压缩pickle持久化到磁盘目录，总大小超过上限时按最近访问时间（LRU）淘汰；
+图或参数不变时跨进程重跑直接读取结果，某阶段参数变化只使其自身及下游阶段失效
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import networkx as nx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    'ANALYSIS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'novellus_analysis')
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_SUFFIX = '.pkl.z'
+
+# 结果格式或算法变化时递增，使旧缓存全部失效
+ANALYSIS_CACHE_VERSION = 1
+
+
+def _encode_default(value: Any) -> Any:
+    """json无法直接编码的属性值的规范形式"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(item) for item in value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return repr(value)
+
+
+def _canonical(value: Any) -> str:
+    """键排序、无空白的json编码"""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False,
+                      separators=(',', ':'), default=_encode_default)
+
+
+def graph_fingerprint(graph: nx.Graph) -> str:
+    """
+    图内容的规范指纹
+
+    与节点、边的插入顺序无关；无向图的边不区分端点顺序，
+    多重图包含边的key。任何节点、边或属性的变化都会改变指纹
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(_canonical([graph.is_directed(), graph.is_multigraph(), graph.graph]).encode())
+
+    node_ids = {node: _canonical(node) for node in graph.nodes()}
+    for line in sorted(f"{node_ids[node]}\t{_canonical(data)}" for node, data in graph.nodes(data=True)):
+        digest.update(line.encode())
+        digest.update(b'\n')
+    digest.update(b'\0')
+
+    if graph.is_multigraph():
+        edges = ((u, v, _canonical(key), data) for u, v, key, data in graph.edges(keys=True, data=True))
+    else:
+        edges = ((u, v, '', data) for u, v, data in graph.edges(data=True))
+
+    lines = []
+    for u, v, key, data in edges:
+        source, target = node_ids[u], node_ids[v]
+        if not graph.is_directed() and target < source:
+            source, target = target, source
+        lines.append(f"{source}\t{target}\t{key}\t{_canonical(data)}")
+    for line in sorted(lines):
+        digest.update(line.encode())
+        digest.update(b'\n')
+
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, fingerprint: str, parameters: Dict[str, Any],
+              dependency_keys: Optional[Dict[str, str]] = None) -> str:
+    """
+    分析阶段的缓存键
+
+    Args:
+        stage: 阶段名
+        fingerprint: 输入图的指纹
+        parameters: 影响该阶段结果的参数
+        dependency_keys: 上游阶段名 -> 其缓存键，上游结果变化时本阶段随之失效
+    """
+    payload = _canonical({
+        'version': ANALYSIS_CACHE_VERSION,
+        'stage': stage,
+        'graph': fingerprint,
+        'parameters': parameters,
+        'dependencies': dependency_keys or {}
+    })
+    return f"{stage}-{hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()}"
+
+
+class AnalysisCache:
+    """压缩pickle文件的磁盘缓存，按文件修改时间做LRU淘汰"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 compress_level: int = 6):
+        """
+        Args:
+            directory: 缓存目录，多个进程可共享
+            max_bytes: 缓存文件总大小上限，<= 0 时不写入
+            compress_level: zlib压缩级别
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存结果，未命中返回None；命中时刷新访问时间"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            # 写入中断或格式不兼容的缓存文件，删除后按未命中处理
+            logger.warning(f"分析缓存读取失败，已删除 {key}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        """写入结果（先写临时文件再原子替换），并按上限淘汰最久未访问的条目"""
+        if self.max_bytes <= 0:
+            return
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        if len(data) > self.max_bytes:
+            logger.warning(f"分析结果 {key} 压缩后 {len(data)} 字节，超过缓存上限，不写入")
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            self._remove(temp_path)
+            raise
+        self._evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        try:
+            return [entry for entry in os.scandir(self.directory)
+                    if entry.is_file() and entry.name.endswith(CACHE_SUFFIX)]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self):
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def size_bytes(self) -> int:
+        """缓存文件总大小"""
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(entry.path)
@@ -0,0 +1,528 @@
+"""
+近似中心性与路径统计引擎
+精确介数/接近中心性和平均路径长度、直径、偏心率都需要对每个节点做一次BFS（O(N·E)），
+大图上改为从k个枢纽节点（pivot）出发的批量矩阵BFS做抽样估计，
+直径和半径用双扫（double sweep）给出上下界；特征向量/Katz/PageRank
+用稀疏矩阵幂迭代代替逐节点字典迭代。所有近似结果都附带误差界
+
+精度取舍：枢纽数k越大越准，时间与k成正比。
+- 介数、接近中心性：k=N时与精确值一致；一般情况下按Hoeffding不等式，
+  以1-δ概率所有节点的归一化介数误差不超过 N/(N-1)·sqrt(ln(2N/δ)/(2k))，
+  平均距离的误差不超过 直径·sqrt(ln(2N/δ)/(2k))（该界偏保守，实际误差通常小一个数量级）
+- 平均路径长度：按枢纽均值的标准误给出置信区间
+- 全局效率：每个枢纽的效率在[0, 1]内，以1-δ概率误差不超过 sqrt(ln(2/δ)/(2k))
+- 直径、半径：给出确定性的上下界，偏心率取各枢纽距离的最大值（下界）
+"""
+
+import logging
+import math
+from typing import Dict, List, Any, Optional, Sequence, Hashable, Tuple, Union
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from compact_graph import CompactGraph, scipy_adjacency
+
+logger = logging.getLogger(__name__)
+
+PRECISION_MODES = ('exact', 'approximate')
+
+# 层同步批量BFS每层都要扫描全部边，直径超过该值的图改用逐源BFS（距离和Brandes累积都适用）
+MAX_BATCH_BFS_DEPTH = 64
+
+
+def validate_precision(precision: str) -> str:
+    """检查精度模式"""
+    if precision not in PRECISION_MODES:
+        raise ValueError(f"未知的精度模式: {precision}，可选: {', '.join(PRECISION_MODES)}")
+    return precision
+
+
+class SampledCentralityEngine:
+    """基于枢纽抽样和稀疏矩阵运算的近似中心性引擎"""
+
+    def __init__(self, graph: Union[nx.Graph, CompactGraph], batch_size: int = 64):
+        """
+        Args:
+            graph: 网络图或紧凑图（有向图沿边的方向计算最短路径，多重边视为一条边，自环忽略）
+            batch_size: 每批同时做BFS的枢纽数量，控制内存峰值（N × batch_size 的稠密数组）
+        """
+        self.nodes, adjacency = scipy_adjacency(graph)
+        self.node_index: Dict[Hashable, int] = {node: idx for idx, node in enumerate(self.nodes)}
+        self.n_nodes = len(self.nodes)
+        self.directed = graph.is_directed()
+        self.batch_size = max(1, batch_size)
+
+        # 二值邻接矩阵 A[i, j] = 1 表示存在边 i -> j
+        adjacency = sparse.csr_matrix(adjacency, dtype=np.float64, copy=True)
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+        adjacency.data[:] = 1.0
+        # 批量BFS在 N × batch_size 的稠密数组上做稀疏矩阵乘法，float32 使内存带宽减半
+        # （只影响距离BFS的前沿数组；路径数σ仍以float64累积）
+        self.adjacency = adjacency.astype(np.float32)
+        # 前向BFS按入边聚合路径数
+        self._adjacency_t = self.adjacency.T.tocsr()
+
+        # 批量Brandes遇到深度超过 MAX_BATCH_BFS_DEPTH 的图后改为逐源累积
+        self._deep = False
+
+        self._graph = graph
+        self._weighted: Dict[Optional[str], sparse.csr_matrix] = {}
+
+    # ---- 抽样最短路径 ----
+
+    def select_pivots(self, k: int, seed: Union[int, np.random.Generator, None] = None) -> np.ndarray:
+        """均匀无放回抽取k个枢纽节点下标，k不小于节点数时返回全部节点"""
+        if k >= self.n_nodes:
+            return np.arange(self.n_nodes)
+        rng = np.random.default_rng(seed)
+        return np.sort(rng.choice(self.n_nodes, size=k, replace=False))
+
+    def _brandes_batch(self, sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        一批源节点的Brandes累积（层同步BFS，每层一次稀疏矩阵乘法）
+
+        最短路径数σ随深度指数增长（网格图上是组合数），σ和依赖值用float64；
+        BFS深度超过 MAX_BATCH_BFS_DEPTH 时放弃本批，改为逐源累积
+
+        Returns:
+            (dependency, dist)：形状均为 (n_nodes, len(sources))，
+            dependency为各源对每个节点的依赖值δ_s(v)，dist为BFS距离（不可达为-1）
+        """
+        if self._deep:
+            return self._brandes_per_source(sources)
+
+        n = self.n_nodes
+        columns = np.arange(len(sources))
+
+        sigma = np.zeros((n, len(sources)))
+        dist = np.full((n, len(sources)), -1, dtype=np.int32)
+        sigma[sources, columns] = 1.0
+        dist[sources, columns] = 0
+
+        frontier = sigma.copy()
+        level = 0
+        while True:
+            reached = self._adjacency_t @ frontier
+            new = (reached > 0) & (dist < 0)
+            if not new.any():
+                break
+            level += 1
+            if level > MAX_BATCH_BFS_DEPTH:
+                # 深图上每层扫描全部边的代价超过逐源BFS，后续批次也直接逐源处理
+                self._deep = True
+                return self._brandes_per_source(sources)
+            dist[new] = level
+            frontier = np.where(new, reached, 0.0)
+            sigma += frontier
+
+        # 反向累积：δ(v) = Σ_{w: v->w, d(w)=d(v)+1} σ(v)/σ(w)·(1 + δ(w))
+        dependency = np.zeros_like(sigma)
+        safe_sigma = np.where(sigma > 0, sigma, 1.0)
+        for depth in range(level, 0, -1):
+            coefficient = np.where(dist == depth, (1.0 + dependency) / safe_sigma, 0.0)
+            contribution = self.adjacency @ coefficient
+            dependency += np.where(dist == depth - 1, sigma * contribution, 0.0)
+
+        dependency[sources, columns] = 0.0
+        return dependency, dist
+
+    def _brandes_per_source(self, sources: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """逐源Brandes累积，返回值与 _brandes_batch 相同"""
+        dependency = np.zeros((self.n_nodes, len(sources)))
+        dist = np.full((self.n_nodes, len(sources)), -1, dtype=np.int32)
+        for column, source in enumerate(sources):
+            dependency[:, column], dist[:, column] = self._brandes_single(int(source))
+        return dependency, dist
+
+    def _brandes_single(self, source: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        单个源节点的Brandes累积
+
+        每层只展开前沿节点的出边，总代价O(E)，与BFS深度无关；
+        记录每层的最短路径边 (v, w)，反向累积时按层批量聚合
+        """
+        n = self.n_nodes
+        indptr, indices = self.adjacency.indptr, self.adjacency.indices
+        sigma = np.zeros(n)
+        dist = np.full(n, -1, dtype=np.int32)
+        sigma[source] = 1.0
+        dist[source] = 0
+
+        levels: List[Tuple[np.ndarray, np.ndarray]] = []
+        frontier = np.array([source])
+        level = 0
+        while frontier.size:
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            tails = np.repeat(frontier, counts)
+            heads = indices[offsets]
+
+            unseen = heads[dist[heads] < 0]
+            dist[unseen] = level + 1
+            on_path = dist[heads] == level + 1
+            tails, heads = tails[on_path], heads[on_path]
+            sigma += np.bincount(heads, weights=sigma[tails], minlength=n)
+
+            levels.append((tails, heads))
+            frontier = np.unique(heads)
+            level += 1
+
+        dependency = np.zeros(n)
+        for tails, heads in reversed(levels):
+            dependency += np.bincount(tails, weights=sigma[tails] / sigma[heads] * (1.0 + dependency[heads]),
+                                      minlength=n)
+
+        dependency[source] = 0.0
+        return dependency, dist
+
+    def betweenness_closeness(self, k: int = 256,
+                              seed: Union[int, np.random.Generator, None] = None,
+                              delta: float = 0.05) -> Dict[str, Any]:
+        """
+        抽样介数中心性和接近中心性
+
+        归一化方式与 nx.betweenness_centrality(normalized=True, k=k) 及
+        nx.closeness_centrality(wf_improved=True) 一致；k不小于节点数时结果为精确值
+
+        Args:
+            k: 枢纽数量
+            seed: 随机种子或Generator
+            delta: 误差界的失败概率
+
+        Returns:
+            betweenness、closeness（节点 -> 值）和 error_bounds
+        """
+        n = self.n_nodes
+        pivots = self.select_pivots(k, seed)
+        k = len(pivots)
+
+        dependency_sum = np.zeros(n)
+        distance_sum = np.zeros(n)
+        reach_count = np.zeros(n)
+        max_distance = 0
+
+        for start in range(0, k, self.batch_size):
+            sources = pivots[start:start + self.batch_size]
+            dependency, dist = self._brandes_batch(sources)
+            dependency_sum += dependency.sum(axis=1)
+            reached = dist > 0
+            distance_sum += np.where(reached, dist, 0).sum(axis=1)
+            reach_count += reached.sum(axis=1)
+            if dist.size:
+                max_distance = max(max_distance, int(dist.max()))
+
+        # 介数：nx的归一化 1/((n-1)(n-2))，抽样时再乘 n/k
+        if n > 2 and k > 0:
+            betweenness_values = dependency_sum / ((n - 1) * (n - 2)) * (n / k)
+        else:
+            betweenness_values = np.zeros(n)
+
+        # 接近中心性：以v以外的枢纽估计可达节点比例和平均距离，
+        # (R/S)·(R/k_v) 中的 N 相互抵消，k = N 时即为精确的 wf_improved 公式
+        is_pivot = np.zeros(n, dtype=bool)
+        is_pivot[pivots] = True
+        other_pivots = k - is_pivot.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            closeness_values = np.where(
+                (distance_sum > 0) & (other_pivots > 0),
+                reach_count / np.where(distance_sum > 0, distance_sum, 1.0)
+                * reach_count / np.where(other_pivots > 0, other_pivots, 1.0),
+                0.0
+            )
+
+        exact = k >= n
+        sampling_error = 0.0 if exact or k == 0 else math.sqrt(math.log(2 * n / delta) / (2 * k))
+        error_bounds = {
+            'pivots': k,
+            'exact': exact,
+            'confidence': 1.0 - delta,
+            'betweenness': (n / (n - 1)) * sampling_error if n > 1 else 0.0,
+            'closeness_mean_distance': max_distance * sampling_error
+        }
+
+        return {
+            'betweenness': dict(zip(self.nodes, betweenness_values.tolist())),
+            'closeness': dict(zip(self.nodes, closeness_values.tolist())),
+            'error_bounds': error_bounds
+        }
+
+    def pivot_distances(self, pivots: Sequence[int], max_depth: Optional[int] = None) -> np.ndarray:
+        """
+        枢纽出发的BFS距离矩阵 (len(pivots), n_nodes)，不可达为inf
+
+        Args:
+            pivots: 枢纽节点下标
+            max_depth: 已知的BFS深度上界（如直径上界）；不超过 MAX_BATCH_BFS_DEPTH 时
+                用批量矩阵BFS，更深时逐源BFS（耗时与深度无关）；未知时先批量BFS，
+                深度超过 MAX_BATCH_BFS_DEPTH 再改为逐源BFS
+        """
+        pivots = np.asarray(pivots, dtype=np.int64)
+        deep = self._deep if max_depth is None else max_depth > MAX_BATCH_BFS_DEPTH
+        if not deep:
+            distances = np.full((len(pivots), self.n_nodes), np.inf)
+            for start in range(0, len(pivots), self.batch_size):
+                sources = pivots[start:start + self.batch_size]
+                dist = self._bfs_batch(sources)
+                if dist is None:
+                    break
+                distances[start:start + len(sources)] = np.where(dist.T >= 0, dist.T, np.inf)
+            else:
+                return distances
+
+        if len(pivots) == 0:
+            return np.zeros((0, self.n_nodes))
+        return csgraph.shortest_path(self.adjacency, directed=self.directed,
+                                     unweighted=True, indices=pivots)
+
+    def global_efficiency(self, k: int = 256,
+                          seed: Union[int, np.random.Generator, None] = None,
+                          delta: float = 0.05) -> Dict[str, Any]:
+        """
+        抽样全局效率（与 nx.global_efficiency 一致，不可达节点对的效率为0）
+
+        每个枢纽s的效率 e_s = Σ_v 1/d(s,v) / (n-1)，全局效率为全部节点 e_s 的均值，
+        以k个均匀抽样枢纽的均值估计；k不小于节点数时为精确值
+
+        Returns:
+            efficiency 和 error_bounds
+        """
+        n = self.n_nodes
+        if n <= 1:
+            return {'efficiency': 0.0, 'error_bounds': {'pivots': n, 'exact': True, 'efficiency': 0.0}}
+
+        pivots = self.select_pivots(k, seed)
+        k = len(pivots)
+        pivot_efficiency = np.zeros(k)
+        for start in range(0, k, self.batch_size):
+            distances = self.pivot_distances(pivots[start:start + self.batch_size])
+            with np.errstate(divide='ignore'):
+                inverse = np.where(distances > 0, 1.0 / distances, 0.0)
+            pivot_efficiency[start:start + len(distances)] = inverse.sum(axis=1) / (n - 1)
+
+        exact = k >= n
+        return {
+            'efficiency': float(pivot_efficiency.mean()),
+            'error_bounds': {
+                'pivots': k,
+                'exact': exact,
+                'confidence': 1.0 - delta,
+                'efficiency': 0.0 if exact else math.sqrt(math.log(2 / delta) / (2 * k))
+            }
+        }
+
+    def _bfs_batch(self, sources: np.ndarray) -> Optional[np.ndarray]:
+        """
+        一批源节点的层同步BFS距离 (n_nodes, len(sources))，不可达为-1
+
+        深度超过 MAX_BATCH_BFS_DEPTH 时标记深图并返回None，由调用方改为逐源BFS
+        """
+        columns = np.arange(len(sources))
+        dist = np.full((self.n_nodes, len(sources)), -1, dtype=np.int32)
+        dist[sources, columns] = 0
+        frontier = np.zeros((self.n_nodes, len(sources)), dtype=np.float32)
+        frontier[sources, columns] = 1.0
+
+        level = 0
+        while True:
+            new = ((self._adjacency_t @ frontier) > 0) & (dist < 0)
+            if not new.any():
+                break
+            level += 1
+            if level > MAX_BATCH_BFS_DEPTH:
+                self._deep = True
+                return None
+            dist[new] = level
+            frontier = new.astype(np.float32)
+        return dist
+
+    # ---- 路径统计 ----
+
+    def double_sweep(self, start: int, sweeps: int = 4) -> Tuple[int, int, List[int]]:
+        """
+        多次双扫求直径上下界
+
+        从start出发BFS，跳到最远节点继续，每个扫描节点的偏心率e满足
+        e <= 直径 <= 2e，取所有扫描节点上的最紧界（要求图连通、无向）
+
+        Returns:
+            (lower, upper, swept)，swept为扫描过的节点下标（外围节点，适合作为枢纽）
+        """
+        lower, upper = 0, math.inf
+        swept: List[int] = []
+        current = start
+        for _ in range(max(1, sweeps)):
+            if current in swept:
+                break
+            swept.append(current)
+            distances = self.pivot_distances([current])[0]
+            distances = np.where(np.isfinite(distances), distances, -1)
+            eccentricity = int(distances.max())
+            lower = max(lower, eccentricity)
+            upper = min(upper, 2 * eccentricity)
+            current = int(np.argmax(distances))
+        return lower, int(upper), swept
+
+    def path_statistics(self, k: int = 256,
+                        seed: Union[int, np.random.Generator, None] = None,
+                        sweeps: int = 4, z: float = 1.96) -> Dict[str, Any]:
+        """
+        抽样平均路径长度、直径/半径上下界和偏心率估计（要求图连通、无向）
+
+        枢纽 = 双扫得到的外围节点 + 均匀抽样节点。偏心率取各枢纽到该节点距离的最大值，
+        是真实偏心率的下界（当最远节点之一为枢纽时取等号）
+
+        Args:
+            k: 枢纽数量
+            seed: 随机种子或Generator
+            sweeps: 双扫次数
+            z: 平均路径长度置信区间的正态分位数
+
+        Returns:
+            avg_path_length、diameter、radius、eccentricities（节点 -> 值）和 error_bounds
+        """
+        n = self.n_nodes
+        if n <= 1:
+            return {
+                'avg_path_length': 0.0, 'diameter': 0, 'radius': 0, 'eccentricities': dict.fromkeys(self.nodes, 0),
+                'error_bounds': {'pivots': n, 'exact': True}
+            }
+
+        rng = np.random.default_rng(seed)
+        diameter_lower, diameter_upper, swept = self.double_sweep(int(rng.integers(n)), sweeps)
+
+        sampled = self.select_pivots(k, rng)
+        exact = len(sampled) >= n
+        distances = self.pivot_distances(sampled, max_depth=diameter_upper)
+
+        # 平均路径长度：每个枢纽到其余 n-1 个节点的平均距离，枢纽间取均值
+        pivot_means = distances.sum(axis=1) / (n - 1)
+        avg_path_length = float(pivot_means.mean())
+        if exact or len(sampled) < 2:
+            half_width = 0.0
+        else:
+            finite_population = math.sqrt(max(0.0, 1.0 - len(sampled) / n))
+            half_width = z * float(pivot_means.std(ddof=1)) / math.sqrt(len(sampled)) * finite_population
+
+        # 偏心率下界与上界：max_s d(s,v) <= e(v) <= min_s (d(s,v) + e(s))
+        sampled_set = set(sampled.tolist())
+        swept_extra = [node for node in swept if node not in sampled_set]
+        if swept_extra:
+            distances = np.vstack([distances, self.pivot_distances(swept_extra, max_depth=diameter_upper)])
+        eccentricity_lower = distances.max(axis=0)
+        pivot_eccentricity = distances.max(axis=1)
+        eccentricity_upper = (distances + pivot_eccentricity[:, None]).min(axis=0)
+
+        diameter_lower = max(diameter_lower, int(eccentricity_lower.max()))
+        diameter_upper = min(diameter_upper, int(eccentricity_upper.max()))
+        radius_upper = int(pivot_eccentricity.min())
+        radius_lower = max(int(eccentricity_lower.min()), math.ceil(diameter_lower / 2))
+        radius_lower = min(radius_lower, radius_upper)
+
+        error_bounds = {
+            'pivots': len(sampled),
+            'exact': exact,
+            'avg_path_length_interval': (avg_path_length - half_width, avg_path_length + half_width),
+            'diameter_interval': (diameter_lower, diameter_upper),
+            'radius_interval': (radius_lower, radius_upper),
+            'eccentricity_mean_gap': float((eccentricity_upper - eccentricity_lower).mean())
+        }
+
+        return {
+            'avg_path_length': avg_path_length,
+            'diameter': diameter_lower,
+            'radius': radius_upper,
+            'eccentricities': dict(zip(self.nodes, eccentricity_lower.astype(int).tolist())),
+            'error_bounds': error_bounds
+        }
+
+    # ---- 稀疏幂迭代 ----
+
+    def _weighted_adjacency(self, weight: Optional[str]) -> sparse.csr_matrix:
+        if weight not in self._weighted:
+            _, adjacency = scipy_adjacency(self._graph, weight=weight)
+            self._weighted[weight] = sparse.csr_matrix(adjacency, dtype=np.float64)
+        return self._weighted[weight]
+
+    def eigenvector(self, max_iter: int = 1000, tol: float = 1.0e-6,
+                    weight: Optional[str] = 'weight') -> Tuple[Dict[Hashable, float], Dict[str, Any]]:
+        """
+        特征向量中心性（与 nx.eigenvector_centrality 相同的 (A^T + I) 迭代和收敛准则）
+
+        Raises:
+            nx.PowerIterationFailedConvergence: 未在max_iter次内收敛
+        """
+        n = self.n_nodes
+        if n == 0:
+            return {}, {'iterations': 0, 'residual': 0.0}
+        operator = self._weighted_adjacency(weight).T.tocsr()
+        x = np.full(n, 1.0 / n)
+        for iteration in range(1, max_iter + 1):
+            previous = x
+            x = previous + operator @ previous
+            norm = np.linalg.norm(x)
+            x = x / norm if norm > 0 else x
+            residual = float(np.abs(x - previous).sum())
+            if residual < n * tol:
+                return dict(zip(self.nodes, x.tolist())), {'iterations': iteration, 'residual': residual}
+        raise nx.PowerIterationFailedConvergence(max_iter)
+
+    def katz(self, alpha: float = 0.1, beta: float = 1.0, max_iter: int = 1000, tol: float = 1.0e-6,
+             weight: Optional[str] = 'weight') -> Tuple[Dict[Hashable, float], Dict[str, Any]]:
+        """
+        Katz中心性 x = αA^T x + β（归一化方式与 nx.katz_centrality 一致）
+
+        Raises:
+            nx.PowerIterationFailedConvergence: α不小于1/λ_max等原因导致不收敛
+        """
+        n = self.n_nodes
+        if n == 0:
+            return {}, {'iterations': 0, 'residual': 0.0}
+        operator = self._weighted_adjacency(weight).T.tocsr()
+        x = np.zeros(n)
+        for iteration in range(1, max_iter + 1):
+            previous = x
+            with np.errstate(over='ignore', invalid='ignore'):
+                x = alpha * (operator @ previous) + beta
+                residual = float(np.abs(x - previous).sum())
+            if not np.isfinite(residual):
+                # α·λ_max >= 1 时迭代发散
+                break
+            if residual < n * tol:
+                norm = np.linalg.norm(x)
+                x = x / norm if norm > 0 else x
+                return dict(zip(self.nodes, x.tolist())), {'iterations': iteration, 'residual': residual}
+        raise nx.PowerIterationFailedConvergence(max_iter)
+
+    def pagerank(self, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6,
+                 weight: Optional[str] = 'weight') -> Tuple[Dict[Hashable, float], Dict[str, Any]]:
+        """
+        PageRank（悬挂节点均匀分配，收敛准则与 nx.pagerank 一致）
+
+        Raises:
+            nx.PowerIterationFailedConvergence: 未在max_iter次内收敛
+        """
+        n = self.n_nodes
+        if n == 0:
+            return {}, {'iterations': 0, 'residual': 0.0}
+        adjacency = self._weighted_adjacency(weight)
+        out_strength = np.asarray(adjacency.sum(axis=1)).ravel()
+        dangling = out_strength == 0
+        inverse = np.divide(1.0, out_strength, out=np.zeros(n), where=~dangling)
+        transition_t = (sparse.diags(inverse) @ adjacency).T.tocsr()
+
+        x = np.full(n, 1.0 / n)
+        for iteration in range(1, max_iter + 1):
+            previous = x
+            x = alpha * (transition_t @ previous + previous[dangling].sum() / n) + (1.0 - alpha) / n
+            residual = float(np.abs(x - previous).sum())
+            if residual < n * tol:
+                return dict(zip(self.nodes, x.tolist())), {'iterations': iteration, 'residual': residual}
+        raise nx.PowerIterationFailedConvergence(max_iter)
@@ -0,0 +1,519 @@
+"""
+紧凑图表示
+节点以整数下标编号，邻接关系以CSR数组（indptr/indices）存放，
+边和节点属性按列存为float32数组或分类编码（关系类型、实体类型、多值的域归属），
+不再为每个节点/边保存Python属性字典；邻接矩阵可零拷贝地交给scipy.sparse，
+传播、渗流、路径和社团分析直接在数组上运算，NetworkX只在接口边界转换
+
+约定：
+- 有向图每条边占一个CSR槽位；无向图每条边在两个方向各占一个槽位，自环只占一个
+- 同一行内按目标下标排序，多重图的平行边相邻
+- 数值属性缺失时取 EDGE_NUMERIC / NODE_NUMERIC 中的默认值，分类属性缺失时编码为 -1
+"""
+
+import logging
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from scipy.sparse import csgraph
+
+logger = logging.getLogger(__name__)
+
+# 列存的属性及缺失时的默认值
+NODE_NUMERIC: Dict[str, float] = {'importance_weight': 1.0, 'confidence': 0.8, 'x': 0.0, 'y': 0.0}
+NODE_CATEGORICAL: Tuple[str, ...] = ('entity_type', 'importance')
+NODE_MULTI_CATEGORICAL: Tuple[str, ...] = ('domains',)
+EDGE_NUMERIC: Dict[str, float] = {'strength': 1.0, 'friction_heat': 0.5, 'escalation_potential': 0.3, 'confidence': 0.8}
+EDGE_CATEGORICAL: Tuple[str, ...] = ('relation_type', 'cross_domain')
+
+
+def _index_dtype(size: int) -> type:
+    """CSR下标类型：indptr 与 indices 同为 int32 时 scipy 不复制"""
+    return np.int32 if size < 2 ** 31 - 1 else np.int64
+
+
+def _code_dtype(n_categories: int) -> type:
+    return np.int16 if n_categories < 2 ** 15 else np.int32
+
+
+class Categorical(NamedTuple):
+    """单值分类列：codes[i] 为 categories 中的下标，-1 表示缺失"""
+    codes: np.ndarray
+    categories: List[Hashable]
+
+    def take(self, positions: np.ndarray) -> 'Categorical':
+        return Categorical(self.codes[positions], self.categories)
+
+    def value(self, i: int) -> Optional[Hashable]:
+        code = self.codes[i]
+        return self.categories[code] if code >= 0 else None
+
+
+class MultiCategorical(NamedTuple):
+    """多值分类列（如域归属）：第i行的取值为 codes[indptr[i]:indptr[i+1]]"""
+    indptr: np.ndarray
+    codes: np.ndarray
+    categories: List[Hashable]
+
+    def values(self, i: int) -> List[Hashable]:
+        return [self.categories[code] for code in self.codes[self.indptr[i]:self.indptr[i + 1]]]
+
+    def incidence(self) -> sparse.csr_matrix:
+        """行 × 类别 的计数矩阵（同一行的重复取值累加）"""
+        data = np.ones(len(self.codes), dtype=np.float64)
+        return sparse.csr_matrix((data, self.codes, self.indptr),
+                                 shape=(len(self.indptr) - 1, len(self.categories)))
+
+    def bitmask(self) -> np.ndarray:
+        """行 × ceil(类别数/64) 的uint64位掩码，用于按位判断两行是否有共同取值"""
+        n_rows = len(self.indptr) - 1
+        words = np.zeros((n_rows, max(1, (len(self.categories) + 63) // 64)), dtype=np.uint64)
+        rows = np.repeat(np.arange(n_rows), np.diff(self.indptr))
+        codes = self.codes.astype(np.int64)
+        np.bitwise_or.at(words, (rows, codes // 64), np.left_shift(np.uint64(1), (codes % 64).astype(np.uint64)))
+        return words
+
+
+class _CategoryEncoder:
+    """逐行累积分类编码"""
+
+    def __init__(self):
+        self.lookup: Dict[Hashable, int] = {}
+        self.categories: List[Hashable] = []
+
+    def encode(self, value: Any) -> int:
+        if value is None:
+            return -1
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def column(self, codes: List[int]) -> Categorical:
+        return Categorical(np.asarray(codes, dtype=_code_dtype(len(self.categories))), self.categories)
+
+
+class CompactGraph:
+    """CSR邻接 + 列存属性的只读图"""
+
+    def __init__(self, node_ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 directed: bool, multigraph: bool,
+                 edge_columns: Dict[str, np.ndarray] = None,
+                 edge_categoricals: Dict[str, Categorical] = None,
+                 edge_keys: Optional[np.ndarray] = None,
+                 node_columns: Dict[str, np.ndarray] = None,
+                 node_categoricals: Dict[str, Categorical] = None,
+                 node_multi_categoricals: Dict[str, MultiCategorical] = None):
+        """
+        Args:
+            node_ids: 下标 -> 原始节点ID（object数组）
+            indptr, indices: 出边CSR
+            directed: 是否有向
+            multigraph: 是否允许平行边
+            edge_columns: 按CSR槽位排列的float32边属性
+            edge_categoricals: 按CSR槽位排列的分类边属性
+            edge_keys: 多重图的边key（关系ID），按CSR槽位排列
+            node_columns / node_categoricals / node_multi_categoricals: 按节点下标排列的节点属性
+        """
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.directed = directed
+        self.multigraph = multigraph
+        self.edge_columns = edge_columns or {}
+        self.edge_categoricals = edge_categoricals or {}
+        self.edge_keys = edge_keys
+        self.node_columns = node_columns or {}
+        self.node_categoricals = node_categoricals or {}
+        self.node_multi_categoricals = node_multi_categoricals or {}
+        self.n_nodes = len(node_ids)
+        self._node_index: Optional[Dict[Hashable, int]] = None
+        self._unit_weights: Optional[np.ndarray] = None
+
+    # ---- 构建 ----
+
+    @classmethod
+    def from_records(cls, entities: Iterable[Tuple[Hashable, Dict[str, Any]]],
+                     relations: Iterable[Tuple[Hashable, Hashable, Hashable, Dict[str, Any]]],
+                     directed: bool = True, multigraph: bool = False) -> 'CompactGraph':
+        """
+        由实体/关系记录直接构建，不经过NetworkX
+
+        参数格式与 IncrementalGraphStore.apply 相同；端点缺失的关系被忽略，
+        简单图中同一节点对的多条关系以最后一条为准（与逐条 add_edge 一致）
+
+        Args:
+            entities: (实体ID, 属性)，实体ID唯一
+            relations: (关系ID, 源实体ID, 目标实体ID, 属性)
+        """
+        node_ids: List[Hashable] = []
+        node_index: Dict[Hashable, int] = {}
+        node_numeric = {name: [] for name in NODE_NUMERIC}
+        node_encoders = {name: _CategoryEncoder() for name in NODE_CATEGORICAL}
+        node_codes = {name: [] for name in NODE_CATEGORICAL}
+        multi_encoders = {name: _CategoryEncoder() for name in NODE_MULTI_CATEGORICAL}
+        multi_codes = {name: [] for name in NODE_MULTI_CATEGORICAL}
+        multi_indptr = {name: [0] for name in NODE_MULTI_CATEGORICAL}
+
+        for node, attributes in entities:
+            if node in node_index:
+                raise ValueError(f"实体ID重复: {node}")
+            node_index[node] = len(node_ids)
+            node_ids.append(node)
+            for name, default in NODE_NUMERIC.items():
+                value = attributes.get(name)
+                node_numeric[name].append(default if value is None else value)
+            for name, encoder in node_encoders.items():
+                node_codes[name].append(encoder.encode(attributes.get(name)))
+            for name, encoder in multi_encoders.items():
+                # 多值列中的缺失值（None）直接丢弃
+                codes = (encoder.encode(value) for value in attributes.get(name) or [])
+                multi_codes[name].extend(code for code in codes if code >= 0)
+                multi_indptr[name].append(len(multi_codes[name]))
+
+        sources, targets, keys = [], [], []
+        edge_numeric = {name: [] for name in EDGE_NUMERIC}
+        edge_encoders = {name: _CategoryEncoder() for name in EDGE_CATEGORICAL}
+        edge_codes = {name: [] for name in EDGE_CATEGORICAL}
+
+        for relation_id, source, target, attributes in relations:
+            source_idx = node_index.get(source)
+            target_idx = node_index.get(target)
+            if source_idx is None or target_idx is None:
+                continue
+            sources.append(source_idx)
+            targets.append(target_idx)
+            keys.append(relation_id)
+            for name, default in EDGE_NUMERIC.items():
+                value = attributes.get(name)
+                edge_numeric[name].append(default if value is None else value)
+            for name, encoder in edge_encoders.items():
+                edge_codes[name].append(encoder.encode(attributes.get(name)))
+
+        node_multi = {
+            name: MultiCategorical(np.asarray(multi_indptr[name], dtype=np.int64),
+                                   np.asarray(multi_codes[name], dtype=_code_dtype(len(encoder.categories))),
+                                   encoder.categories)
+            for name, encoder in multi_encoders.items()
+        }
+
+        return cls._from_edge_arrays(
+            node_ids=np.array(node_ids + [None], dtype=object)[:-1],
+            sources=np.asarray(sources, dtype=np.int64),
+            targets=np.asarray(targets, dtype=np.int64),
+            directed=directed, multigraph=multigraph,
+            edge_columns={name: np.asarray(values, dtype=np.float32) for name, values in edge_numeric.items()},
+            edge_categoricals={name: encoder.column(edge_codes[name]) for name, encoder in edge_encoders.items()},
+            edge_keys=np.array(keys + [None], dtype=object)[:-1] if multigraph else None,
+            node_columns={name: np.asarray(values, dtype=np.float32) for name, values in node_numeric.items()},
+            node_categoricals={name: encoder.column(node_codes[name]) for name, encoder in node_encoders.items()},
+            node_multi_categoricals=node_multi
+        )
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> 'CompactGraph':
+        """由NetworkX图构建（接口边界使用），节点顺序与 graph.nodes() 一致"""
+        if graph.is_multigraph():
+            relations = ((key, u, v, data) for u, v, key, data in graph.edges(keys=True, data=True))
+        else:
+            relations = (((u, v), u, v, data) for u, v, data in graph.edges(data=True))
+        return cls.from_records(graph.nodes(data=True), relations,
+                                directed=graph.is_directed(), multigraph=graph.is_multigraph())
+
+    @classmethod
+    def _from_edge_arrays(cls, node_ids: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                          directed: bool, multigraph: bool,
+                          edge_columns: Dict[str, np.ndarray], edge_categoricals: Dict[str, Categorical],
+                          edge_keys: Optional[np.ndarray], **node_attributes) -> 'CompactGraph':
+        """由按边排列的数组构建CSR（简单图去重保留最后一条，无向图补反向槽位）"""
+        n_nodes = len(node_ids)
+        edge = np.arange(len(sources))
+
+        if not multigraph and len(edge):
+            low, high = (sources, targets) if directed else (np.minimum(sources, targets), np.maximum(sources, targets))
+            pair = low * max(n_nodes, 1) + high
+            _, last = np.unique(pair[::-1], return_index=True)
+            edge = np.sort(len(edge) - 1 - last)
+
+        slot_source, slot_target, slot_edge = sources[edge], targets[edge], edge
+        if not directed:
+            mirrored = slot_source != slot_target
+            slot_source, slot_target, slot_edge = (
+                np.concatenate([slot_source, slot_target[mirrored]]),
+                np.concatenate([slot_target, slot_source[mirrored]]),
+                np.concatenate([slot_edge, slot_edge[mirrored]])
+            )
+
+        order = np.lexsort((slot_edge, slot_target, slot_source))
+        slot_edge = slot_edge[order]
+        index_dtype = _index_dtype(max(len(order), n_nodes))
+        indptr = np.zeros(n_nodes + 1, dtype=index_dtype)
+        np.cumsum(np.bincount(slot_source, minlength=n_nodes), out=indptr[1:])
+
+        return cls(
+            node_ids, indptr, slot_target[order].astype(index_dtype), directed, multigraph,
+            edge_columns={name: values[slot_edge] for name, values in edge_columns.items()},
+            edge_categoricals={name: column.take(slot_edge) for name, column in edge_categoricals.items()},
+            edge_keys=edge_keys[slot_edge] if edge_keys is not None else None,
+            **node_attributes
+        )
+
+    def to_networkx(self) -> nx.Graph:
+        """转换为NetworkX图（接口边界使用）"""
+        if self.directed:
+            graph = nx.MultiDiGraph() if self.multigraph else nx.DiGraph()
+        else:
+            graph = nx.MultiGraph() if self.multigraph else nx.Graph()
+
+        for i, node in enumerate(self.node_ids):
+            attributes = {name: float(values[i]) for name, values in self.node_columns.items()}
+            for name, column in self.node_categoricals.items():
+                value = column.value(i)
+                if value is not None:
+                    attributes[name] = value
+            for name, column in self.node_multi_categoricals.items():
+                attributes[name] = column.values(i)
+            graph.add_node(node, **attributes)
+
+        sources = self.edge_sources()
+        for slot in self.logical_edges():
+            attributes = {name: float(values[slot]) for name, values in self.edge_columns.items()}
+            for name, column in self.edge_categoricals.items():
+                value = column.value(slot)
+                if value is not None:
+                    attributes[name] = value
+            u, v = self.node_ids[sources[slot]], self.node_ids[self.indices[slot]]
+            if self.multigraph:
+                graph.add_edge(u, v, key=self.edge_keys[slot], **attributes)
+            else:
+                graph.add_edge(u, v, **attributes)
+        return graph
+
+    def to_undirected(self) -> 'CompactGraph':
+        """
+        无向化（与 NetworkX 的 to_undirected 一致）
+
+        多重图保留每条有向边；简单图中互逆的两条边合并，属性取源节点下标较大的一条
+        """
+        if not self.directed:
+            return self
+        return self._from_edge_arrays(
+            self.node_ids, self.edge_sources().astype(np.int64), self.indices.astype(np.int64),
+            directed=False, multigraph=self.multigraph,
+            edge_columns=self.edge_columns, edge_categoricals=self.edge_categoricals, edge_keys=self.edge_keys,
+            node_columns=self.node_columns, node_categoricals=self.node_categoricals,
+            node_multi_categoricals=self.node_multi_categoricals
+        )
+
+    # ---- 与 NetworkX 同名的只读接口 ----
+
+    def nodes(self) -> List[Hashable]:
+        return self.node_ids.tolist()
+
+    def number_of_nodes(self) -> int:
+        return self.n_nodes
+
+    def number_of_edges(self) -> int:
+        if self.directed:
+            return len(self.indices)
+        return (len(self.indices) + int(np.count_nonzero(self.edge_sources() == self.indices))) // 2
+
+    def is_directed(self) -> bool:
+        return self.directed
+
+    def is_multigraph(self) -> bool:
+        return self.multigraph
+
+    def __len__(self) -> int:
+        return self.n_nodes
+
+    @property
+    def node_index(self) -> Dict[Hashable, int]:
+        """原始节点ID -> 下标（按需构建）"""
+        if self._node_index is None:
+            self._node_index = {node: idx for idx, node in enumerate(self.node_ids)}
+        return self._node_index
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self.node_index
+
+    # ---- 数组访问 ----
+
+    def edge_sources(self) -> np.ndarray:
+        """每个CSR槽位的源节点下标"""
+        return np.repeat(np.arange(self.n_nodes, dtype=self.indices.dtype), np.diff(self.indptr))
+
+    def logical_edges(self) -> np.ndarray:
+        """每条边各取一个槽位（无向图取源下标不大于目标下标的方向，与 NetworkX 的边遍历方向一致）"""
+        if self.directed:
+            return np.arange(len(self.indices))
+        return np.flatnonzero(self.edge_sources() <= self.indices)
+
+    def to_scipy(self, weight: Optional[str] = None) -> sparse.csr_matrix:
+        """
+        零拷贝的scipy.sparse邻接矩阵
+
+        矩阵与本图共享indptr/indices及权重列，调用方不得原地修改；
+        平行边保留为重复项（scipy运算时累加），需要规范格式时先 copy() 再 sum_duplicates()
+
+        Args:
+            weight: 作为矩阵值的边属性列；None 或不存在的属性为全1（同 NetworkX 缺失权重按1计）
+        """
+        if weight in self.edge_columns:
+            data = self.edge_columns[weight]
+        else:
+            if self._unit_weights is None:
+                self._unit_weights = np.ones(len(self.indices), dtype=np.float32)
+            data = self._unit_weights
+        matrix = sparse.csr_matrix((data, self.indices, self.indptr),
+                                   shape=(self.n_nodes, self.n_nodes), copy=False)
+        matrix.has_sorted_indices = True
+        return matrix
+
+    def memory_bytes(self) -> int:
+        """数组占用的字节数（不含节点ID对象本身）"""
+        arrays = [self.node_ids, self.indptr, self.indices]
+        arrays.extend(self.edge_columns.values())
+        arrays.extend(column.codes for column in self.edge_categoricals.values())
+        arrays.extend(self.node_columns.values())
+        arrays.extend(column.codes for column in self.node_categoricals.values())
+        for column in self.node_multi_categoricals.values():
+            arrays.extend((column.indptr, column.codes))
+        if self.edge_keys is not None:
+            arrays.append(self.edge_keys)
+        return int(sum(array.nbytes for array in arrays))
+
+    # ---- 向量化的结构指标 ----
+
+    def degree(self) -> np.ndarray:
+        """节点度（有向图为入度+出度，自环计2，平行边分别计数，与 NetworkX 一致）"""
+        out_degree = np.diff(self.indptr).astype(np.int64)
+        if self.directed:
+            return out_degree + np.bincount(self.indices, minlength=self.n_nodes)
+        loops = self.edge_sources() == self.indices
+        return out_degree + np.bincount(self.indices[loops], minlength=self.n_nodes)
+
+    def degree_centrality(self) -> Dict[Hashable, float]:
+        """与 nx.degree_centrality 相同"""
+        if self.n_nodes <= 1:
+            return {node: 1.0 for node in self.node_ids}
+        centrality = self.degree() * (1.0 / (self.n_nodes - 1))
+        return dict(zip(self.node_ids, centrality.tolist()))
+
+    def density(self) -> float:
+        """与 nx.density 相同"""
+        n = self.n_nodes
+        if n <= 1:
+            return 0.0
+        density = self.number_of_edges() / (n * (n - 1))
+        return density if self.directed else density * 2
+
+    def number_connected_components(self) -> int:
+        """弱连通分量数"""
+        if self.n_nodes == 0:
+            return 0
+        count, _ = csgraph.connected_components(self.to_scipy(), directed=False)
+        return int(count)
+
+    def global_efficiency(self, batch_size: int = 256) -> float:
+        """与 nx.global_efficiency 相同：按批次BFS求所有点对最短路径倒数的均值"""
+        n = self.n_nodes
+        if n < 2:
+            return 0.0
+        adjacency = self.to_scipy()
+        total = 0.0
+        for start in range(0, n, batch_size):
+            distances = csgraph.shortest_path(adjacency, directed=self.directed, unweighted=True,
+                                              indices=np.arange(start, min(start + batch_size, n)))
+            reachable = np.isfinite(distances) & (distances > 0)
+            total += float(np.sum(1.0 / distances[reachable]))
+        return total / (n * (n - 1))
+
+
+def scipy_adjacency(graph, weight: Optional[str] = None) -> Tuple[List[Hashable], sparse.csr_matrix]:
+    """
+    NetworkX图或CompactGraph -> (节点列表, CSR邻接矩阵)
+
+    与 nx.to_scipy_sparse_array 一致：平行边的权重累加，无向图矩阵对称。
+    CompactGraph 的简单图直接返回零拷贝矩阵，调用方不得原地修改
+    """
+    if isinstance(graph, CompactGraph):
+        adjacency = graph.to_scipy(weight)
+        if graph.multigraph:
+            adjacency = adjacency.copy()
+            adjacency.sum_duplicates()
+        return graph.nodes(), adjacency
+    nodes = list(graph.nodes())
+    return nodes, sparse.csr_matrix(nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight, format='csr'))
+
+
+def community_statistics(graph: CompactGraph, communities: Dict[Hashable, Sequence[Hashable]]
+                         ) -> Tuple[Dict[Hashable, float], Dict[Hashable, float]]:
+    """
+    无向紧凑图上各社团的密度和导纳度
+
+    密度同 nx.density(子图)；导纳度 = 外部邻居数 / 全部邻居数（平行边只计一次）
+
+    Returns:
+        (community_densities, community_conductance)
+    """
+    community_ids = list(communities)
+    labels = np.full(graph.n_nodes, -1, dtype=np.int64)
+    index = graph.node_index
+    for label, community_id in enumerate(community_ids):
+        labels[[index[node] for node in communities[community_id]]] = label
+    n_communities = len(community_ids)
+    sizes = np.bincount(labels[labels >= 0], minlength=n_communities)
+
+    sources = graph.edge_sources()
+    edges = graph.logical_edges()
+    source_label, target_label = labels[sources[edges]], labels[graph.indices[edges]]
+    internal = (source_label == target_label) & (source_label >= 0)
+    internal_edges = np.bincount(source_label[internal], minlength=n_communities)
+
+    neighbors = graph.to_scipy().copy()
+    neighbors.sum_duplicates()
+    rows = np.repeat(np.arange(graph.n_nodes), np.diff(neighbors.indptr))
+    row_label, column_label = labels[rows], labels[neighbors.indices]
+    labelled = row_label >= 0
+    same = row_label == column_label
+    internal_neighbors = np.bincount(row_label[labelled & same], minlength=n_communities)
+    external_neighbors = np.bincount(row_label[labelled & ~same], minlength=n_communities)
+
+    densities, conductance = {}, {}
+    for label, community_id in enumerate(community_ids):
+        size = sizes[label]
+        densities[community_id] = float(2 * internal_edges[label] / (size * (size - 1))) if size > 1 else 0.0
+        total = internal_neighbors[label] + external_neighbors[label]
+        conductance[community_id] = float(external_neighbors[label] / total) if total > 0 else 0.0
+    return densities, conductance
+
+
+def domain_mixing(graph: CompactGraph, attribute: str = 'domains') -> Tuple[int, int, List[Hashable], np.ndarray]:
+    """
+    按边统计域混合情况（无向图每条边计一次，方向同 NetworkX 的边遍历）
+
+    Returns:
+        (跨域边数, 域内边数, 排序后的域列表, 域混合矩阵)，
+        两端点有共同域的边为域内边，混合矩阵[i, j]累计源端域i、目标端域j的边数
+    """
+    column = graph.node_multi_categoricals[attribute]
+    domain_list = sorted(column.categories)
+    rank = np.array([domain_list.index(domain) for domain in column.categories], dtype=np.int64)
+    column = MultiCategorical(column.indptr, rank[column.codes.astype(np.int64)] if len(column.codes) else column.codes,
+                              domain_list)
+
+    edges = graph.logical_edges()
+    sources, targets = graph.edge_sources()[edges], graph.indices[edges]
+    bits = column.bitmask()
+    shared = np.any((bits[sources] & bits[targets]) != 0, axis=1)
+    intra = int(np.count_nonzero(shared))
+
+    edge_counts = sparse.csr_matrix((np.ones(len(edges)), (sources, targets)),
+                                    shape=(graph.n_nodes, graph.n_nodes))
+    incidence = column.incidence()
+    mixing = np.asarray((incidence.T @ edge_counts @ incidence).todense(), dtype=np.float64)
+    return len(edges) - intra, intra, domain_list, mixing
@@ -9,7 +9,7 @@ import pandas as pd
 import numpy as np
 import networkx as nx
 from typing import Dict, List, Tuple, Any, Optional, Set, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from collections import defaultdict, Counter, deque
 import logging
 from pathlib import Path
@@ -30,6 +30,13 @@ from sklearn.ensemble import RandomForestClassifier, IsolationForest
 import time
 import datetime
 
+from propagation_engine import SparsePropagationEngine
+from percolation import PercolationEngine, first_fragmentation
+from approximate_centrality import SampledCentralityEngine, validate_precision
+from analysis_cache import AnalysisCache, graph_fingerprint, stage_key, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from graph_store import IncrementalGraphStore, GraphChange, merge_rows
+from compact_graph import CompactGraph, scipy_adjacency, community_statistics, domain_mixing
+
 # 网络分析相关库
 try:
     import community as community_louvain  # python-louvain
@@ -68,6 +75,17 @@ plt.rcParams['axes.unicode_minus'] = False
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 综合分析的阶段：阶段名 -> (结果属性, 分析方法, 依赖的上游阶段)，按执行顺序排列
+# 上游阶段的结果通过模型属性被下游读取（如强度模型 -> 冲突中心性），因此上游缓存键是下游键的一部分
+ANALYSIS_STAGES = {
+    'topology': ('topology_metrics', 'analyze_network_topology', ()),
+    'intensity': ('intensity_model', 'build_conflict_intensity_model', ()),
+    'communities': ('community_structure', 'discover_communities', ('intensity',)),
+    'centrality': ('centrality_analysis', 'analyze_centrality', ('intensity',)),
+    'propagation': ('propagation_model', 'model_conflict_propagation', ('intensity',)),
+    'robustness': ('robustness_analysis', 'analyze_network_robustness', ('intensity', 'centrality')),
+}
+
 @dataclass
 class NetworkTopologyMetrics:
     """网络拓扑指标"""
@@ -108,6 +126,10 @@ class NetworkTopologyMetrics:
     small_world_sigma: Optional[float]
     small_world_omega: Optional[float]
 
+    # 计算精度（exact / approximate）及近似指标的误差界
+    precision: str = 'exact'
+    error_bounds: Dict[str, Any] = field(default_factory=dict)
+
 @dataclass
 class ConflictIntensityModel:
     """冲突强度模型"""
@@ -178,6 +200,10 @@ class CentralityAnalysis:
     centrality_correlations: np.ndarray
     critical_nodes: Dict[str, List[str]]
 
+    # 计算精度（exact / approximate）及近似指标的误差界
+    precision: str = 'exact'
+    error_bounds: Dict[str, Any] = field(default_factory=dict)
+
 @dataclass
 class ConflictPropagationModel:
     """冲突传播动力学模型"""
@@ -187,7 +213,7 @@ class ConflictPropagationModel:
     spontaneous_rate: float
 
     # 网络效应
-    influence_matrix: np.ndarray
+    influence_matrix: sparse.csr_matrix
     propagation_paths: Dict[str, List[List[str]]]
 
     # 级联分析
@@ -198,6 +224,9 @@ class ConflictPropagationModel:
     propagation_timeline: Dict[str, List[float]]
     peak_conflict_times: Dict[str, float]
 
+    # 全部源节点在3跳内的可达规模
+    propagation_reach: Dict[str, int] = field(default_factory=dict)
+
 @dataclass
 class NetworkRobustness:
     """网络稳定性和韧性"""
@@ -280,6 +309,8 @@ class ComprehensiveConflictNetworkModel:
         self.domain_networks = {}
         self.type_networks = {}
         self.relation_networks = {}
+        # 增量维护主网络及其度/强度聚合
+        self.graph_store: Optional[IncrementalGraphStore] = None
 
         # 分析结果
         self.topology_metrics = None
@@ -296,11 +327,33 @@ class ComprehensiveConflictNetworkModel:
         self.enable_caching = self.config.get('enable_caching', True)
         self.parallel_processing = self.config.get('parallel_processing', False)
 
+        # 传播模拟参数
+        self.propagation_batch_size = self.config.get('propagation_batch_size', 256)
+        self.propagation_path_sources = self.config.get('propagation_path_sources', 20)
+        # 级联模拟的Monte-Carlo种子数；节点数不超过该值时每个节点各作一次种子，None 表示总是如此
+        self.cascade_simulations = self.config.get('cascade_simulations', 1000)
+        self.max_sir_sources = self.config.get('max_sir_sources', 512)
+        # SIR每批状态矩阵的规模上限（节点数 × 传播源数），大图上相应减少传播源
+        self.sir_state_budget = self.config.get('sir_state_budget', 1_000_000)
+
+        # 鲁棒性分析参数
+        self.robustness_runs = self.config.get('robustness_runs', 20)  # 随机攻击的移除顺序数量
+        # 全局效率精确计算（全源BFS）的节点数上限，超过时按 centrality_samples 个枢纽抽样估计
+        self.exact_efficiency_max_nodes = self.config.get('exact_efficiency_max_nodes', 2000)
+
+        # 中心性与路径指标精度：exact 为逐节点精确计算，approximate 为枢纽抽样和稀疏幂迭代
+        self.centrality_precision = validate_precision(self.config.get('centrality_precision', 'exact'))
+        self.centrality_samples = self.config.get('centrality_samples', 256)  # 近似模式的枢纽数量
+
         # 设置随机种子
         np.random.seed(self.random_seed)
+        self._rng = np.random.default_rng(self.random_seed)
 
-        # 缓存
-        self._cache = {} if self.enable_caching else None
+        # 持久化分析结果缓存：按图内容指纹 + 阶段参数寻址，跨进程复用
+        self.analysis_cache = AnalysisCache(
+            self.config.get('cache_dir', DEFAULT_CACHE_DIR),
+            max_bytes=self.config.get('cache_max_bytes', DEFAULT_MAX_BYTES)
+        ) if self.enable_caching else None
 
         logger.info("综合冲突网络模型初始化完成")
 
@@ -337,108 +390,130 @@ class ComprehensiveConflictNetworkModel:
 
     def _convert_to_dataframes(self):
         """将数据转换为DataFrame格式"""
-        # 实体数据
-        entities_data = []
-        for entity in self.conflict_data.get('entities', []):
-            entities_data.append({
-                'ID': entity['id'],
-                '名称': entity['name'],
-                '实体类型': entity['entity_type'],
-                '域归属': ';'.join(entity.get('domains', [])),
-                '重要性': entity.get('importance', '中'),
-                '描述': entity.get('description', ''),
-                '置信度': entity.get('confidence', 0.8),
-                '提取方法': entity.get('extraction_method', 'auto'),
-                '坐标': entity.get('coordinates', [0, 0]),
-                '创建时间': entity.get('created_at', datetime.datetime.now().isoformat())
-            })
-        self.entities_df = pd.DataFrame(entities_data)
-
-        # 关系数据
-        relations_data = []
-        for relation in self.conflict_data.get('relations', []):
-            relations_data.append({
-                'ID': relation['id'],
-                '源实体ID': relation['source_entity_id'],
-                '目标实体ID': relation['target_entity_id'],
-                '关系类型': relation['relation_type'],
-                '强度': relation.get('strength', 1.0),
-                '描述': relation.get('description', ''),
-                '跨域': relation.get('cross_domain', False),
-                '置信度': relation.get('confidence', 0.8),
-                '摩擦热度': relation.get('friction_heat', 0.5),
-                '升级潜力': relation.get('escalation_potential', 0.3),
-                '创建时间': relation.get('created_at', datetime.datetime.now().isoformat())
-            })
-        self.relations_df = pd.DataFrame(relations_data)
+        self.entities_df = self._entities_frame(self.conflict_data.get('entities', []))
+        self.relations_df = self._relations_frame(self.conflict_data.get('relations', []))
+
+    @staticmethod
+    def _entities_frame(entities: List[Dict[str, Any]]) -> pd.DataFrame:
+        """实体数据"""
+        return pd.DataFrame([{
+            'ID': entity['id'],
+            '名称': entity['name'],
+            '实体类型': entity['entity_type'],
+            '域归属': ';'.join(entity.get('domains', [])),
+            '重要性': entity.get('importance', '中'),
+            '描述': entity.get('description', ''),
+            '置信度': entity.get('confidence', 0.8),
+            '提取方法': entity.get('extraction_method', 'auto'),
+            '坐标': entity.get('coordinates', [0, 0]),
+            '创建时间': entity.get('created_at', datetime.datetime.now().isoformat())
+        } for entity in entities])
+
+    @staticmethod
+    def _relations_frame(relations: List[Dict[str, Any]]) -> pd.DataFrame:
+        """关系数据"""
+        return pd.DataFrame([{
+            'ID': relation['id'],
+            '源实体ID': relation['source_entity_id'],
+            '目标实体ID': relation['target_entity_id'],
+            '关系类型': relation['relation_type'],
+            '强度': relation.get('strength', 1.0),
+            '描述': relation.get('description', ''),
+            '跨域': relation.get('cross_domain', False),
+            '置信度': relation.get('confidence', 0.8),
+            '摩擦热度': relation.get('friction_heat', 0.5),
+            '升级潜力': relation.get('escalation_potential', 0.3),
+            '创建时间': relation.get('created_at', datetime.datetime.now().isoformat())
+        } for relation in relations])
 
     def _preprocess_data(self):
         """数据预处理"""
         if self.entities_df is not None:
-            # 处理域归属字段
-            self.entities_df['域列表'] = self.entities_df['域归属'].apply(
-                lambda x: [d.strip() for d in str(x).split(';')] if pd.notna(x) else []
-            )
-
-            # 重要性权重映射
-            importance_weights = {'高': 3, '中高': 2.5, '中': 2, '中低': 1.5, '低': 1}
-            self.entities_df['重要性权重'] = self.entities_df['重要性'].map(importance_weights).fillna(2)
-
-            # 处理坐标数据
-            self.entities_df['x坐标'] = self.entities_df['坐标'].apply(lambda x: x[0] if isinstance(x, list) and len(x) >= 2 else np.random.uniform(-1, 1))
-            self.entities_df['y坐标'] = self.entities_df['坐标'].apply(lambda x: x[1] if isinstance(x, list) and len(x) >= 2 else np.random.uniform(-1, 1))
+            self.entities_df = self._preprocess_entities(self.entities_df)
 
         if self.relations_df is not None:
-            # 确保数值字段为浮点类型
-            numeric_cols = ['强度', '置信度', '摩擦热度', '升级潜力']
-            for col in numeric_cols:
-                if col in self.relations_df.columns:
-                    self.relations_df[col] = pd.to_numeric(self.relations_df[col], errors='coerce').fillna(0.5)
+            self.relations_df = self._preprocess_relations(self.relations_df)
+
+    @staticmethod
+    def _preprocess_entities(entities_df: pd.DataFrame) -> pd.DataFrame:
+        """实体预处理：域列表、重要性权重和坐标"""
+        if entities_df.empty:
+            return entities_df
+
+        # 处理域归属字段
+        entities_df['域列表'] = entities_df['域归属'].apply(
+            lambda x: [d.strip() for d in str(x).split(';')] if pd.notna(x) else []
+        )
+
+        # 重要性权重映射
+        importance_weights = {'高': 3, '中高': 2.5, '中': 2, '中低': 1.5, '低': 1}
+        entities_df['重要性权重'] = entities_df['重要性'].map(importance_weights).fillna(2)
+
+        # 处理坐标数据
+        entities_df['x坐标'] = entities_df['坐标'].apply(lambda x: x[0] if isinstance(x, list) and len(x) >= 2 else np.random.uniform(-1, 1))
+        entities_df['y坐标'] = entities_df['坐标'].apply(lambda x: x[1] if isinstance(x, list) and len(x) >= 2 else np.random.uniform(-1, 1))
+        return entities_df
+
+    @staticmethod
+    def _preprocess_relations(relations_df: pd.DataFrame) -> pd.DataFrame:
+        """关系预处理"""
+        # 确保数值字段为浮点类型
+        numeric_cols = ['强度', '置信度', '摩擦热度', '升级潜力']
+        for col in numeric_cols:
+            if col in relations_df.columns:
+                relations_df[col] = pd.to_numeric(relations_df[col], errors='coerce').fillna(0.5)
+        return relations_df
+
+    @staticmethod
+    def _entity_attributes(entity: Dict[str, Any]) -> Dict[str, Any]:
+        """实体行 -> 节点属性"""
+        return dict(
+            name=entity['名称'],
+            entity_type=entity['实体类型'],
+            domains=entity.get('域列表', []),
+            importance=entity['重要性'],
+            importance_weight=entity.get('重要性权重', 2),
+            description=entity.get('描述', ''),
+            confidence=entity.get('置信度', 0.8),
+            x=entity.get('x坐标', 0),
+            y=entity.get('y坐标', 0),
+            created_at=entity.get('创建时间', '')
+        )
+
+    @staticmethod
+    def _relation_attributes(relation: Dict[str, Any]) -> Dict[str, Any]:
+        """关系行 -> 边属性"""
+        return dict(
+            relation_type=relation['关系类型'],
+            strength=relation['强度'],
+            cross_domain=relation.get('跨域', False),
+            description=relation.get('描述', ''),
+            confidence=relation.get('置信度', 0.8),
+            friction_heat=relation.get('摩擦热度', 0.5),
+            escalation_potential=relation.get('升级潜力', 0.3),
+            created_at=relation.get('创建时间', '')
+        )
+
+    def _store_batch(self, entities_df: pd.DataFrame, relations_df: pd.DataFrame) -> Dict[str, Any]:
+        """DataFrame行 -> IncrementalGraphStore.apply 的实体/关系参数"""
+        return dict(
+            entities=((entity['ID'], self._entity_attributes(entity))
+                      for entity in entities_df.to_dict('records')),
+            relations=((relation['ID'], relation['源实体ID'], relation['目标实体ID'], self._relation_attributes(relation))
+                       for relation in relations_df.to_dict('records'))
+        )
 
     def build_main_network(self) -> nx.Graph:
         """构建主网络图"""
         try:
             logger.info("构建主网络图...")
 
-            # 创建有向多重图以支持多种关系类型
-            G = nx.MultiDiGraph()
-
-            # 添加节点
-            for _, entity in self.entities_df.iterrows():
-                G.add_node(
-                    entity['ID'],
-                    name=entity['名称'],
-                    entity_type=entity['实体类型'],
-                    domains=entity.get('域列表', []),
-                    importance=entity['重要性'],
-                    importance_weight=entity.get('重要性权重', 2),
-                    description=entity.get('描述', ''),
-                    confidence=entity.get('置信度', 0.8),
-                    x=entity.get('x坐标', 0),
-                    y=entity.get('y坐标', 0),
-                    created_at=entity.get('创建时间', '')
-                )
-
-            # 添加边
-            for _, relation in self.relations_df.iterrows():
-                source = relation['源实体ID']
-                target = relation['目标实体ID']
-
-                if source in G.nodes and target in G.nodes:
-                    G.add_edge(
-                        source,
-                        target,
-                        key=relation['ID'],
-                        relation_type=relation['关系类型'],
-                        strength=relation['强度'],
-                        cross_domain=relation.get('跨域', False),
-                        description=relation.get('描述', ''),
-                        confidence=relation.get('置信度', 0.8),
-                        friction_heat=relation.get('摩擦热度', 0.5),
-                        escalation_potential=relation.get('升级潜力', 0.3),
-                        created_at=relation.get('创建时间', '')
-                    )
+            # 有向多重图以支持多种关系类型，边的key为关系ID
+            store = IncrementalGraphStore(nx.MultiDiGraph)
+            store.apply(**self._store_batch(self.entities_df, self.relations_df))
 
+            G = store.graph
+            self.graph_store = store
             self.main_network = G
             logger.info(f"主网络构建完成: {G.number_of_nodes()} 节点, {G.number_of_edges()} 边")
             return G
@@ -447,6 +522,64 @@ class ComprehensiveConflictNetworkModel:
             logger.error(f"主网络构建失败: {e}")
             raise
 
+    def build_compact_network(self) -> CompactGraph:
+        """
+        由实体/关系DataFrame直接构建紧凑图（CSR邻接 + 列存属性），不经过NetworkX
+
+        节点、边与 build_main_network 相同；传播、鲁棒性和社团分析可直接传入该图，
+        大图上内存约为NetworkX表示的十分之一
+        """
+        compact = CompactGraph.from_records(directed=True, multigraph=True,
+                                            **self._store_batch(self.entities_df, self.relations_df))
+        logger.info(f"紧凑网络构建完成: {compact.number_of_nodes()} 节点, {compact.number_of_edges()} 边, "
+                    f"{compact.memory_bytes() / 1024 / 1024:.1f} MB")
+        return compact
+
+    def apply_network_changes(self,
+                              entities: List[Dict[str, Any]] = None,
+                              relations: List[Dict[str, Any]] = None,
+                              removed_entity_ids: List[str] = None,
+                              removed_relation_ids: List[str] = None) -> List[GraphChange]:
+        """
+        增量导入一批实体/关系变更，只更新主网络中受影响的节点和边
+
+        变更后主网络指纹随之变化，run_comprehensive_analysis 会自动重算各阶段；
+        需要按节点失效的下游可通过 self.graph_store.subscribe / affected_nodes 读取变更流
+
+        Args:
+            entities: 新增或更新的实体（与JSON数据格式相同，按id覆盖）
+            relations: 新增或更新的关系（与JSON数据格式相同，按id覆盖）
+            removed_entity_ids: 要删除的实体ID
+            removed_relation_ids: 要删除的关系ID
+
+        Returns:
+            本批次的变更记录
+        """
+        if self.main_network is None:
+            if self.entities_df is not None and self.relations_df is not None:
+                self.build_main_network()
+            else:
+                self.graph_store = IncrementalGraphStore(nx.MultiDiGraph)
+                self.main_network = self.graph_store.graph
+        elif self.graph_store is None or self.graph_store.graph is not self.main_network:
+            self.graph_store = IncrementalGraphStore.from_graph(self.main_network)
+
+        removed_entity_ids = list(removed_entity_ids or [])
+        removed_relation_ids = list(removed_relation_ids or [])
+        entities_df = self._preprocess_entities(self._entities_frame(entities or []))
+        relations_df = self._preprocess_relations(self._relations_frame(relations or []))
+
+        self.entities_df = merge_rows(self.entities_df, entities_df, removed_entity_ids)
+        self.relations_df = merge_rows(self.relations_df, relations_df, removed_relation_ids)
+
+        changes = self.graph_store.apply(
+            removed_entities=removed_entity_ids,
+            removed_relations=removed_relation_ids,
+            **self._store_batch(entities_df, relations_df)
+        )
+        logger.info(f"增量更新完成: {len(changes)} 项变更")
+        return changes
+
     def build_conflict_intensity_model(self, graph: nx.Graph = None) -> ConflictIntensityModel:
         """
         构建冲突强度量化模型
@@ -622,12 +755,12 @@ class ComprehensiveConflictNetworkModel:
             logger.error(f"冲突强度模型构建失败: {e}")
             raise
 
-    def discover_communities(self, graph: nx.Graph = None, methods: List[str] = None) -> CommunityStructure:
+    def discover_communities(self, graph: Union[nx.Graph, CompactGraph] = None, methods: List[str] = None) -> CommunityStructure:
         """
         社团发现和聚类分析
 
         Args:
-            graph: 要分析的网络图，默认为主网络
+            graph: 要分析的网络图或紧凑图（CompactGraph），默认为主网络
             methods: 使用的社团发现方法列表
 
         Returns:
@@ -654,8 +787,15 @@ class ComprehensiveConflictNetworkModel:
 
             if 'louvain' in methods and HAS_LOUVAIN:
                 try:
-                    partition = community_louvain.best_partition(undirected_graph)
-                    louvain_modularity = community_louvain.modularity(partition, undirected_graph)
+                    louvain_graph = undirected_graph
+                    if isinstance(undirected_graph, CompactGraph):
+                        # python-louvain 只接受NetworkX图，只转换不带属性的拓扑骨架
+                        louvain_graph = nx.relabel_nodes(
+                            nx.from_scipy_sparse_array(scipy_adjacency(undirected_graph)[1]),
+                            dict(enumerate(undirected_graph.nodes()))
+                        )
+                    partition = community_louvain.best_partition(louvain_graph)
+                    louvain_modularity = community_louvain.modularity(partition, louvain_graph)
 
                     # 重组社团结构
                     communities_dict = defaultdict(list)
@@ -672,7 +812,10 @@ class ComprehensiveConflictNetworkModel:
             if 'spectral' in methods:
                 try:
                     # 使用邻接矩阵进行谱聚类
-                    adj_matrix = nx.adjacency_matrix(undirected_graph).toarray()
+                    if isinstance(undirected_graph, CompactGraph):
+                        adj_matrix = scipy_adjacency(undirected_graph)[1].toarray()
+                    else:
+                        adj_matrix = nx.adjacency_matrix(undirected_graph).toarray()
 
                     # 估计最优聚类数
                     n_nodes = adj_matrix.shape[0]
@@ -727,62 +870,67 @@ class ComprehensiveConflictNetworkModel:
             num_communities = len(main_communities)
             community_sizes = [len(nodes) for nodes in main_communities.values()]
 
-            # 社团密度计算
-            community_densities = {}
-            for comm_id, nodes in main_communities.items():
-                subgraph = undirected_graph.subgraph(nodes)
-                community_densities[comm_id] = nx.density(subgraph)
-
-            # 社团导纳度计算
-            community_conductance = {}
-            for comm_id, nodes in main_communities.items():
-                internal_edges = 0
-                external_edges = 0
-
-                for node in nodes:
-                    for neighbor in undirected_graph.neighbors(node):
-                        if neighbor in nodes:
-                            internal_edges += 1
-                        else:
-                            external_edges += 1
-
-                total_edges = internal_edges + external_edges
-                if total_edges > 0:
-                    community_conductance[comm_id] = external_edges / total_edges
-                else:
-                    community_conductance[comm_id] = 0.0
-
-            # 跨域分析
-            cross_domain_edges = 0
-            intra_domain_edges = 0
-
-            for u, v in undirected_graph.edges():
-                u_domains = set(graph.nodes[u].get('domains', []))
-                v_domains = set(graph.nodes[v].get('domains', []))
-
-                if u_domains.intersection(v_domains):
-                    intra_domain_edges += 1
-                else:
-                    cross_domain_edges += 1
-
-            # 域混合矩阵
-            all_domains = set()
-            for node in graph.nodes():
-                all_domains.update(graph.nodes[node].get('domains', []))
-
-            domain_list = sorted(list(all_domains))
-            domain_mixing_matrix = np.zeros((len(domain_list), len(domain_list)))
+            if isinstance(undirected_graph, CompactGraph):
+                # 紧凑图：社团密度/导纳度和域混合按CSR数组向量化统计
+                community_densities, community_conductance = community_statistics(undirected_graph, main_communities)
+                cross_domain_edges, intra_domain_edges, domain_list, domain_mixing_matrix = domain_mixing(undirected_graph)
+            else:
+                # 社团密度计算
+                community_densities = {}
+                for comm_id, nodes in main_communities.items():
+                    subgraph = undirected_graph.subgraph(nodes)
+                    community_densities[comm_id] = nx.density(subgraph)
 
-            for u, v in undirected_graph.edges():
-                u_domains = graph.nodes[u].get('domains', [])
-                v_domains = graph.nodes[v].get('domains', [])
+                # 社团导纳度计算
+                community_conductance = {}
+                for comm_id, nodes in main_communities.items():
+                    internal_edges = 0
+                    external_edges = 0
 
-                for u_domain in u_domains:
-                    for v_domain in v_domains:
-                        if u_domain in domain_list and v_domain in domain_list:
-                            i = domain_list.index(u_domain)
-                            j = domain_list.index(v_domain)
-                            domain_mixing_matrix[i, j] += 1
+                    for node in nodes:
+                        for neighbor in undirected_graph.neighbors(node):
+                            if neighbor in nodes:
+                                internal_edges += 1
+                            else:
+                                external_edges += 1
+
+                    total_edges = internal_edges + external_edges
+                    if total_edges > 0:
+                        community_conductance[comm_id] = external_edges / total_edges
+                    else:
+                        community_conductance[comm_id] = 0.0
+
+                # 跨域分析
+                cross_domain_edges = 0
+                intra_domain_edges = 0
+
+                for u, v in undirected_graph.edges():
+                    u_domains = set(graph.nodes[u].get('domains', []))
+                    v_domains = set(graph.nodes[v].get('domains', []))
+
+                    if u_domains.intersection(v_domains):
+                        intra_domain_edges += 1
+                    else:
+                        cross_domain_edges += 1
+
+                # 域混合矩阵
+                all_domains = set()
+                for node in graph.nodes():
+                    all_domains.update(graph.nodes[node].get('domains', []))
+
+                domain_list = sorted(list(all_domains))
+                domain_mixing_matrix = np.zeros((len(domain_list), len(domain_list)))
+
+                for u, v in undirected_graph.edges():
+                    u_domains = graph.nodes[u].get('domains', [])
+                    v_domains = graph.nodes[v].get('domains', [])
+
+                    for u_domain in u_domains:
+                        for v_domain in v_domains:
+                            if u_domain in domain_list and v_domain in domain_list:
+                                i = domain_list.index(u_domain)
+                                j = domain_list.index(v_domain)
+                                domain_mixing_matrix[i, j] += 1
 
             # 社团中心性计算
             community_centralities = {}
@@ -805,7 +953,13 @@ class ComprehensiveConflictNetworkModel:
             # 桥梁节点识别
             bridge_nodes = []
             try:
-                betweenness = nx.betweenness_centrality(undirected_graph)
+                if isinstance(undirected_graph, CompactGraph):
+                    # 全部节点作枢纽时与 nx.betweenness_centrality 一致
+                    betweenness = SampledCentralityEngine(undirected_graph).betweenness_closeness(
+                        k=undirected_graph.number_of_nodes()
+                    )['betweenness']
+                else:
+                    betweenness = nx.betweenness_centrality(undirected_graph)
                 threshold = np.percentile(list(betweenness.values()), 80)
                 bridge_nodes = [node for node, score in betweenness.items() if score >= threshold]
             except:
@@ -836,12 +990,15 @@ class ComprehensiveConflictNetworkModel:
             logger.error(f"社团发现失败: {e}")
             raise
 
-    def analyze_centrality(self, graph: nx.Graph = None) -> CentralityAnalysis:
+    def analyze_centrality(self, graph: nx.Graph = None, precision: str = None) -> CentralityAnalysis:
         """
         全面的中心性分析
 
         Args:
             graph: 要分析的网络图，默认为主网络
+            precision: 计算精度，exact 或 approximate，默认取配置 centrality_precision。
+                approximate 模式下介数/接近中心性按 centrality_samples 个枢纽抽样估计，
+                特征向量/Katz/PageRank 使用稀疏幂迭代，误差界记录在 error_bounds 中
 
         Returns:
             CentralityAnalysis: 中心性分析结果
@@ -852,26 +1009,42 @@ class ComprehensiveConflictNetworkModel:
         if graph is None:
             raise ValueError("网络图未构建")
 
-        logger.info("开始中心性分析...")
+        precision = validate_precision(precision or self.centrality_precision)
+        logger.info(f"开始中心性分析（{precision}）...")
 
         try:
             # 转换为无向图进行某些计算
             undirected_graph = graph.to_undirected() if graph.is_directed() else graph
+            error_bounds = {}
 
             # 基础中心性指标
             degree_centrality = nx.degree_centrality(undirected_graph)
-            betweenness_centrality = nx.betweenness_centrality(undirected_graph)
-            closeness_centrality = nx.closeness_centrality(undirected_graph)
+            if precision == 'approximate':
+                undirected_engine = SampledCentralityEngine(undirected_graph)
+                engine = undirected_engine if graph is undirected_graph else SampledCentralityEngine(graph)
+                sampled = undirected_engine.betweenness_closeness(self.centrality_samples, self._rng)
+                betweenness_centrality = sampled['betweenness']
+                closeness_centrality = sampled['closeness']
+                error_bounds['betweenness_closeness'] = sampled['error_bounds']
+            else:
+                betweenness_centrality = nx.betweenness_centrality(undirected_graph)
+                closeness_centrality = nx.closeness_centrality(undirected_graph)
 
             # 特征向量中心性
             try:
-                eigenvector_centrality = nx.eigenvector_centrality(undirected_graph, max_iter=1000)
+                if precision == 'approximate':
+                    eigenvector_centrality, error_bounds['eigenvector'] = undirected_engine.eigenvector(max_iter=1000)
+                else:
+                    eigenvector_centrality = nx.eigenvector_centrality(undirected_graph, max_iter=1000)
             except:
                 eigenvector_centrality = degree_centrality
                 logger.warning("特征向量中心性计算失败，使用度中心性代替")
 
             # PageRank（适用于有向图）
-            pagerank = nx.pagerank(graph)
+            if precision == 'approximate':
+                pagerank, error_bounds['pagerank'] = engine.pagerank()
+            else:
+                pagerank = nx.pagerank(graph)
 
             # HITS算法
             try:
@@ -882,7 +1055,10 @@ class ComprehensiveConflictNetworkModel:
 
             # Katz中心性
             try:
-                katz_centrality = nx.katz_centrality(graph, max_iter=1000)
+                if precision == 'approximate':
+                    katz_centrality, error_bounds['katz'] = engine.katz(max_iter=1000)
+                else:
+                    katz_centrality = nx.katz_centrality(graph, max_iter=1000)
             except:
                 katz_centrality = degree_centrality
                 logger.warning("Katz中心性计算失败，使用度中心性代替")
@@ -986,7 +1162,9 @@ class ComprehensiveConflictNetworkModel:
                 cross_domain_centrality=cross_domain_centrality,
                 centrality_rankings=centrality_rankings,
                 centrality_correlations=centrality_correlations,
-                critical_nodes=critical_nodes
+                critical_nodes=critical_nodes,
+                precision=precision,
+                error_bounds=error_bounds
             )
 
             self.centrality_analysis = centrality_analysis
@@ -997,12 +1175,15 @@ class ComprehensiveConflictNetworkModel:
             logger.error(f"中心性分析失败: {e}")
             raise
 
-    def analyze_network_topology(self, graph: nx.Graph = None) -> NetworkTopologyMetrics:
+    def analyze_network_topology(self, graph: nx.Graph = None, precision: str = None) -> NetworkTopologyMetrics:
         """
         全面的网络拓扑分析
 
         Args:
             graph: 要分析的网络图，默认为主网络
+            precision: 计算精度，exact 或 approximate，默认取配置 centrality_precision。
+                approximate 模式下平均路径长度按枢纽抽样估计，直径/半径取双扫上下界，
+                误差界记录在 error_bounds 中
 
         Returns:
             NetworkTopologyMetrics: 拓扑分析结果
@@ -1013,13 +1194,8 @@ class ComprehensiveConflictNetworkModel:
         if graph is None:
             raise ValueError("网络图未构建")
 
-        logger.info("开始网络拓扑分析...")
-
-        # 检查缓存
-        cache_key = f"topology_metrics_{hash(str(sorted(graph.nodes())))}"
-        if self._cache and cache_key in self._cache:
-            logger.info("使用缓存的拓扑分析结果")
-            return self._cache[cache_key]
+        precision = validate_precision(precision or self.centrality_precision)
+        logger.info(f"开始网络拓扑分析（{precision}）...")
 
         try:
             # 转换为简单无向图进行分析
@@ -1046,24 +1222,30 @@ class ComprehensiveConflictNetworkModel:
             component_sizes = [len(comp) for comp in components]
             largest_component_size = max(component_sizes) if component_sizes else 0
 
-            # 路径分析
+            # 路径分析（不连通时对最大连通分量进行分析）
+            error_bounds = {}
             if is_connected:
-                avg_path_length = nx.average_shortest_path_length(simple_graph)
-                diameter = nx.diameter(simple_graph)
-                radius = nx.radius(simple_graph)
-                eccentricities = nx.eccentricity(simple_graph)
+                path_graph = simple_graph
+            elif component_sizes:
+                path_graph = simple_graph.subgraph(max(components, key=len))
             else:
-                # 对最大连通分量进行分析
-                if component_sizes:
-                    largest_component = max(components, key=len)
-                    largest_subgraph = simple_graph.subgraph(largest_component)
-                    avg_path_length = nx.average_shortest_path_length(largest_subgraph)
-                    diameter = nx.diameter(largest_subgraph)
-                    radius = nx.radius(largest_subgraph)
-                    eccentricities = nx.eccentricity(largest_subgraph)
-                else:
-                    avg_path_length = diameter = radius = 0
-                    eccentricities = {}
+                path_graph = None
+
+            if path_graph is None:
+                avg_path_length = diameter = radius = 0
+                eccentricities = {}
+            elif precision == 'approximate':
+                path_stats = SampledCentralityEngine(path_graph).path_statistics(self.centrality_samples, self._rng)
+                avg_path_length = path_stats['avg_path_length']
+                diameter = path_stats['diameter']
+                radius = path_stats['radius']
+                eccentricities = path_stats['eccentricities']
+                error_bounds['paths'] = path_stats['error_bounds']
+            else:
+                avg_path_length = nx.average_shortest_path_length(path_graph)
+                diameter = nx.diameter(path_graph)
+                radius = nx.radius(path_graph)
+                eccentricities = nx.eccentricity(path_graph)
 
             # 偏心率统计
             ecc_values = list(eccentricities.values()) if eccentricities else [0]
@@ -1074,10 +1256,10 @@ class ComprehensiveConflictNetworkModel:
                 'max': np.max(ecc_values)
             }
 
-            # 聚类分析
-            global_clustering = nx.average_clustering(simple_graph)
+            # 聚类分析（平均聚类系数即局部聚类系数的均值，只计算一次）
             local_clustering = nx.clustering(simple_graph)
             local_clustering_avg = np.mean(list(local_clustering.values())) if local_clustering else 0
+            global_clustering = local_clustering_avg
             transitivity = nx.transitivity(simple_graph)
 
             # 度分布分析
@@ -1124,9 +1306,12 @@ class ComprehensiveConflictNetworkModel:
             try:
                 if is_connected and num_nodes >= 10:
                     # 计算小世界指标
-                    random_graph = nx.erdos_renyi_graph(num_nodes, density)
+                    if precision == 'approximate':
+                        random_graph = nx.fast_gnp_random_graph(num_nodes, density, seed=int(self._rng.integers(2 ** 31)))
+                    else:
+                        random_graph = nx.erdos_renyi_graph(num_nodes, density)
                     random_clustering = nx.average_clustering(random_graph)
-                    random_path_length = nx.average_shortest_path_length(random_graph) if nx.is_connected(random_graph) else avg_path_length
+                    random_path_length = self._average_path_length(random_graph, precision) if nx.is_connected(random_graph) else avg_path_length
 
                     if random_clustering > 0 and random_path_length > 0:
                         clustering_ratio = global_clustering / random_clustering
@@ -1136,7 +1321,7 @@ class ComprehensiveConflictNetworkModel:
                         # Omega指标
                         lattice_graph = nx.watts_strogatz_graph(num_nodes, int(avg_degree), 0)
                         lattice_clustering = nx.average_clustering(lattice_graph)
-                        lattice_path_length = nx.average_shortest_path_length(lattice_graph)
+                        lattice_path_length = self._average_path_length(lattice_graph, precision)
 
                         if lattice_clustering > 0 and random_path_length > 0:
                             small_world_omega = (avg_path_length / random_path_length) - (global_clustering / lattice_clustering)
@@ -1167,13 +1352,11 @@ class ComprehensiveConflictNetworkModel:
                 degree_assortativity=degree_assortativity,
                 attribute_assortativity=attribute_assortativity,
                 small_world_sigma=small_world_sigma,
-                small_world_omega=small_world_omega
+                small_world_omega=small_world_omega,
+                precision=precision,
+                error_bounds=error_bounds
             )
 
-            # 缓存结果
-            if self._cache:
-                self._cache[cache_key] = metrics
-
             self.topology_metrics = metrics
             logger.info("网络拓扑分析完成")
             return metrics
@@ -1182,13 +1365,19 @@ class ComprehensiveConflictNetworkModel:
             logger.error(f"网络拓扑分析失败: {e}")
             raise
 
-    def model_conflict_propagation(self, graph: nx.Graph = None,
+    def _average_path_length(self, graph: nx.Graph, precision: str) -> float:
+        """连通图的平均最短路径长度，approximate 模式按枢纽抽样估计"""
+        if precision == 'approximate':
+            return SampledCentralityEngine(graph).path_statistics(self.centrality_samples, self._rng)['avg_path_length']
+        return nx.average_shortest_path_length(graph)
+
+    def model_conflict_propagation(self, graph: Union[nx.Graph, CompactGraph] = None,
                                    initial_conflicts: Dict[str, float] = None) -> ConflictPropagationModel:
         """
         构建冲突传播动力学模型
 
         Args:
-            graph: 要分析的网络图，默认为主网络
+            graph: 要分析的网络图或紧凑图（CompactGraph），默认为主网络
             initial_conflicts: 初始冲突状态字典
 
         Returns:
@@ -1216,71 +1405,66 @@ class ComprehensiveConflictNetworkModel:
             recovery_rate = 0.1  # 恢复率
             spontaneous_rate = 0.05  # 自发冲突率
 
-            # 构建影响矩阵
-            influence_matrix = np.zeros((n_nodes, n_nodes))
-            node_to_idx = {node: idx for idx, node in enumerate(nodes)}
-
-            for u, v, data in graph.edges(data=True):
-                u_idx = node_to_idx[u]
-                v_idx = node_to_idx[v]
+            engine = SparsePropagationEngine(graph, batch_size=self.propagation_batch_size)
 
-                # 影响强度基于边权重和距离
-                strength = data.get('strength', 1.0)
-                friction = data.get('friction_heat', 0.5)
-                influence = strength * friction * transmission_rate
+            # 构建稀疏影响矩阵（正向影响基于边权重和摩擦热度，反向影响稍弱）
+            influence_matrix = engine.influence_matrix(transmission_rate, reverse_factor=0.8)
 
-                influence_matrix[u_idx, v_idx] = influence
-                influence_matrix[v_idx, u_idx] = influence * 0.8  # 反向影响稍弱
+            # 传播路径分析 - 全部节点的3跳可达规模，显式路径只保留影响范围最大的源节点
+            propagation_reach = engine.reachable_within(nodes, cutoff=3)
+            ranked_sources = sorted(nodes, key=lambda node: propagation_reach.get(node, 0), reverse=True)
+            path_sources = ranked_sources[:self.propagation_path_sources]
 
-            # 传播路径分析
             propagation_paths = {}
-            for source in nodes[:min(20, len(nodes))]:  # 限制计算量
-                paths = {}
-                try:
-                    # 计算从源节点到其他节点的最短路径
+            for source in path_sources:
+                if isinstance(graph, CompactGraph):
+                    shortest_paths = engine.shortest_paths(source, cutoff=3)
+                else:
                     shortest_paths = nx.single_source_shortest_path(graph, source, cutoff=3)
-                    for target, path in shortest_paths.items():
-                        if len(path) > 1:  # 排除自身
-                            paths[target] = path
-                except:
-                    pass
-                propagation_paths[source] = paths
+                propagation_paths[source] = {
+                    target: path for target, path in shortest_paths.items() if len(path) > 1
+                }
 
-            # 级联分析 - 简化的级联模型
-            cascade_sizes = []
-            for _ in range(100):  # Monte Carlo 模拟
-                # 随机选择初始节点
-                initial_node = np.random.choice(nodes)
-                cascade_size = self._simulate_cascade(graph, initial_node, transmission_rate)
-                cascade_sizes.append(cascade_size)
+            # 级联分析 - 批量独立级联模拟，大图上抽样固定数量的初始节点
+            if self.cascade_simulations is None or n_nodes <= self.cascade_simulations:
+                cascade_seeds = nodes
+            else:
+                cascade_seeds = [nodes[idx] for idx in
+                                 self._rng.integers(0, n_nodes, size=self.cascade_simulations)]
+            cascade_sizes = engine.simulate_cascades(cascade_seeds, transmission_rate, rng=self._rng)
 
-            cascade_size_distribution = dict(Counter(cascade_sizes))
+            cascade_size_distribution = {
+                int(size): int(count)
+                for size, count in zip(*np.unique(cascade_sizes, return_counts=True))
+            }
 
             # 临界级联阈值
             cascade_threshold_candidates = np.linspace(0.1, 0.9, 9)
             critical_cascade_threshold = 0.5  # 默认值
 
             for threshold in cascade_threshold_candidates:
-                large_cascades = sum(1 for size in cascade_sizes if size > len(nodes) * threshold)
+                large_cascades = np.count_nonzero(cascade_sizes > n_nodes * threshold)
                 if large_cascades / len(cascade_sizes) < 0.05:  # 5%的大级联
                     critical_cascade_threshold = threshold
                     break
 
-            # 时间序列预测 - 简化的SIR模型
-            propagation_timeline = {}
-            peak_conflict_times = {}
-
+            # 时间序列预测 - 批量SIR模型
             if initial_conflicts is None:
-                # 随机初始化冲突状态
-                initial_conflicts = {node: np.random.random() * 0.1 for node in nodes[:5]}
+                # 随机初始化冲突状态，源节点数量受max_sir_sources和状态规模限制时优先影响范围大的节点
+                max_sources = min(self.max_sir_sources, max(1, self.sir_state_budget // max(n_nodes, 1)))
+                sir_sources = nodes if n_nodes <= max_sources else ranked_sources[:max_sources]
+                initial_conflicts = {
+                    node: intensity for node, intensity in
+                    zip(sir_sources, self._rng.random(len(sir_sources)) * 0.1)
+                }
 
-            for source_node, initial_intensity in initial_conflicts.items():
-                timeline, peak_time = self._simulate_sir_propagation(
-                    graph, source_node, initial_intensity,
-                    transmission_rate, recovery_rate, spontaneous_rate
-                )
-                propagation_timeline[source_node] = timeline
-                peak_conflict_times[source_node] = peak_time
+            sources = list(initial_conflicts.keys())
+            timelines, peak_times = engine.simulate_sir(
+                sources, [initial_conflicts[source] for source in sources],
+                transmission_rate, recovery_rate, spontaneous_rate
+            )
+            propagation_timeline = {source: timelines[i].tolist() for i, source in enumerate(sources)}
+            peak_conflict_times = {source: float(peak_times[i]) for i, source in enumerate(sources)}
 
             # 构建结果对象
             propagation_model = ConflictPropagationModel(
@@ -1292,7 +1476,8 @@ class ComprehensiveConflictNetworkModel:
                 cascade_size_distribution=cascade_size_distribution,
                 critical_cascade_threshold=critical_cascade_threshold,
                 propagation_timeline=propagation_timeline,
-                peak_conflict_times=peak_conflict_times
+                peak_conflict_times=peak_conflict_times,
+                propagation_reach=propagation_reach
             )
 
             self.propagation_model = propagation_model
@@ -1306,12 +1491,12 @@ class ComprehensiveConflictNetworkModel:
     def _simulate_cascade(self, graph: nx.Graph, initial_node: str, transmission_rate: float) -> int:
         """简单的级联模拟"""
         infected = {initial_node}
-        queue = [initial_node]
+        queue = deque([initial_node])
 
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             for neighbor in graph.neighbors(current):
-                if neighbor not in infected and np.random.random() < transmission_rate:
+                if neighbor not in infected and self._rng.random() < transmission_rate:
                     infected.add(neighbor)
                     queue.append(neighbor)
 
@@ -1320,70 +1505,20 @@ class ComprehensiveConflictNetworkModel:
     def _simulate_sir_propagation(self, graph: nx.Graph, source_node: str,
                                   initial_intensity: float, transmission_rate: float,
                                   recovery_rate: float, spontaneous_rate: float) -> Tuple[List[float], float]:
-        """SIR模型传播模拟"""
-        nodes = list(graph.nodes())
-        n_nodes = len(nodes)
-
-        # 初始状态
-        susceptible = np.ones(n_nodes)
-        infected = np.zeros(n_nodes)
-        recovered = np.zeros(n_nodes)
-
-        source_idx = nodes.index(source_node) if source_node in nodes else 0
-        infected[source_idx] = initial_intensity
-        susceptible[source_idx] = 1 - initial_intensity
-
-        timeline = []
-        time_steps = 50
-
-        for t in range(time_steps):
-            # 记录当前状态
-            total_infected = np.sum(infected)
-            timeline.append(total_infected)
-
-            # 更新状态
-            new_infected = np.zeros(n_nodes)
-            new_recovered = np.zeros(n_nodes)
-
-            for i, node in enumerate(nodes):
-                # 传播
-                if infected[i] > 0:
-                    for neighbor in graph.neighbors(node):
-                        j = nodes.index(neighbor)
-                        if susceptible[j] > 0:
-                            transmission_prob = transmission_rate * infected[i] * susceptible[j]
-                            transmission = min(transmission_prob, susceptible[j])
-                            new_infected[j] += transmission
-
-                # 恢复
-                recovery = recovery_rate * infected[i]
-                new_recovered[i] = recovery
-
-                # 自发冲突
-                spontaneous = spontaneous_rate * susceptible[i]
-                new_infected[i] += spontaneous
-
-            # 应用变化
-            infected += new_infected - new_recovered
-            susceptible -= new_infected + new_recovered * 0.5  # 部分恢复为易感
-            recovered += new_recovered
-
-            # 边界处理
-            infected = np.clip(infected, 0, 1)
-            susceptible = np.clip(susceptible, 0, 1)
-            recovered = np.clip(recovered, 0, 1)
-
-        # 找到峰值时间
-        peak_time = float(np.argmax(timeline))
-
-        return timeline, peak_time
-
-    def analyze_network_robustness(self, graph: nx.Graph = None) -> NetworkRobustness:
+        """SIR模型传播模拟（单源，批量模拟见SparsePropagationEngine.simulate_sir）"""
+        engine = SparsePropagationEngine(graph, batch_size=1)
+        timelines, peak_times = engine.simulate_sir(
+            [source_node], [initial_intensity],
+            transmission_rate, recovery_rate, spontaneous_rate
+        )
+        return timelines[0].tolist(), float(peak_times[0])
+
+    def analyze_network_robustness(self, graph: Union[nx.Graph, CompactGraph] = None) -> NetworkRobustness:
         """
         网络稳定性和韧性分析
 
         Args:
-            graph: 要分析的网络图，默认为主网络
+            graph: 要分析的网络图或紧凑图（CompactGraph），默认为主网络
 
         Returns:
             NetworkRobustness: 网络鲁棒性分析结果
@@ -1402,11 +1537,10 @@ class ComprehensiveConflictNetworkModel:
             original_nodes = list(undirected_graph.nodes())
             n_nodes = len(original_nodes)
 
-            # 随机攻击测试
-            random_attack_results = self._simulate_random_attack(undirected_graph)
-
-            # 目标攻击测试
-            targeted_attack_results = self._simulate_targeted_attack(undirected_graph)
+            # 随机攻击和目标攻击测试共用同一渗流引擎
+            percolation = PercolationEngine(undirected_graph)
+            random_attack_results = self._simulate_random_attack(undirected_graph, percolation)
+            targeted_attack_results = self._simulate_targeted_attack(undirected_graph, percolation)
 
             # 脆弱性评分
             vulnerability_scores = {}
@@ -1421,8 +1555,7 @@ class ComprehensiveConflictNetworkModel:
                     vulnerability_scores[node] = score
             else:
                 # 简单的度中心性评分
-                degree_centrality = nx.degree_centrality(undirected_graph)
-                vulnerability_scores = degree_centrality
+                vulnerability_scores = self._degree_centrality(undirected_graph)
 
             # 关键失效节点
             sorted_vulnerability = sorted(vulnerability_scores.items(), key=lambda x: x[1], reverse=True)
@@ -1439,18 +1572,30 @@ class ComprehensiveConflictNetworkModel:
             resilience_metrics = {}
 
             # 连通韧性
-            original_components = nx.number_connected_components(undirected_graph)
+            if isinstance(undirected_graph, CompactGraph):
+                original_components = undirected_graph.number_connected_components()
+            else:
+                original_components = nx.number_connected_components(undirected_graph)
             resilience_metrics['connectivity_resilience'] = 1.0 / (original_components + 1)
 
-            # 效率韧性
+            # 效率韧性：大图或 approximate 模式下按枢纽抽样估计，并给出误差界
             try:
-                original_efficiency = nx.global_efficiency(undirected_graph)
+                if self.centrality_precision == 'approximate' or n_nodes > self.exact_efficiency_max_nodes:
+                    sampled = SampledCentralityEngine(undirected_graph).global_efficiency(
+                        self.centrality_samples, self._rng)
+                    original_efficiency = sampled['efficiency']
+                    resilience_metrics['efficiency_error_bound'] = sampled['error_bounds']['efficiency']
+                elif isinstance(undirected_graph, CompactGraph):
+                    original_efficiency = undirected_graph.global_efficiency()
+                else:
+                    original_efficiency = nx.global_efficiency(undirected_graph)
                 resilience_metrics['efficiency_resilience'] = original_efficiency
             except:
                 resilience_metrics['efficiency_resilience'] = 0.5
 
             # 结构韧性
-            original_density = nx.density(undirected_graph)
+            original_density = (undirected_graph.density() if isinstance(undirected_graph, CompactGraph)
+                                else nx.density(undirected_graph))
             resilience_metrics['structural_resilience'] = original_density
 
             # 系统性风险评分
@@ -1506,48 +1651,60 @@ class ComprehensiveConflictNetworkModel:
             logger.error(f"网络鲁棒性分析失败: {e}")
             raise
 
-    def _simulate_random_attack(self, graph: nx.Graph) -> Dict[str, Any]:
-        """模拟随机攻击"""
-        nodes = list(graph.nodes())
-        original_size = len(nodes)
-
-        for removed_fraction in np.linspace(0, 0.9, 19):
-            nodes_to_remove = int(removed_fraction * original_size)
-            if nodes_to_remove == 0:
-                continue
-
-            # 随机移除节点
-            removed_nodes = np.random.choice(nodes, size=nodes_to_remove, replace=False)
-            remaining_graph = graph.copy()
-            remaining_graph.remove_nodes_from(removed_nodes)
+    @staticmethod
+    def _degree_centrality(graph: Union[nx.Graph, CompactGraph]) -> Dict[str, float]:
+        if isinstance(graph, CompactGraph):
+            return graph.degree_centrality()
+        return nx.degree_centrality(graph)
 
-            # 检查连通性
-            if nx.number_connected_components(remaining_graph) > 1:
-                return {'threshold': removed_fraction, 'nodes_removed': nodes_to_remove}
+    def _simulate_random_attack(self, graph: nx.Graph,
+                                engine: Optional[PercolationEngine] = None) -> Dict[str, Any]:
+        """
+        模拟随机攻击
 
-        return {'threshold': 0.9, 'nodes_removed': int(0.9 * original_size)}
+        对 robustness_runs 个随机移除顺序各做一次逆向渗流，
+        在 5%~90% 的移除比例网格上找出每次首次分裂的比例，取中位数和95%区间
+        """
+        engine = engine or PercolationEngine(graph)
+        original_size = engine.n_nodes
+        fractions = np.linspace(0, 0.9, 19)[1:]
+        candidates = engine.removal_counts(fractions)
+
+        _, num_components = engine.random_curves(self.robustness_runs, self._rng)
+
+        thresholds = []
+        for run_components in num_components:
+            removed = first_fragmentation(run_components, [count for count in candidates if count > 0])
+            if removed is None:
+                thresholds.append(0.9)
+            else:
+                thresholds.append(float(fractions[list(candidates).index(removed)]))
+
+        threshold = float(np.median(thresholds))
+        return {
+            'threshold': threshold,
+            'nodes_removed': int(threshold * original_size),
+            'threshold_interval': (float(np.percentile(thresholds, 2.5)), float(np.percentile(thresholds, 97.5))),
+            'runs': len(thresholds)
+        }
 
-    def _simulate_targeted_attack(self, graph: nx.Graph) -> Dict[str, Any]:
-        """模拟目标攻击"""
+    def _simulate_targeted_attack(self, graph: nx.Graph,
+                                  engine: Optional[PercolationEngine] = None) -> Dict[str, Any]:
+        """模拟目标攻击（按度中心性从高到低移除，一次逆向渗流得到首次分裂点）"""
         # 按度中心性排序节点
-        degree_centrality = nx.degree_centrality(graph)
+        degree_centrality = self._degree_centrality(graph)
         sorted_nodes = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)
 
         original_size = len(sorted_nodes)
+        if original_size == 0:
+            return {'threshold': 1.0, 'nodes_removed': 0}
 
-        for i, (node, _) in enumerate(sorted_nodes):
-            removed_fraction = (i + 1) / original_size
-
-            # 移除高中心性节点
-            remaining_graph = graph.copy()
-            nodes_to_remove = [n for n, _ in sorted_nodes[:i+1]]
-            remaining_graph.remove_nodes_from(nodes_to_remove)
-
-            # 检查连通性
-            if remaining_graph.number_of_nodes() == 0 or nx.number_connected_components(remaining_graph) > 1:
-                return {'threshold': removed_fraction, 'nodes_removed': i + 1}
+        engine = engine or PercolationEngine(graph)
+        curve = engine.attack_curve([node for node, _ in sorted_nodes])
 
-        return {'threshold': 1.0, 'nodes_removed': original_size}
+        # 移除全部节点时必然满足条件
+        removed = first_fragmentation(curve['num_components'], range(1, original_size + 1))
+        return {'threshold': removed / original_size, 'nodes_removed': removed}
 
     def run_comprehensive_analysis(self) -> Dict[str, Any]:
         """
@@ -1566,12 +1723,16 @@ class ComprehensiveConflictNetworkModel:
                 self.build_main_network()
             results['network_built'] = True
 
+            fingerprint = graph_fingerprint(self.main_network)
+            stage_keys = {}
+            cache_status = {}
+
             # 2. 拓扑分析
-            topology_metrics = self.analyze_network_topology()
+            topology_metrics = self._run_stage('topology', fingerprint, stage_keys, cache_status)
             results['topology_metrics'] = asdict(topology_metrics)
 
             # 3. 强度建模
-            intensity_model = self.build_conflict_intensity_model()
+            intensity_model = self._run_stage('intensity', fingerprint, stage_keys, cache_status)
             results['intensity_model'] = {
                 'average_intensity': intensity_model.intensity_distribution['mean'],
                 'intensity_range': (intensity_model.intensity_distribution['min'],
@@ -1581,7 +1742,7 @@ class ComprehensiveConflictNetworkModel:
             }
 
             # 4. 社团发现
-            community_structure = self.discover_communities()
+            community_structure = self._run_stage('communities', fingerprint, stage_keys, cache_status)
             results['community_structure'] = {
                 'num_communities': community_structure.num_communities,
                 'modularity': community_structure.louvain_modularity,
@@ -1591,14 +1752,14 @@ class ComprehensiveConflictNetworkModel:
             }
 
             # 5. 中心性分析
-            centrality_analysis = self.analyze_centrality()
+            centrality_analysis = self._run_stage('centrality', fingerprint, stage_keys, cache_status)
             results['centrality_analysis'] = {
                 'critical_nodes_count': {k: len(v) for k, v in centrality_analysis.critical_nodes.items()},
                 'top_conflict_nodes': centrality_analysis.centrality_rankings.get('conflict', [])[:5]
             }
 
             # 6. 传播模型
-            propagation_model = self.model_conflict_propagation()
+            propagation_model = self._run_stage('propagation', fingerprint, stage_keys, cache_status)
             results['propagation_model'] = {
                 'transmission_rate': propagation_model.transmission_rate,
                 'critical_cascade_threshold': propagation_model.critical_cascade_threshold,
@@ -1606,7 +1767,7 @@ class ComprehensiveConflictNetworkModel:
             }
 
             # 7. 鲁棒性分析
-            robustness_analysis = self.analyze_network_robustness()
+            robustness_analysis = self._run_stage('robustness', fingerprint, stage_keys, cache_status)
             results['robustness_analysis'] = {
                 'random_attack_threshold': robustness_analysis.random_attack_threshold,
                 'targeted_attack_threshold': robustness_analysis.targeted_attack_threshold,
@@ -1615,6 +1776,7 @@ class ComprehensiveConflictNetworkModel:
             }
 
             # 8. 生成综合报告
+            results['cache_status'] = cache_status
             results['summary'] = self._generate_analysis_summary(results)
 
             logger.info("综合网络分析完成")
@@ -1624,6 +1786,73 @@ class ComprehensiveConflictNetworkModel:
             logger.error(f"综合分析失败: {e}")
             raise
 
+    def _stage_parameters(self, stage: str) -> Dict[str, Any]:
+        """影响该阶段结果的参数（随机种子按阶段派生，见 _run_stage）"""
+        parameters = {'random_seed': self.random_seed}
+        if stage in ('topology', 'centrality', 'communities'):
+            # 社团发现内部会计算中心性
+            parameters.update(precision=self.centrality_precision, centrality_samples=self.centrality_samples)
+        if stage == 'communities':
+            parameters.update(louvain=HAS_LOUVAIN, igraph=HAS_IGRAPH)
+        elif stage == 'propagation':
+            parameters.update(
+                batch_size=self.propagation_batch_size,
+                path_sources=self.propagation_path_sources,
+                cascade_simulations=self.cascade_simulations,
+                max_sir_sources=self.max_sir_sources,
+                sir_state_budget=self.sir_state_budget
+            )
+        elif stage == 'robustness':
+            parameters.update(
+                robustness_runs=self.robustness_runs,
+                precision=self.centrality_precision,
+                centrality_samples=self.centrality_samples,
+                exact_efficiency_max_nodes=self.exact_efficiency_max_nodes
+            )
+        return parameters
+
+    def _run_stage(self, stage: str, fingerprint: str, stage_keys: Dict[str, str],
+                   cache_status: Dict[str, str]) -> Any:
+        """
+        执行或从缓存恢复一个分析阶段
+
+        缓存键由图指纹、阶段参数和上游阶段的键组成；未命中时用按阶段派生的随机种子计算，
+        保证同一键下的结果与之前各阶段是否命中缓存无关
+
+        Args:
+            stage: ANALYSIS_STAGES 中的阶段名
+            fingerprint: 主网络的内容指纹
+            stage_keys: 已执行阶段的缓存键，执行后写入本阶段的键
+            cache_status: 各阶段的缓存状态（hit / computed），执行后写入本阶段
+        """
+        attribute, method_name, dependencies = ANALYSIS_STAGES[stage]
+        key = stage_key(stage, fingerprint, self._stage_parameters(stage),
+                        {dependency: stage_keys[dependency] for dependency in dependencies})
+        stage_keys[stage] = key
+
+        if self.analysis_cache is not None:
+            result = self.analysis_cache.get(key)
+            if result is not None:
+                logger.info(f"使用缓存的分析结果: {stage}")
+                setattr(self, attribute, result)
+                cache_status[stage] = 'hit'
+                return result
+
+        stage_seed = [self.random_seed, list(ANALYSIS_STAGES).index(stage)]
+        np.random.seed(stage_seed)
+        self._rng = np.random.default_rng(stage_seed)
+
+        result = getattr(self, method_name)()
+        setattr(self, attribute, result)
+        cache_status[stage] = 'computed'
+
+        if self.analysis_cache is not None:
+            try:
+                self.analysis_cache.put(key, result)
+            except Exception as e:
+                logger.warning(f"分析结果写入缓存失败 {stage}: {e}")
+        return result
+
     def _generate_analysis_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """生成分析摘要"""
         summary = {}
@@ -1638,8 +1867,8 @@ class ComprehensiveConflictNetworkModel:
 
         # 网络特征
         summary['network_characteristics'] = {
-            'small_world': topology.get('small_world_sigma', 0) > 1,
-            'scale_free': topology.get('power_law_fit_quality', 0) > 0.8,
+            'small_world': (topology.get('small_world_sigma') or 0) > 1,
+            'scale_free': (topology.get('power_law_fit_quality') or 0) > 0.8,
             'highly_clustered': topology.get('global_clustering', 0) > 0.3
         }
 
@@ -8,7 +8,7 @@ import pandas as pd
 import numpy as np
 import networkx as nx
 from typing import Dict, List, Tuple, Any, Optional, Set
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import defaultdict, Counter
 import logging
 from pathlib import Path
@@ -31,6 +31,10 @@ from sklearn.cluster import KMeans, SpectralClustering
 from sklearn.manifold import TSNE
 from sklearn.decomposition import PCA
 
+from approximate_centrality import SampledCentralityEngine, validate_precision
+from graph_store import (IncrementalGraphStore, GraphChange, merge_rows,
+                         domain_keys, entity_type_keys, relation_type_key)
+
 # 可视化库
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -74,6 +78,10 @@ class CentralityMetrics:
     eigenvector_centrality: Dict[str, float]
     pagerank: Dict[str, float]
 
+    # 计算精度（exact / approximate）及近似指标的误差界
+    precision: str = 'exact'
+    error_bounds: Dict[str, Any] = field(default_factory=dict)
+
 @dataclass
 class CommunityStructure:
     """社群结构"""
@@ -104,12 +112,19 @@ class ConflictNetworkAnalyzer:
         self.domain_networks = {}
         self.type_networks = {}
         self.relation_networks = {}
+        # 增量维护主网络和各分层投影
+        self.graph_store: Optional[IncrementalGraphStore] = None
 
         # 分析结果
         self.network_metrics = None
         self.centrality_metrics = None
         self.community_structure = None
 
+        # 中心性精度：exact 为精确计算，approximate 为枢纽抽样和稀疏幂迭代
+        self.centrality_precision = 'exact'
+        self.centrality_samples = 256
+        self.random_seed = 42
+
         # 可视化设置
         self.colors = {
             '人域域': '#FF6B6B',
@@ -138,33 +153,8 @@ class ConflictNetworkAnalyzer:
                     self.conflict_data = json.load(f)
 
                 # 转换为DataFrame
-                entities_data = []
-                for entity in self.conflict_data.get('entities', []):
-                    entities_data.append({
-                        'ID': entity['id'],
-                        '名称': entity['name'],
-                        '实体类型': entity['entity_type'],
-                        '域归属': ';'.join(entity.get('domains', [])),
-                        '重要性': entity.get('importance', '中'),
-                        '描述': entity.get('description', ''),
-                        '置信度': entity.get('confidence', 0.8),
-                        '提取方法': entity.get('extraction_method', 'auto')
-                    })
-                self.entities_df = pd.DataFrame(entities_data)
-
-                relations_data = []
-                for relation in self.conflict_data.get('relations', []):
-                    relations_data.append({
-                        'ID': relation['id'],
-                        '源实体ID': relation['source_entity_id'],
-                        '目标实体ID': relation['target_entity_id'],
-                        '关系类型': relation['relation_type'],
-                        '强度': relation.get('strength', 1.0),
-                        '描述': relation.get('description', ''),
-                        '跨域': relation.get('cross_domain', False),
-                        '置信度': relation.get('confidence', 0.8)
-                    })
-                self.relations_df = pd.DataFrame(relations_data)
+                self.entities_df = self._entities_frame(self.conflict_data.get('entities', []))
+                self.relations_df = self._relations_frame(self.conflict_data.get('relations', []))
 
             else:
                 # 从CSV文件加载
@@ -184,60 +174,112 @@ class ConflictNetworkAnalyzer:
             logger.error(f"数据加载失败: {e}")
             raise
 
+    @staticmethod
+    def _entities_frame(entities: List[Dict[str, Any]]) -> pd.DataFrame:
+        """将JSON格式的实体列表转换为DataFrame"""
+        return pd.DataFrame([{
+            'ID': entity['id'],
+            '名称': entity['name'],
+            '实体类型': entity['entity_type'],
+            '域归属': ';'.join(entity.get('domains', [])),
+            '重要性': entity.get('importance', '中'),
+            '描述': entity.get('description', ''),
+            '置信度': entity.get('confidence', 0.8),
+            '提取方法': entity.get('extraction_method', 'auto')
+        } for entity in entities])
+
+    @staticmethod
+    def _relations_frame(relations: List[Dict[str, Any]]) -> pd.DataFrame:
+        """将JSON格式的关系列表转换为DataFrame"""
+        return pd.DataFrame([{
+            'ID': relation['id'],
+            '源实体ID': relation['source_entity_id'],
+            '目标实体ID': relation['target_entity_id'],
+            '关系类型': relation['relation_type'],
+            '强度': relation.get('strength', 1.0),
+            '描述': relation.get('description', ''),
+            '跨域': relation.get('cross_domain', False),
+            '置信度': relation.get('confidence', 0.8)
+        } for relation in relations])
+
     def _preprocess_data(self):
         """数据预处理"""
         if self.entities_df is not None:
-            # 处理域归属字段
-            self.entities_df['域列表'] = self.entities_df['域归属'].apply(
-                lambda x: [d.strip() for d in str(x).split(';')] if pd.notna(x) else []
-            )
-
-            # 重要性权重映射
-            importance_weights = {'高': 3, '中高': 2, '中': 1, '低': 0.5}
-            self.entities_df['重要性权重'] = self.entities_df['重要性'].map(importance_weights).fillna(1)
+            self.entities_df = self._preprocess_entities(self.entities_df)
 
         if self.relations_df is not None:
-            # 确保关系强度为数值类型
-            self.relations_df['强度'] = pd.to_numeric(self.relations_df['强度'], errors='coerce').fillna(1.0)
+            self.relations_df = self._preprocess_relations(self.relations_df)
+
+    @staticmethod
+    def _preprocess_entities(entities_df: pd.DataFrame) -> pd.DataFrame:
+        """实体预处理：域列表和重要性权重"""
+        if entities_df.empty:
+            return entities_df
+
+        # 处理域归属字段
+        entities_df['域列表'] = entities_df['域归属'].apply(
+            lambda x: [d.strip() for d in str(x).split(';')] if pd.notna(x) else []
+        )
+
+        # 重要性权重映射
+        importance_weights = {'高': 3, '中高': 2, '中': 1, '低': 0.5}
+        entities_df['重要性权重'] = entities_df['重要性'].map(importance_weights).fillna(1)
+        return entities_df
+
+    @staticmethod
+    def _preprocess_relations(relations_df: pd.DataFrame) -> pd.DataFrame:
+        """关系预处理"""
+        if relations_df.empty:
+            return relations_df
+
+        # 确保关系强度为数值类型
+        relations_df['强度'] = pd.to_numeric(relations_df['强度'], errors='coerce').fillna(1.0)
+        return relations_df
+
+    @staticmethod
+    def _entity_attributes(entity: Dict[str, Any]) -> Dict[str, Any]:
+        """实体行 -> 节点属性"""
+        return dict(
+            name=entity['名称'],
+            entity_type=entity['实体类型'],
+            domains=entity.get('域列表', []),
+            importance=entity['重要性'],
+            importance_weight=entity.get('重要性权重', 1),
+            description=entity.get('描述', ''),
+            confidence=entity.get('置信度', 0.8)
+        )
+
+    @staticmethod
+    def _relation_attributes(relation: Dict[str, Any]) -> Dict[str, Any]:
+        """关系行 -> 边属性"""
+        return dict(
+            relation_type=relation['关系类型'],
+            strength=relation['强度'],
+            cross_domain=relation.get('跨域', False),
+            description=relation.get('描述', ''),
+            confidence=relation.get('置信度', 0.8)
+        )
+
+    def _store_batch(self, entities_df: pd.DataFrame, relations_df: pd.DataFrame) -> Dict[str, Any]:
+        """DataFrame行 -> IncrementalGraphStore.apply 的实体/关系参数"""
+        return dict(
+            entities=((entity['ID'], self._entity_attributes(entity))
+                      for entity in entities_df.to_dict('records')),
+            relations=((relation['ID'], relation['源实体ID'], relation['目标实体ID'], self._relation_attributes(relation))
+                       for relation in relations_df.to_dict('records'))
+        )
 
     def build_main_network(self) -> nx.Graph:
         """构建主网络图"""
         try:
             logger.info("构建主网络图...")
 
-            # 创建有向图
-            G = nx.DiGraph()
-
-            # 添加节点
-            for _, entity in self.entities_df.iterrows():
-                domains = entity.get('域列表', [])
-                G.add_node(
-                    entity['ID'],
-                    name=entity['名称'],
-                    entity_type=entity['实体类型'],
-                    domains=domains,
-                    importance=entity['重要性'],
-                    importance_weight=entity.get('重要性权重', 1),
-                    description=entity.get('描述', ''),
-                    confidence=entity.get('置信度', 0.8)
-                )
-
-            # 添加边
-            for _, relation in self.relations_df.iterrows():
-                source = relation['源实体ID']
-                target = relation['目标实体ID']
-
-                if source in G.nodes and target in G.nodes:
-                    G.add_edge(
-                        source,
-                        target,
-                        relation_type=relation['关系类型'],
-                        strength=relation['强度'],
-                        cross_domain=relation.get('跨域', False),
-                        description=relation.get('描述', ''),
-                        confidence=relation.get('置信度', 0.8)
-                    )
+            # 有向图：同一节点对上的多条关系以最后一条为准
+            store = IncrementalGraphStore(nx.DiGraph)
+            store.apply(**self._store_batch(self.entities_df, self.relations_df))
 
+            G = store.graph
+            self.graph_store = store
             self.main_network = G
             logger.info(f"主网络构建完成: {G.number_of_nodes()} 节点, {G.number_of_edges()} 边")
             return G
@@ -246,102 +288,88 @@ class ConflictNetworkAnalyzer:
             logger.error(f"主网络构建失败: {e}")
             raise
 
-    def build_domain_networks(self) -> Dict[str, nx.Graph]:
-        """构建按域分层的网络"""
+    def _ensure_graph_store(self) -> IncrementalGraphStore:
+        """返回维护当前主网络的存储；主网络被直接替换时接管新图"""
         if self.main_network is None:
-            self.build_main_network()
+            if self.entities_df is not None and self.relations_df is not None:
+                self.build_main_network()
+            else:
+                self.graph_store = IncrementalGraphStore(nx.DiGraph)
+                self.main_network = self.graph_store.graph
+        elif self.graph_store is None or self.graph_store.graph is not self.main_network:
+            self.graph_store = IncrementalGraphStore.from_graph(self.main_network)
+        return self.graph_store
+
+    def apply_network_changes(self,
+                              entities: List[Dict[str, Any]] = None,
+                              relations: List[Dict[str, Any]] = None,
+                              removed_entity_ids: List[str] = None,
+                              removed_relation_ids: List[str] = None) -> List[GraphChange]:
+        """
+        增量导入一批实体/关系变更
 
-        logger.info("构建域分层网络...")
-        domain_networks = {}
+        只更新主网络和已构建分层网络中受影响的节点和边，
+        不重建整个网络；实体/关系DataFrame同步合并
 
-        # 获取所有域
-        all_domains = set()
-        for node, data in self.main_network.nodes(data=True):
-            all_domains.update(data.get('domains', []))
+        Args:
+            entities: 新增或更新的实体（与JSON数据格式相同，按id覆盖）
+            relations: 新增或更新的关系（与JSON数据格式相同，按id覆盖）
+            removed_entity_ids: 要删除的实体ID
+            removed_relation_ids: 要删除的关系ID
 
-        # 为每个域构建子网络
-        for domain in all_domains:
-            if not domain:
-                continue
+        Returns:
+            本批次的变更记录
+        """
+        store = self._ensure_graph_store()
+        removed_entity_ids = list(removed_entity_ids or [])
+        removed_relation_ids = list(removed_relation_ids or [])
+        entities_df = self._preprocess_entities(self._entities_frame(entities or []))
+        relations_df = self._preprocess_relations(self._relations_frame(relations or []))
+
+        self.entities_df = merge_rows(self.entities_df, entities_df, removed_entity_ids)
+        self.relations_df = merge_rows(self.relations_df, relations_df, removed_relation_ids)
+
+        changes = store.apply(
+            removed_entities=removed_entity_ids,
+            removed_relations=removed_relation_ids,
+            **self._store_batch(entities_df, relations_df)
+        )
+        logger.info(f"增量更新完成: {len(changes)} 项变更, "
+                    f"{store.graph.number_of_nodes()} 节点, {store.graph.number_of_edges()} 边")
+        return changes
 
-            # 筛选属于该域的节点
-            domain_nodes = []
-            for node, data in self.main_network.nodes(data=True):
-                if domain in data.get('domains', []):
-                    domain_nodes.append(node)
+    def build_domain_networks(self) -> Dict[str, nx.Graph]:
+        """
+        构建按域分层的网络
 
-            # 创建子图
-            domain_subgraph = self.main_network.subgraph(domain_nodes).copy()
-            domain_networks[domain] = domain_subgraph
+        子网络由图存储增量维护，之后的 apply_network_changes 会同步更新
+        """
+        logger.info("构建域分层网络...")
+        domain_networks = self._ensure_graph_store().node_projection('domain', domain_keys)
 
+        for domain, domain_subgraph in domain_networks.items():
             logger.info(f"域 {domain}: {domain_subgraph.number_of_nodes()} 节点, {domain_subgraph.number_of_edges()} 边")
 
         self.domain_networks = domain_networks
         return domain_networks
 
     def build_type_networks(self) -> Dict[str, nx.Graph]:
-        """构建按实体类型分层的网络"""
-        if self.main_network is None:
-            self.build_main_network()
-
+        """构建按实体类型分层的网络（由图存储增量维护）"""
         logger.info("构建类型分层网络...")
-        type_networks = {}
-
-        # 获取所有实体类型
-        entity_types = set()
-        for node, data in self.main_network.nodes(data=True):
-            entity_types.add(data.get('entity_type', ''))
-
-        # 为每种类型构建子网络
-        for entity_type in entity_types:
-            if not entity_type:
-                continue
-
-            # 筛选该类型的节点
-            type_nodes = []
-            for node, data in self.main_network.nodes(data=True):
-                if data.get('entity_type') == entity_type:
-                    type_nodes.append(node)
-
-            # 创建子图
-            type_subgraph = self.main_network.subgraph(type_nodes).copy()
-            type_networks[entity_type] = type_subgraph
+        type_networks = self._ensure_graph_store().node_projection('entity_type', entity_type_keys)
 
+        for entity_type, type_subgraph in type_networks.items():
             logger.info(f"类型 {entity_type}: {type_subgraph.number_of_nodes()} 节点, {type_subgraph.number_of_edges()} 边")
 
         self.type_networks = type_networks
         return type_networks
 
     def build_relation_networks(self) -> Dict[str, nx.Graph]:
-        """构建按关系类型分层的网络"""
-        if self.main_network is None:
-            self.build_main_network()
-
+        """构建按关系类型分层的网络（包含全部节点和该类型的边，由图存储增量维护）"""
         logger.info("构建关系分层网络...")
-        relation_networks = {}
-
-        # 获取所有关系类型
-        relation_types = set()
-        for _, _, data in self.main_network.edges(data=True):
-            relation_types.add(data.get('relation_type', ''))
-
-        # 为每种关系类型构建网络
-        for relation_type in relation_types:
-            if not relation_type:
-                continue
-
-            # 创建只包含该关系类型的网络
-            G = nx.DiGraph()
-
-            # 添加所有节点
-            G.add_nodes_from(self.main_network.nodes(data=True))
+        relation_networks = self._ensure_graph_store().edge_projection('relation_type', relation_type_key)
 
-            # 只添加指定类型的边
-            for source, target, data in self.main_network.edges(data=True):
-                if data.get('relation_type') == relation_type:
-                    G.add_edge(source, target, **data)
-
-            relation_networks[relation_type] = G
+        for relation_type, G in relation_networks.items():
             logger.info(f"关系 {relation_type}: {G.number_of_edges()} 边")
 
         self.relation_networks = relation_networks
@@ -420,43 +448,66 @@ class ConflictNetworkAnalyzer:
             logger.error(f"网络指标计算失败: {e}")
             raise
 
-    def calculate_centrality_metrics(self, graph: nx.Graph = None) -> CentralityMetrics:
-        """计算中心性指标"""
+    def calculate_centrality_metrics(self, graph: nx.Graph = None, precision: str = None) -> CentralityMetrics:
+        """
+        计算中心性指标
+
+        Args:
+            graph: 要分析的网络图，默认为主网络
+            precision: exact 或 approximate，默认取 centrality_precision；approximate 模式下
+                介数/接近中心性按 centrality_samples 个枢纽抽样，特征向量/PageRank 使用稀疏幂迭代
+        """
         if graph is None:
             graph = self.main_network
 
         if graph is None:
             raise ValueError("网络图未构建")
 
-        logger.info("计算中心性指标...")
+        precision = validate_precision(precision or self.centrality_precision)
+        logger.info(f"计算中心性指标（{precision}）...")
 
         try:
+            error_bounds = {}
+            engine = SampledCentralityEngine(graph) if precision == 'approximate' else None
+
             # 度中心性
             degree_centrality = nx.degree_centrality(graph)
 
-            # 介数中心性
-            betweenness_centrality = nx.betweenness_centrality(graph)
-
-            # 接近中心性
-            closeness_centrality = nx.closeness_centrality(graph)
+            # 介数中心性和接近中心性
+            if engine is not None:
+                sampled = engine.betweenness_closeness(self.centrality_samples, self.random_seed)
+                betweenness_centrality = sampled['betweenness']
+                closeness_centrality = sampled['closeness']
+                error_bounds['betweenness_closeness'] = sampled['error_bounds']
+            else:
+                betweenness_centrality = nx.betweenness_centrality(graph)
+                closeness_centrality = nx.closeness_centrality(graph)
 
             # 特征向量中心性
             try:
-                eigenvector_centrality = nx.eigenvector_centrality(graph, max_iter=1000)
+                if engine is not None:
+                    eigenvector_centrality, error_bounds['eigenvector'] = engine.eigenvector(max_iter=1000)
+                else:
+                    eigenvector_centrality = nx.eigenvector_centrality(graph, max_iter=1000)
             except:
                 # 如果计算失败，使用度中心性代替
                 eigenvector_centrality = degree_centrality
                 logger.warning("特征向量中心性计算失败，使用度中心性代替")
 
             # PageRank
-            pagerank = nx.pagerank(graph)
+            if engine is not None:
+                pagerank, error_bounds['pagerank'] = engine.pagerank()
+            else:
+                pagerank = nx.pagerank(graph)
 
             metrics = CentralityMetrics(
                 degree_centrality=degree_centrality,
                 betweenness_centrality=betweenness_centrality,
                 closeness_centrality=closeness_centrality,
                 eigenvector_centrality=eigenvector_centrality,
-                pagerank=pagerank
+                pagerank=pagerank,
+                precision=precision,
+                error_bounds=error_bounds
             )
 
             self.centrality_metrics = metrics
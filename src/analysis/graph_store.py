@@ -0,0 +1,525 @@
+"""
+增量冲突网络存储
+主网络和按域、实体类型、关系类型划分的投影子图由同一份存储维护：
+实体/关系的增删改只触及相关节点和边，不再从DataFrame整体重建；
+同时维护节点的度和强度聚合，并提供变更流供下游指标只失效受影响的节点
+
+语义与整体重建一致：
+- 端点缺失的关系暂存为待定关系，端点实体加入后自动生效，实体删除后其关系回到待定状态
+- 简单图中同一节点对上的多条关系，以最后写入的关系作为边属性（无向图不区分关系方向）
+- 多重图以关系ID作为边的key
+"""
+
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STRENGTH_ATTRIBUTE = 'strength'
+
+
+@dataclass(frozen=True)
+class GraphChange:
+    """变更流中的一条记录"""
+    sequence: int
+    operation: str  # entity_added / entity_updated / entity_removed / relation_added / relation_updated / relation_removed
+    key: Hashable  # 实体ID或关系ID
+    nodes: Tuple[Hashable, ...]  # 度、强度、属性或邻接关系发生变化的节点
+
+
+def domain_keys(attributes: Dict[str, Any]) -> Iterable[Hashable]:
+    """域投影：节点属于其 domains 列表中的每个域"""
+    return attributes.get('domains') or []
+
+
+def entity_type_keys(attributes: Dict[str, Any]) -> Iterable[Hashable]:
+    """实体类型投影"""
+    return [attributes.get('entity_type')]
+
+
+def relation_type_key(attributes: Dict[str, Any]) -> Optional[Hashable]:
+    """关系类型投影"""
+    return attributes.get('relation_type')
+
+
+def merge_rows(frame: Optional[pd.DataFrame], updates: pd.DataFrame, removed_ids: List[str]) -> pd.DataFrame:
+    """按ID合并增量行：删除被更新或移除的旧行，新行追加在末尾"""
+    if frame is None or frame.empty:
+        return updates.reset_index(drop=True)
+    dropped = set(removed_ids)
+    if not updates.empty:
+        dropped.update(updates['ID'])
+    kept = frame[~frame['ID'].isin(dropped)]
+    if updates.empty:
+        return kept.reset_index(drop=True)
+    return pd.concat([kept, updates], ignore_index=True)
+
+
+class _NodeProjection:
+    """按节点属性划分的诱导子图（一个节点可属于多个子图）"""
+
+    def __init__(self, store: 'IncrementalGraphStore', keys_fn: Callable[[Dict[str, Any]], Iterable[Hashable]]):
+        self.store = store
+        self.keys_fn = keys_fn
+        self.graphs: Dict[Hashable, nx.Graph] = {}
+        # 成员加入时会补齐与已有成员之间的边
+        for node, attributes in store.graph.nodes(data=True):
+            self.node_added(node, attributes)
+
+    def keys(self, attributes: Dict[str, Any]) -> Set[Hashable]:
+        return {key for key in self.keys_fn(attributes) if key}
+
+    def _add_member(self, key: Hashable, node: Hashable, attributes: Dict[str, Any]):
+        graph = self.graphs.get(key)
+        if graph is None:
+            graph = self.graphs[key] = self.store.graph.__class__()
+        graph.add_node(node, **attributes)
+        # 节点因属性变化新加入子图时补齐与已有成员之间的边
+        for u, v, edge_key, edge_attributes in self.store.iter_node_edges(node):
+            if u in graph and v in graph:
+                self.store.add_projected_edge(graph, u, v, edge_key, edge_attributes)
+
+    def _remove_member(self, key: Hashable, node: Hashable):
+        graph = self.graphs[key]
+        graph.remove_node(node)
+        if graph.number_of_nodes() == 0:
+            del self.graphs[key]
+
+    def node_added(self, node: Hashable, attributes: Dict[str, Any]):
+        for key in self.keys(attributes):
+            self._add_member(key, node, attributes)
+
+    def node_updated(self, node: Hashable, old_attributes: Dict[str, Any], attributes: Dict[str, Any]):
+        old_keys, new_keys = self.keys(old_attributes), self.keys(attributes)
+        for key in old_keys - new_keys:
+            self._remove_member(key, node)
+        for key in old_keys & new_keys:
+            node_attributes = self.graphs[key].nodes[node]
+            node_attributes.clear()
+            node_attributes.update(attributes)
+        for key in new_keys - old_keys:
+            self._add_member(key, node, attributes)
+
+    def node_removed(self, node: Hashable, attributes: Dict[str, Any]):
+        for key in self.keys(attributes):
+            self._remove_member(key, node)
+
+    def edge_added(self, u: Hashable, v: Hashable, edge_key: Optional[Hashable], attributes: Dict[str, Any]):
+        nodes = self.store.graph.nodes
+        for key in self.keys(nodes[u]) & self.keys(nodes[v]):
+            self.store.add_projected_edge(self.graphs[key], u, v, edge_key, attributes)
+
+    def edge_removed(self, u: Hashable, v: Hashable, edge_key: Optional[Hashable], attributes: Dict[str, Any]):
+        nodes = self.store.graph.nodes
+        for key in self.keys(nodes[u]) & self.keys(nodes[v]):
+            self.store.remove_projected_edge(self.graphs[key], u, v, edge_key)
+
+
+class _EdgeProjection:
+    """按边属性划分的子图，包含主网络全部节点和该类边"""
+
+    def __init__(self, store: 'IncrementalGraphStore', key_fn: Callable[[Dict[str, Any]], Optional[Hashable]]):
+        self.store = store
+        self.key_fn = key_fn
+        self.graphs: Dict[Hashable, nx.Graph] = {}
+        for u, v, key, attributes in store.iter_edges():
+            self.edge_added(u, v, key, attributes)
+
+    def node_added(self, node: Hashable, attributes: Dict[str, Any]):
+        for graph in self.graphs.values():
+            graph.add_node(node, **attributes)
+
+    def node_updated(self, node: Hashable, old_attributes: Dict[str, Any], attributes: Dict[str, Any]):
+        for graph in self.graphs.values():
+            node_attributes = graph.nodes[node]
+            node_attributes.clear()
+            node_attributes.update(attributes)
+
+    def node_removed(self, node: Hashable, attributes: Dict[str, Any]):
+        for graph in self.graphs.values():
+            graph.remove_node(node)
+
+    def edge_added(self, u: Hashable, v: Hashable, edge_key: Optional[Hashable], attributes: Dict[str, Any]):
+        key = self.key_fn(attributes)
+        if not key:
+            return
+        graph = self.graphs.get(key)
+        if graph is None:
+            graph = self.graphs[key] = self.store.graph.__class__()
+            graph.add_nodes_from(self.store.graph.nodes(data=True))
+        self.store.add_projected_edge(graph, u, v, edge_key, attributes)
+
+    def edge_removed(self, u: Hashable, v: Hashable, edge_key: Optional[Hashable], attributes: Dict[str, Any]):
+        key = self.key_fn(attributes)
+        if not key:
+            return
+        graph = self.graphs[key]
+        self.store.remove_projected_edge(graph, u, v, edge_key)
+        if graph.number_of_edges() == 0:
+            del self.graphs[key]
+
+
+class IncrementalGraphStore:
+    """增量维护主网络、投影子图、度/强度聚合和变更流"""
+
+    def __init__(self, graph_class: type = nx.DiGraph, max_changes: int = 100000):
+        """
+        Args:
+            graph_class: 主网络的图类型（DiGraph/Graph 按节点对合并关系，MultiDiGraph 按关系ID保留多重边）
+            max_changes: 变更流保留的最大记录数，更早的记录被丢弃
+        """
+        self.graph: nx.Graph = graph_class()
+        self.multigraph = self.graph.is_multigraph()
+
+        # 关系ID -> (源, 目标, 属性)，包括端点缺失的待定关系
+        self.relations: Dict[Hashable, Tuple[Hashable, Hashable, Dict[str, Any]]] = {}
+        self._relation_order: Dict[Hashable, int] = {}
+        self._relation_counter = 0
+        self._node_relations: Dict[Hashable, Set[Hashable]] = {}
+        # 简单图：节点对（见 _pair）-> 已生效的关系ID（按写入顺序，最后一个决定边属性）
+        self._pair_relations: Dict[Hashable, 'OrderedDict[Hashable, None]'] = {}
+
+        # 聚合：节点的度（入边+出边）和强度（关联边的 strength 之和）
+        self.degree: Dict[Hashable, int] = {}
+        self.strength: Dict[Hashable, float] = {}
+
+        self._projections: Dict[str, Any] = {}
+
+        self.sequence = 0
+        self._changes: deque = deque(maxlen=max_changes)
+        self._subscribers: List[Callable[[List[GraphChange]], None]] = []
+        self._pending: List[GraphChange] = []
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph, max_changes: int = 100000) -> 'IncrementalGraphStore':
+        """
+        接管已构建的图（不复制）
+
+        多重图以边的key作为关系ID，简单图以 (源, 目标) 作为关系ID
+        """
+        store = cls(graph.__class__, max_changes=max_changes)
+        store.graph = graph
+        for node in graph.nodes():
+            store.degree[node] = 0
+            store.strength[node] = 0.0
+        for u, v, key, attributes in store.iter_edges():
+            relation_id = key if store.multigraph else (u, v)
+            store._register_relation(relation_id, u, v, attributes)
+            if not store.multigraph:
+                store._pair_relations[store._pair(u, v)] = OrderedDict([(relation_id, None)])
+            store._update_aggregates(u, v, attributes, 1)
+        return store
+
+    # ---- 边访问 ----
+
+    def iter_edges(self) -> Iterable[Tuple[Hashable, Hashable, Optional[Hashable], Dict[str, Any]]]:
+        """(源, 目标, key, 属性)，简单图的key为None"""
+        if self.multigraph:
+            return self.graph.edges(keys=True, data=True)
+        return ((u, v, None, attributes) for u, v, attributes in self.graph.edges(data=True))
+
+    def iter_node_edges(self, node: Hashable) -> Iterable[Tuple[Hashable, Hashable, Optional[Hashable], Dict[str, Any]]]:
+        """节点的全部关联边（有向图包括出边和入边）"""
+        edges = []
+        if self.multigraph:
+            edges.extend(self.graph.edges(node, keys=True, data=True))
+            if self.graph.is_directed():
+                edges.extend(self.graph.in_edges(node, keys=True, data=True))
+        else:
+            edges.extend((u, v, None, data) for u, v, data in self.graph.edges(node, data=True))
+            if self.graph.is_directed():
+                edges.extend((u, v, None, data) for u, v, data in self.graph.in_edges(node, data=True))
+        return edges
+
+    def add_projected_edge(self, graph: nx.Graph, u, v, key, attributes: Dict[str, Any]):
+        if self.multigraph:
+            graph.add_edge(u, v, key=key, **attributes)
+        else:
+            graph.add_edge(u, v, **attributes)
+
+    def remove_projected_edge(self, graph: nx.Graph, u, v, key):
+        if self.multigraph:
+            graph.remove_edge(u, v, key=key)
+        else:
+            graph.remove_edge(u, v)
+
+    # ---- 投影 ----
+
+    def node_projection(self, name: str,
+                        keys_fn: Callable[[Dict[str, Any]], Iterable[Hashable]]) -> Dict[Hashable, nx.Graph]:
+        """
+        按节点属性划分的诱导子图，首次调用时构建，之后随变更增量维护
+
+        Returns:
+            键 -> 子图 的字典（同一个对象会被持续更新，空子图被移除）
+        """
+        if name not in self._projections:
+            self._projections[name] = _NodeProjection(self, keys_fn)
+        return self._projections[name].graphs
+
+    def edge_projection(self, name: str,
+                        key_fn: Callable[[Dict[str, Any]], Optional[Hashable]]) -> Dict[Hashable, nx.Graph]:
+        """按边属性划分的子图，首次调用时构建，之后随变更增量维护"""
+        if name not in self._projections:
+            self._projections[name] = _EdgeProjection(self, key_fn)
+        return self._projections[name].graphs
+
+    # ---- 聚合 ----
+
+    def _update_aggregates(self, u: Hashable, v: Hashable, attributes: Dict[str, Any], sign: int):
+        weight = attributes.get(STRENGTH_ATTRIBUTE, 1.0)
+        weight = float(weight) if weight is not None else 0.0
+        for node in (u, v):
+            degree = self.degree[node] + sign
+            self.degree[node] = degree
+            # 度归零时重置强度，避免浮点误差累积
+            self.strength[node] = self.strength[node] + sign * weight if degree else 0.0
+
+    def _edge_added(self, u, v, key, attributes):
+        self._update_aggregates(u, v, attributes, 1)
+        for projection in self._projections.values():
+            projection.edge_added(u, v, key, attributes)
+
+    def _edge_removed(self, u, v, key, attributes):
+        self._update_aggregates(u, v, attributes, -1)
+        for projection in self._projections.values():
+            projection.edge_removed(u, v, key, attributes)
+
+    # ---- 实体 ----
+
+    def upsert_entity(self, entity_id: Hashable, attributes: Dict[str, Any]) -> GraphChange:
+        """新增或整体替换实体属性；新增实体的待定关系随之生效"""
+        if entity_id in self.graph:
+            node_attributes = self.graph.nodes[entity_id]
+            old_attributes = dict(node_attributes)
+            node_attributes.clear()
+            node_attributes.update(attributes)
+            for projection in self._projections.values():
+                projection.node_updated(entity_id, old_attributes, attributes)
+            affected = {entity_id}
+            affected.update(self._neighbors(entity_id))
+            return self._record('entity_updated', entity_id, affected)
+
+        self.graph.add_node(entity_id, **attributes)
+        self.degree[entity_id] = 0
+        self.strength[entity_id] = 0.0
+        for projection in self._projections.values():
+            projection.node_added(entity_id, attributes)
+
+        affected = {entity_id}
+        pending = sorted(self._node_relations.get(entity_id, ()), key=self._relation_order.__getitem__)
+        for relation_id in pending:
+            source, target, _ = self.relations[relation_id]
+            if source in self.graph and target in self.graph:
+                self._attach(relation_id)
+                affected.update((source, target))
+        return self._record('entity_added', entity_id, affected)
+
+    def remove_entity(self, entity_id: Hashable) -> Optional[GraphChange]:
+        """删除实体及其关联边；关系本身保留为待定关系"""
+        if entity_id not in self.graph:
+            return None
+        affected = {entity_id}
+        affected.update(self._neighbors(entity_id))
+
+        for relation_id in sorted(self._node_relations.get(entity_id, ()), key=self._relation_order.__getitem__):
+            if self._is_attached(relation_id):
+                self._detach(relation_id)
+
+        attributes = dict(self.graph.nodes[entity_id])
+        for projection in self._projections.values():
+            projection.node_removed(entity_id, attributes)
+        self.graph.remove_node(entity_id)
+        del self.degree[entity_id]
+        del self.strength[entity_id]
+        return self._record('entity_removed', entity_id, affected)
+
+    def _neighbors(self, node: Hashable) -> Set[Hashable]:
+        neighbors = set(self.graph.successors(node) if self.graph.is_directed() else self.graph.neighbors(node))
+        if self.graph.is_directed():
+            neighbors.update(self.graph.predecessors(node))
+        return neighbors
+
+    # ---- 关系 ----
+
+    def _register_relation(self, relation_id, source, target, attributes):
+        self.relations[relation_id] = (source, target, attributes)
+        self._relation_counter += 1
+        self._relation_order[relation_id] = self._relation_counter
+        self._node_relations.setdefault(source, set()).add(relation_id)
+        self._node_relations.setdefault(target, set()).add(relation_id)
+
+    def _unregister_relation(self, relation_id):
+        source, target, _ = self.relations.pop(relation_id)
+        del self._relation_order[relation_id]
+        for node in (source, target):
+            relations = self._node_relations.get(node)
+            if relations is not None:
+                relations.discard(relation_id)
+                if not relations:
+                    del self._node_relations[node]
+
+    def _pair(self, source: Hashable, target: Hashable) -> Hashable:
+        """简单图中关系所在的节点对；无向图中 (A, B) 与 (B, A) 是同一条边"""
+        if self.graph.is_directed():
+            return source, target
+        return frozenset((source, target))
+
+    def _is_attached(self, relation_id) -> bool:
+        source, target, _ = self.relations[relation_id]
+        if self.multigraph:
+            return self.graph.has_edge(source, target, key=relation_id)
+        return relation_id in self._pair_relations.get(self._pair(source, target), ())
+
+    def _attach(self, relation_id):
+        source, target, attributes = self.relations[relation_id]
+        if self.multigraph:
+            self.graph.add_edge(source, target, key=relation_id, **attributes)
+            self._edge_added(source, target, relation_id, attributes)
+            return
+
+        stack = self._pair_relations.setdefault(self._pair(source, target), OrderedDict())
+        if stack:
+            # 新关系覆盖该节点对当前的边属性
+            self._edge_removed(source, target, None, dict(self.graph.edges[source, target]))
+            edge_attributes = self.graph.edges[source, target]
+            edge_attributes.clear()
+            edge_attributes.update(attributes)
+        else:
+            self.graph.add_edge(source, target, **attributes)
+        stack[relation_id] = None
+        self._edge_added(source, target, None, attributes)
+
+    def _detach(self, relation_id):
+        source, target, attributes = self.relations[relation_id]
+        if self.multigraph:
+            self._edge_removed(source, target, relation_id, attributes)
+            self.graph.remove_edge(source, target, key=relation_id)
+            return
+
+        pair = self._pair(source, target)
+        stack = self._pair_relations[pair]
+        is_current = next(reversed(stack)) == relation_id
+        del stack[relation_id]
+        if not is_current:
+            return
+        self._edge_removed(source, target, None, dict(self.graph.edges[source, target]))
+        if stack:
+            # 回退到该节点对上次写入的关系
+            _, _, previous = self.relations[next(reversed(stack))]
+            edge_attributes = self.graph.edges[source, target]
+            edge_attributes.clear()
+            edge_attributes.update(previous)
+            self._edge_added(source, target, None, previous)
+        else:
+            del self._pair_relations[pair]
+            self.graph.remove_edge(source, target)
+
+    def upsert_relation(self, relation_id: Hashable, source: Hashable, target: Hashable,
+                        attributes: Dict[str, Any]) -> GraphChange:
+        """新增或替换关系（可改变端点）；端点缺失时保留为待定关系"""
+        affected = set()
+        operation = 'relation_added'
+        if relation_id in self.relations:
+            operation = 'relation_updated'
+            old_source, old_target, _ = self.relations[relation_id]
+            if self._is_attached(relation_id):
+                self._detach(relation_id)
+                affected.update((old_source, old_target))
+            self._unregister_relation(relation_id)
+
+        self._register_relation(relation_id, source, target, attributes)
+        if source in self.graph and target in self.graph:
+            self._attach(relation_id)
+            affected.update((source, target))
+        return self._record(operation, relation_id, affected)
+
+    def remove_relation(self, relation_id: Hashable) -> Optional[GraphChange]:
+        """删除关系"""
+        if relation_id not in self.relations:
+            return None
+        source, target, _ = self.relations[relation_id]
+        affected = set()
+        if self._is_attached(relation_id):
+            self._detach(relation_id)
+            affected.update((source, target))
+        self._unregister_relation(relation_id)
+        return self._record('relation_removed', relation_id, affected)
+
+    # ---- 批量变更 ----
+
+    def apply(self,
+              entities: Iterable[Tuple[Hashable, Dict[str, Any]]] = (),
+              relations: Iterable[Tuple[Hashable, Hashable, Hashable, Dict[str, Any]]] = (),
+              removed_entities: Iterable[Hashable] = (),
+              removed_relations: Iterable[Hashable] = ()) -> List[GraphChange]:
+        """
+        应用一批变更：先删除关系和实体，再写入实体和关系
+
+        Args:
+            entities: (实体ID, 属性)
+            relations: (关系ID, 源实体ID, 目标实体ID, 属性)
+            removed_entities: 要删除的实体ID
+            removed_relations: 要删除的关系ID
+
+        Returns:
+            本批次的变更记录，同时推送给订阅者
+        """
+        self._pending = []
+        for relation_id in removed_relations:
+            self.remove_relation(relation_id)
+        for entity_id in removed_entities:
+            self.remove_entity(entity_id)
+        for entity_id, attributes in entities:
+            self.upsert_entity(entity_id, attributes)
+        for relation_id, source, target, attributes in relations:
+            self.upsert_relation(relation_id, source, target, attributes)
+
+        batch, self._pending = self._pending, []
+        for callback in self._subscribers:
+            try:
+                callback(batch)
+            except Exception as e:
+                logger.error(f"图变更订阅者处理失败: {e}")
+        return batch
+
+    # ---- 变更流 ----
+
+    def _record(self, operation: str, key: Hashable, nodes: Set[Hashable]) -> GraphChange:
+        self.sequence += 1
+        change = GraphChange(self.sequence, operation, key, tuple(nodes))
+        self._changes.append(change)
+        self._pending.append(change)
+        return change
+
+    def subscribe(self, callback: Callable[[List[GraphChange]], None]):
+        """订阅变更，每次 apply 后以该批次的变更记录调用"""
+        self._subscribers.append(callback)
+
+    def changes_since(self, sequence: int) -> Optional[List[GraphChange]]:
+        """
+        序号大于sequence的变更
+
+        Returns:
+            变更列表；所需记录已被丢弃时返回None，调用方应视为全部失效
+        """
+        if sequence >= self.sequence:
+            return []
+        if not self._changes or self._changes[0].sequence > sequence + 1:
+            return None
+        return [change for change in self._changes if change.sequence > sequence]
+
+    def affected_nodes(self, since: int) -> Optional[Set[Hashable]]:
+        """自序号since以来受影响的节点，记录不完整时返回None"""
+        changes = self.changes_since(since)
+        if changes is None:
+            return None
+        nodes = set()
+        for change in changes:
+            nodes.update(change.nodes)
+        return nodes
@@ -0,0 +1,269 @@
+"""
+冲突路径挖掘引擎
+对每个域对惰性地只取前k条路径（k最短路径或截断的简单路径枚举），
+边枚举边评分，用有界最小堆只保留全局top_k；域对之间互不依赖，可分发到进程池并行
+"""
+
+import heapq
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Optional, Iterator, Hashable, NamedTuple
+
+import numpy as np
+import networkx as nx
+
+logger = logging.getLogger(__name__)
+
+PATH_STRATEGIES = ('shortest', 'simple')
+
+
+class MinedPath(NamedTuple):
+    """挖掘得到的候选路径"""
+    escalation_potential: float
+    source: Hashable
+    target: Hashable
+    path: List[Hashable]
+
+
+class PairTask(NamedTuple):
+    """单个域对的挖掘任务"""
+    order: int
+    source_domain: str
+    target_domain: str
+    sources: List[Hashable]
+    targets: List[Hashable]
+
+
+# ---------------------------------------------------------------- 路径评分
+
+def path_strength(graph: nx.Graph, path: List[Hashable], conflict_weights: Dict[str, float]) -> float:
+    """路径强度：按关系类型加权的边强度之和加冲突加分，再按路径长度归一"""
+    if len(path) < 2:
+        return 0.0
+
+    total_strength = 0.0
+    conflict_bonus = 0.0
+
+    for source, target in zip(path, path[1:]):
+        if graph.has_edge(source, target):
+            edge_data = graph[source][target]
+            relation_type = edge_data.get('relation_type', '')
+            total_strength += edge_data.get('strength', 1.0) * conflict_weights.get(relation_type, 0.5)
+
+            # 冲突关系额外加分
+            if relation_type in ('对立', '竞争'):
+                conflict_bonus += 0.2
+
+    return (total_strength + conflict_bonus) / len(path)
+
+
+def path_conflict_types(graph: nx.Graph, path: List[Hashable]) -> List[str]:
+    """路径中出现的关系类型（保持首次出现顺序）"""
+    conflict_types = []
+
+    for source, target in zip(path, path[1:]):
+        if graph.has_edge(source, target):
+            relation_type = graph[source][target].get('relation_type', '')
+            if relation_type and relation_type not in conflict_types:
+                conflict_types.append(relation_type)
+
+    return conflict_types
+
+
+def path_domains(graph: nx.Graph, path: List[Hashable]) -> List[str]:
+    """路径涉及的域"""
+    domains = set()
+
+    for node in path:
+        if node in graph.nodes:
+            domains.update(graph.nodes[node].get('domains', []))
+
+    return list(domains)
+
+
+def escalation_potential(graph: nx.Graph, path: List[Hashable]) -> float:
+    """冲突升级潜力：冲突强度、节点重要性和跨域程度的加权和，限制在0-1之间"""
+    if len(path) < 2:
+        return 0.0
+
+    # 因素1: 路径中的冲突强度
+    conflict_intensity = 0.0
+    for source, target in zip(path, path[1:]):
+        if graph.has_edge(source, target):
+            relation_type = graph[source][target].get('relation_type', '')
+            if relation_type in ('对立', '竞争'):
+                conflict_intensity += 1.0
+            elif relation_type == '制约':
+                conflict_intensity += 0.5
+
+    escalation_score = conflict_intensity / (len(path) - 1)
+
+    # 因素2: 节点重要性
+    importance_bonus = 0.0
+    for node in path:
+        if node in graph.nodes:
+            importance_bonus += graph.nodes[node].get('importance_weight', 1.0)
+
+    escalation_score += importance_bonus / len(path) * 0.5
+
+    # 因素3: 跨域程度（假设最多4个域）
+    escalation_score += len(path_domains(graph, path)) / 4.0 * 0.3
+
+    return min(escalation_score, 1.0)
+
+
+# ---------------------------------------------------------------- 路径枚举
+
+def iter_pair_paths(graph: nx.Graph, source: Hashable, target: Hashable,
+                    cutoff: int, strategy: str = 'shortest') -> Iterator[List[Hashable]]:
+    """
+    惰性枚举source到target、长度不超过cutoff的路径
+
+    shortest: Yen k最短简单路径，按跳数从短到长产出，超过cutoff即停止，
+              每条路径的代价是多项式的；多重图退化为simple
+    simple:   截断的深度优先简单路径枚举，调用方用islice只取前几条
+    """
+    if source == target or source not in graph or target not in graph:
+        return
+
+    if strategy == 'shortest' and not graph.is_multigraph():
+        try:
+            for path in nx.shortest_simple_paths(graph, source, target):
+                if len(path) - 1 > cutoff:
+                    return
+                yield path
+        except nx.NetworkXNoPath:
+            return
+    else:
+        yield from nx.all_simple_paths(graph, source, target, cutoff=cutoff)
+
+
+def _push_bounded(heap: List[Tuple], item: Tuple, limit: int) -> None:
+    """有界最小堆：只保留分数最高的limit个元素"""
+    if len(heap) < limit:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def mine_pair(graph: nx.Graph, task: PairTask, paths_per_pair: int, cutoff: int,
+              top_k: int, strategy: str) -> List[Tuple]:
+    """挖掘单个域对，返回本域对内分数最高的top_k个 (分数, 排序键, MinedPath)"""
+    heap: List[Tuple] = []
+    sequence = 0
+
+    for source in task.sources:
+        for target in task.targets:
+            try:
+                for path in itertools.islice(iter_pair_paths(graph, source, target, cutoff, strategy),
+                                             paths_per_pair):
+                    score = escalation_potential(graph, path)
+                    # 同分时先产出的路径优先，保证结果与调度顺序无关
+                    item = (score, (-task.order, -sequence), MinedPath(score, source, target, path))
+                    sequence += 1
+                    _push_bounded(heap, item, top_k)
+            except Exception as e:
+                logger.warning(f"路径计算失败 {source}->{target}: {e}")
+
+    return heap
+
+
+# ---------------------------------------------------------------- 进程池
+
+_worker_graph: Optional[nx.Graph] = None
+
+
+def _init_worker(graph: nx.Graph) -> None:
+    """进程池初始化：每个工作进程只反序列化一次图"""
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _mine_pair_in_worker(args: Tuple[PairTask, int, int, int, str]) -> List[Tuple]:
+    task, paths_per_pair, cutoff, top_k, strategy = args
+    return mine_pair(_worker_graph, task, paths_per_pair, cutoff, top_k, strategy)
+
+
+class CriticalPathMiner:
+    """跨域关键路径挖掘器"""
+
+    def __init__(self, graph: nx.Graph, sample_size: int = 10, paths_per_pair: int = 3,
+                 cutoff: int = 5, strategy: str = 'shortest',
+                 max_workers: Optional[int] = None, random_seed: Optional[int] = 42):
+        """
+        Args:
+            graph: 网络图，节点属性domains为所属域列表
+            sample_size: 每个域抽样的节点数
+            paths_per_pair: 每对节点最多保留的路径数
+            cutoff: 路径最大跳数
+            strategy: 路径枚举策略，'shortest' 或 'simple'
+            max_workers: 进程数，None为CPU核数，1表示串行
+            random_seed: 节点抽样的随机种子
+        """
+        if strategy not in PATH_STRATEGIES:
+            raise ValueError(f"未知的路径枚举策略: {strategy}")
+
+        self.graph = graph
+        self.sample_size = sample_size
+        self.paths_per_pair = paths_per_pair
+        self.cutoff = cutoff
+        self.strategy = strategy
+        self.max_workers = max_workers
+        self.random_seed = random_seed
+
+    def build_tasks(self) -> List[PairTask]:
+        """按域对生成挖掘任务，抽样只依赖随机种子，与图的域集合迭代顺序无关"""
+        domain_nodes: Dict[str, List[Hashable]] = {}
+        for node, data in self.graph.nodes(data=True):
+            for domain in data.get('domains', []):
+                domain_nodes.setdefault(domain, []).append(node)
+
+        rng = np.random.default_rng(self.random_seed)
+        tasks = []
+        for order, (source_domain, target_domain) in enumerate(itertools.combinations(sorted(domain_nodes), 2)):
+            source_nodes = domain_nodes[source_domain]
+            target_nodes = domain_nodes[target_domain]
+            source_pick = rng.choice(len(source_nodes), min(self.sample_size, len(source_nodes)), replace=False)
+            target_pick = rng.choice(len(target_nodes), min(self.sample_size, len(target_nodes)), replace=False)
+            tasks.append(PairTask(
+                order=order,
+                source_domain=source_domain,
+                target_domain=target_domain,
+                sources=[source_nodes[i] for i in source_pick],
+                targets=[target_nodes[i] for i in target_pick]
+            ))
+
+        return tasks
+
+    def mine(self, top_k: int = 50) -> List[MinedPath]:
+        """挖掘全局升级潜力最高的top_k条路径，按分数从高到低返回"""
+        tasks = self.build_tasks()
+        if not tasks or top_k <= 0:
+            return []
+
+        workers = self.max_workers or os.cpu_count() or 1
+        workers = min(workers, len(tasks))
+
+        global_heap: List[Tuple] = []
+        for pair_heap in self._run_tasks(tasks, top_k, workers):
+            for item in pair_heap:
+                _push_bounded(global_heap, item, top_k)
+
+        return [item[2] for item in sorted(global_heap, reverse=True)]
+
+    def _run_tasks(self, tasks: List[PairTask], top_k: int, workers: int) -> Iterator[List[Tuple]]:
+        """执行挖掘任务，进程池不可用时退化为串行"""
+        if workers > 1:
+            args = [(task, self.paths_per_pair, self.cutoff, top_k, self.strategy) for task in tasks]
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(self.graph,)) as executor:
+                    chunksize = max(1, len(tasks) // (workers * 4))
+                    return iter(list(executor.map(_mine_pair_in_worker, args, chunksize=chunksize)))
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"进程池不可用，改为串行挖掘: {e}")
+
+        return (mine_pair(self.graph, task, self.paths_per_pair, self.cutoff, top_k, self.strategy)
+                for task in tasks)
@@ -0,0 +1,194 @@
+"""
+逆向渗流网络鲁棒性引擎（Newman-Ziff）
+不再为每个移除比例复制图并重算连通分量，而是按移除顺序的逆序逐个加回节点，
+用并查集维护连通分量，一次近线性扫描得到所有移除数量下的最大连通分量和分量数；
+多个随机移除顺序批量运行，给出均值和置信区间
+"""
+
+import logging
+from typing import Dict, List, Any, Optional, Sequence, Hashable, Tuple, Union
+
+import numpy as np
+import networkx as nx
+from compact_graph import CompactGraph, scipy_adjacency
+
+logger = logging.getLogger(__name__)
+
+
+class PercolationEngine:
+    """基于并查集的节点移除渗流模拟"""
+
+    def __init__(self, graph: Union[nx.Graph, CompactGraph]):
+        """
+        Args:
+            graph: 网络图或紧凑图（有向图按无向连通性处理，自环和多重边不影响结果）
+        """
+        self.nodes, adjacency = scipy_adjacency(graph)
+        self.node_index: Dict[Hashable, int] = {node: idx for idx, node in enumerate(self.nodes)}
+        self.n_nodes = len(self.nodes)
+
+        adjacency = (adjacency + adjacency.T).tocsr()
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+
+        # 邻接表：扫描时的Python列表访问比逐个切片NumPy数组快得多
+        indptr = adjacency.indptr.tolist()
+        indices = adjacency.indices.tolist()
+        self._neighbors: List[List[int]] = [
+            indices[indptr[i]:indptr[i + 1]] for i in range(self.n_nodes)
+        ]
+
+    def order_from_nodes(self, nodes: Sequence[Hashable]) -> List[int]:
+        """
+        节点移除顺序转为下标顺序
+
+        不在图中的节点被忽略；未列出的节点按原顺序追加在末尾
+        """
+        order = []
+        seen = set()
+        for node in nodes:
+            idx = self.node_index.get(node)
+            if idx is not None and idx not in seen:
+                seen.add(idx)
+                order.append(idx)
+        order.extend(idx for idx in range(self.n_nodes) if idx not in seen)
+        return order
+
+    def curve(self, order: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        单个移除顺序下的完整渗流曲线
+
+        Args:
+            order: 节点下标的移除顺序（须覆盖全部节点）
+
+        Returns:
+            (largest_cc_size, num_components)，长度均为 n_nodes + 1，
+            第k项为移除前k个节点后的值
+        """
+        n = self.n_nodes
+        neighbors = self._neighbors
+        parent = list(range(n))
+        size = [1] * n
+        present = [False] * n
+
+        largest_cc = np.zeros(n + 1, dtype=np.int64)
+        num_components = np.zeros(n + 1, dtype=np.int64)
+        largest = 0
+        components = 0
+
+        # 逆序加回节点：加回第k个被移除的节点后，状态对应移除了前k个节点
+        for k in range(n - 1, -1, -1):
+            node = order[k]
+            present[node] = True
+            components += 1
+            root = node
+            root_size = 1
+
+            for neighbor in neighbors[node]:
+                if not present[neighbor]:
+                    continue
+                # 查找邻居的根（路径减半）
+                other = neighbor
+                while parent[other] != other:
+                    parent[other] = parent[parent[other]]
+                    other = parent[other]
+                if other == root:
+                    continue
+                # 按大小合并
+                other_size = size[other]
+                if other_size > root_size:
+                    root, other = other, root
+                parent[other] = root
+                root_size += other_size
+                size[root] = root_size
+                components -= 1
+
+            if root_size > largest:
+                largest = root_size
+            largest_cc[k] = largest
+            num_components[k] = components
+
+        return largest_cc, num_components
+
+    def attack_curve(self, nodes: Sequence[Hashable]) -> Dict[str, np.ndarray]:
+        """按给定节点顺序移除（目标攻击）的渗流曲线"""
+        largest_cc, num_components = self.curve(self.order_from_nodes(nodes))
+        return {'largest_cc_size': largest_cc, 'num_components': num_components}
+
+    def random_curves(self, n_runs: int = 20,
+                      seed: Union[int, np.random.Generator, None] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量随机移除顺序的渗流曲线
+
+        Args:
+            n_runs: 随机移除顺序的数量
+            seed: 随机种子或Generator
+
+        Returns:
+            (largest_cc_size, num_components)，形状均为 (n_runs, n_nodes + 1)
+        """
+        rng = np.random.default_rng(seed)
+        n_runs = max(1, n_runs)
+        largest_cc = np.zeros((n_runs, self.n_nodes + 1), dtype=np.int64)
+        num_components = np.zeros((n_runs, self.n_nodes + 1), dtype=np.int64)
+
+        for run in range(n_runs):
+            order = rng.permutation(self.n_nodes).tolist()
+            largest_cc[run], num_components[run] = self.curve(order)
+
+        return largest_cc, num_components
+
+    def random_attack(self, removal_fractions: Sequence[float], n_runs: int = 20,
+                      seed: Union[int, np.random.Generator, None] = None,
+                      confidence: float = 0.95) -> Dict[str, Any]:
+        """
+        随机攻击在各移除比例下的均值和置信区间
+
+        Args:
+            removal_fractions: 移除比例，移除数量为 int(比例 * 节点数)
+            n_runs: 随机移除顺序的数量
+            seed: 随机种子或Generator
+            confidence: 置信区间水平（按各次运行的分位数计算）
+
+        Returns:
+            各比例下的最大连通分量和分量数的均值、下界、上界
+        """
+        largest_cc, num_components = self.random_curves(n_runs, seed)
+        removed = self.removal_counts(removal_fractions)
+        tail = (1.0 - confidence) / 2 * 100
+
+        largest_at = largest_cc[:, removed]
+        components_at = num_components[:, removed]
+
+        return {
+            'removal_fraction': list(removal_fractions),
+            'largest_cc_size': largest_at.mean(axis=0).tolist(),
+            'largest_cc_size_lower': np.percentile(largest_at, tail, axis=0).tolist(),
+            'largest_cc_size_upper': np.percentile(largest_at, 100 - tail, axis=0).tolist(),
+            'num_components': components_at.mean(axis=0).tolist(),
+            'num_components_lower': np.percentile(components_at, tail, axis=0).tolist(),
+            'num_components_upper': np.percentile(components_at, 100 - tail, axis=0).tolist(),
+            'runs': largest_cc.shape[0]
+        }
+
+    def removal_counts(self, removal_fractions: Sequence[float]) -> np.ndarray:
+        """移除比例对应的移除节点数"""
+        return np.array([int(fraction * self.n_nodes) for fraction in removal_fractions], dtype=np.int64)
+
+
+def first_fragmentation(num_components: np.ndarray, candidates: Sequence[int]) -> Optional[int]:
+    """
+    候选移除数量中，第一个使网络分裂（分量数 > 1）或清空的数量
+
+    Args:
+        num_components: 渗流曲线的分量数（长度 n_nodes + 1）
+        candidates: 按升序检查的移除数量
+
+    Returns:
+        移除数量，均未分裂时返回None
+    """
+    n_nodes = len(num_components) - 1
+    for removed in candidates:
+        if removed >= n_nodes or num_components[removed] > 1:
+            return int(removed)
+    return None
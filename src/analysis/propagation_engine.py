@@ -0,0 +1,302 @@
+"""
+稀疏矩阵冲突传播引擎
+每张图只构建一次scipy.sparse邻接矩阵，SIR状态以矩阵运算推进，
+多个传播源/Monte-Carlo种子按批次以数组运算一次性模拟；
+独立级联按活边图求可达集，同批种子共享一张活边图
+"""
+
+import logging
+from typing import Dict, List, Tuple, Optional, Sequence, Hashable, Union
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from compact_graph import CompactGraph, scipy_adjacency
+
+logger = logging.getLogger(__name__)
+
+
+class SparsePropagationEngine:
+    """基于稀疏邻接矩阵的批量传播模拟引擎"""
+
+    def __init__(self, graph: Union[nx.Graph, CompactGraph], batch_size: int = 256):
+        """
+        Args:
+            graph: 网络图或紧凑图（有向图按后继节点传播，多重边视为一条边）
+            batch_size: 每批同时模拟的传播源数量，控制内存峰值
+        """
+        self.nodes, adjacency = scipy_adjacency(graph)
+        self.node_index: Dict[Hashable, int] = {node: idx for idx, node in enumerate(self.nodes)}
+        self.n_nodes = len(self.nodes)
+        self.batch_size = max(1, batch_size)
+
+        # 二值邻接矩阵 A[i, j] = 1 表示 i 可以传播到 j
+        adjacency = sparse.csr_matrix(adjacency, dtype=np.float64, copy=True)
+        adjacency.data[:] = 1.0
+        self.adjacency = adjacency
+        # SIR每步需要按入边聚合，预先转置避免每步重复转换
+        self._adjacency_t = adjacency.T.tocsr()
+
+        self._graph = graph
+
+    def node_indices(self, nodes: Sequence[Hashable], default: int = 0) -> np.ndarray:
+        """节点名转为矩阵下标，不存在的节点映射为default"""
+        return np.array([self.node_index.get(node, default) for node in nodes], dtype=np.int64)
+
+    def influence_matrix(self, transmission_rate: float, reverse_factor: float = 0.8) -> sparse.csr_matrix:
+        """
+        构建稀疏影响矩阵
+
+        正向影响 = strength * friction_heat * transmission_rate，
+        反向影响为正向的reverse_factor倍；多重边或双向边取最大影响
+        """
+        if isinstance(self._graph, CompactGraph):
+            # 紧凑图直接取边属性列
+            graph = self._graph
+            edges = graph.logical_edges()
+            u_idx = graph.edge_sources()[edges].astype(np.int64)
+            v_idx = graph.indices[edges].astype(np.int64)
+            influence = (graph.edge_columns['strength'][edges].astype(np.float64)
+                         * graph.edge_columns['friction_heat'][edges] * transmission_rate)
+            rows = np.concatenate([u_idx, v_idx])
+            cols = np.concatenate([v_idx, u_idx])
+            values = np.concatenate([influence, influence * reverse_factor])
+        else:
+            rows, cols, values = [], [], []
+            for u, v, data in self._graph.edges(data=True):
+                influence = data.get('strength', 1.0) * data.get('friction_heat', 0.5) * transmission_rate
+                u_idx = self.node_index[u]
+                v_idx = self.node_index[v]
+                rows.extend((u_idx, v_idx))
+                cols.extend((v_idx, u_idx))
+                values.extend((influence, influence * reverse_factor))
+
+            rows = np.asarray(rows, dtype=np.int64)
+            cols = np.asarray(cols, dtype=np.int64)
+            values = np.asarray(values, dtype=np.float64)
+
+        if not len(values):
+            return sparse.csr_matrix((self.n_nodes, self.n_nodes))
+
+        # 按 (行, 列) 分组取最大值
+        order = np.lexsort((-values, cols, rows))
+        rows, cols, values = rows[order], cols[order], values[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+
+        return sparse.csr_matrix(
+            (values[first], (rows[first], cols[first])),
+            shape=(self.n_nodes, self.n_nodes)
+        )
+
+    def simulate_sir(self, sources: Sequence[Hashable], initial_intensities: Sequence[float],
+                     transmission_rate: float, recovery_rate: float, spontaneous_rate: float,
+                     time_steps: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量SIR传播模拟
+
+        Args:
+            sources: 传播源节点列表
+            initial_intensities: 各传播源的初始冲突强度
+
+        Returns:
+            (timelines, peak_times): 形状为 (源数, time_steps) 的感染总量时间线，
+            以及每个源的峰值时间
+        """
+        source_idx = self.node_indices(sources)
+        intensities = np.asarray(initial_intensities, dtype=np.float64)
+        n_sources = len(source_idx)
+
+        timelines = np.zeros((n_sources, time_steps), dtype=np.float64)
+        if n_sources == 0 or self.n_nodes == 0:
+            return timelines, np.zeros(n_sources, dtype=np.float64)
+
+        for start in range(0, n_sources, self.batch_size):
+            batch = slice(start, start + self.batch_size)
+            timelines[batch] = self._sir_batch(
+                source_idx[batch], intensities[batch],
+                transmission_rate, recovery_rate, spontaneous_rate, time_steps
+            )
+
+        peak_times = np.argmax(timelines, axis=1).astype(np.float64)
+        return timelines, peak_times
+
+    def _sir_batch(self, source_idx: np.ndarray, intensities: np.ndarray,
+                   transmission_rate: float, recovery_rate: float, spontaneous_rate: float,
+                   time_steps: int) -> np.ndarray:
+        """单批SIR模拟，状态矩阵按 (节点数, 批大小) 存放以便直接左乘稀疏矩阵"""
+        batch_size = len(source_idx)
+        columns = np.arange(batch_size)
+
+        susceptible = np.ones((self.n_nodes, batch_size))
+        infected = np.zeros((self.n_nodes, batch_size))
+        recovered = np.zeros((self.n_nodes, batch_size))
+
+        infected[source_idx, columns] = intensities
+        susceptible[source_idx, columns] = 1 - intensities
+
+        timeline = np.zeros((batch_size, time_steps))
+
+        for t in range(time_steps):
+            timeline[:, t] = infected.sum(axis=0)
+
+            # 邻居i对j的传播量 min(β·I_i·S_j, S_j) = S_j·min(β·I_i, 1)，按入边聚合
+            pressure = np.minimum(transmission_rate * infected, 1.0)
+            exposure = self._adjacency_t @ pressure
+
+            new_infected = susceptible * (exposure + spontaneous_rate)
+            new_recovered = recovery_rate * infected
+
+            infected += new_infected - new_recovered
+            susceptible -= new_infected + new_recovered * 0.5  # 部分恢复为易感
+            recovered += new_recovered
+
+            np.clip(infected, 0, 1, out=infected)
+            np.clip(susceptible, 0, 1, out=susceptible)
+            np.clip(recovered, 0, 1, out=recovered)
+
+        return timeline
+
+    def simulate_cascades(self, seeds: Sequence[Hashable], transmission_rate: float,
+                          rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        批量独立级联模拟
+
+        每个新感染节点对其每个未感染的后继节点独立尝试一次传播。每条边至多被尝试一次，
+        因此单个种子的级联等价于其在活边图（每条边以transmission_rate独立保留）上的可达集；
+        同一批次的种子共享一张活边图，各种子级联规模的分布不变
+
+        Returns:
+            每个种子对应的级联规模数组
+        """
+        rng = rng or np.random.default_rng()
+        seed_idx = self.node_indices(seeds)
+        sizes = np.zeros(len(seed_idx), dtype=np.int64)
+
+        for start in range(0, len(seed_idx), self.batch_size):
+            batch = seed_idx[start:start + self.batch_size]
+            sizes[start:start + len(batch)] = self._cascade_batch(batch, transmission_rate, rng)
+
+        return sizes
+
+    def _cascade_batch(self, seed_idx: np.ndarray, transmission_rate: float,
+                       rng: np.random.Generator) -> np.ndarray:
+        """
+        单批级联模拟，感染前沿以 (运行编号, 节点) 坐标数组表示
+
+        先求活边图中最大的强连通分量C及从C出发的可达集R：到达C的种子的可达集
+        为R与其余已访问节点的并集，所以前沿不展开C中的节点，单个种子的开销
+        不再随巨分量规模增长
+        """
+        batch_size = len(seed_idx)
+        adjacency = self.adjacency
+        live_graph = adjacency.copy()
+        live_graph.data = (rng.random(len(live_graph.data)) < transmission_rate).astype(np.float64)
+        live_graph.eliminate_zeros()
+        indptr = live_graph.indptr
+        indices = live_graph.indices
+
+        _, labels = csgraph.connected_components(live_graph, directed=True, connection='strong')
+        in_core = labels == np.bincount(labels).argmax()
+        core_reach = np.zeros(self.n_nodes, dtype=bool)
+        core_reach[csgraph.breadth_first_order(
+            live_graph, int(np.flatnonzero(in_core)[0]), directed=True, return_predecessors=False
+        )] = True
+
+        infected = np.zeros((batch_size, self.n_nodes), dtype=bool)
+        frontier_run = np.arange(batch_size, dtype=np.int64)
+        frontier_node = seed_idx.astype(np.int64)
+        infected[frontier_run, frontier_node] = True
+        hit_core = in_core[frontier_node].copy()
+
+        while len(frontier_node):
+            expand = ~in_core[frontier_node]
+            frontier_run, frontier_node = frontier_run[expand], frontier_node[expand]
+            starts = indptr[frontier_node]
+            degrees = indptr[frontier_node + 1] - starts
+            n_edges = int(degrees.sum())
+            if n_edges == 0:
+                break
+
+            # 展开前沿节点的全部活边
+            run = np.repeat(frontier_run, degrees)
+            offsets = np.arange(n_edges) - np.repeat(np.cumsum(degrees) - degrees, degrees)
+            neighbor = indices[np.repeat(starts, degrees) + offsets]
+
+            fresh = ~infected[run, neighbor]
+            keys = np.unique(run[fresh] * self.n_nodes + neighbor[fresh])
+            frontier_run, frontier_node = np.divmod(keys, self.n_nodes)
+            infected[frontier_run, frontier_node] = True
+            hit_core[frontier_run[in_core[frontier_node]]] = True
+
+        outside = (infected & ~core_reach).sum(axis=1)
+        return np.where(hit_core, outside + np.count_nonzero(core_reach), infected.sum(axis=1))
+
+    def reachable_within(self, sources: Sequence[Hashable], cutoff: int) -> Dict[Hashable, int]:
+        """各源节点在cutoff跳内可达的节点数（不含自身）"""
+        source_idx = self.node_indices(sources)
+        counts: Dict[Hashable, int] = {}
+
+        for start in range(0, len(source_idx), self.batch_size):
+            batch = source_idx[start:start + self.batch_size]
+            rows = np.arange(len(batch))
+            reached = sparse.csr_matrix(
+                (np.ones(len(batch), dtype=bool), (rows, batch)),
+                shape=(len(batch), self.n_nodes)
+            )
+            frontier = reached
+            for _ in range(cutoff):
+                frontier = (frontier @ self.adjacency).astype(bool)
+                frontier = frontier - frontier.multiply(reached)
+                if not frontier.nnz:
+                    break
+                reached = reached + frontier
+
+            reach_sizes = np.asarray(reached.sum(axis=1)).ravel() - 1
+            for offset, size in enumerate(reach_sizes):
+                counts[self.nodes[batch[offset]]] = int(size)
+
+        return counts
+
+    def shortest_paths(self, source: Hashable, cutoff: int) -> Dict[Hashable, List[Hashable]]:
+        """
+        cutoff跳内到各可达节点的一条最短路径（含源节点自身），格式同 nx.single_source_shortest_path
+
+        逐层展开前沿，每个节点取下标最小的前驱
+        """
+        indptr = self.adjacency.indptr
+        indices = self.adjacency.indices
+        source_idx = self.node_index[source]
+        parent = np.full(self.n_nodes, -1, dtype=np.int64)
+        parent[source_idx] = source_idx
+
+        levels = []
+        frontier = np.array([source_idx], dtype=np.int64)
+        for _ in range(cutoff):
+            starts = indptr[frontier]
+            degrees = indptr[frontier + 1] - starts
+            n_edges = int(degrees.sum())
+            if n_edges == 0:
+                break
+            origin = np.repeat(frontier, degrees)
+            offsets = np.arange(n_edges) - np.repeat(np.cumsum(degrees) - degrees, degrees)
+            neighbor = indices[np.repeat(starts, degrees) + offsets].astype(np.int64)
+
+            fresh = parent[neighbor] < 0
+            neighbor, first = np.unique(neighbor[fresh], return_index=True)
+            if not len(neighbor):
+                break
+            parent[neighbor] = origin[fresh][first]
+            levels.append(neighbor)
+            frontier = neighbor
+
+        paths = {source: [source]}
+        index_paths = {source_idx: [source]}
+        for level in levels:
+            for idx, previous in zip(level.tolist(), parent[level].tolist()):
+                path = index_paths[previous] + [self.nodes[idx]]
+                index_paths[idx] = path
+                paths[self.nodes[idx]] = path
+        return paths
@@ -32,62 +32,63 @@ async def search_content(
 ):
     """Search novel content"""
     try:
-        novel_manager = get_novel_data_manager(str(novel_id))
+        novel_manager = await get_novel_data_manager(str(novel_id))
 
-        # Perform search
-        search_results = await novel_manager.search_content(
+        # Run all backends concurrently with pagination pushed down to each store
+        search_results = await novel_manager.federated_search(
             query=query,
-            content_types=content_types
+            content_types=content_types,
+            skip=(page - 1) * page_size,
+            limit=page_size
         )
 
-        # Format results
         formatted_results = {
             "query": query,
+            "page": page,
+            "page_size": page_size,
             "total_results": 0,
+            "totals": {},
+            "backend_status": {},
             "segments": [],
             "characters": [],
             "locations": [],
             "knowledge": []
         }
 
-        # Process segments
-        if "segments" in search_results:
-            segments = search_results["segments"]
-            # Apply pagination
-            start = (page - 1) * page_size
-            end = start + page_size
-            paginated_segments = segments[start:end]
-
-            formatted_results["segments"] = [
-                {
-                    "id": str(s.id),
-                    "title": s.title,
-                    "content_preview": s.content[:200] + "..." if len(s.content) > 200 else s.content,
-                    "word_count": s.word_count,
-                    "tags": s.tags,
-                    "relevance_score": getattr(s, 'relevance_score', 1.0)
-                }
-                for s in paginated_segments
-            ]
+        formatters = {
+            "segments": lambda s: {
+                "id": str(s.id),
+                "title": s.title,
+                "content_preview": s.content[:200] + "..." if len(s.content) > 200 else s.content,
+                "word_count": s.word_count,
+                "tags": s.tags
+            },
+            "characters": lambda c: {
+                "id": c.id,
+                "name": c.name,
+                "character_type": c.character_type,
+                "tags": c.tags
+            },
+            "locations": lambda loc: {
+                "id": loc.id,
+                "name": loc.name,
+                "location_type": loc.location_type,
+                "domain_affiliation": loc.domain_affiliation
+            },
+            "knowledge": lambda k: {
+                "id": k.id,
+                "title": k.title,
+                "category": k.category,
+                "tags": k.tags
+            }
+        }
 
-        # Process characters
-        if "characters" in search_results:
-            formatted_results["characters"] = [
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "character_type": c.character_type,
-                    "tags": c.tags
-                }
-                for c in search_results["characters"][:10]  # Limit to 10
-            ]
+        for backend, outcome in search_results.items():
+            formatted_results[backend] = [formatters[backend](item) for item in outcome["items"]]
+            formatted_results["totals"][backend] = outcome["total"]
+            formatted_results["backend_status"][backend] = outcome["status"]
 
-        formatted_results["total_results"] = sum([
-            len(search_results.get("segments", [])),
-            len(search_results.get("characters", [])),
-            len(search_results.get("locations", [])),
-            len(search_results.get("knowledge", []))
-        ])
+        formatted_results["total_results"] = sum(formatted_results["totals"].values())
 
         return DataResponse(
             success=True,
@@ -4,8 +4,11 @@ Batch Creation Manager for Novellus
 """
 
 import asyncio
+import heapq
+import itertools
 import json
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -129,8 +132,52 @@ class BatchStatistics:
         }
 
 
+class TokenBucketRateLimiter:
+    """令牌桶速率限制器
+
+    令牌按 rate/period 的速度连续补充，桶容量即允许的突发请求数；
+    等待者按到达顺序依次取令牌
+    """
+
+    def __init__(self, rate: float, period: float = 60.0, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 每个周期允许的请求数，<=0 表示不限速
+            period: 周期长度（秒）
+            capacity: 桶容量，默认等于rate
+        """
+        self.rate = rate
+        self.period = period
+        self.capacity = capacity if capacity is not None else max(1.0, float(rate))
+        self.tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate / self.period)
+        self._updated_at = now
+
+    async def acquire(self):
+        """获取一个令牌，令牌不足时等待补充"""
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) * self.period / self.rate)
+
+
 class BatchCreationManager:
-    """批量创作管理器"""
+    """批量创作管理器
+
+    max_concurrent个工作协程从优先级队列并发取任务；同一优先级内按小说轮转，
+    避免单本小说的大批任务阻塞其它小说；请求速率由令牌桶统一限制
+    """
 
     def __init__(
         self,
@@ -157,9 +204,14 @@ class BatchCreationManager:
 
         # 工作流缓存
         self.workflows: Dict[str, CreationWorkflow] = {}
-
-        # 任务队列
-        self.task_queue: List[BatchTask] = []
+        self._workflow_locks: Dict[str, asyncio.Lock] = {}
+
+        # 任务队列：(优先级, 小说轮次, 序号, 任务)
+        self.task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.queued_tasks: Dict[str, tuple] = {}
+        self._sequence = itertools.count()
+        self._novel_rounds: Dict[str, int] = defaultdict(int)
+        self._current_round = 0
         self.running_tasks: Dict[str, BatchTask] = {}
         self.completed_tasks: Dict[str, BatchTask] = {}
 
@@ -176,9 +228,10 @@ class BatchCreationManager:
             self.cost_controller = None
 
         # 并发控制
-        self.semaphore = asyncio.Semaphore(max_concurrent)
-        self.rate_limiter = asyncio.Semaphore(rate_limit)
-        self._rate_limit_reset_task = None
+        self.rate_limiter = TokenBucketRateLimiter(rate_limit)
+        self._workers: List[asyncio.Task] = []
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
 
         # 状态
         self.is_running = False
@@ -206,7 +259,7 @@ class BatchCreationManager:
         Returns:
             任务ID
         """
-        task_id = f"batch_{datetime.now().strftime('%Y%m%d%H%M%S')}_{len(self.task_queue)}"
+        task_id = f"batch_{datetime.now().strftime('%Y%m%d%H%M%S')}_{self.statistics.total_tasks}"
 
         task = BatchTask(
             task_id=task_id,
@@ -218,12 +271,9 @@ class BatchCreationManager:
             metadata=metadata or {}
         )
 
-        self.task_queue.append(task)
+        self._enqueue(task)
         self.statistics.total_tasks += 1
 
-        # 按优先级排序
-        self.task_queue.sort(key=lambda t: (t.priority.value, t.created_at))
-
         logger.info(f"Added task {task_id} to queue (Priority: {priority.name})")
         return task_id
 
@@ -264,55 +314,72 @@ class BatchCreationManager:
         logger.info(f"Added {len(task_ids)} tasks for chapter {chapter_number}")
         return task_ids
 
+    def _enqueue(self, task: BatchTask):
+        """任务入队
+
+        同一小说的任务依次占用递增的轮次，新加入的小说从当前轮次开始，
+        因此同一优先级内各小说的任务交替执行
+        """
+        novel_round = max(self._novel_rounds[task.novel_id], self._current_round)
+        self._novel_rounds[task.novel_id] = novel_round + 1
+
+        entry = (task.priority.value, novel_round, next(self._sequence), task)
+        task.status = TaskStatus.QUEUED
+        self.queued_tasks[task.task_id] = entry
+        self.task_queue.put_nowait(entry)
+
     async def start(self):
-        """启动批量处理"""
+        """启动批量处理，直到stop()被调用"""
         if self.is_running:
             logger.warning("Batch manager is already running")
             return
 
         self.is_running = True
         self.is_paused = False
+        self._resume_event.set()
         logger.info("Starting batch creation manager")
 
-        # 启动速率限制重置任务
-        if not self._rate_limit_reset_task:
-            self._rate_limit_reset_task = asyncio.create_task(self._reset_rate_limit())
-
         # 处理任务队列
         await self._process_queue()
 
     async def _process_queue(self):
-        """处理任务队列"""
+        """启动max_concurrent个工作协程并发处理任务队列"""
+        self._workers = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(max(1, self.max_concurrent))
+        ]
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, worker_id: int):
+        """工作协程：取任务、检查预算、获取令牌后执行"""
         while self.is_running:
-            if self.is_paused:
-                await asyncio.sleep(1)
-                continue
-
-            # 获取下一个任务
-            if not self.task_queue:
-                await asyncio.sleep(1)
-                continue
-
-            task = self.task_queue.pop(0)
-
-            # 检查成本预算
-            if self.cost_controller and self.use_real_api:
-                # 估算成本
-                estimated_cost = self._estimate_task_cost(task)
-                budget_ok = await self.cost_controller.check_budget(estimated_cost)
-
-                if not budget_ok:
-                    logger.warning(f"Budget limit reached. Pausing task {task.task_id}")
-                    task.status = TaskStatus.CANCELLED
-                    task.error = "Budget limit exceeded"
-                    self.completed_tasks[task.task_id] = task
-                    self.statistics.cancelled_tasks += 1
-                    continue
-
-            # 执行任务
-            async with self.semaphore:
-                async with self.rate_limiter:
-                    await self._execute_task(task)
+            await self._resume_event.wait()
+
+            _, novel_round, _, task = await self.task_queue.get()
+            self.queued_tasks.pop(task.task_id, None)
+            self._current_round = max(self._current_round, novel_round)
+
+            try:
+                # 检查成本预算
+                if self.cost_controller and self.use_real_api:
+                    # 估算成本
+                    estimated_cost = self._estimate_task_cost(task)
+                    budget_ok = await self.cost_controller.check_budget(estimated_cost)
+
+                    if not budget_ok:
+                        logger.warning(f"Budget limit reached. Pausing task {task.task_id}")
+                        task.status = TaskStatus.CANCELLED
+                        task.error = "Budget limit exceeded"
+                        self.completed_tasks[task.task_id] = task
+                        self.statistics.cancelled_tasks += 1
+                        continue
+
+                # 执行任务
+                await self.rate_limiter.acquire()
+                await self._execute_task(task)
+            finally:
+                self.task_queue.task_done()
 
     async def _execute_task(self, task: BatchTask):
         """执行单个任务"""
@@ -353,8 +420,7 @@ class BatchCreationManager:
                 # 自动重试
                 if self.enable_auto_retry and task.retry_count < task.max_retries:
                     task.retry_count += 1
-                    task.status = TaskStatus.PENDING
-                    self.task_queue.append(task)
+                    self._enqueue(task)
                     logger.info(f"Retrying task {task.task_id} (Attempt {task.retry_count}/{task.max_retries})")
                     return
 
@@ -368,20 +434,40 @@ class BatchCreationManager:
             task.completed_at = datetime.now()
             self.statistics.failed_tasks += 1
 
+        except asyncio.CancelledError:
+            task.status = TaskStatus.CANCELLED
+            task.error = "Batch manager stopped"
+            task.completed_at = datetime.now()
+            self.statistics.cancelled_tasks += 1
+            raise
+
         finally:
             # 移动到完成列表
             del self.running_tasks[task.task_id]
             self.completed_tasks[task.task_id] = task
 
     async def _get_workflow(self, novel_id: str) -> CreationWorkflow:
-        """获取或创建工作流"""
-        if novel_id not in self.workflows:
-            self.workflows[novel_id] = CreationWorkflow(
-                novel_id=novel_id,
-                use_real_api=self.use_real_api
-            )
-            await self.workflows[novel_id].initialize()
-        return self.workflows[novel_id]
+        """
+        获取或创建工作流
+
+        同一小说的并发工作者共享一次初始化；工作流在 initialize() 成功后才放入缓存，
+        初始化失败时下一个请求重新创建。
+        """
+        workflow = self.workflows.get(novel_id)
+        if workflow is not None:
+            return workflow
+
+        lock = self._workflow_locks.setdefault(novel_id, asyncio.Lock())
+        async with lock:
+            workflow = self.workflows.get(novel_id)
+            if workflow is None:
+                workflow = CreationWorkflow(
+                    novel_id=novel_id,
+                    use_real_api=self.use_real_api
+                )
+                await workflow.initialize()
+                self.workflows[novel_id] = workflow
+        return workflow
 
     def _estimate_task_cost(self, task: BatchTask) -> float:
         """估算任务成本"""
@@ -395,29 +481,24 @@ class BatchCreationManager:
 
         return input_cost + output_cost
 
-    async def _reset_rate_limit(self):
-        """定期重置速率限制"""
-        while self.is_running:
-            await asyncio.sleep(60)  # 每分钟重置
-            self.rate_limiter = asyncio.Semaphore(self.rate_limit)
-
     async def pause(self):
         """暂停处理"""
         self.is_paused = True
+        self._resume_event.clear()
         logger.info("Batch creation manager paused")
 
     async def resume(self):
         """恢复处理"""
         self.is_paused = False
+        self._resume_event.set()
         logger.info("Batch creation manager resumed")
 
     async def stop(self):
         """停止处理"""
         self.is_running = False
 
-        if self._rate_limit_reset_task:
-            self._rate_limit_reset_task.cancel()
-            self._rate_limit_reset_task = None
+        for worker in self._workers:
+            worker.cancel()
 
         logger.info("Batch creation manager stopped")
 
@@ -426,7 +507,7 @@ class BatchCreationManager:
         return {
             "is_running": self.is_running,
             "is_paused": self.is_paused,
-            "queue_size": len(self.task_queue),
+            "queue_size": self.task_queue.qsize(),
             "running_tasks": len(self.running_tasks),
             "completed_tasks": len(self.completed_tasks),
             "statistics": self.statistics.to_dict(),
@@ -456,9 +537,8 @@ class BatchCreationManager:
             return task_dict
 
         # 检查队列中的任务
-        for task in self.task_queue:
-            if task.task_id == task_id:
-                return task.to_dict()
+        if task_id in self.queued_tasks:
+            return self.queued_tasks[task_id][-1].to_dict()
 
         return None
 
@@ -466,17 +546,17 @@ class BatchCreationManager:
         """获取队列信息"""
         # 按优先级分组
         priority_groups = defaultdict(list)
-        for task in self.task_queue:
+        for *_, task in self.queued_tasks.values():
             priority_groups[task.priority.name].append(task.task_id)
 
         return {
-            "total_queued": len(self.task_queue),
+            "total_queued": len(self.queued_tasks),
             "by_priority": {
                 "HIGH": len(priority_groups["HIGH"]),
                 "MEDIUM": len(priority_groups["MEDIUM"]),
                 "LOW": len(priority_groups["LOW"])
             },
-            "next_tasks": [t.task_id for t in self.task_queue[:5]]  # 下5个任务
+            "next_tasks": [entry[-1].task_id for entry in heapq.nsmallest(5, self.queued_tasks.values())]  # 下5个任务
         }
 
     async def wait_for_completion(self, timeout: Optional[float] = None):
@@ -485,16 +565,10 @@ class BatchCreationManager:
         Args:
             timeout: 超时时间（秒）
         """
-        start_time = datetime.now()
-
-        while len(self.task_queue) > 0 or len(self.running_tasks) > 0:
-            if timeout:
-                elapsed = (datetime.now() - start_time).total_seconds()
-                if elapsed >= timeout:
-                    logger.warning(f"Batch processing timeout after {timeout} seconds")
-                    break
-
-            await asyncio.sleep(1)
+        try:
+            await asyncio.wait_for(self.task_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Batch processing timeout after {timeout} seconds")
 
         logger.info("All tasks completed or timeout reached")
 
@@ -44,6 +44,9 @@ class MCPConfig:
         self.mongodb_user = os.getenv('MONGODB_USER', '')
         self.mongodb_password = os.getenv('MONGODB_PASSWORD', '')
 
+        # Search configuration
+        self.search_backend_timeout = float(os.getenv('SEARCH_BACKEND_TIMEOUT', '2.0'))
+
     @property
     def postgres_url(self) -> str:
         """Get PostgreSQL connection URL."""
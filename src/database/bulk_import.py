@@ -0,0 +1,112 @@
+"""
+批量导入工具 - COPY暂存表、分阶段事务与进度报告
+供冲突数据导入器和文化数据批量管理器共用，替代逐行INSERT
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PhaseProgress:
+    """单个导入阶段的进度"""
+    phase: str
+    total: int
+    processed: int = 0
+    skipped: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def percentage(self) -> float:
+        return 100.0 if self.total == 0 else min(100.0, self.processed * 100.0 / self.total)
+
+
+ProgressCallback = Callable[[PhaseProgress], Optional[Awaitable[None]]]
+
+
+def rows_affected(status: str) -> int:
+    """从命令状态 (如 'INSERT 0 42' / 'COPY 42') 中解析影响行数"""
+    try:
+        return int(status.split()[-1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+async def copy_to_staging(conn: asyncpg.Connection,
+                          table: str,
+                          columns: Sequence[str],
+                          records: List[tuple],
+                          extra_columns: Sequence[Tuple[str, str]] = (),
+                          staging: Optional[str] = None) -> str:
+    """
+    建立与目标表列类型一致的临时暂存表并用COPY写入记录
+
+    extra_columns 为目标表之外的附加列 (列名, 类型)，如待解析的实体名称；
+    记录的字段顺序为 columns 后接 extra_columns。必须在事务内调用，
+    暂存表在提交时自动删除。
+
+    Returns:
+        暂存表名
+    """
+    staging = staging or f"_staging_{table}"
+    await conn.execute(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {', '.join(columns)} FROM {table} WITH NO DATA"
+    )
+    if extra_columns:
+        await conn.execute(
+            f"ALTER TABLE {staging} "
+            + ", ".join(f"ADD COLUMN {name} {column_type}" for name, column_type in extra_columns)
+        )
+    if records:
+        await conn.copy_records_to_table(
+            staging, records=records,
+            columns=list(columns) + [name for name, _ in extra_columns]
+        )
+    return staging
+
+
+async def copy_into_table(conn: asyncpg.Connection,
+                          table: str,
+                          columns: Sequence[str],
+                          records: List[tuple]) -> int:
+    """直接COPY写入目标表 (无冲突处理)，返回写入行数"""
+    if not records:
+        return 0
+    status = await conn.copy_records_to_table(table, records=records, columns=list(columns))
+    return rows_affected(status)
+
+
+@asynccontextmanager
+async def import_phase(conn: asyncpg.Connection,
+                       phase: str,
+                       total: int,
+                       progress_callback: Optional[ProgressCallback] = None):
+    """
+    单事务执行一个导入阶段，结束后报告进度
+
+    阶段内任一语句失败则整个阶段回滚，不会留下部分导入的数据。
+    """
+    progress = PhaseProgress(phase=phase, total=total)
+    async with conn.transaction():
+        yield progress
+
+    logger.info(
+        f"导入阶段 {phase} 完成: {progress.processed}/{total} 条, "
+        f"跳过 {progress.skipped} 条, 耗时 {progress.elapsed:.2f} 秒"
+    )
+    if progress_callback:
+        result = progress_callback(progress)
+        if result is not None:
+            await result
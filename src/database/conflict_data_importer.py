@@ -14,6 +14,8 @@ from typing import Dict, List, Any, Optional, Tuple
 import asyncpg
 from dataclasses import dataclass
 
+from .bulk_import import ProgressCallback, copy_into_table, copy_to_staging, import_phase, rows_affected
+
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -40,12 +42,69 @@ class ImportConfig:
     clear_existing_data: bool = False
     validate_data_integrity: bool = True
     create_backup: bool = True
+    bulk_import: bool = True  # COPY暂存 + 集合式SQL，False时逐行INSERT
 
 class ConflictDataImporter:
     """冲突数据导入器"""
 
-    def __init__(self, config: ImportConfig):
+    # 实体类型映射
+    ENTITY_TYPE_MAPPING = {
+        '推断实体': '核心资源',
+        '明确实体': '核心资源',
+        '关键角色': '关键角色',
+        '制度法条': '法条制度',
+        '技术工艺': '技术工艺',
+        '地理位置': '地理位置',
+        '文化符号': '文化符号'
+    }
+
+    # 关系类型映射
+    RELATION_TYPE_MAPPING = {
+        'conflicts_with': '冲突',
+        'depends_on': '依赖',
+        'controls': '控制',
+        'influences': '影响',
+        'competes_with': '竞争',
+        'cooperates_with': '合作',
+        'threatens': '威胁',
+        'supports': '支持'
+    }
+
+    ENTITY_COLUMNS = [
+        'id', 'novel_id', 'conflict_matrix_id', 'name', 'entity_type', 'entity_subtype',
+        'primary_domain', 'involved_domains', 'description', 'characteristics',
+        'strategic_value', 'economic_value', 'symbolic_value', 'scarcity_level',
+        'conflict_roles', 'dispute_intensity', 'confidence_score', 'validation_status',
+        'aliases', 'tags', 'source_locations'
+    ]
+
+    RELATION_COLUMNS = [
+        'id', 'novel_id', 'source_entity_id', 'target_entity_id',
+        'relation_type', 'relation_subtype', 'strength', 'directionality',
+        'description', 'context', 'is_cross_domain', 'impact_level',
+        'confidence_score', 'detection_method'
+    ]
+
+    # _relation_fields() 返回的字段
+    RELATION_FIELD_COLUMNS = [
+        'relation_type', 'relation_subtype', 'strength', 'description', 'context', 'confidence_score'
+    ]
+
+    HOOK_COLUMNS = [
+        'id', 'novel_id', 'conflict_matrix_id', 'title', 'description',
+        'hook_type', 'hook_subtype', 'domains_involved', 'main_characters',
+        'moral_themes', 'inciting_incident', 'originality', 'complexity',
+        'emotional_impact', 'plot_integration', 'overall_score', 'priority_level',
+        'is_ai_generated', 'tags'
+    ]
+
+    AI_HOOK_COLUMNS = HOOK_COLUMNS[:-1] + [
+        'generation_method', 'generation_model', 'human_validation_status', 'tags'
+    ]
+
+    def __init__(self, config: ImportConfig, progress_callback: Optional[ProgressCallback] = None):
         self.config = config
+        self.progress_callback = progress_callback
         self.conn: Optional[asyncpg.Connection] = None
         self.stats = {
             'matrices_imported': 0,
@@ -231,9 +290,101 @@ class ConflictDataImporter:
 
         return matrix_ids
 
+    @staticmethod
+    def _insert_sql(table: str, columns: List[str]) -> str:
+        placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    @staticmethod
+    def _matrix_id_for(domains: List[str], matrix_ids: Dict[str, uuid.UUID]) -> Optional[uuid.UUID]:
+        """根据前两个相关域确定关联的冲突矩阵"""
+        if len(domains) >= 2:
+            return matrix_ids.get(f"{domains[0]}↔{domains[1]}")
+        return None
+
+    def _entity_record(self, entity: Dict[str, Any], matrix_ids: Dict[str, uuid.UUID]) -> tuple:
+        """冲突实体行 (列顺序同 ENTITY_COLUMNS)"""
+        domains = entity.get('domains', [])
+        return (
+            uuid.uuid4(),
+            uuid.UUID(self.config.novel_id),
+            self._matrix_id_for(domains, matrix_ids),
+            entity.get('name', ''),
+            self.ENTITY_TYPE_MAPPING.get(entity.get('entity_type', ''), '核心资源'),
+            entity.get('category', ''),
+            domains[0] if domains else None,
+            domains,
+            entity.get('description', ''),
+            json.dumps(entity.get('characteristics', {})),
+            5.0,  # 默认战略价值
+            5.0,  # 默认经济价值
+            5.0,  # 默认象征价值
+            5.0,  # 默认稀缺性
+            [],   # conflict_roles
+            5,    # 默认争议强度
+            entity.get('confidence_score', 0.8),
+            'validated' if entity.get('confidence_score', 0) > 0.7 else 'pending',
+            entity.get('aliases', []),
+            [],   # tags
+            json.dumps({'extraction_method': entity.get('extraction_method', '')})
+        )
+
+    def _relation_fields(self, relation: Dict[str, Any]) -> tuple:
+        """冲突关系的属性字段 (relation_type, relation_subtype, strength, description, context, confidence_score)"""
+        return (
+            self.RELATION_TYPE_MAPPING.get(relation.get('relationship_type', ''), '影响'),
+            relation.get('category', ''),
+            relation.get('strength', 0.5),
+            relation.get('description', ''),
+            relation.get('context', ''),
+            relation.get('confidence', 0.7)
+        )
+
+    def _hook_record(self, hook_data: Dict[str, Any], matrix_ids: Dict[str, uuid.UUID],
+                     ai_generated: bool) -> tuple:
+        """剧情钩子行 (列顺序同 HOOK_COLUMNS / AI_HOOK_COLUMNS)"""
+        domains = hook_data.get('domains_involved', [])
+        record = (
+            uuid.uuid4(),
+            uuid.UUID(self.config.novel_id),
+            self._matrix_id_for(domains, matrix_ids),
+            hook_data.get('title', ''),
+            hook_data.get('description', ''),
+            hook_data.get('hook_type', '综合冲突'),
+            hook_data.get('subtype', ''),
+            domains,
+            hook_data.get('characters', []),
+            hook_data.get('themes', []),
+            hook_data.get('inciting_incident', ''),
+            hook_data.get('originality', 5),
+            hook_data.get('complexity', 5),
+            hook_data.get('emotional_impact', 5),
+            hook_data.get('plot_integration', 5),
+            hook_data.get('overall_score', 5.0),
+            hook_data.get('priority', 5),
+            ai_generated
+        )
+        if ai_generated:
+            record += ('conflict_analysis_system', 'claude-sonnet', 'pending')
+        return record + (hook_data.get('tags', []),)
+
+    @staticmethod
+    def _story_hooks(analysis_data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """提取 (现有剧情钩子, AI生成钩子)"""
+        hooks_section = analysis_data['conflict_analysis'].get('4. 智能剧情钩子推荐', {})
+
+        def valid_hooks(section: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return [hook for hook in section.values() if isinstance(hook, dict) and 'title' in hook]
+
+        return (
+            valid_hooks(hooks_section.get('现有剧情钩子评估', {})),
+            valid_hooks(hooks_section.get('AI生成新钩子', {}))
+        )
+
     async def import_conflict_entities(self, analysis_data: Dict[str, Any], matrix_ids: Dict[str, uuid.UUID]) -> Dict[str, uuid.UUID]:
         """导入冲突实体数据"""
         entity_ids = {}
+        insert_sql = self._insert_sql('conflict_entities', self.ENTITY_COLUMNS)
 
         # 处理结构化实体数据
         for data_key in ['conflict_elements', 'enhanced_elements']:
@@ -244,64 +395,10 @@ class ConflictDataImporter:
 
             try:
                 for entity in entities_data:
-                    entity_id = uuid.uuid4()
-
-                    # 确定关联的冲突矩阵
-                    conflict_matrix_id = None
-                    domains = entity.get('domains', [])
-                    if len(domains) >= 2:
-                        domain_pair = f"{domains[0]}↔{domains[1]}"
-                        conflict_matrix_id = matrix_ids.get(domain_pair)
-
-                    # 映射实体类型
-                    entity_type_mapping = {
-                        '推断实体': '核心资源',
-                        '明确实体': '核心资源',
-                        '关键角色': '关键角色',
-                        '制度法条': '法条制度',
-                        '技术工艺': '技术工艺',
-                        '地理位置': '地理位置',
-                        '文化符号': '文化符号'
-                    }
-
-                    mapped_type = entity_type_mapping.get(
-                        entity.get('entity_type', ''),
-                        '核心资源'
-                    )
+                    record = self._entity_record(entity, matrix_ids)
+                    await self.conn.execute(insert_sql, *record)
 
-                    await self.conn.execute("""
-                        INSERT INTO conflict_entities (
-                            id, novel_id, conflict_matrix_id, name, entity_type, entity_subtype,
-                            primary_domain, involved_domains, description, characteristics,
-                            strategic_value, economic_value, symbolic_value, scarcity_level,
-                            conflict_roles, dispute_intensity, confidence_score, validation_status,
-                            aliases, tags, source_locations
-                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20, $21)
-                    """,
-                        entity_id,
-                        uuid.UUID(self.config.novel_id),
-                        conflict_matrix_id,
-                        entity.get('name', ''),
-                        mapped_type,
-                        entity.get('category', ''),
-                        domains[0] if domains else None,
-                        domains,
-                        entity.get('description', ''),
-                        json.dumps(entity.get('characteristics', {})),
-                        5.0,  # 默认战略价值
-                        5.0,  # 默认经济价值
-                        5.0,  # 默认象征价值
-                        5.0,  # 默认稀缺性
-                        [],   # conflict_roles
-                        5,    # 默认争议强度
-                        entity.get('confidence_score', 0.8),
-                        'validated' if entity.get('confidence_score', 0) > 0.7 else 'pending',
-                        entity.get('aliases', []),
-                        [],   # tags
-                        json.dumps({'extraction_method': entity.get('extraction_method', '')})
-                    )
-
-                    entity_ids[entity.get('name', '')] = entity_id
+                    entity_ids[entity.get('name', '')] = record[0]
                     self.stats['entities_imported'] += 1
 
             except Exception as e:
@@ -313,6 +410,7 @@ class ConflictDataImporter:
 
     async def import_conflict_relations(self, analysis_data: Dict[str, Any], entity_ids: Dict[str, uuid.UUID]):
         """导入冲突关系数据"""
+        insert_sql = self._insert_sql('conflict_relations', self.RELATION_COLUMNS)
 
         for data_key in ['conflict_elements', 'enhanced_elements']:
             if data_key not in analysis_data:
@@ -322,55 +420,30 @@ class ConflictDataImporter:
 
             try:
                 for relation in relations_data:
-                    source_name = relation.get('source', '')
-                    target_name = relation.get('target', '')
-
-                    source_id = entity_ids.get(source_name)
-                    target_id = entity_ids.get(target_name)
+                    source_id = entity_ids.get(relation.get('source', ''))
+                    target_id = entity_ids.get(relation.get('target', ''))
 
                     if not source_id or not target_id:
                         continue  # 跳过无法找到实体的关系
 
-                    relation_id = uuid.uuid4()
-
-                    # 映射关系类型
-                    relation_type_mapping = {
-                        'conflicts_with': '冲突',
-                        'depends_on': '依赖',
-                        'controls': '控制',
-                        'influences': '影响',
-                        'competes_with': '竞争',
-                        'cooperates_with': '合作',
-                        'threatens': '威胁',
-                        'supports': '支持'
-                    }
-
-                    mapped_type = relation_type_mapping.get(
-                        relation.get('relationship_type', ''),
-                        '影响'
-                    )
+                    relation_type, subtype, strength, description, context, confidence = \
+                        self._relation_fields(relation)
 
-                    await self.conn.execute("""
-                        INSERT INTO conflict_relations (
-                            id, novel_id, source_entity_id, target_entity_id,
-                            relation_type, relation_subtype, strength, directionality,
-                            description, context, is_cross_domain, impact_level,
-                            confidence_score, detection_method
-                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-                    """,
-                        relation_id,
+                    await self.conn.execute(
+                        insert_sql,
+                        uuid.uuid4(),
                         uuid.UUID(self.config.novel_id),
                         source_id,
                         target_id,
-                        mapped_type,
-                        relation.get('category', ''),
-                        relation.get('strength', 0.5),
+                        relation_type,
+                        subtype,
+                        strength,
                         'bidirectional',
-                        relation.get('description', ''),
-                        relation.get('context', ''),
+                        description,
+                        context,
                         True,  # 默认为跨域关系
                         5,     # 默认影响等级
-                        relation.get('confidence', 0.7),
+                        confidence,
                         'automated_analysis'
                     )
 
@@ -387,103 +460,20 @@ class ConflictDataImporter:
         if 'conflict_analysis' not in analysis_data:
             return
 
-        hooks_section = analysis_data['conflict_analysis'].get('4. 智能剧情钩子推荐', {})
-
-        # 处理现有剧情钩子
-        existing_hooks = hooks_section.get('现有剧情钩子评估', {})
-        ai_generated_hooks = hooks_section.get('AI生成新钩子', {})
+        existing_hooks, ai_generated_hooks = self._story_hooks(analysis_data)
 
         try:
             # 导入现有剧情钩子
-            for hook_key, hook_data in existing_hooks.items():
-                if isinstance(hook_data, dict) and 'title' in hook_data:
-                    hook_id = uuid.uuid4()
-
-                    # 确定相关域和冲突矩阵
-                    domains = hook_data.get('domains_involved', [])
-                    conflict_matrix_id = None
-                    if len(domains) >= 2:
-                        domain_pair = f"{domains[0]}↔{domains[1]}"
-                        conflict_matrix_id = matrix_ids.get(domain_pair)
-
-                    await self.conn.execute("""
-                        INSERT INTO conflict_story_hooks (
-                            id, novel_id, conflict_matrix_id, title, description,
-                            hook_type, hook_subtype, domains_involved, main_characters,
-                            moral_themes, inciting_incident, originality, complexity,
-                            emotional_impact, plot_integration, overall_score, priority_level,
-                            is_ai_generated, tags
-                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19)
-                    """,
-                        hook_id,
-                        uuid.UUID(self.config.novel_id),
-                        conflict_matrix_id,
-                        hook_data.get('title', ''),
-                        hook_data.get('description', ''),
-                        hook_data.get('hook_type', '综合冲突'),
-                        hook_data.get('subtype', ''),
-                        domains,
-                        hook_data.get('characters', []),
-                        hook_data.get('themes', []),
-                        hook_data.get('inciting_incident', ''),
-                        hook_data.get('originality', 5),
-                        hook_data.get('complexity', 5),
-                        hook_data.get('emotional_impact', 5),
-                        hook_data.get('plot_integration', 5),
-                        hook_data.get('overall_score', 5.0),
-                        hook_data.get('priority', 5),
-                        False,  # 不是AI生成
-                        hook_data.get('tags', [])
-                    )
-
-                    self.stats['hooks_imported'] += 1
+            insert_sql = self._insert_sql('conflict_story_hooks', self.HOOK_COLUMNS)
+            for hook_data in existing_hooks:
+                await self.conn.execute(insert_sql, *self._hook_record(hook_data, matrix_ids, False))
+                self.stats['hooks_imported'] += 1
 
             # 导入AI生成的剧情钩子
-            for hook_key, hook_data in ai_generated_hooks.items():
-                if isinstance(hook_data, dict) and 'title' in hook_data:
-                    hook_id = uuid.uuid4()
-
-                    domains = hook_data.get('domains_involved', [])
-                    conflict_matrix_id = None
-                    if len(domains) >= 2:
-                        domain_pair = f"{domains[0]}↔{domains[1]}"
-                        conflict_matrix_id = matrix_ids.get(domain_pair)
-
-                    await self.conn.execute("""
-                        INSERT INTO conflict_story_hooks (
-                            id, novel_id, conflict_matrix_id, title, description,
-                            hook_type, hook_subtype, domains_involved, main_characters,
-                            moral_themes, inciting_incident, originality, complexity,
-                            emotional_impact, plot_integration, overall_score, priority_level,
-                            is_ai_generated, generation_method, generation_model,
-                            human_validation_status, tags
-                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20, $21, $22)
-                    """,
-                        hook_id,
-                        uuid.UUID(self.config.novel_id),
-                        conflict_matrix_id,
-                        hook_data.get('title', ''),
-                        hook_data.get('description', ''),
-                        hook_data.get('hook_type', '综合冲突'),
-                        hook_data.get('subtype', ''),
-                        domains,
-                        hook_data.get('characters', []),
-                        hook_data.get('themes', []),
-                        hook_data.get('inciting_incident', ''),
-                        hook_data.get('originality', 5),
-                        hook_data.get('complexity', 5),
-                        hook_data.get('emotional_impact', 5),
-                        hook_data.get('plot_integration', 5),
-                        hook_data.get('overall_score', 5.0),
-                        hook_data.get('priority', 5),
-                        True,   # AI生成
-                        'conflict_analysis_system',
-                        'claude-sonnet',
-                        'pending',
-                        hook_data.get('tags', [])
-                    )
-
-                    self.stats['hooks_imported'] += 1
+            insert_sql = self._insert_sql('conflict_story_hooks', self.AI_HOOK_COLUMNS)
+            for hook_data in ai_generated_hooks:
+                await self.conn.execute(insert_sql, *self._hook_record(hook_data, matrix_ids, True))
+                self.stats['hooks_imported'] += 1
 
         except Exception as e:
             logger.error(f"导入剧情钩子失败: {e}")
@@ -491,6 +481,127 @@ class ConflictDataImporter:
 
         logger.info(f"成功导入 {self.stats['hooks_imported']} 个剧情钩子")
 
+    # ====================================================================
+    # 批量导入 (COPY暂存 + 集合式SQL，每个阶段一个事务)
+    # ====================================================================
+
+    async def bulk_import_conflict_entities(self, analysis_data: Dict[str, Any],
+                                            matrix_ids: Dict[str, uuid.UUID]) -> Dict[str, uuid.UUID]:
+        """
+        批量导入冲突实体
+
+        全部实体COPY到暂存表后以单条 INSERT ... SELECT 合并，已存在的
+        (novel_id, name, entity_type) 保留原记录；名称→UUID映射在SQL中解析，
+        同名实体以最后出现的为准 (与逐行导入一致)。
+        """
+        records = [
+            self._entity_record(entity, matrix_ids)
+            for data_key in ['conflict_elements', 'enhanced_elements'] if data_key in analysis_data
+            for entity in analysis_data[data_key].get('entities', [])
+        ]
+        if not records:
+            return {}
+
+        columns = ", ".join(self.ENTITY_COLUMNS)
+        try:
+            async with import_phase(self.conn, 'conflict_entities', len(records), self.progress_callback) as progress:
+                staging = await copy_to_staging(self.conn, 'conflict_entities', self.ENTITY_COLUMNS, records)
+                status = await self.conn.execute(f"""
+                    INSERT INTO conflict_entities ({columns})
+                    SELECT {columns} FROM {staging}
+                    ON CONFLICT (novel_id, name, entity_type) DO NOTHING
+                """)
+                progress.processed = rows_affected(status)
+                progress.skipped = len(records) - progress.processed
+
+                rows = await self.conn.fetch(f"""
+                    SELECT DISTINCT ON (s.name) s.name, e.id
+                    FROM {staging} s
+                    JOIN conflict_entities e
+                      ON e.novel_id = s.novel_id AND e.name = s.name AND e.entity_type = s.entity_type
+                    ORDER BY s.name, s.ctid DESC
+                """)
+
+            self.stats['entities_imported'] += progress.processed
+            logger.info(f"成功导入 {progress.processed} 个冲突实体")
+            return {row['name']: row['id'] for row in rows}
+
+        except Exception as e:
+            logger.error(f"批量导入实体数据失败: {e}")
+            self.stats['errors'].append(f"实体导入失败: {e}")
+            return {}
+
+    async def bulk_import_conflict_relations(self, analysis_data: Dict[str, Any], entity_ids: Dict[str, uuid.UUID]):
+        """
+        批量导入冲突关系
+
+        关系以实体名称COPY到暂存表，在SQL中与名称→UUID映射连接解析两端实体，
+        找不到实体或违反唯一约束的关系被跳过。
+        """
+        records = [
+            self._relation_fields(relation) + (relation.get('source', ''), relation.get('target', ''))
+            for data_key in ['conflict_elements', 'enhanced_elements'] if data_key in analysis_data
+            for relation in analysis_data[data_key].get('relationships', [])
+        ]
+        if not records or not entity_ids:
+            return
+
+        names, ids = list(entity_ids.keys()), list(entity_ids.values())
+        try:
+            async with import_phase(self.conn, 'conflict_relations', len(records), self.progress_callback) as progress:
+                staging = await copy_to_staging(
+                    self.conn, 'conflict_relations', self.RELATION_FIELD_COLUMNS, records,
+                    extra_columns=[('source_name', 'TEXT'), ('target_name', 'TEXT')]
+                )
+                status = await self.conn.execute(f"""
+                    INSERT INTO conflict_relations ({', '.join(self.RELATION_COLUMNS[1:])})
+                    SELECT $1, s.id, t.id, r.relation_type, r.relation_subtype, r.strength,
+                           'bidirectional', r.description, r.context, TRUE, 5,
+                           r.confidence_score, 'automated_analysis'
+                    FROM {staging} r
+                    JOIN unnest($2::text[], $3::uuid[]) AS s(name, id) ON s.name = r.source_name
+                    JOIN unnest($2::text[], $3::uuid[]) AS t(name, id) ON t.name = r.target_name
+                    WHERE s.id <> t.id
+                    ON CONFLICT (source_entity_id, target_entity_id, relation_type) DO NOTHING
+                """, uuid.UUID(self.config.novel_id), names, ids)
+                progress.processed = rows_affected(status)
+                progress.skipped = len(records) - progress.processed
+
+            self.stats['relations_imported'] += progress.processed
+            logger.info(f"成功导入 {progress.processed} 个冲突关系")
+
+        except Exception as e:
+            logger.error(f"批量导入关系数据失败: {e}")
+            self.stats['errors'].append(f"关系导入失败: {e}")
+
+    async def bulk_import_story_hooks(self, analysis_data: Dict[str, Any], matrix_ids: Dict[str, uuid.UUID]):
+        """批量导入剧情钩子 (现有钩子与AI生成钩子各一次COPY，同一事务)"""
+        if 'conflict_analysis' not in analysis_data:
+            return
+
+        existing_hooks, ai_generated_hooks = self._story_hooks(analysis_data)
+        total = len(existing_hooks) + len(ai_generated_hooks)
+        if not total:
+            return
+
+        try:
+            async with import_phase(self.conn, 'conflict_story_hooks', total, self.progress_callback) as progress:
+                progress.processed += await copy_into_table(
+                    self.conn, 'conflict_story_hooks', self.HOOK_COLUMNS,
+                    [self._hook_record(hook, matrix_ids, False) for hook in existing_hooks]
+                )
+                progress.processed += await copy_into_table(
+                    self.conn, 'conflict_story_hooks', self.AI_HOOK_COLUMNS,
+                    [self._hook_record(hook, matrix_ids, True) for hook in ai_generated_hooks]
+                )
+
+            self.stats['hooks_imported'] += progress.processed
+            logger.info(f"成功导入 {progress.processed} 个剧情钩子")
+
+        except Exception as e:
+            logger.error(f"批量导入剧情钩子失败: {e}")
+            self.stats['errors'].append(f"剧情钩子导入失败: {e}")
+
     async def import_network_analysis(self, analysis_data: Dict[str, Any], matrix_ids: Dict[str, uuid.UUID]):
         """导入网络分析结果"""
         if 'conflict_analysis' not in analysis_data:
@@ -574,15 +685,24 @@ class ConflictDataImporter:
 
             # 6. 导入冲突实体
             logger.info("开始导入冲突实体...")
-            entity_ids = await self.import_conflict_entities(analysis_data, matrix_ids)
+            if self.config.bulk_import:
+                entity_ids = await self.bulk_import_conflict_entities(analysis_data, matrix_ids)
+            else:
+                entity_ids = await self.import_conflict_entities(analysis_data, matrix_ids)
 
             # 7. 导入冲突关系
             logger.info("开始导入冲突关系...")
-            await self.import_conflict_relations(analysis_data, entity_ids)
+            if self.config.bulk_import:
+                await self.bulk_import_conflict_relations(analysis_data, entity_ids)
+            else:
+                await self.import_conflict_relations(analysis_data, entity_ids)
 
             # 8. 导入剧情钩子
             logger.info("开始导入剧情钩子...")
-            await self.import_story_hooks(analysis_data, matrix_ids)
+            if self.config.bulk_import:
+                await self.bulk_import_story_hooks(analysis_data, matrix_ids)
+            else:
+                await self.import_story_hooks(analysis_data, matrix_ids)
 
             # 9. 导入网络分析结果
             logger.info("开始导入网络分析结果...")
@@ -4,6 +4,7 @@ MongoDB database connection and query utilities.
 
 import motor.motor_asyncio
 import pymongo
+from pymongo import UpdateOne
 from typing import List, Dict, Any, Optional
 import logging
 
@@ -122,6 +123,28 @@ class MongoDBConnection:
             logger.error(f"MongoDB update_many failed: {e}")
             raise DatabaseError(f"Update operation failed: {e}")
 
+    async def bulk_upsert(self, collection_name: str, documents: List[Dict[str, Any]],
+                          key_fields: List[str], ordered: bool = False) -> Dict[str, int]:
+        """Upsert documents matched on key_fields with a single bulk_write."""
+        if not documents:
+            return {"matched": 0, "modified": 0, "upserted": 0}
+
+        try:
+            collection = self.get_collection(collection_name)
+            operations = [
+                UpdateOne({field: document[field] for field in key_fields}, {"$set": document}, upsert=True)
+                for document in documents
+            ]
+            result = await collection.bulk_write(operations, ordered=ordered)
+            return {
+                "matched": result.matched_count,
+                "modified": result.modified_count,
+                "upserted": result.upserted_count
+            }
+        except Exception as e:
+            logger.error(f"MongoDB bulk_upsert failed: {e}")
+            raise DatabaseError(f"Bulk upsert failed: {e}")
+
     async def delete_one(self, collection_name: str, filter_dict: Dict[str, Any]) -> int:
         """Delete one document from a collection."""
         try:
@@ -86,6 +86,58 @@ class PostgreSQLConnection:
             logger.error(f"Command execution failed: {e}")
             raise DatabaseError(f"Command failed: {e}")
 
+    async def execute_many(self, command: str, params_list: List[tuple]) -> None:
+        """Execute a command for each parameter tuple in one pipelined call."""
+        if not params_list:
+            return
+        try:
+            async with self.get_connection() as conn:
+                await conn.executemany(command, params_list)
+        except Exception as e:
+            logger.error(f"Batch command execution failed: {e}")
+            raise DatabaseError(f"Batch command failed: {e}")
+
+    async def copy_upsert(self,
+                          table: str,
+                          columns: List[str],
+                          records: List[tuple],
+                          conflict_columns: List[str],
+                          update_columns: List[str]) -> int:
+        """
+        Bulk upsert via COPY into a temp staging table and a single INSERT ... SELECT ... ON CONFLICT.
+
+        Records must not contain duplicate conflict keys (ON CONFLICT cannot
+        update the same row twice in one statement).
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        if not records:
+            return 0
+
+        staging = f"_staging_{table}"
+        column_list = ", ".join(columns)
+        update_clause = ", ".join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+        conflict_action = f"DO UPDATE SET {update_clause}" if update_columns else "DO NOTHING"
+
+        try:
+            async with self.get_connection() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                        f"SELECT {column_list} FROM {table} WITH NO DATA"
+                    )
+                    await conn.copy_records_to_table(staging, records=records, columns=columns)
+                    status = await conn.execute(
+                        f"INSERT INTO {table} ({column_list}) "
+                        f"SELECT {column_list} FROM {staging} "
+                        f"ON CONFLICT ({', '.join(conflict_columns)}) {conflict_action}"
+                    )
+            return int(status.split()[-1])
+        except Exception as e:
+            logger.error(f"Bulk upsert into {table} failed: {e}")
+            raise DatabaseError(f"Bulk upsert failed: {e}")
+
 
 class SyncPostgreSQLConnection:
     """Synchronous PostgreSQL connection for simple operations."""
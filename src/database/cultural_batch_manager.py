@@ -12,6 +12,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple, Union
 from uuid import UUID, uuid4
 
+from .bulk_import import PhaseProgress
 from .repositories.cultural_framework_repository import CulturalFrameworkRepository
 from .models.cultural_framework_models import (
     CulturalFrameworkCreate, CulturalEntityCreate, CulturalRelationCreate,
@@ -24,6 +25,9 @@ logger = logging.getLogger(__name__)
 class CulturalDataBatchManager:
     """文化数据批量管理器"""
 
+    # 批量导入阶段 (每个阶段一个事务)
+    IMPORT_PHASES = ('cultural_frameworks', 'cultural_entities', 'cultural_relations')
+
     def __init__(self, repository: CulturalFrameworkRepository):
         self.repository = repository
         self.processing_stats = {
@@ -32,6 +36,8 @@ class CulturalDataBatchManager:
             'failed': 0,
             'warnings': []
         }
+        self._task_id: Optional[str] = None
+        self._entity_id_mapping: Dict[str, UUID] = {}
 
     async def import_cultural_framework_analysis(self,
                                                novel_id: UUID,
@@ -64,8 +70,10 @@ class CulturalDataBatchManager:
                 'warnings': [],
                 'entities_by_type': {},
                 'relations_created': 0,
-                'frameworks_created': 0
+                'frameworks_created': 0,
+                'phases': []
             }
+            self._task_id = task_id
 
             logger.info(f"开始导入文化框架分析数据 - 任务ID: {task_id}")
 
@@ -110,10 +118,36 @@ class CulturalDataBatchManager:
 
             raise
 
+    async def _report_phase(self, progress: PhaseProgress):
+        """批量阶段完成回调：更新统计并写入导入任务进度"""
+        self.processing_stats['total_processed'] += progress.total
+        self.processing_stats['successful'] += progress.processed
+        self.processing_stats['failed'] += progress.skipped
+        self.processing_stats['phases'].append({
+            'phase': progress.phase,
+            'total': progress.total,
+            'processed': progress.processed,
+            'skipped': progress.skipped,
+            'elapsed_seconds': round(progress.elapsed, 3)
+        })
+
+        if self._task_id:
+            await self.repository.update_import_task_progress(self._task_id, {
+                "currentPhase": progress.phase,
+                "totalRecords": self.processing_stats['total_processed'],
+                "processedRecords": self.processing_stats['total_processed'],
+                "successfulRecords": self.processing_stats['successful'],
+                "failedRecords": self.processing_stats['failed'],
+                "progressPercentage": round(
+                    (self.IMPORT_PHASES.index(progress.phase) + 1) * 100.0 / len(self.IMPORT_PHASES), 1
+                )
+            })
+
     async def _import_domain_cultures(self, novel_id: UUID, domain_cultures: Dict[str, Any]):
         """导入域文化框架数据"""
         logger.info("开始导入域文化框架...")
 
+        frameworks = []
         for domain_name, domain_data in domain_cultures.items():
             try:
                 # 转换域名称
@@ -133,7 +167,7 @@ class CulturalDataBatchManager:
                         continue
 
                     # 创建文化框架记录
-                    framework = CulturalFrameworkCreate(
+                    frameworks.append(CulturalFrameworkCreate(
                         novel_id=novel_id,
                         domain_type=domain_type,
                         dimension=dimension,
@@ -143,25 +177,30 @@ class CulturalDataBatchManager:
                         detailed_content=dimension_data.get('content', ''),
                         tags=dimension_data.get('tags', []),
                         priority=8  # 高优先级
-                    )
-
-                    framework_id = await self.repository.create_cultural_framework(framework)
-                    self.processing_stats['frameworks_created'] += 1
-                    self.processing_stats['successful'] += 1
-
-                logger.info(f"域 {domain_name} 文化框架导入完成")
+                    ))
 
             except Exception as e:
-                logger.error(f"导入域 {domain_name} 文化框架失败: {e}")
+                logger.error(f"准备域 {domain_name} 文化框架失败: {e}")
                 self.processing_stats['failed'] += 1
 
+        try:
+            framework_ids = await self.repository.bulk_create_cultural_frameworks(
+                frameworks, progress_callback=self._report_phase
+            )
+            self.processing_stats['frameworks_created'] += len(framework_ids)
+            logger.info(f"域文化框架导入完成，共创建 {len(framework_ids)} 个框架")
+
+        except Exception as e:
+            logger.error(f"批量导入域文化框架失败: {e}")
+            self.processing_stats['failed'] += len(frameworks)
+
     async def _import_cultural_entities(self, novel_id: UUID, analysis_data: Dict[str, Any]):
         """导入文化实体数据"""
         logger.info("开始导入文化实体...")
 
         # 从domain_cultures中提取实体
         domain_cultures = analysis_data.get("domain_cultures", {})
-        entity_id_mapping = {}  # 保存实体名称到ID的映射，用于后续关系创建
+        entities = []
 
         for domain_name, domain_data in domain_cultures.items():
             domain_type = self._normalize_domain_name(domain_name)
@@ -177,8 +216,7 @@ class CulturalDataBatchManager:
                     continue
 
                 # 处理该维度下的实体
-                entities = dimension_data.get('entities', [])
-                for entity_data in entities:
+                for entity_data in dimension_data.get('entities', []):
                     try:
                         entity_type = self._normalize_entity_type(entity_data.get('type', ''))
                         if not entity_type:
@@ -188,7 +226,7 @@ class CulturalDataBatchManager:
                             continue
 
                         # 创建文化实体
-                        entity = CulturalEntityCreate(
+                        entities.append(CulturalEntityCreate(
                             novel_id=novel_id,
                             name=entity_data['name'],
                             entity_type=entity_type,
@@ -199,32 +237,39 @@ class CulturalDataBatchManager:
                             functions=entity_data.get('functions', []),
                             significance=entity_data.get('significance', ''),
                             tags=entity_data.get('tags', [])
-                        )
+                        ))
 
-                        entity_id = await self.repository.create_cultural_entity(entity)
-                        entity_id_mapping[entity_data['name']] = entity_id
+                    except Exception as e:
+                        logger.error(f"准备实体 {entity_data.get('name', 'Unknown')} 失败: {e}")
+                        self.processing_stats['failed'] += 1
 
-                        # 统计
-                        entity_type_key = entity_type.value
-                        if entity_type_key not in self.processing_stats['entities_by_type']:
-                            self.processing_stats['entities_by_type'][entity_type_key] = 0
-                        self.processing_stats['entities_by_type'][entity_type_key] += 1
+        # 实体名称到ID的映射，用于后续关系创建
+        entity_id_mapping = {}
+        try:
+            entity_id_mapping = await self.repository.bulk_create_cultural_entities(
+                entities, progress_callback=self._report_phase
+            )
 
-                        self.processing_stats['successful'] += 1
-                        self.processing_stats['total_processed'] += 1
+            # 统计
+            for entity in entities:
+                entity_type_key = entity.entity_type.value
+                self.processing_stats['entities_by_type'][entity_type_key] = \
+                    self.processing_stats['entities_by_type'].get(entity_type_key, 0) + 1
 
-                    except Exception as e:
-                        logger.error(f"创建实体 {entity_data.get('name', 'Unknown')} 失败: {e}")
-                        self.processing_stats['failed'] += 1
+        except Exception as e:
+            logger.error(f"批量导入文化实体失败: {e}")
+            self.processing_stats['total_processed'] += len(entities)
+            self.processing_stats['failed'] += len(entities)
 
         # 保存实体映射供后续使用
         self._entity_id_mapping = entity_id_mapping
-        logger.info(f"文化实体导入完成，共创建 {len(entity_id_mapping)} 个实体")
+        logger.info(f"文化实体导入完成，共映射 {len(entity_id_mapping)} 个实体")
 
     async def _import_cross_domain_relations(self, novel_id: UUID, cross_domain_relations: List[Dict[str, Any]]):
         """导入跨域关系数据"""
         logger.info("开始导入跨域关系...")
 
+        relations = []
         for relation_data in cross_domain_relations:
             try:
                 source_name = relation_data.get('source_entity', '')
@@ -249,7 +294,7 @@ class CulturalDataBatchManager:
                     continue
 
                 # 创建关系
-                relation = CulturalRelationCreate(
+                relations.append(CulturalRelationCreate(
                     novel_id=novel_id,
                     source_entity_id=source_id,
                     target_entity_id=target_id,
@@ -258,16 +303,23 @@ class CulturalDataBatchManager:
                     strength=relation_data.get('strength', 0.8),
                     context=relation_data.get('context', ''),
                     is_cross_domain=True
-                )
-
-                relation_id = await self.repository.create_cultural_relation(relation)
-                self.processing_stats['relations_created'] += 1
-                self.processing_stats['successful'] += 1
+                ))
 
             except Exception as e:
-                logger.error(f"创建跨域关系失败: {e}")
+                logger.error(f"准备跨域关系失败: {e}")
                 self.processing_stats['failed'] += 1
 
+        try:
+            relation_ids = await self.repository.bulk_create_cultural_relations(
+                relations, progress_callback=self._report_phase
+            )
+            self.processing_stats['relations_created'] += len(relation_ids)
+
+        except Exception as e:
+            logger.error(f"批量导入跨域关系失败: {e}")
+            self.processing_stats['total_processed'] += len(relations)
+            self.processing_stats['failed'] += len(relations)
+
         logger.info(f"跨域关系导入完成，共创建 {self.processing_stats['relations_created']} 个关系")
 
     async def _import_concept_dictionary(self, novel_id: UUID, concept_dictionary: List[Dict[str, Any]]):
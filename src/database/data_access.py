@@ -5,7 +5,8 @@
 
 import asyncio
 import logging
-from typing import Optional, List, Dict, Any, Union
+import time
+from typing import Optional, List, Dict, Any, Union, Callable, Awaitable, Tuple
 from uuid import UUID
 from datetime import datetime
 
@@ -13,7 +14,8 @@ from .connection_manager import (
     DatabaseManager,
     get_database_manager,
     close_database_manager,
-    DatabaseError
+    DatabaseError,
+    config
 )
 from .models import *
 from .repositories.postgresql_repository import PostgreSQLRepository
@@ -21,6 +23,54 @@ from .repositories.mongodb_repository import MongoDBRepository
 
 logger = logging.getLogger(__name__)
 
+# 联合搜索支持的后端
+SEARCH_BACKENDS = ("segments", "characters", "locations", "knowledge")
+
+
+class NovelContextCache:
+    """
+    按小说版本号失效的进程内上下文缓存
+
+    世界观、法则链等创作上下文读多写少，按 (小说ID, 键) 缓存构建结果。
+    通过 NovelDataManager 的写操作递增该小说的版本号，旧版本的缓存项随之失效。
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    def version(self, novel_id: str) -> int:
+        """当前上下文版本号"""
+        return self._versions.get(novel_id, 0)
+
+    def invalidate(self, novel_id: str) -> None:
+        """使小说的全部缓存上下文失效"""
+        self._versions[novel_id] = self.version(novel_id) + 1
+
+    async def get_or_load(self, novel_id: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """返回缓存值；版本过期或未缓存时调用 loader 构建（同一键的并发请求只构建一次）"""
+        cache_key = (novel_id, key)
+        entry = self._entries.get(cache_key)
+        if entry and entry[0] == self.version(novel_id):
+            return entry[1]
+
+        lock = self._locks.setdefault(cache_key, asyncio.Lock())
+        async with lock:
+            version = self.version(novel_id)
+            entry = self._entries.get(cache_key)
+            if entry and entry[0] == version:
+                return entry[1]
+
+            value = await loader()
+            # 构建期间发生写操作时不缓存可能过期的结果
+            if self.version(novel_id) == version:
+                self._entries[cache_key] = (version, value)
+            return value
+
+
+novel_context_cache = NovelContextCache()
+
 
 class NovelDataManager:
     """小说数据管理器 - 针对特定小说的数据操作"""
@@ -185,6 +235,7 @@ class NovelDataManager:
         """创建域"""
         try:
             domain = await self.pg_repo.create_domain(domain_data)
+            self.invalidate_context()
             logger.info(f"创建域: {domain.name} (ID: {domain.id})")
             return domain
         except Exception as e:
@@ -203,6 +254,7 @@ class NovelDataManager:
         """创建法则链"""
         try:
             law_chain = await self.pg_repo.create_law_chain(law_chain_data)
+            self.invalidate_context()
             logger.info(f"创建法则链: {law_chain.name} (ID: {law_chain.id})")
             return law_chain
         except Exception as e:
@@ -217,6 +269,14 @@ class NovelDataManager:
             logger.error(f"获取法则链列表失败: {e}")
             raise DatabaseError(f"获取法则链列表失败: {e}")
 
+    async def get_cached_context(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """获取按版本缓存的创作上下文，世界观数据写入后自动重建"""
+        return await novel_context_cache.get_or_load(self.novel_id, key, loader)
+
+    def invalidate_context(self) -> None:
+        """使本小说的缓存上下文失效"""
+        novel_context_cache.invalidate(self.novel_id)
+
     # =============================================================================
     # MongoDB数据操作
     # =============================================================================
@@ -247,6 +307,14 @@ class NovelDataManager:
             logger.error(f"获取角色列表失败: {e}")
             raise DatabaseError(f"获取角色列表失败: {e}")
 
+    async def get_characters_by_ids(self, character_ids: List[str]) -> List[Character]:
+        """根据ID批量获取角色"""
+        try:
+            return await self.mongo_repo.get_characters_by_ids(self.novel_id, character_ids)
+        except Exception as e:
+            logger.error(f"批量获取角色失败: {e}")
+            raise DatabaseError(f"批量获取角色失败: {e}")
+
     async def create_location(self, location_data: LocationCreate) -> Location:
         """创建地点"""
         try:
@@ -282,43 +350,110 @@ class NovelDataManager:
         query: str,
         content_types: Optional[List[str]] = None
     ) -> Dict[str, List[Any]]:
-        """全文搜索内容"""
+        """全文搜索内容（各后端并发执行）"""
         try:
-            results = {
-                "segments": [],
-                "characters": [],
-                "locations": [],
-                "knowledge": []
-            }
+            searches = {}
 
             # 搜索PostgreSQL中的内容段落
             if not content_types or "segments" in content_types:
-                results["segments"] = await self.pg_repo.search_content_segments(
+                searches["segments"] = self.pg_repo.search_content_segments(
                     UUID(self.novel_id), query
                 )
 
             # 搜索MongoDB中的各类内容
             if not content_types or "characters" in content_types:
-                results["characters"] = await self.mongo_repo.search_characters(
+                searches["characters"] = self.mongo_repo.search_characters(
                     self.novel_id, query
                 )
 
             if not content_types or "locations" in content_types:
-                results["locations"] = await self.mongo_repo.search_locations(
+                searches["locations"] = self.mongo_repo.search_locations(
                     self.novel_id, query
                 )
 
             if not content_types or "knowledge" in content_types:
-                results["knowledge"] = await self.mongo_repo.search_knowledge_base(
+                searches["knowledge"] = self.mongo_repo.search_knowledge_base(
                     self.novel_id, query
                 )
 
+            results = {backend: [] for backend in SEARCH_BACKENDS}
+            found = await asyncio.gather(*searches.values())
+            results.update(zip(searches.keys(), found))
             return results
 
         except Exception as e:
             logger.error(f"搜索内容失败: {e}")
             raise DatabaseError(f"搜索内容失败: {e}")
 
+    async def federated_search(
+        self,
+        query: str,
+        content_types: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 20,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        联合搜索 - 四个后端并发执行，分页下推到SQL/MongoDB
+
+        每个后端独立超时，超时或失败的后端返回空结果并标记状态，
+        不影响其它后端。返回 {后端: {"items", "total", "status", "elapsed_ms"}}
+        """
+        timeout = config.search_backend_timeout if timeout is None else timeout
+        backends = [
+            backend for backend in SEARCH_BACKENDS
+            if not content_types or backend in content_types
+        ]
+
+        searches = {
+            "segments": lambda: self.pg_repo.search_content_segments_page(
+                UUID(self.novel_id), query, skip, limit
+            ),
+            "characters": lambda: self._search_mongo_page(
+                self.mongo_repo.search_characters, "characters", query, skip, limit
+            ),
+            "locations": lambda: self._search_mongo_page(
+                self.mongo_repo.search_locations, "locations", query, skip, limit
+            ),
+            "knowledge": lambda: self._search_mongo_page(
+                self.mongo_repo.search_knowledge_base, "knowledge_base", query, skip, limit
+            ),
+        }
+
+        outcomes = await asyncio.gather(*(
+            self._run_search_backend(backend, searches[backend](), timeout)
+            for backend in backends
+        ))
+        return dict(zip(backends, outcomes))
+
+    async def _search_mongo_page(self, search_func, collection_name: str, query: str,
+                                 skip: int, limit: int):
+        """MongoDB分页搜索，结果与总数并发查询"""
+        return await asyncio.gather(
+            search_func(self.novel_id, query, skip=skip, limit=limit),
+            self.mongo_repo.count_text_matches(collection_name, self.novel_id, query)
+        )
+
+    async def _run_search_backend(self, backend: str, search, timeout: float) -> Dict[str, Any]:
+        """执行单个搜索后端并记录状态"""
+        started = time.perf_counter()
+        outcome = {"items": [], "total": 0, "status": "ok"}
+
+        try:
+            items, total = await asyncio.wait_for(search, timeout=timeout)
+            outcome["items"] = items
+            outcome["total"] = total
+        except asyncio.TimeoutError:
+            logger.warning(f"搜索后端超时: {backend} ({timeout}s)")
+            outcome["status"] = "timeout"
+        except Exception as e:
+            logger.error(f"搜索后端失败: {backend}: {e}")
+            outcome["status"] = "error"
+            outcome["error"] = str(e)
+
+        outcome["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return outcome
+
     async def get_novel_statistics(self) -> Dict[str, Any]:
         """获取小说统计信息"""
         try:
@@ -20,6 +20,8 @@ from ..models.cultural_framework_models import (
     DomainType, EntityType, RelationType, CulturalDimension
 )
 from ..connection_manager import DatabaseManager
+from ..search_index import SearchIndexer, get_search_indexer, ENTITY_VECTOR_SQL
+from ..bulk_import import ProgressCallback, copy_to_staging, import_phase
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +29,9 @@ logger = logging.getLogger(__name__)
 class CulturalFrameworkRepository:
     """文化框架数据仓库 - 混合数据库操作"""
 
-    def __init__(self, connection_manager: DatabaseManager):
+    def __init__(self, connection_manager: DatabaseManager, search_indexer: Optional[SearchIndexer] = None):
         self.connection_manager = connection_manager
+        self.search_indexer = search_indexer or get_search_indexer()
         self._pg_pool: Optional[asyncpg.Pool] = None
         self._mongo_client: Optional[AsyncIOMotorClient] = None
         self._mongo_db: Optional[AsyncIOMotorDatabase] = None
@@ -148,32 +151,32 @@ class CulturalFrameworkRepository:
     # 文化实体操作 (PostgreSQL + MongoDB)
     # ====================================================================
 
-    async def create_cultural_entity(self, entity: CulturalEntityCreate) -> UUID:
-        """创建文化实体 (PostgreSQL主表 + MongoDB详细信息)"""
-        entity_id = uuid4()
-
-        # 在PostgreSQL中创建主记录
-        async with self._pg_pool.acquire() as conn:
-            await conn.execute(
-                """
-                INSERT INTO cultural_entities (
-                    id, novel_id, framework_id, name, entity_type, domain_type,
-                    dimensions, description, characteristics, functions, significance,
-                    origin_story, historical_context, current_status,
-                    aliases, tags, text_references, confidence_score, extraction_method
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19)
-                """,
-                entity_id, entity.novel_id, entity.framework_id, entity.name,
-                entity.entity_type.value, entity.domain_type.value if entity.domain_type else None,
-                [d.value for d in entity.dimensions], entity.description,
-                json.dumps(entity.characteristics, ensure_ascii=False), entity.functions,
-                entity.significance, entity.origin_story, entity.historical_context,
-                entity.current_status, entity.aliases, entity.tags, entity.text_references,
-                0.8, 'manual'
-            )
+    ENTITY_COLUMNS = [
+        'id', 'novel_id', 'framework_id', 'name', 'entity_type', 'domain_type',
+        'dimensions', 'description', 'characteristics', 'functions', 'significance',
+        'origin_story', 'historical_context', 'current_status',
+        'aliases', 'tags', 'text_references', 'confidence_score', 'extraction_method'
+    ]
+
+    def _entity_record(self, entity_id: UUID, entity: CulturalEntityCreate) -> tuple:
+        """文化实体主表行 (列顺序同 ENTITY_COLUMNS，后接名称/描述索引词元)"""
+        name_text, description_text = self.search_indexer.entity_index_params(
+            entity.name, entity.description
+        )
+        return (
+            entity_id, entity.novel_id, entity.framework_id, entity.name,
+            entity.entity_type.value, entity.domain_type.value if entity.domain_type else None,
+            [d.value for d in entity.dimensions], entity.description,
+            json.dumps(entity.characteristics, ensure_ascii=False), entity.functions,
+            entity.significance, entity.origin_story, entity.historical_context,
+            entity.current_status, entity.aliases, entity.tags, entity.text_references,
+            0.8, 'manual', name_text, description_text
+        )
 
-        # 在MongoDB中创建详细记录
-        await self._collections['cultural_entities_detailed'].insert_one({
+    @staticmethod
+    def _entity_detail_document(entity_id: UUID, entity: CulturalEntityCreate) -> Dict[str, Any]:
+        """文化实体的MongoDB详细记录"""
+        return {
             "novelId": str(entity.novel_id),
             "entityId": str(entity_id),
             "entityName": entity.name,
@@ -204,7 +207,30 @@ class CulturalFrameworkRepository:
             },
             "createdAt": datetime.now(timezone.utc),
             "updatedAt": datetime.now(timezone.utc)
-        })
+        }
+
+    async def create_cultural_entity(self, entity: CulturalEntityCreate) -> UUID:
+        """创建文化实体 (PostgreSQL主表 + MongoDB详细信息)"""
+        entity_id = uuid4()
+        placeholders = ", ".join(f"${i}" for i in range(1, len(self.ENTITY_COLUMNS) + 1))
+        vector_sql = ENTITY_VECTOR_SQL.format(
+            name=f"${len(self.ENTITY_COLUMNS) + 1}", description=f"${len(self.ENTITY_COLUMNS) + 2}"
+        )
+
+        # 在PostgreSQL中创建主记录
+        async with self._pg_pool.acquire() as conn:
+            await conn.execute(
+                f"""
+                INSERT INTO cultural_entities ({', '.join(self.ENTITY_COLUMNS)}, search_vector)
+                VALUES ({placeholders}, {vector_sql})
+                """,
+                *self._entity_record(entity_id, entity)
+            )
+
+        # 在MongoDB中创建详细记录
+        await self._collections['cultural_entities_detailed'].insert_one(
+            self._entity_detail_document(entity_id, entity)
+        )
 
         logger.info(f"创建文化实体: {entity.name} ({entity_id})")
         return entity_id
@@ -285,6 +311,29 @@ class CulturalFrameworkRepository:
     # 文化关系操作 (PostgreSQL + MongoDB)
     # ====================================================================
 
+    @staticmethod
+    def _semantic_relation_document(novel_id: UUID, source: Dict[str, Any], target: Dict[str, Any],
+                                    relation_type: str, strength: float,
+                                    context: Optional[str]) -> Dict[str, Any]:
+        """文化关系的MongoDB语义关系记录"""
+        return {
+            "novelId": str(novel_id),
+            "relation_data": {
+                "source_entity": source,
+                "target_entity": target,
+                "relation_type": relation_type,
+                "semantic_weight": strength
+            },
+            "inference_path": [],
+            "contextual_factors": {
+                "temporal_context": "current",
+                "cultural_context": context or "",
+                "narrative_context": ""
+            },
+            "createdAt": datetime.now(timezone.utc),
+            "updatedAt": datetime.now(timezone.utc)
+        }
+
     async def create_cultural_relation(self, relation: CulturalRelationCreate) -> UUID:
         """创建文化关系"""
         relation_id = uuid4()
@@ -318,33 +367,22 @@ class CulturalFrameworkRepository:
         target_entity = await self.get_cultural_entity(relation.target_entity_id)
 
         if source_entity and target_entity:
-            await self._collections['semantic_relations'].insert_one({
-                "novelId": str(relation.novel_id),
-                "relation_data": {
-                    "source_entity": {
-                        "id": str(source_entity.id),
-                        "name": source_entity.name,
-                        "type": source_entity.entity_type.value,
-                        "domain": source_entity.domain_type.value if source_entity.domain_type else None
-                    },
-                    "target_entity": {
-                        "id": str(target_entity.id),
-                        "name": target_entity.name,
-                        "type": target_entity.entity_type.value,
-                        "domain": target_entity.domain_type.value if target_entity.domain_type else None
-                    },
-                    "relation_type": relation.relation_type.value,
-                    "semantic_weight": relation.strength
+            await self._collections['semantic_relations'].insert_one(self._semantic_relation_document(
+                relation.novel_id,
+                {
+                    "id": str(source_entity.id),
+                    "name": source_entity.name,
+                    "type": source_entity.entity_type.value,
+                    "domain": source_entity.domain_type.value if source_entity.domain_type else None
                 },
-                "inference_path": [],
-                "contextual_factors": {
-                    "temporal_context": "current",
-                    "cultural_context": relation.context or "",
-                    "narrative_context": ""
+                {
+                    "id": str(target_entity.id),
+                    "name": target_entity.name,
+                    "type": target_entity.entity_type.value,
+                    "domain": target_entity.domain_type.value if target_entity.domain_type else None
                 },
-                "createdAt": datetime.now(timezone.utc),
-                "updatedAt": datetime.now(timezone.utc)
-            })
+                relation.relation_type.value, relation.strength, relation.context
+            ))
 
         logger.info(f"创建文化关系: {relation.relation_type.value} ({relation_id})")
         return relation_id
@@ -456,6 +494,169 @@ class CulturalFrameworkRepository:
                 for row in rows
             ]
 
+    # ====================================================================
+    # 批量写入操作 (COPY暂存 + 集合式SQL，每批一个事务)
+    # ====================================================================
+
+    async def bulk_create_cultural_frameworks(self, frameworks: List[CulturalFrameworkCreate],
+                                              progress_callback: Optional[ProgressCallback] = None) -> List[UUID]:
+        """批量创建文化框架 (单事务 executemany)"""
+        if not frameworks:
+            return []
+
+        framework_ids = [uuid4() for _ in frameworks]
+        records = [
+            (
+                framework_id, framework.novel_id, framework.domain_type.value,
+                framework.dimension.value, framework.title, framework.summary,
+                framework.key_elements, framework.detailed_content,
+                framework.tags, framework.priority, 'draft', 0.5
+            )
+            for framework_id, framework in zip(framework_ids, frameworks)
+        ]
+
+        async with self._pg_pool.acquire() as conn:
+            async with import_phase(conn, 'cultural_frameworks', len(records), progress_callback) as progress:
+                await conn.executemany(
+                    """
+                    INSERT INTO cultural_frameworks (
+                        id, novel_id, domain_type, dimension, title, summary,
+                        key_elements, detailed_content, tags, priority,
+                        processing_status, confidence_score
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                    """,
+                    records
+                )
+                progress.processed = len(records)
+
+        return framework_ids
+
+    async def bulk_create_cultural_entities(self, entities: List[CulturalEntityCreate],
+                                            progress_callback: Optional[ProgressCallback] = None) -> Dict[str, UUID]:
+        """
+        批量创建文化实体 (PostgreSQL COPY + MongoDB insert_many)
+
+        已存在的 (novel_id, name, entity_type) 被跳过，只为新建实体写入MongoDB详细记录。
+
+        Returns:
+            实体名称到ID的映射 (同名实体以最后出现的为准)
+        """
+        if not entities:
+            return {}
+
+        entity_ids = [uuid4() for _ in entities]
+        records = [self._entity_record(entity_id, entity) for entity_id, entity in zip(entity_ids, entities)]
+        columns = ", ".join(self.ENTITY_COLUMNS)
+
+        async with self._pg_pool.acquire() as conn:
+            async with import_phase(conn, 'cultural_entities', len(records), progress_callback) as progress:
+                staging = await copy_to_staging(
+                    conn, 'cultural_entities', self.ENTITY_COLUMNS, records,
+                    extra_columns=[('name_text', 'TEXT'), ('description_text', 'TEXT')]
+                )
+                inserted = await conn.fetch(
+                    f"""
+                    INSERT INTO cultural_entities ({columns}, search_vector)
+                    SELECT {columns}, {ENTITY_VECTOR_SQL.format(name='name_text', description='description_text')}
+                    FROM {staging}
+                    ON CONFLICT (novel_id, name, entity_type) DO NOTHING
+                    RETURNING id
+                    """
+                )
+                progress.processed = len(inserted)
+                progress.skipped = len(records) - len(inserted)
+
+                rows = await conn.fetch(
+                    f"""
+                    SELECT DISTINCT ON (s.name) s.name, e.id
+                    FROM {staging} s
+                    JOIN cultural_entities e
+                      ON e.novel_id = s.novel_id AND e.name = s.name AND e.entity_type = s.entity_type
+                    ORDER BY s.name, s.ctid DESC
+                    """
+                )
+
+        inserted_ids = {row['id'] for row in inserted}
+        documents = [
+            self._entity_detail_document(entity_id, entity)
+            for entity_id, entity in zip(entity_ids, entities) if entity_id in inserted_ids
+        ]
+        if documents:
+            await self._collections['cultural_entities_detailed'].insert_many(documents, ordered=False)
+
+        logger.info(f"批量创建文化实体: {len(inserted_ids)} 个")
+        return {row['name']: row['id'] for row in rows}
+
+    async def bulk_create_cultural_relations(self, relations: List[CulturalRelationCreate],
+                                             progress_callback: Optional[ProgressCallback] = None) -> List[UUID]:
+        """
+        批量创建文化关系
+
+        两端实体的域信息和跨域标识在SQL中连接实体表解析；实体不存在或
+        违反唯一约束的关系被跳过。
+
+        Returns:
+            新建关系ID列表
+        """
+        if not relations:
+            return []
+
+        columns = ['id', 'novel_id', 'source_entity_id', 'target_entity_id',
+                   'relation_type', 'description', 'strength', 'context']
+        records = [
+            (uuid4(), relation.novel_id, relation.source_entity_id, relation.target_entity_id,
+             relation.relation_type.value, relation.description, relation.strength, relation.context)
+            for relation in relations
+        ]
+
+        async with self._pg_pool.acquire() as conn:
+            async with import_phase(conn, 'cultural_relations', len(records), progress_callback) as progress:
+                staging = await copy_to_staging(conn, 'cultural_relations', columns, records)
+                rows = await conn.fetch(
+                    f"""
+                    WITH inserted AS (
+                        INSERT INTO cultural_relations (
+                            {', '.join(columns)}, is_cross_domain, source_domain,
+                            target_domain, confidence_score, detection_method, bidirectional
+                        )
+                        SELECT {', '.join(f'r.{column}' for column in columns)},
+                               COALESCE(s.domain_type <> t.domain_type, FALSE),
+                               s.domain_type, t.domain_type, 0.8, 'manual', FALSE
+                        FROM {staging} r
+                        JOIN cultural_entities s ON s.id = r.source_entity_id
+                        JOIN cultural_entities t ON t.id = r.target_entity_id
+                        ON CONFLICT (source_entity_id, target_entity_id, relation_type) DO NOTHING
+                        RETURNING id, novel_id, source_entity_id, target_entity_id,
+                                  relation_type, strength, context
+                    )
+                    SELECT i.*,
+                           s.name AS source_name, s.entity_type AS source_type, s.domain_type AS source_domain,
+                           t.name AS target_name, t.entity_type AS target_type, t.domain_type AS target_domain
+                    FROM inserted i
+                    JOIN cultural_entities s ON s.id = i.source_entity_id
+                    JOIN cultural_entities t ON t.id = i.target_entity_id
+                    """
+                )
+                progress.processed = len(rows)
+                progress.skipped = len(records) - len(rows)
+
+        documents = [
+            self._semantic_relation_document(
+                row['novel_id'],
+                {"id": str(row['source_entity_id']), "name": row['source_name'],
+                 "type": row['source_type'], "domain": row['source_domain']},
+                {"id": str(row['target_entity_id']), "name": row['target_name'],
+                 "type": row['target_type'], "domain": row['target_domain']},
+                row['relation_type'], float(row['strength']), row['context']
+            )
+            for row in rows
+        ]
+        if documents:
+            await self._collections['semantic_relations'].insert_many(documents, ordered=False)
+
+        logger.info(f"批量创建文化关系: {len(rows)} 个")
+        return [row['id'] for row in rows]
+
     # ====================================================================
     # 批量数据导入操作 (MongoDB)
     # ====================================================================
@@ -577,15 +778,19 @@ class CulturalFrameworkRepository:
                             entity_types: Optional[List[EntityType]] = None,
                             domains: Optional[List[DomainType]] = None) -> List[Dict[str, Any]]:
         """全文搜索文化实体"""
-        # PostgreSQL全文搜索
+        query_text = self.search_indexer.query_text(search_query)
+        if not query_text:
+            return []
+
+        # PostgreSQL全文搜索（预分词的search_vector + GIN索引）
         query = """
         SELECT id, name, entity_type, domain_type, description, tags,
-               ts_rank_cd(to_tsvector('simple', name || ' ' || description), plainto_tsquery('simple', $2)) as rank
+               ts_rank_cd(search_vector, plainto_tsquery('simple', $2)) as rank
         FROM cultural_entities
         WHERE novel_id = $1
-        AND (to_tsvector('simple', name || ' ' || description) @@ plainto_tsquery('simple', $2))
+        AND search_vector @@ plainto_tsquery('simple', $2)
         """
-        params = [novel_id, search_query]
+        params = [novel_id, query_text]
 
         if entity_types:
             query += f" AND entity_type = ANY($3)"
@@ -6,6 +6,7 @@ import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import TEXT, ASCENDING, DESCENDING
 from pymongo.errors import DuplicateKeyError
@@ -91,6 +92,31 @@ class MongoDBRepository:
             logger.error(f"获取角色失败: {e}")
             raise DatabaseError(f"获取角色失败: {e}")
 
+    async def get_characters_by_ids(self, novel_id: str, character_ids: List[str]) -> List[Character]:
+        """根据ID批量获取角色（单次 $in 查询，按传入顺序返回，不存在的ID跳过）"""
+        if not character_ids:
+            return []
+        try:
+            # 插入时由驱动生成的是ObjectId，兼容以字符串形式传入的ID
+            lookup_ids = [
+                ObjectId(character_id) if ObjectId.is_valid(character_id) else character_id
+                for character_id in character_ids
+            ]
+            lookup_ids += [character_id for character_id in character_ids if ObjectId.is_valid(character_id)]
+
+            found = {}
+            cursor = self.db.characters.find({"_id": {"$in": lookup_ids}, "novel_id": novel_id})
+            async for doc in cursor:
+                doc["id"] = str(doc["_id"])
+                doc.pop("_id", None)
+                found[doc["id"]] = Character(**doc)
+
+            return [found[str(character_id)] for character_id in character_ids if str(character_id) in found]
+
+        except Exception as e:
+            logger.error(f"批量获取角色失败: {e}")
+            raise DatabaseError(f"批量获取角色失败: {e}")
+
     async def get_characters_by_novel(
         self,
         novel_id: str,
@@ -153,20 +179,33 @@ class MongoDBRepository:
             logger.error(f"删除角色失败: {e}")
             raise DatabaseError(f"删除角色失败: {e}")
 
-    async def search_characters(self, novel_id: str, query: str) -> List[Character]:
-        """搜索角色"""
+    async def search_characters(
+        self,
+        novel_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Character]:
+        """搜索角色（按文本相关度排序）"""
         try:
             search_query = {
                 "novel_id": novel_id,
                 "$text": {"$search": query}
             }
 
-            cursor = self.db.characters.find(search_query).limit(20)
+            cursor = (
+                self.db.characters
+                .find(search_query, {"score": {"$meta": "textScore"}})
+                .sort([("score", {"$meta": "textScore"})])
+                .skip(skip)
+                .limit(limit)
+            )
             characters = []
 
             async for doc in cursor:
                 doc["id"] = str(doc["_id"])
                 doc.pop("_id", None)
+                doc.pop("score", None)
                 characters.append(Character(**doc))
 
             return characters
@@ -262,20 +301,33 @@ class MongoDBRepository:
             logger.error(f"获取地点列表失败: {e}")
             raise DatabaseError(f"获取地点列表失败: {e}")
 
-    async def search_locations(self, novel_id: str, query: str) -> List[Location]:
-        """搜索地点"""
+    async def search_locations(
+        self,
+        novel_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Location]:
+        """搜索地点（按文本相关度排序）"""
         try:
             search_query = {
                 "novel_id": novel_id,
                 "$text": {"$search": query}
             }
 
-            cursor = self.db.locations.find(search_query).limit(20)
+            cursor = (
+                self.db.locations
+                .find(search_query, {"score": {"$meta": "textScore"}})
+                .sort([("score", {"$meta": "textScore"})])
+                .skip(skip)
+                .limit(limit)
+            )
             locations = []
 
             async for doc in cursor:
                 doc["id"] = str(doc["_id"])
                 doc.pop("_id", None)
+                doc.pop("score", None)
                 locations.append(Location(**doc))
 
             return locations
@@ -499,20 +551,33 @@ class MongoDBRepository:
             logger.error(f"获取知识库列表失败: {e}")
             raise DatabaseError(f"获取知识库列表失败: {e}")
 
-    async def search_knowledge_base(self, novel_id: str, query: str) -> List[KnowledgeBase]:
-        """搜索知识库"""
+    async def search_knowledge_base(
+        self,
+        novel_id: str,
+        query: str,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[KnowledgeBase]:
+        """搜索知识库（按文本相关度排序）"""
         try:
             search_query = {
                 "novel_id": novel_id,
                 "$text": {"$search": query}
             }
 
-            cursor = self.db.knowledge_base.find(search_query).limit(20)
+            cursor = (
+                self.db.knowledge_base
+                .find(search_query, {"score": {"$meta": "textScore"}})
+                .sort([("score", {"$meta": "textScore"})])
+                .skip(skip)
+                .limit(limit)
+            )
             knowledge_items = []
 
             async for doc in cursor:
                 doc["id"] = str(doc["_id"])
                 doc.pop("_id", None)
+                doc.pop("score", None)
                 knowledge_items.append(KnowledgeBase(**doc))
 
             return knowledge_items
@@ -521,6 +586,17 @@ class MongoDBRepository:
             logger.error(f"搜索知识库失败: {e}")
             raise DatabaseError(f"搜索知识库失败: {e}")
 
+    async def count_text_matches(self, collection_name: str, novel_id: str, query: str) -> int:
+        """统计全文搜索匹配数量"""
+        try:
+            return await self.db[collection_name].count_documents({
+                "novel_id": novel_id,
+                "$text": {"$search": query}
+            })
+        except Exception as e:
+            logger.error(f"统计搜索结果失败: {e}")
+            raise DatabaseError(f"统计搜索结果失败: {e}")
+
     # =============================================================================
     # 数据库维护操作
     # =============================================================================
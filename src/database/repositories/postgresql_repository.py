@@ -3,13 +3,14 @@ PostgreSQL数据仓库 - 处理关系型数据库操作
 """
 
 import logging
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple
 from uuid import UUID
 from datetime import datetime
 import json
 
 from ..connection_manager import PostgreSQLManager, DatabaseError
 from ..models import *
+from ..search_index import SearchIndexer, get_search_indexer, SEGMENT_VECTOR_SQL
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +28,9 @@ def _deserialize_json_fields(row_dict: dict, *fields) -> dict:
 class PostgreSQLRepository:
     """PostgreSQL数据仓库"""
 
-    def __init__(self, postgres_manager: PostgreSQLManager):
+    def __init__(self, postgres_manager: PostgreSQLManager, search_indexer: Optional[SearchIndexer] = None):
         self.postgres = postgres_manager
+        self.search_indexer = search_indexer or get_search_indexer()
 
     # =============================================================================
     # 项目管理操作
@@ -331,13 +333,17 @@ class PostgreSQLRepository:
 
     async def create_content_segment(self, segment_data: ContentSegmentCreate) -> ContentSegment:
         """创建内容段落"""
+        title_text, content_text = self.search_indexer.segment_index_params(
+            segment_data.title, segment_data.content
+        )
         async with self.postgres.get_transaction() as conn:
-            query = """
+            query = f"""
                 INSERT INTO content_segments (
                     batch_id, segment_type, title, content, sequence_order,
-                    tags, emotions, characters, locations, metadata
+                    tags, emotions, characters, locations, metadata, search_vector
                 )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10,
+                        {SEGMENT_VECTOR_SQL.format(title='$11', content='$12')})
                 RETURNING *
             """
             row = await conn.fetchrow(
@@ -351,7 +357,9 @@ class PostgreSQLRepository:
                 segment_data.emotions,
                 [str(char_id) for char_id in segment_data.characters],
                 [str(loc_id) for loc_id in segment_data.locations],
-                json.dumps(segment_data.metadata)
+                json.dumps(segment_data.metadata),
+                title_text,
+                content_text
             )
             return ContentSegment(**_deserialize_json_fields(dict(row), "metadata"))
 
@@ -419,9 +427,12 @@ class PostgreSQLRepository:
         params = []
         param_count = 1
 
+        update_fields = set()
+
         # 构建动态更新查询
         for field, value in update_data.dict(exclude_unset=True).items():
             if value is not None:
+                update_fields.add(field)
                 if field in ['segment_type', 'status'] and hasattr(value, 'value'):
                     value = value.value
                 elif field in ['characters', 'locations']:
@@ -443,6 +454,11 @@ class PostgreSQLRepository:
 
         async with self.postgres.get_transaction() as conn:
             row = await conn.fetchrow(query, *params)
+            if row and ('title' in update_fields or 'content' in update_fields):
+                # 标题或正文变化时在同一事务内重建检索向量
+                await self.search_indexer.index_content_segment(
+                    conn, row['id'], row['title'], row['content']
+                )
             return ContentSegment(**_deserialize_json_fields(dict(row), "metadata")) if row else None
 
     async def delete_content_segment(self, segment_id: UUID) -> bool:
@@ -529,22 +545,61 @@ class PostgreSQLRepository:
     # 搜索和统计操作
     # =============================================================================
 
-    async def search_content_segments(self, novel_id: UUID, query: str) -> List[ContentSegment]:
-        """搜索内容段落"""
+    async def search_content_segments(
+        self,
+        novel_id: UUID,
+        query: str,
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[ContentSegment]:
+        """搜索内容段落（jieba分词 + GIN索引，按ts_rank_cd排序）"""
+        segments, _ = await self.search_content_segments_page(novel_id, query, skip, limit)
+        return segments
+
+    async def search_content_segments_page(
+        self,
+        novel_id: UUID,
+        query: str,
+        skip: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[ContentSegment], int]:
+        """分页搜索内容段落，返回 (当前页段落, 匹配总数)"""
+        query_text = self.search_indexer.query_text(query)
+        if not query_text:
+            return [], 0
+
         async with self.postgres.get_connection() as conn:
             search_query = """
-                SELECT cs.* FROM content_segments cs
-                JOIN content_batches cb ON cs.batch_id = cb.id
+                SELECT cs.*, ts_rank_cd(cs.search_vector, q) AS rank,
+                       COUNT(*) OVER () AS total_count
+                FROM content_segments cs
+                JOIN content_batches cb ON cs.batch_id = cb.id,
+                     plainto_tsquery('simple', $2) q
                 WHERE cb.novel_id = $1
-                AND (
-                    to_tsvector('simple', cs.content) @@ plainto_tsquery('simple', $2)
-                    OR to_tsvector('simple', COALESCE(cs.title, '')) @@ plainto_tsquery('simple', $2)
-                )
-                ORDER BY cs.sequence_order
-                LIMIT 50
+                AND cs.search_vector @@ q
+                ORDER BY rank DESC, cs.sequence_order, cs.id
+                OFFSET $3 LIMIT $4
             """
-            rows = await conn.fetch(search_query, novel_id, query)
-            return [ContentSegment(**_deserialize_json_fields(dict(row), "metadata")) for row in rows]
+            rows = await conn.fetch(search_query, novel_id, query_text, skip, limit)
+
+            if rows:
+                total = rows[0]['total_count']
+            elif skip > 0:
+                # 页码越界时窗口计数不可用，单独统计总数
+                total = await conn.fetchval(
+                    """
+                    SELECT COUNT(*) FROM content_segments cs
+                    JOIN content_batches cb ON cs.batch_id = cb.id
+                    WHERE cb.novel_id = $1
+                    AND cs.search_vector @@ plainto_tsquery('simple', $2)
+                    """,
+                    novel_id, query_text
+                )
+            else:
+                total = 0
+
+            segments = [ContentSegment(**_deserialize_json_fields(dict(row), "metadata")) for row in rows]
+            return segments, total
 
     async def get_batch_statistics(self, novel_id: UUID) -> Dict[str, Any]:
         """获取批次统计信息"""
@@ -210,6 +210,10 @@ CREATE INDEX IF NOT EXISTS idx_cultural_entities_validation ON cultural_entities
 CREATE INDEX IF NOT EXISTS idx_cultural_entities_confidence ON cultural_entities(confidence_score DESC);
 CREATE INDEX IF NOT EXISTS idx_cultural_entities_framework ON cultural_entities(framework_id);
 
+-- 文化实体全文检索（search_vector由应用层jieba分词后写入）
+ALTER TABLE cultural_entities ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+CREATE INDEX IF NOT EXISTS idx_cultural_entities_search_vector ON cultural_entities USING gin(search_vector);
+
 -- 文化关系索引
 CREATE INDEX IF NOT EXISTS idx_cultural_relations_source ON cultural_relations(source_entity_id);
 CREATE INDEX IF NOT EXISTS idx_cultural_relations_target ON cultural_relations(target_entity_id);
@@ -80,10 +80,14 @@ CREATE TABLE IF NOT EXISTS content_segments (
     status VARCHAR(50) DEFAULT 'draft' CHECK (status IN ('draft', 'review', 'approved', 'published')),
     revision_count INTEGER DEFAULT 0,
     metadata JSONB DEFAULT '{}',
+    search_vector TSVECTOR, -- jieba预分词后的全文检索向量（标题A权重，正文B权重）
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- 旧库升级：补充检索向量列（已有数据通过 scripts/database_setup/backfill_search_index.py 回填）
+ALTER TABLE content_segments ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
 -- =============================================================================
 -- 九域世界观核心表
 -- =============================================================================
@@ -214,9 +218,10 @@ CREATE INDEX IF NOT EXISTS idx_content_batches_type ON content_batches(batch_typ
 CREATE INDEX IF NOT EXISTS idx_content_segments_batch_id ON content_segments(batch_id);
 CREATE INDEX IF NOT EXISTS idx_content_segments_sequence ON content_segments(batch_id, sequence_order);
 
--- 文本搜索索引
-CREATE INDEX IF NOT EXISTS idx_content_segments_content_gin ON content_segments USING gin(to_tsvector('simple', content));
-CREATE INDEX IF NOT EXISTS idx_content_segments_title_gin ON content_segments USING gin(to_tsvector('simple', title));
+-- 文本搜索索引（search_vector由应用层jieba分词后写入）
+DROP INDEX IF EXISTS idx_content_segments_content_gin;
+DROP INDEX IF EXISTS idx_content_segments_title_gin;
+CREATE INDEX IF NOT EXISTS idx_content_segments_search_vector ON content_segments USING gin(search_vector);
 
 -- 世界观索引
 CREATE INDEX IF NOT EXISTS idx_domains_novel_id ON domains(novel_id);
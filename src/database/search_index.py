@@ -0,0 +1,238 @@
+"""
+中文全文检索索引 - 基于jieba分词的tsvector索引维护
+PostgreSQL的'simple'配置不会切分中文，这里在写入时用jieba预先分词，
+把词元以空格拼接后交给to_tsvector('simple', ...)，存入带GIN索引的search_vector列
+"""
+
+import logging
+import re
+from typing import Optional, List, Any, Tuple
+from uuid import UUID
+
+from .segmentation import JIEBA_AVAILABLE, get_segmentation_service
+
+logger = logging.getLogger(__name__)
+
+if not JIEBA_AVAILABLE:
+    logger.warning("jieba未安装，中文检索将退化为二元字切分")
+
+# 内容段落：标题权重A，正文权重B
+SEGMENT_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', {title}), 'A') || "
+    "setweight(to_tsvector('simple', {content}), 'B')"
+)
+
+# 文化实体：名称权重A，描述权重B
+ENTITY_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', {name}), 'A') || "
+    "setweight(to_tsvector('simple', {description}), 'B')"
+)
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+_CJK_PATTERN = re.compile(r'[一-鿿]')
+
+
+class ChineseSearchTokenizer:
+    """中文检索分词器"""
+
+    def __init__(self, custom_terms: Optional[List[str]] = None):
+        self._initialized = False
+        self._custom_terms = list(custom_terms or [])
+
+    def _ensure_initialized(self) -> None:
+        """延迟加载jieba词典（有词典快照时直接映射加载）"""
+        if self._initialized:
+            return
+        if JIEBA_AVAILABLE:
+            get_segmentation_service().load_dictionary(terms=self._custom_terms)
+        self._initialized = True
+
+    def add_terms(self, terms: List[str]) -> None:
+        """添加专有名词（角色名、地名、法则名等）"""
+        self._custom_terms.extend(terms)
+        if self._initialized and JIEBA_AVAILABLE:
+            get_segmentation_service().load_dictionary(terms=terms)
+
+    def _cut(self, text: str, for_index: bool) -> List[str]:
+        """切分文本为词元列表"""
+        if not text:
+            return []
+
+        self._ensure_initialized()
+
+        if JIEBA_AVAILABLE:
+            # 索引端使用搜索引擎模式（包含长词的子词），查询端使用精确模式
+            segmenter = get_segmentation_service()
+            words = segmenter.cut_for_search(text) if for_index else segmenter.cut(text)
+        else:
+            words = self._bigram_cut(text)
+
+        tokens = []
+        for word in words:
+            for token in _TOKEN_PATTERN.findall(word.lower()):
+                tokens.append(token)
+        return tokens
+
+    @staticmethod
+    def _bigram_cut(text: str) -> List[str]:
+        """无jieba时的退化切分：中文按二元字，其它按单词"""
+        tokens = []
+        for chunk in _TOKEN_PATTERN.findall(text):
+            if not _CJK_PATTERN.search(chunk):
+                tokens.append(chunk)
+                continue
+            if len(chunk) == 1:
+                tokens.append(chunk)
+                continue
+            tokens.extend(chunk[i:i + 2] for i in range(len(chunk) - 1))
+        return tokens
+
+    def to_index_text(self, text: Optional[str]) -> str:
+        """生成用于to_tsvector的词元文本"""
+        return " ".join(self._cut(text or "", for_index=True))
+
+    def to_query_text(self, query: Optional[str]) -> str:
+        """生成用于plainto_tsquery的查询文本"""
+        return " ".join(self._cut(query or "", for_index=False))
+
+
+class SearchIndexer:
+    """全文检索索引维护器"""
+
+    def __init__(self, tokenizer: Optional[ChineseSearchTokenizer] = None):
+        self.tokenizer = tokenizer or ChineseSearchTokenizer()
+
+    def segment_index_params(self, title: Optional[str], content: Optional[str]) -> Tuple[str, str]:
+        """内容段落的索引参数 (标题词元, 正文词元)"""
+        return self.tokenizer.to_index_text(title), self.tokenizer.to_index_text(content)
+
+    def entity_index_params(self, name: Optional[str], description: Optional[str]) -> Tuple[str, str]:
+        """文化实体的索引参数 (名称词元, 描述词元)"""
+        return self.tokenizer.to_index_text(name), self.tokenizer.to_index_text(description)
+
+    def query_text(self, query: str) -> str:
+        """查询词元文本，为空表示查询中没有可检索的词"""
+        return self.tokenizer.to_query_text(query)
+
+    async def index_content_segment(self, conn, segment_id: UUID,
+                                    title: Optional[str], content: Optional[str]) -> None:
+        """更新单个内容段落的检索向量（需在调用方事务中执行）"""
+        title_text, content_text = self.segment_index_params(title, content)
+        await conn.execute(
+            f"UPDATE content_segments SET search_vector = "
+            f"{SEGMENT_VECTOR_SQL.format(title='$2', content='$3')} WHERE id = $1",
+            segment_id, title_text, content_text
+        )
+
+    async def index_cultural_entity(self, conn, entity_id: UUID,
+                                    name: Optional[str], description: Optional[str]) -> None:
+        """更新单个文化实体的检索向量（需在调用方事务中执行）"""
+        name_text, description_text = self.entity_index_params(name, description)
+        await conn.execute(
+            f"UPDATE cultural_entities SET search_vector = "
+            f"{ENTITY_VECTOR_SQL.format(name='$2', description='$3')} WHERE id = $1",
+            entity_id, name_text, description_text
+        )
+
+    async def backfill_content_segments(
+        self,
+        pool,
+        novel_id: Optional[UUID] = None,
+        batch_size: int = 500,
+        only_missing: bool = True
+    ) -> int:
+        """为已有内容段落回填检索向量，按主键分批以避免长事务"""
+        conditions = ["cs.id > $1"]
+        params: List[Any] = []
+        if only_missing:
+            conditions.append("cs.search_vector IS NULL")
+        if novel_id is not None:
+            conditions.append("cb.novel_id = $3")
+            params.append(novel_id)
+
+        select_query = f"""
+            SELECT cs.id, cs.title, cs.content
+            FROM content_segments cs
+            JOIN content_batches cb ON cs.batch_id = cb.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY cs.id
+            LIMIT $2
+        """
+        update_query = (
+            f"UPDATE content_segments SET search_vector = "
+            f"{SEGMENT_VECTOR_SQL.format(title='$2', content='$3')} WHERE id = $1"
+        )
+
+        return await self._backfill(
+            pool, select_query, update_query, params, batch_size,
+            lambda row: (row['id'], *self.segment_index_params(row['title'], row['content']))
+        )
+
+    async def backfill_cultural_entities(
+        self,
+        pool,
+        novel_id: Optional[UUID] = None,
+        batch_size: int = 500,
+        only_missing: bool = True
+    ) -> int:
+        """为已有文化实体回填检索向量"""
+        conditions = ["id > $1"]
+        params: List[Any] = []
+        if only_missing:
+            conditions.append("search_vector IS NULL")
+        if novel_id is not None:
+            conditions.append("novel_id = $3")
+            params.append(novel_id)
+
+        select_query = f"""
+            SELECT id, name, description
+            FROM cultural_entities
+            WHERE {' AND '.join(conditions)}
+            ORDER BY id
+            LIMIT $2
+        """
+        update_query = (
+            f"UPDATE cultural_entities SET search_vector = "
+            f"{ENTITY_VECTOR_SQL.format(name='$2', description='$3')} WHERE id = $1"
+        )
+
+        return await self._backfill(
+            pool, select_query, update_query, params, batch_size,
+            lambda row: (row['id'], *self.entity_index_params(row['name'], row['description']))
+        )
+
+    async def _backfill(self, pool, select_query: str, update_query: str,
+                        extra_params: List[Any], batch_size: int, build_args) -> int:
+        """键集分页回填"""
+        last_id = UUID(int=0)
+        total = 0
+
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(select_query, last_id, batch_size, *extra_params)
+                if not rows:
+                    break
+
+                args = [build_args(row) for row in rows]
+                async with conn.transaction():
+                    await conn.executemany(update_query, args)
+
+            total += len(rows)
+            last_id = rows[-1]['id']
+            logger.info(f"检索索引回填进度: {total} 条")
+
+            if len(rows) < batch_size:
+                break
+
+        return total
+
+
+_search_indexer: Optional[SearchIndexer] = None
+
+
+def get_search_indexer() -> SearchIndexer:
+    """获取全局检索索引维护器"""
+    global _search_indexer
+    if _search_indexer is None:
+        _search_indexer = SearchIndexer()
+    return _search_indexer
@@ -0,0 +1,392 @@
+"""
+中文分词服务 - jieba词典快照与分词结果持久缓存
+
+- 主词典、用户词典和专有名词合并后的前缀词典序列化为快照文件；进程首次加载词典时
+  通过mmap读取快照，不再重新构建前缀词典、逐条添加词条
+- 分词/词性标注结果按 (词典签名, 模式, 文本块) 的哈希缓存在SQLite文件中，
+  按访问时间做有界LRU淘汰，跨流水线运行和进程共享
+- jieba在换行处本就断开，文本按行对齐切成段落块逐块缓存，与整段切分结果一致；
+  修改一段只需重新切分该段所在的块
+
+词典变更应通过 load_dictionary 进行，签名才能覆盖全部词条；绕过服务直接修改jieba词典时，
+服务会根据词频总数的变化更新签名，避免读到旧词典下的缓存结果。
+"""
+
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import jieba
+    from jieba import finalseg
+    JIEBA_AVAILABLE = True
+except ImportError:
+    JIEBA_AVAILABLE = False
+
+DEFAULT_CACHE_DIR = os.getenv(
+    'SEGMENTATION_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'novellus_segmentation')
+)
+DEFAULT_CACHE_ENTRIES = int(os.getenv('SEGMENTATION_CACHE_ENTRIES', '200000'))
+
+# 缓存块: 在空行处或累计达到 BLOCK_SIZE 后的行尾结束；短于 MIN_CACHED_BLOCK 的块直接切分，
+# 哈希和查库的开销不比切分小
+BLOCK_SIZE = 512
+MIN_CACHED_BLOCK = 16
+
+_SNAPSHOT_VERSION = 1
+_QUERY_BATCH_SIZE = 500
+
+
+class SegmentationCache:
+    """分词结果磁盘缓存 (SQLite，WAL模式支持多进程并发读写，按访问时间LRU淘汰)"""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 连接不能跨fork使用，子进程重新打开
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "key BLOB PRIMARY KEY, value BLOB NOT NULL, accessed INTEGER NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_segments_accessed ON segments (accessed)")
+            conn.commit()
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, bytes]:
+        """批量读取，命中的条目刷新访问时间"""
+        found: Dict[bytes, bytes] = {}
+        with self._lock:
+            conn = self._connect()
+            for i in range(0, len(keys), _QUERY_BATCH_SIZE):
+                batch = keys[i:i + _QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, value FROM segments WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time_ns()
+                conn.executemany(
+                    "UPDATE segments SET accessed = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[bytes, bytes]):
+        """批量写入，写入量累计到上限的十分之一时检查并淘汰最久未访问的条目"""
+        if not items or self.max_entries <= 0:
+            return
+        with self._lock:
+            conn = self._connect()
+            now = time.time_ns()
+            conn.executemany(
+                "INSERT OR REPLACE INTO segments (key, value, accessed) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items.items()]
+            )
+            self._writes_since_evict += len(items)
+            if self._writes_since_evict >= max(1, self.max_entries // 10):
+                self._writes_since_evict = 0
+                self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        (count,) = conn.execute("SELECT COUNT(*) FROM segments").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM segments WHERE key IN "
+                "(SELECT key FROM segments ORDER BY accessed LIMIT ?)",
+                (excess,)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connect().execute("SELECT COUNT(*) FROM segments").fetchone()
+        return count
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM segments")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class SegmentationService:
+    """
+    jieba分词服务
+
+    在全局jieba词典上工作 (与直接调用jieba的代码共享词典)，提供带缓存的
+    精确模式、搜索引擎模式和词性标注切分。
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_cache_entries: int = DEFAULT_CACHE_ENTRIES,
+                 enable_result_cache: bool = True):
+        self.cache_dir = cache_dir
+        self.cache: Optional[SegmentationCache] = None
+        if enable_result_cache and max_cache_entries > 0:
+            self.cache = SegmentationCache(os.path.join(cache_dir, 'segments.sqlite3'), max_cache_entries)
+
+        self._lock = threading.RLock()
+        self._applied_ops: set = set()
+        self._signature = hashlib.sha256(
+            f"{_SNAPSHOT_VERSION}|{getattr(jieba, '__version__', '') if JIEBA_AVAILABLE else ''}".encode('utf-8')
+        ).hexdigest()
+        self._known_total: Optional[int] = None
+        self.stats = {'dictionary_snapshot': None, 'blocks_segmented': 0, 'blocks_cached': 0}
+
+    # ---- 词典 ----
+
+    @property
+    def dictionary_signature(self) -> str:
+        """当前词典签名 (覆盖主词典、已加载的用户词典和词条)"""
+        with self._lock:
+            self._sync_external_changes()
+            return self._signature
+
+    def load_dictionary(self, user_dicts: Iterable[str] = (),
+                        terms: Iterable[str] = (),
+                        freq: Optional[int] = None):
+        """
+        加载用户词典文件和词条
+
+        重复加载相同内容不会改变词典。进程内首次加载时，如果已有包含本次内容的
+        词典快照，直接映射快照；否则构建词典并写出快照供其它进程使用。
+
+        Args:
+            user_dicts: jieba用户词典文件路径
+            terms: 词条
+            freq: 词条词频，None时由jieba计算保证能切出的词频
+        """
+        if not JIEBA_AVAILABLE:
+            return
+
+        user_dicts = [path for path in user_dicts if path]
+        terms = list(terms)
+        op_digest = self._operation_digest(user_dicts, terms, freq)
+
+        with self._lock:
+            self._sync_external_changes()
+            if op_digest in self._applied_ops:
+                return
+
+            signature = hashlib.sha256(f"{self._signature}|{op_digest}".encode('utf-8')).hexdigest()
+            if jieba.dt.initialized:
+                self._apply(user_dicts, terms, freq)
+            elif not self._load_snapshot(signature):
+                # 只有从空词典开始构建时，词典内容才完全由签名决定，可以写出快照
+                jieba.dt.initialize()
+                self._apply(user_dicts, terms, freq)
+                self._write_snapshot(signature)
+
+            self._applied_ops.add(op_digest)
+            self._signature = signature
+            self._known_total = jieba.dt.total
+
+    def _operation_digest(self, user_dicts: List[str], terms: List[str], freq: Optional[int]) -> str:
+        digest = hashlib.sha256()
+        for path in user_dicts:
+            with open(path, 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        digest.update(f"|{freq}|".encode('utf-8'))
+        digest.update("\x00".join(terms).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _apply(user_dicts: List[str], terms: List[str], freq: Optional[int]):
+        for path in user_dicts:
+            jieba.load_userdict(path)
+        for term in terms:
+            jieba.add_word(term, freq=freq)
+
+    def _sync_external_changes(self):
+        """词典被绕过服务修改过 (词频总数变化) 时，把变化折算进签名"""
+        if self._known_total is None:
+            if jieba.dt.initialized:
+                self._known_total = jieba.dt.total
+        elif jieba.dt.total != self._known_total:
+            self._signature = hashlib.sha256(
+                f"{self._signature}|external|{jieba.dt.total}".encode('utf-8')
+            ).hexdigest()
+            self._known_total = jieba.dt.total
+
+    def _snapshot_path(self, signature: str) -> str:
+        main_dict = jieba.dt.dictionary or os.path.join(os.path.dirname(jieba.__file__), jieba.DEFAULT_DICT_NAME)
+        stat = os.stat(main_dict)
+        # 主词典文件变化时快照失效
+        key = f"{signature}|{main_dict}|{stat.st_size}|{stat.st_mtime_ns}"
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"jieba_dict_{name}.marshal")
+
+    def _load_snapshot(self, signature: str) -> bool:
+        path = self._snapshot_path(signature)
+        if not os.path.isfile(path):
+            return False
+        try:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                version, freq_table, total, word_tags, force_split = marshal.loads(mapped)
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.warning(f"分词词典快照读取失败，重新构建: {e}")
+            return False
+        if version != _SNAPSHOT_VERSION:
+            return False
+
+        tokenizer = jieba.dt
+        with tokenizer.lock:
+            tokenizer.FREQ, tokenizer.total = freq_table, total
+            tokenizer.user_word_tag_tab.update(word_tags)
+            finalseg.Force_Split_Words.update(force_split)
+            tokenizer.initialized = True
+        self.stats['dictionary_snapshot'] = 'loaded'
+        logger.debug(f"分词词典快照已加载: {path}")
+        return True
+
+    def _write_snapshot(self, signature: str):
+        path = self._snapshot_path(signature)
+        # 用户词性在词性标注切分时才合并进posseg词性表，构建完成时仍全部待合并
+        payload = (_SNAPSHOT_VERSION, jieba.dt.FREQ, jieba.dt.total, dict(jieba.dt.user_word_tag_tab),
+                   set(finalseg.Force_Split_Words))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(payload, f)
+            os.replace(temp_path, path)
+            self.stats['dictionary_snapshot'] = 'written'
+        except OSError as e:
+            logger.warning(f"分词词典快照写入失败: {e}")
+
+    # ---- 切分 ----
+
+    def cut(self, text: str, hmm: bool = True) -> List[str]:
+        """精确模式切分"""
+        return self._segment(text, f"cut|{hmm}", lambda block: list(jieba.cut(block, HMM=hmm)))
+
+    def cut_for_search(self, text: str, hmm: bool = True) -> List[str]:
+        """搜索引擎模式切分 (长词再切出子词)"""
+        return self._segment(text, f"search|{hmm}", lambda block: list(jieba.cut_for_search(block, HMM=hmm)))
+
+    def pos_cut(self, text: str, hmm: bool = True) -> List[Tuple[str, str]]:
+        """词性标注切分，返回 (词, 词性) 列表"""
+        # 按需导入: posseg导入时解析主词典词性表，只做检索分词的进程不必付出这部分开销
+        import jieba.posseg as pseg
+
+        return self._segment(
+            text, f"pos|{hmm}", lambda block: [(pair.word, pair.flag) for pair in pseg.cut(block, HMM=hmm)]
+        )
+
+    @staticmethod
+    def _iter_blocks(text: str) -> Iterable[str]:
+        """按行对齐切分缓存块"""
+        block = []
+        size = 0
+        for line in text.splitlines(keepends=True):
+            block.append(line)
+            size += len(line)
+            if size >= BLOCK_SIZE or not line.strip():
+                yield ''.join(block)
+                block, size = [], 0
+        if block:
+            yield ''.join(block)
+
+    def _segment(self, text: str, mode: str, segment_block: Callable[[str], list]) -> list:
+        if not text:
+            return []
+        if self.cache is None:
+            return segment_block(text)
+
+        signature = self.dictionary_signature
+        blocks = list(self._iter_blocks(text))
+        keys: List[Optional[bytes]] = []
+        for block in blocks:
+            if len(block) < MIN_CACHED_BLOCK:
+                keys.append(None)
+            else:
+                keys.append(hashlib.blake2b(
+                    f"{signature}|{mode}|{block}".encode('utf-8'), digest_size=20
+                ).digest())
+
+        lookup_keys = list(dict.fromkeys(key for key in keys if key is not None))
+        try:
+            cached = self.cache.get_many(lookup_keys) if lookup_keys else {}
+        except sqlite3.Error as e:
+            logger.warning(f"分词缓存不可用，直接切分: {e}")
+            self.cache = None
+            cached = {}
+
+        results = []
+        new_entries: Dict[bytes, bytes] = {}
+        for block, key in zip(blocks, keys):
+            payload = cached.get(key) if key is not None else None
+            if payload is not None:
+                results.extend(marshal.loads(payload))
+                self.stats['blocks_cached'] += 1
+                continue
+
+            tokens = segment_block(block)
+            results.extend(tokens)
+            self.stats['blocks_segmented'] += 1
+            if key is not None:
+                cached[key] = new_entries[key] = marshal.dumps(tokens)
+
+        if new_entries and self.cache is not None:
+            try:
+                self.cache.put_many(new_entries)
+            except sqlite3.Error as e:
+                logger.warning(f"分词缓存写入失败: {e}")
+
+        return results
+
+    def get_stats(self) -> Dict[str, object]:
+        """服务统计"""
+        stats = dict(self.stats)
+        if self.cache is not None:
+            stats.update(cache_hits=self.cache.hits, cache_misses=self.cache.misses)
+        return stats
+
+
+_segmentation_service: Optional[SegmentationService] = None
+
+
+def get_segmentation_service() -> SegmentationService:
+    """获取进程内共享的分词服务"""
+    global _segmentation_service
+    if _segmentation_service is None:
+        _segmentation_service = SegmentationService()
+    return _segmentation_service
@@ -4,15 +4,16 @@
 """
 
 import re
-import jieba
-import jieba.posseg as pseg
 from typing import Dict, List, Tuple, Set, Optional, Any
 from dataclasses import dataclass, field
 from collections import defaultdict, Counter
 import logging
 
-# 添加自定义词典
-jieba.load_userdict('src/etl/custom_dict.txt')  # 需要创建这个文件
+from database.segmentation import get_segmentation_service
+from .entity_consolidation import best_by_key, nearby_pairs
+
+# 添加自定义词典 (已有词典快照时直接映射加载)
+get_segmentation_service().load_dictionary(user_dicts=['src/etl/custom_dict.txt'])
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +55,7 @@ class ChineseTextAnalyzer:
     """中文文本分析器"""
 
     def __init__(self):
+        self.segmenter = get_segmentation_service()
         self.initialize_dictionaries()
         self.initialize_patterns()
         self.initialize_semantic_rules()
@@ -247,8 +249,8 @@ class ChineseTextAnalyzer:
         """提取命名实体"""
         entities = []
 
-        # 使用jieba进行词性标注
-        words = pseg.cut(text)
+        # 使用jieba进行词性标注 (未修改的段落直接取缓存结果)
+        words = self.segmenter.pos_cut(text)
 
         current_pos = 0
         for word, flag in words:
@@ -275,7 +277,12 @@ class ChineseTextAnalyzer:
         custom_entities = self._extract_custom_entities(text)
         entities.extend(custom_entities)
 
-        return entities
+        # 同一位置、同一类型的实体只保留置信度最高的
+        return best_by_key(
+            entities,
+            key=lambda entity: (entity.start_pos, entity.end_pos, entity.entity_type),
+            score=lambda entity: entity.confidence
+        )
 
     def _classify_entity(self, word: str, pos_flag: str) -> Optional[str]:
         """分类实体"""
@@ -413,6 +420,7 @@ class ChineseTextAnalyzer:
     def extract_semantic_relations(self, text: str, entities: List[NamedEntity]) -> List[SemanticRelation]:
         """提取语义关系"""
         relations = []
+        entity_substrings = None
 
         # 基于模式的关系提取
         for relation_type, patterns in self.relation_patterns.items():
@@ -423,7 +431,9 @@ class ChineseTextAnalyzer:
                     obj = match.group(2).strip()
 
                     # 验证实体存在
-                    if self._validate_entity_pair(subject, obj, entities):
+                    if entity_substrings is None:
+                        entity_substrings = self._entity_substrings(entities)
+                    if self._validate_entity_pair(subject, obj, entity_substrings):
                         context = text[max(0, match.start()-50):match.end()+50]
                         confidence = self._calculate_relation_confidence(subject, obj, relation_type, context)
 
@@ -442,11 +452,18 @@ class ChineseTextAnalyzer:
 
         return relations
 
-    def _validate_entity_pair(self, subject: str, obj: str, entities: List[NamedEntity]) -> bool:
-        """验证实体对是否有效"""
-        entity_texts = [e.text for e in entities]
-        return (any(subject in text for text in entity_texts) and
-                any(obj in text for text in entity_texts))
+    def _entity_substrings(self, entities: List[NamedEntity]) -> Set[str]:
+        """实体文本的全部子串 (实体文本很短，预先展开后验证实体对只需集合查找)"""
+        substrings = set()
+        for text in {e.text for e in entities}:
+            for i in range(len(text)):
+                for j in range(i, len(text) + 1):
+                    substrings.add(text[i:j])
+        return substrings
+
+    def _validate_entity_pair(self, subject: str, obj: str, entity_substrings: Set[str]) -> bool:
+        """验证实体对是否有效 (主语和宾语都出现在某个实体文本中)"""
+        return subject in entity_substrings and obj in entity_substrings
 
     def _calculate_relation_confidence(self, subject: str, obj: str, relation_type: str, context: str) -> float:
         """计算关系置信度"""
@@ -479,12 +496,8 @@ class ChineseTextAnalyzer:
         """从上下文推理关系"""
         relations = []
 
-        # 共现分析
-        entity_pairs = []
-        for i, entity1 in enumerate(entities):
-            for entity2 in entities[i+1:]:
-                if abs(entity1.start_pos - entity2.start_pos) < 100:  # 距离阈值
-                    entity_pairs.append((entity1, entity2))
+        # 共现分析 (按位置排序后只比较距离阈值内的实体)
+        entity_pairs = nearby_pairs(entities, position=lambda e: e.start_pos, max_distance=100)
 
         # 为共现实体对推理关系
         for entity1, entity2 in entity_pairs:
@@ -581,7 +594,7 @@ class ChineseTextAnalyzer:
     def extract_key_concepts(self, text: str, top_k: int = 10) -> List[Tuple[str, float]]:
         """提取关键概念"""
         # 词频统计
-        words = jieba.cut(text)
+        words = self.segmenter.cut(text)
         word_freq = Counter(words)
 
         # 过滤停用词和短词
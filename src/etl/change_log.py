@@ -0,0 +1,265 @@
+"""
+Durable change log for incremental processing
+
+Append-only change-data-capture log stored as numbered JSON-lines segment
+files:
+
+- Entries are buffered and written in batches (by size or age) off the
+  event loop, one write per batch
+- Segments rotate at a fixed record count; retention drops whole segment
+  files instead of rewriting the log
+- A compact index (record_id -> latest content hash and version id) is
+  snapshotted on rotation and close; startup loads the snapshot and
+  replays only the entries written after it, so change detection and
+  version lineage survive restarts
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = re.compile(r'^changes-(\d{8})\.jsonl$')
+INDEX_FILE = 'index.json'
+
+
+def default_change_log_dir() -> Path:
+    """
+    Change log directory when none is configured explicitly.
+
+    The change log is the system of record for change detection and version
+    lineage, so it must not live in a temp directory that the OS may clear.
+    Uses CHANGE_LOG_DIR if set, otherwise falls back (with a warning) to the
+    per-user application data directory.
+    """
+    configured = os.getenv('CHANGE_LOG_DIR')
+    if configured:
+        return Path(configured)
+
+    if os.name == 'nt':
+        data_home = Path(os.getenv('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local')
+    else:
+        data_home = Path(os.getenv('XDG_DATA_HOME') or Path.home() / '.local' / 'share')
+    directory = data_home / 'novellus' / 'change_log'
+    logger.warning(f"CHANGE_LOG_DIR not set; storing the change log in {directory}")
+    return directory
+
+
+class ChangeLogStore:
+    """
+    Segment-file change log with a persisted content-hash index.
+
+    Each entry is a JSON object with at least 'record_id'; entries that carry
+    'content_hash' / 'version_id' update the index.
+    """
+
+    def __init__(self,
+                 directory: Path,
+                 segment_max_records: int = 50000,
+                 max_segments: int = 20,
+                 flush_batch_size: int = 1000,
+                 flush_interval: float = 1.0):
+        self.directory = Path(directory)
+        self.segment_max_records = segment_max_records
+        self.max_segments = max_segments
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval = flush_interval
+
+        # record_id -> (content_hash, version_id)
+        self.index: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._segment_seq = 0
+        self._segment_records = 0
+        self._opened = False
+        self._open_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # ---- lifecycle ----
+
+    async def open(self):
+        """Load the index snapshot, replay the log tail and start the periodic flusher."""
+        async with self._open_lock:
+            if self._opened:
+                return
+            await asyncio.to_thread(self._load)
+            self._opened = True
+            if self.flush_interval > 0:
+                self._flush_task = asyncio.create_task(self._periodic_flush())
+
+    async def close(self):
+        """Flush buffered entries and write the index snapshot."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._opened:
+            await self.flush()
+            async with self._flush_lock:
+                await asyncio.to_thread(self._write_index)
+            self._opened = False
+
+    async def _periodic_flush(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Change log flush failed: {e}")
+
+    # ---- writes ----
+
+    async def append(self, entry: Dict[str, Any]):
+        """Buffer an entry; writes the buffer once it reaches flush_batch_size."""
+        await self.open()
+        self._buffer.append(entry)
+        self._index_entry(entry)
+        if len(self._buffer) >= self.flush_batch_size:
+            await self.flush()
+
+    async def flush(self):
+        """Write all buffered entries to the current segment."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            entries, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._write_entries, entries)
+            except Exception:
+                # Keep entries for the next attempt, ahead of anything buffered meanwhile
+                self._buffer[:0] = entries
+                raise
+
+    def _index_entry(self, entry: Dict[str, Any]):
+        if 'content_hash' in entry:
+            self.index[str(entry['record_id'])] = (entry.get('content_hash'), entry.get('version_id'))
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.directory / f"changes-{seq:08d}.jsonl"
+
+    def _write_entries(self, entries: List[Dict[str, Any]]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        position = 0
+        while position < len(entries):
+            if self._segment_records >= self.segment_max_records:
+                self._rotate()
+            count = min(len(entries) - position, self.segment_max_records - self._segment_records)
+            lines = ''.join(
+                json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+                for entry in entries[position:position + count]
+            )
+            with open(self._segment_path(self._segment_seq), 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._segment_records += count
+            position += count
+
+    def _rotate(self):
+        """Start a new segment, snapshot the index and apply retention."""
+        self._segment_seq += 1
+        self._segment_records = 0
+        self._write_index()
+
+        # The new active segment has no file yet but counts towards max_segments
+        closed = [seq for seq in self._segments() if seq < self._segment_seq]
+        for seq in closed[:max(0, len(closed) - (self.max_segments - 1))]:
+            self._segment_path(seq).unlink(missing_ok=True)
+
+    def _write_index(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Copy first: entries appended on the event loop may update the index meanwhile
+        records = self.index.copy()
+        snapshot = {
+            'checkpoint': [self._segment_seq, self._segment_records],
+            'records': {record_id: list(value) for record_id, value in records.items()}
+        }
+        temp_path = self.directory / f"{INDEX_FILE}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(temp_path, self.directory / INDEX_FILE)
+
+    # ---- startup ----
+
+    def _segments(self) -> List[int]:
+        if not self.directory.exists():
+            return []
+        return sorted(
+            int(match.group(1)) for match in
+            (SEGMENT_PATTERN.match(path.name) for path in self.directory.iterdir()) if match
+        )
+
+    def _load(self):
+        checkpoint_seq, checkpoint_records = 0, 0
+        index_path = self.directory / INDEX_FILE
+        if index_path.exists():
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                checkpoint_seq, checkpoint_records = snapshot['checkpoint']
+                self.index = {record_id: tuple(value) for record_id, value in snapshot['records'].items()}
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Failed to load change log index, rebuilding from segments: {e}")
+                checkpoint_seq, checkpoint_records = 0, 0
+                self.index = {}
+
+        segments = self._segments()
+        replayed = 0
+        for seq in segments:
+            if seq < checkpoint_seq:
+                continue
+            skip = checkpoint_records if seq == checkpoint_seq else 0
+            count = 0
+            for count, entry in enumerate(self._read_segment(seq), 1):
+                if count > skip:
+                    self._index_entry(entry)
+                    replayed += 1
+            self._segment_seq, self._segment_records = seq, count
+
+        if not segments:
+            self._segment_seq = checkpoint_seq
+        logger.info(f"Change log opened: {len(self.index)} indexed records, {replayed} entries replayed")
+
+    def _read_segment(self, seq: int) -> Iterator[Dict[str, Any]]:
+        with open(self._segment_path(seq), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Torn write at the end of a segment after a crash
+                    logger.warning(f"Skipping unreadable change log line in segment {seq}")
+
+    # ---- reads ----
+
+    def content_hash(self, record_id: str) -> Optional[str]:
+        """Latest logged content hash of a record."""
+        return self.index.get(str(record_id), (None, None))[0]
+
+    def latest_version(self, record_id: str) -> Optional[str]:
+        """Latest logged version id of a record."""
+        return self.index.get(str(record_id), (None, None))[1]
+
+    def iter_entries(self, newest_first: bool = True) -> Iterator[Dict[str, Any]]:
+        """All retained entries, including ones not yet flushed."""
+        segments = self._segments()
+        if newest_first:
+            yield from reversed(self._buffer)
+            for seq in reversed(segments):
+                yield from reversed(list(self._read_segment(seq)))
+        else:
+            for seq in segments:
+                yield from self._read_segment(seq)
+            yield from list(self._buffer)
+
+    def __len__(self) -> int:
+        """Number of indexed records."""
+        return len(self.index)
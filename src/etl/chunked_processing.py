@@ -0,0 +1,318 @@
+"""
+分块处理 - 大型设定文本的窗口化增量处理
+
+- 按段落切分文本，块边界由内容决定 (段落哈希)，编辑一处只影响附近的块
+- 每个块带重叠窗口: 重叠部分只提供上下文，实体和关系归属于核心区所在的块
+- 块结果按内容哈希缓存 (序列化存储)，重新处理编辑后的文档时只处理变化的块
+- 块可在进程池中并发处理，每个工作进程只初始化一次处理组件
+"""
+
+import hashlib
+import logging
+import pickle
+import re
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from database.models.cultural_framework_models import CulturalFrameworkBatch, DomainType
+
+logger = logging.getLogger(__name__)
+
+# 段落切分; 单个段落过长时退回到句子切分
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n+')
+SENTENCE_END = re.compile(r'[。！？\n]')
+
+# 九域文本的标题行: 域标题 (人域｜六维文化框架 / ## 人域) 和维度标题 (A. 神话与宗教)
+_DOMAIN_NAMES = '|'.join(re.escape(domain.value) for domain in DomainType)
+NINE_DOMAINS_HEADING_PATTERN = re.compile(
+    rf'^[ \t]*(?:(?P<domain>#[^\n]*(?:{_DOMAIN_NAMES})[^\n]*|[^\n]*(?:{_DOMAIN_NAMES})｜[^\n]*)'
+    rf'|(?P<dimension>[A-F][\.、 \t][^\n]*))$',
+    re.MULTILINE
+)
+
+
+@dataclass
+class TextChunk:
+    """文本块 (start/end 为含重叠的窗口范围，core_start/core_end 为归属本块的核心区，均为文档坐标)"""
+    index: int
+    start: int
+    end: int
+    core_start: int
+    core_end: int
+    text: str
+    heading: str = ""  # 核心区之前最近的标题行，补充给按章节解析的处理器
+
+    @property
+    def core_text(self) -> str:
+        return self.text[self.core_start - self.start:self.core_end - self.start]
+
+    @property
+    def relative_core(self) -> Tuple[int, int]:
+        return self.core_start - self.start, self.core_end - self.start
+
+    def content_hash(self, *salt: Any) -> str:
+        """块内容哈希 (不含文档绝对位置，块整体移动后仍能命中缓存)"""
+        digest = hashlib.sha256()
+        for part in (*salt, self.heading, *self.relative_core):
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\x00')
+        digest.update(self.text.encode('utf-8'))
+        return digest.hexdigest()
+
+
+def _split_units(text: str, max_size: int) -> Iterator[Tuple[int, int]]:
+    """产出段落单元 (起始, 结束)，超过 max_size 的段落按句子再切分"""
+    position = 0
+    breaks = [match.end() for match in PARAGRAPH_BREAK.finditer(text)]
+    for end in breaks + [len(text)]:
+        if end <= position:
+            continue
+        while end - position > max_size:
+            # 在允许范围内最后一个句末处切开，没有句末则硬切
+            cut = None
+            for match in SENTENCE_END.finditer(text, position + max_size // 2, position + max_size):
+                cut = match.end()
+            cut = cut or position + max_size
+            yield position, cut
+            position = cut
+        yield position, end
+        position = end
+
+
+def iter_text_chunks(text: str,
+                     chunk_size: int,
+                     overlap: int = 0,
+                     heading_pattern: Optional[re.Pattern] = None) -> Iterator[TextChunk]:
+    """
+    将文本切分为带重叠窗口的块
+
+    段落依次装入当前块；当前块达到 chunk_size 的一半后，遇到哈希满足条件的段落即结束，
+    再加入下一段落会超过 chunk_size 时也结束。边界只取决于附近段落的内容，
+    因此在文档中插入或删除内容时，后续块的边界很快恢复一致，缓存仍可命中。
+
+    Args:
+        text: 待切分文本
+        chunk_size: 核心区最大长度
+        overlap: 窗口两侧的重叠长度
+        heading_pattern: 标题行正则，按命名分组的顺序表示标题层级；
+                         每个块记录其核心区之前最近的各级标题
+    """
+    chunk_size = max(1, chunk_size)
+    min_size = chunk_size // 2
+    levels = list(heading_pattern.groupindex) if heading_pattern else []
+    headings: Dict[str, str] = {}
+    heading_scan = 0
+
+    def make_chunk(index: int, core_start: int, core_end: int) -> TextChunk:
+        nonlocal heading_scan
+        if heading_pattern:
+            for match in heading_pattern.finditer(text, heading_scan, core_start):
+                level = next(name for name in levels if match.group(name))
+                headings[level] = match.group(level).strip()
+                for lower in levels[levels.index(level) + 1:]:
+                    headings.pop(lower, None)
+            heading_scan = core_start
+
+        start = max(0, core_start - overlap)
+        end = min(len(text), core_end + overlap)
+        return TextChunk(
+            index=index,
+            start=start,
+            end=end,
+            core_start=core_start,
+            core_end=core_end,
+            text=text[start:end],
+            heading='\n'.join(headings[level] for level in levels if level in headings)
+        )
+
+    index = 0
+    core_start = 0
+    for unit_start, unit_end in _split_units(text, chunk_size):
+        if unit_start > core_start and unit_end - core_start > chunk_size:
+            yield make_chunk(index, core_start, unit_start)
+            index += 1
+            core_start = unit_start
+
+        size = unit_end - core_start
+        if size >= chunk_size or (size >= min_size and zlib.crc32(text[unit_start:unit_end].encode('utf-8')) % 4 == 0):
+            yield make_chunk(index, core_start, unit_end)
+            index += 1
+            core_start = unit_end
+
+    if core_start < len(text):
+        yield make_chunk(index, core_start, len(text))
+
+
+class ChunkResultCache:
+    """块结果LRU缓存 (按内容哈希索引，结果以序列化形式存储，取出时得到独立副本)"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return pickle.loads(payload)
+
+    def put(self, key: str, value: Any):
+        self.put_serialized(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def put_serialized(self, key: str, payload: bytes):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+@dataclass
+class ChunkResult:
+    """单个块的处理结果 (位置均相对于块窗口)"""
+    batch: CulturalFrameworkBatch
+    entities: List[Any] = field(default_factory=list)
+    domain_mentions: Dict[DomainType, List[Tuple[int, int, str]]] = field(default_factory=dict)
+    cross_relations: List[Any] = field(default_factory=list)
+
+
+@dataclass
+class ChunkProcessors:
+    """处理单个块所需的组件"""
+    cultural_processor: Any
+    entity_extractor: Any
+    cross_domain_analyzer: Any
+
+    @classmethod
+    def create(cls) -> "ChunkProcessors":
+        from .nine_domains_cultural_processor import NineDomainsCulturalProcessor
+        from .nine_domains_entity_extractor import NineDomainsEntityExtractor
+        from .cross_domain_analyzer import CrossDomainAnalyzer
+
+        return cls(
+            cultural_processor=NineDomainsCulturalProcessor(),
+            entity_extractor=NineDomainsEntityExtractor(),
+            cross_domain_analyzer=CrossDomainAnalyzer()
+        )
+
+
+async def process_text_chunk(chunk: TextChunk, novel_id: UUID, processors: ChunkProcessors,
+                             enable_cross_domain_analysis: bool = True) -> ChunkResult:
+    """
+    处理单个块
+
+    九域文化处理器按章节解析，只处理核心区 (前面补上所在的域/维度标题)，
+    实体关系涉及跨块的实体对，合并后统一分析；
+    实体提取和跨域关系依赖上下文窗口，处理整个窗口但只保留核心区内的结果。
+    """
+    section_text = f"{chunk.heading}\n{chunk.core_text}" if chunk.heading else chunk.core_text
+    batch = await processors.cultural_processor.process_nine_domains_text(
+        section_text, novel_id, analyze_relations=False
+    )
+
+    core_start, core_end = chunk.relative_core
+    entities = processors.entity_extractor.extract_window_entities(chunk.text, core_start, core_end)
+
+    domain_mentions, cross_relations = {}, []
+    if enable_cross_domain_analysis:
+        domain_mentions, cross_relations = processors.cross_domain_analyzer.extract_window_relations(
+            chunk.text, core_start, core_end
+        )
+
+    return ChunkResult(batch=batch, entities=entities,
+                       domain_mentions=domain_mentions, cross_relations=cross_relations)
+
+
+def merge_chunk_batches(batches: List[CulturalFrameworkBatch]) -> CulturalFrameworkBatch:
+    """
+    合并各块的文化框架数据
+
+    同一 (域, 维度) 被切到多个块时合并为一个框架；实体按 (名称, 类型) 去重，
+    概念按术语去重并累加出现频率；关系按 (类型, 描述, 源域, 目标域) 去重
+    (块内关系的实体ID是临时生成的，描述中包含源、目标实体名)，剧情钩子按 (域, 内容) 去重。
+    """
+    merged = CulturalFrameworkBatch()
+    frameworks: Dict[Tuple[DomainType, Any], Any] = {}
+    entity_keys = set()
+    concepts: Dict[str, Any] = {}
+    relation_keys = set()
+    plot_hook_keys = set()
+
+    for batch in batches:
+        for framework in batch.frameworks:
+            key = (framework.domain_type, framework.dimension)
+            existing = frameworks.get(key)
+            if existing is None:
+                frameworks[key] = framework.model_copy(deep=True)
+                continue
+            existing.detailed_content = f"{existing.detailed_content}\n{framework.detailed_content}"
+            existing.key_elements = list(dict.fromkeys(existing.key_elements + framework.key_elements))
+            existing.tags = list(dict.fromkeys(existing.tags + framework.tags))
+            existing.priority = max(existing.priority, framework.priority)
+
+        for entity in batch.entities:
+            key = (entity.name, entity.entity_type)
+            if key not in entity_keys:
+                entity_keys.add(key)
+                merged.entities.append(entity)
+
+        for concept in batch.concepts:
+            existing = concepts.get(concept.term)
+            if existing is None:
+                concepts[concept.term] = concept.model_copy(deep=True)
+            else:
+                existing.frequency += concept.frequency
+                existing.importance = max(existing.importance, concept.importance)
+
+        for relation in batch.relations:
+            key = (relation.relation_type, relation.description, relation.source_domain, relation.target_domain)
+            if key not in relation_keys:
+                relation_keys.add(key)
+                merged.relations.append(relation)
+
+        for plot_hook in batch.plot_hooks:
+            key = (plot_hook.domain_type, plot_hook.description)
+            if key not in plot_hook_keys:
+                plot_hook_keys.add(key)
+                merged.plot_hooks.append(plot_hook)
+
+    merged.frameworks = list(frameworks.values())
+    merged.concepts = list(concepts.values())
+    return merged
+
+
+# 工作进程内的处理组件，由进程池初始化函数创建
+_worker_processors: Optional[ChunkProcessors] = None
+_worker_loop = None
+
+
+def init_chunk_worker():
+    """进程池初始化: 每个工作进程只加载一次词典和规则"""
+    import asyncio
+
+    global _worker_processors, _worker_loop
+    _worker_processors = ChunkProcessors.create()
+    _worker_loop = asyncio.new_event_loop()
+
+
+def process_chunk_in_worker(chunk: TextChunk, novel_id: UUID, enable_cross_domain_analysis: bool) -> bytes:
+    """在工作进程中处理一个块，返回序列化结果 (可直接写入缓存)"""
+    result = _worker_loop.run_until_complete(
+        process_text_chunk(chunk, novel_id, _worker_processors, enable_cross_domain_analysis)
+    )
+    return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
@@ -14,9 +14,15 @@ from database.models.cultural_framework_models import (
     DomainType, CulturalDimension, EntityType, RelationType,
     CulturalEntityCreate, CulturalRelationCreate
 )
+from .nine_domains_entity_extractor import get_domain_gazetteer
 
 logger = logging.getLogger(__name__)
 
+# 所有域名的合并正则: 域名后接"的/之"或空白
+DOMAIN_NAME_PATTERN = re.compile(
+    '(' + '|'.join(re.escape(domain.value) for domain in DomainType) + r')(?:[的之]|(?=\s))'
+)
+
 
 class CrossDomainRelationType(str, Enum):
     """跨域关系类型"""
@@ -87,6 +93,7 @@ class CrossDomainAnalyzer:
     """跨域关系分析器"""
 
     def __init__(self):
+        self.gazetteer = get_domain_gazetteer()
         self.initialize_domain_profiles()
         self.initialize_relationship_patterns()
         self.initialize_conflict_analysis()
@@ -319,6 +326,29 @@ class CrossDomainAnalyzer:
         # 2. 提取跨域关系
         cross_relations = self._extract_cross_domain_relations(text, domain_mentions)
 
+        return self.summarize_cross_domain_relationships(text, cross_relations, entities, domain_mentions)
+
+    def extract_window_relations(self, text: str, core_start: int, core_end: int) -> Tuple[Dict[DomainType, List[Tuple[int, int, str]]], List[CrossDomainRelation]]:
+        """
+        提取窗口文本中的域提及和跨域关系，只保留起始位置落在核心区 [core_start, core_end) 内的部分
+
+        供分块处理使用: 重叠部分只提供上下文，相邻块之间不会重复计入。
+        """
+        domain_mentions = self._identify_domain_mentions(text)
+        cross_relations = self._extract_cross_domain_relations(text, domain_mentions, (core_start, core_end))
+
+        core_mentions = {}
+        for domain, mentions in domain_mentions.items():
+            kept = [mention for mention in mentions if core_start <= mention[0] < core_end]
+            if kept:
+                core_mentions[domain] = kept
+
+        return core_mentions, cross_relations
+
+    def summarize_cross_domain_relationships(self, text: str, cross_relations: List[CrossDomainRelation],
+                                             entities: List[CulturalEntityCreate],
+                                             domain_mentions: Dict[DomainType, List[Tuple[int, int, str]]]) -> Dict[str, Any]:
+        """基于已提取的跨域关系生成冲突、交流、网络、影响和预测分析"""
         # 3. 分析冲突点
         conflicts = self._analyze_conflicts(text, cross_relations)
 
@@ -352,35 +382,23 @@ class CrossDomainAnalyzer:
         """识别域提及"""
         mentions = defaultdict(list)
 
-        for domain in DomainType:
-            domain_name = domain.value
-
-            # 直接域名提及
-            pattern = rf'{domain_name}(?:[的之]|(?=\s))'
-            matches = re.finditer(pattern, text)
-
-            for match in matches:
-                context = text[max(0, match.start()-50):match.end()+50]
-                mentions[domain].append((match.start(), match.end(), context))
-
-            # 域特征实体提及
-            if domain in self.domain_profiles:
-                profile = self.domain_profiles[domain]
-                signature_entities = [
-                    "天命王朝", "祭司议会", "冥司殿", "守源会", "血契", "虚空", "港市", "源流"
-                ]
-
-                for entity in signature_entities:
-                    if entity in text:
-                        entity_matches = re.finditer(re.escape(entity), text)
-                        for match in entity_matches:
-                            context = text[max(0, match.start()-50):match.end()+50]
-                            mentions[domain].append((match.start(), match.end(), context))
-
-        return dict(mentions)
-
-    def _extract_cross_domain_relations(self, text: str, domain_mentions: Dict[DomainType, List[Tuple[int, int, str]]]) -> List[CrossDomainRelation]:
-        """提取跨域关系"""
+        # 直接域名提及
+        for match in DOMAIN_NAME_PATTERN.finditer(text):
+            domain = DomainType(match.group(1))
+            context = text[max(0, match.start()-50):match.end()+50]
+            mentions[domain].append((match.start(), match.end(), context))
+
+        # 域特征实体提及 (单次词典扫描，命中归属其所在的域)
+        for hit in self.gazetteer.find_all(text):
+            if hit.category == "signature_entities" and hit.domain in self.domain_profiles:
+                context = text[max(0, hit.start-50):hit.end+50]
+                mentions[hit.domain].append((hit.start, hit.end, context))
+
+        return {domain: mentions[domain] for domain in DomainType if domain in mentions}
+
+    def _extract_cross_domain_relations(self, text: str, domain_mentions: Dict[DomainType, List[Tuple[int, int, str]]],
+                                        core_span: Optional[Tuple[int, int]] = None) -> List[CrossDomainRelation]:
+        """提取跨域关系 (指定 core_span 时只保留起始位置在核心区内的域对)"""
         relations = []
 
         # 寻找域对共现
@@ -394,6 +412,8 @@ class CrossDomainAnalyzer:
                     for pos2, end2, context2 in domain_mentions[domain2]:
                         distance = abs(pos1 - pos2)
                         if distance < 200:  # 距离阈值
+                            if core_span and not core_span[0] <= min(pos1, pos2) < core_span[1]:
+                                continue
                             domain_pairs.append((domain1, domain2, pos1, pos2, min(pos1, pos2), max(end1, end2)))
 
         # 分析每个域对的关系
@@ -0,0 +1,128 @@
+"""
+Entity consolidation helpers shared by the entity extractors
+
+Extractors collect raw mentions from several sources (regex rules, NLP,
+phrase and gazetteer matches) and then merge them. These helpers do the
+merging with dict indexes and sorted sweeps instead of rescanning the
+result list for every mention:
+
+- best_by_key: keep the highest-confidence item per key
+- group_by_key / pick_canonical_name: gather mentions of one entity and pick
+  its most frequent surface form
+- resolve_overlaps: drop overlapping spans, keeping the more confident one
+- nearby_pairs: co-occurring item pairs within a distance
+"""
+
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def best_by_key(items: Iterable[T],
+                key: Callable[[T], Hashable],
+                score: Callable[[T], float]) -> List[T]:
+    """
+    Deduplicate items, keeping the highest-scoring item for each key.
+
+    The survivor takes the slot of the key's first occurrence, so output
+    order follows first appearance; ties keep the earlier item. O(n).
+
+    Args:
+        items: Items to deduplicate
+        key: Identity of an item
+        score: Confidence used to pick among duplicates
+
+    Returns:
+        One item per distinct key
+    """
+    slots: Dict[Hashable, int] = {}
+    result: List[T] = []
+
+    for item in items:
+        item_key = key(item)
+        slot = slots.get(item_key)
+        if slot is None:
+            slots[item_key] = len(result)
+            result.append(item)
+        elif score(item) > score(result[slot]):
+            result[slot] = item
+
+    return result
+
+
+def group_by_key(items: Iterable[T], key: Callable[[T], Hashable]) -> Dict[Hashable, List[T]]:
+    """Group items by key, preserving first-appearance order of keys and items."""
+    groups: Dict[Hashable, List[T]] = defaultdict(list)
+    for item in items:
+        groups[key(item)].append(item)
+    return groups
+
+
+def pick_canonical_name(names: Iterable[str]) -> str:
+    """Most frequent surface form; ties go to the form seen first."""
+    counts = Counter(names)
+    return counts.most_common(1)[0][0] if counts else ""
+
+
+def resolve_overlaps(items: Iterable[T],
+                     start: Callable[[T], int],
+                     end: Callable[[T], int],
+                     score: Callable[[T], float]) -> List[T]:
+    """
+    Resolve overlapping spans with a single sweep in start order.
+
+    An item overlapping the last kept item replaces it only if it scores
+    strictly higher; otherwise it is dropped. O(n log n).
+
+    Args:
+        items: Items with spans
+        start: Span start of an item
+        end: Span end (exclusive) of an item
+        score: Confidence used to pick between overlapping items
+
+    Returns:
+        Non-overlapping items sorted by start
+    """
+    kept: List[T] = []
+    for item in sorted(items, key=start):
+        if kept and start(item) < end(kept[-1]):
+            if score(item) > score(kept[-1]):
+                kept[-1] = item
+        else:
+            kept.append(item)
+    return kept
+
+
+def nearby_pairs(items: Sequence[T],
+                 position: Callable[[T], int],
+                 max_distance: int) -> Iterator[Tuple[T, T]]:
+    """
+    Pairs of items whose positions are less than max_distance apart.
+
+    Equivalent to checking every (items[i], items[j]) with i < j, and
+    yields pairs in that same order, but only visits pairs inside the
+    distance window: O(n log n + pairs).
+
+    Args:
+        items: Items in their original order
+        position: Position of an item
+        max_distance: Exclusive distance threshold
+
+    Yields:
+        (items[i], items[j]) with i < j
+    """
+    positions = [position(item) for item in items]
+    order = sorted(range(len(items)), key=positions.__getitem__)
+
+    pairs: List[Tuple[int, int]] = []
+    window_start = 0
+    for rank, index in enumerate(order):
+        while positions[index] - positions[order[window_start]] >= max_distance:
+            window_start += 1
+        for other in order[window_start:rank]:
+            pairs.append((other, index) if other < index else (index, other))
+
+    pairs.sort()
+    for i, j in pairs:
+        yield items[i], items[j]
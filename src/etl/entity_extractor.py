@@ -17,16 +17,24 @@ from typing import Dict, List, Any, Set, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import json
-from collections import defaultdict, Counter
 import spacy
 from spacy.matcher import Matcher, PhraseMatcher
 from spacy.tokens import Doc, Span
 import networkx as nx
 
+from .entity_consolidation import group_by_key, pick_canonical_name, resolve_overlaps
 from .types import ContentType
 
 logger = logging.getLogger(__name__)
 
+# Relationship patterns: (subject, object) groups and relationship type
+RELATIONSHIP_PATTERNS = [
+    (re.compile(r'([^，。]+)的(?:师父|徒弟|弟子)'), 'mentor_student'),
+    (re.compile(r'([^，。]+)和([^，。]+)(?:是|乃)(?:师兄弟|好友|敌人)'), 'peer_relationship'),
+    (re.compile(r'([^，。]+)(?:来自|属于)([^，。]+)'), 'belongs_to'),
+    (re.compile(r'([^，。]+)(?:位于|在)([^，。]+)'), 'located_in'),
+]
+
 
 class EntityType(Enum):
     """Types of entities that can be extracted."""
@@ -374,16 +382,10 @@ class EntityExtractor:
     async def _consolidate_entities(self, mentions: List[EntityMention], text: str) -> List[ExtractedEntity]:
         """Consolidate overlapping mentions into entities."""
         # Group mentions by normalized name and type
-        entity_groups = defaultdict(list)
-        for mention in mentions:
-            key = (mention.normalized_form, mention.entity_type)
-            entity_groups[key].append(mention)
+        entity_groups = group_by_key(mentions, key=lambda m: (m.normalized_form, m.entity_type))
 
         entities = []
         for (normalized_name, entity_type), mention_list in entity_groups.items():
-            # Sort mentions by position
-            mention_list.sort(key=lambda m: m.start_pos)
-
             # Remove overlapping mentions (keep highest confidence)
             filtered_mentions = self._remove_overlapping_mentions(mention_list)
 
@@ -450,30 +452,24 @@ class EntityExtractor:
         return entities
 
     async def _extract_relationships(self, entities: List[ExtractedEntity], text: str) -> List[ExtractedEntity]:
-        """Extract relationships between entities."""
-        # Relationship patterns
-        relationship_patterns = [
-            (r'([^，。]+)的(?:师父|徒弟|弟子)', 'mentor_student'),
-            (r'([^，。]+)和([^，。]+)(?:是|乃)(?:师兄弟|好友|敌人)', 'peer_relationship'),
-            (r'([^，。]+)(?:来自|属于)([^，。]+)', 'belongs_to'),
-            (r'([^，。]+)(?:位于|在)([^，。]+)', 'located_in'),
-        ]
+        """Extract relationships between entities.
 
-        entity_name_to_id = {e.canonical_name: e.entity_id for e in entities}
+        Each pattern is scanned once over the text; a match links its subject
+        entity to its object entity.
+        """
+        entity_by_name = {e.canonical_name: e for e in entities}
 
-        for entity in entities:
-            for pattern, rel_type in relationship_patterns:
-                matches = re.finditer(pattern, text)
-                for match in matches:
-                    entity1, entity2 = match.groups()
-                    entity1_clean = self._normalize_entity_name(entity1)
-                    entity2_clean = self._normalize_entity_name(entity2)
+        for pattern, rel_type in RELATIONSHIP_PATTERNS:
+            if pattern.groups < 2:
+                continue
+            for match in pattern.finditer(text):
+                entity1, entity2 = match.group(1, 2)
+                subject = entity_by_name.get(self._normalize_entity_name(entity1))
+                target = entity_by_name.get(self._normalize_entity_name(entity2))
 
-                    # Check if both entities are in our extracted set
-                    if entity1_clean in entity_name_to_id and entity2_clean in entity_name_to_id:
-                        if rel_type not in entity.relationships:
-                            entity.relationships[rel_type] = []
-                        entity.relationships[rel_type].append(entity_name_to_id[entity2_clean])
+                # Check if both entities are in our extracted set
+                if subject is not None and target is not None:
+                    subject.relationships.setdefault(rel_type, []).append(target.entity_id)
 
         return entities
 
@@ -526,36 +522,17 @@ class EntityExtractor:
 
     def _remove_overlapping_mentions(self, mentions: List[EntityMention]) -> List[EntityMention]:
         """Remove overlapping mentions, keeping the one with highest confidence."""
-        if not mentions:
-            return []
-
-        # Sort by start position
-        sorted_mentions = sorted(mentions, key=lambda m: m.start_pos)
-        filtered = [sorted_mentions[0]]
-
-        for mention in sorted_mentions[1:]:
-            last_added = filtered[-1]
-            # Check for overlap
-            if mention.start_pos < last_added.end_pos:
-                # Overlapping - keep the one with higher confidence
-                if mention.confidence > last_added.confidence:
-                    filtered[-1] = mention
-            else:
-                # No overlap - add to filtered list
-                filtered.append(mention)
-
-        return filtered
+        return resolve_overlaps(
+            mentions,
+            start=lambda m: m.start_pos,
+            end=lambda m: m.end_pos,
+            score=lambda m: m.confidence
+        )
 
     def _determine_canonical_name(self, mentions: List[EntityMention]) -> str:
         """Determine the canonical name from mentions."""
-        if not mentions:
-            return ""
-
-        # Count frequency of each mention text
-        name_counts = Counter(m.text for m in mentions)
-
-        # Return the most frequent name
-        return name_counts.most_common(1)[0][0]
+        # Most frequent mention text
+        return pick_canonical_name(m.text for m in mentions)
 
     def get_entity_statistics(self) -> Dict[str, Any]:
         """Get statistics about extracted entities."""
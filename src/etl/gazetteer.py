@@ -0,0 +1,192 @@
+"""
+词典匹配引擎 - 基于Aho-Corasick自动机的多模式术语匹配
+
+九域词典（签名实体、层级标记、机构、文化物品、仪式、禁用词）一次性编译为
+自动机，单次扫描文本即可得到全部 (术语, 域, 类别, 位置) 命中；命中按位置建立
+索引，供上下文窗口内的域判定和置信度计算使用，无需对每个窗口重复扫描。
+"""
+
+import bisect
+import logging
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+class GazetteerHit(NamedTuple):
+    """一次词典命中"""
+    term: str
+    domain: Any
+    category: str
+    start: int
+    end: int
+
+
+class _AhoCorasickAutomaton:
+    """纯Python实现的Aho-Corasick自动机 (转移表展开为DFA，每个字符一次字典查找)"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = []
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        for term in terms:
+            state = 0
+            for ch in term:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(len(self.terms))
+            self.terms.append(term)
+
+        # 广度优先计算失败链接，并把失败状态的转移和输出合并进来
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0) if state else 0
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = [tuple(out) for out in outputs]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """逐个产出 (结束位置, 术语编号)，结束位置不含"""
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for position, ch in enumerate(text, 1):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for term_id in outputs[state]:
+                    yield position, term_id
+
+
+class GazetteerIndex:
+    """单个文本的词典命中索引 (按起始位置排序)"""
+
+    def __init__(self, hits: List[GazetteerHit]):
+        self.hits = sorted(hits, key=lambda hit: (hit.start, hit.end))
+        self._starts = [hit.start for hit in self.hits]
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+    def __iter__(self) -> Iterator[GazetteerHit]:
+        return iter(self.hits)
+
+    def window(self, start: int, end: int) -> List[GazetteerHit]:
+        """完全落在 [start, end) 内的命中"""
+        lo = bisect.bisect_left(self._starts, start)
+        hi = bisect.bisect_left(self._starts, end, lo)
+        return [hit for hit in self.hits[lo:hi] if hit.end <= end]
+
+    def select(self, domain: Any = None, category: Optional[str] = None) -> List[GazetteerHit]:
+        """按域/类别筛选命中"""
+        return [
+            hit for hit in self.hits
+            if (domain is None or hit.domain == domain) and (category is None or hit.category == category)
+        ]
+
+
+def distinct_terms(hits: Iterable[GazetteerHit], category: str) -> Dict[Any, Set[str]]:
+    """每个域在命中中出现过的不同术语 (相当于逐词 `term in text` 的结果)"""
+    terms: Dict[Any, Set[str]] = defaultdict(set)
+    for hit in hits:
+        if hit.category == category:
+            terms[hit.domain].add(hit.term)
+    return terms
+
+
+class Gazetteer:
+    """
+    多模式词典匹配器
+
+    同一术语可属于多个 (域, 类别)；编译后单次扫描返回所有重叠命中。
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, List[Tuple[Any, str]]] = defaultdict(list)
+        self._terms: List[str] = []
+        self._automaton = None
+
+    def add_term(self, term: str, domain: Any, category: str):
+        """添加术语"""
+        if not term:
+            return
+        if term not in self._entries:
+            self._terms.append(term)
+        if (domain, category) not in self._entries[term]:
+            self._entries[term].append((domain, category))
+        self._automaton = None
+
+    def add_lexicon(self, lexicon: Mapping[Any, Mapping[str, Iterable[str]]]):
+        """添加 {域: {类别: [术语]}} 形式的词典"""
+        for domain, categories in lexicon.items():
+            for category, terms in categories.items():
+                for term in terms:
+                    self.add_term(term, domain, category)
+
+    def compile(self) -> "Gazetteer":
+        """编译自动机"""
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for term in self._terms:
+                automaton.add_word(term, term)
+            automaton.make_automaton()
+        else:
+            automaton = _AhoCorasickAutomaton(self._terms)
+        self._automaton = automaton
+        logger.debug(f"词典自动机编译完成: {len(self._terms)} 个术语")
+        return self
+
+    def lookup(self, term: str) -> List[Tuple[Any, str]]:
+        """术语所属的 (域, 类别) 列表"""
+        return self._entries.get(term, [])
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._entries
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """单次扫描产出全部 (术语, 起始, 结束) 匹配，包括重叠匹配"""
+        if self._automaton is None:
+            self.compile()
+        if not text or not self._terms:
+            return
+
+        if AHOCORASICK_AVAILABLE:
+            for last_index, term in self._automaton.iter(text):
+                yield term, last_index + 1 - len(term), last_index + 1
+        else:
+            terms = self._automaton.terms
+            for end, term_id in self._automaton.iter(text):
+                term = terms[term_id]
+                yield term, end - len(term), end
+
+    def find_all(self, text: str) -> List[GazetteerHit]:
+        """全部 (术语, 域, 类别, 位置) 命中"""
+        return [
+            GazetteerHit(term, domain, category, start, end)
+            for term, start, end in self.iter_matches(text)
+            for domain, category in self._entries[term]
+        ]
+
+    def index(self, text: str) -> GazetteerIndex:
+        """扫描文本并建立命中索引"""
+        return GazetteerIndex(self.find_all(text))
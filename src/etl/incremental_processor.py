@@ -8,23 +8,26 @@ Advanced incremental processing system including:
 - Conflict resolution and consistency guarantees
 - Efficient merging and upsert operations
 - Cross-database synchronization
+- Durable change log and content-hash index (see change_log)
 """
 
 import asyncio
 import logging
 import hashlib
 import json
-from typing import Dict, List, Any, Optional, Set, Tuple, Union
+from typing import Deque, Dict, List, Any, Optional, Set, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
+from pathlib import Path
 import uuid
-from collections import defaultdict
+from collections import defaultdict, deque
 
 from database.connections.postgresql import postgres_db
 from database.connections.mongodb import mongodb
 from .pipeline_manager import ContentType
 from .entity_extractor import ExtractedEntity
+from .change_log import ChangeLogStore, default_change_log_dir
 
 logger = logging.getLogger(__name__)
 
@@ -194,24 +197,33 @@ class IncrementalProcessor:
     - Conflict detection and resolution
     - Cross-database synchronization
     - Consistency validation and repair
+    - Durable change log; content hashes survive restarts
     """
 
-    def __init__(self):
-        self.change_log: List[ChangeRecord] = []
+    def __init__(self, change_log_dir: Optional[Union[str, Path]] = None):
+        # Configuration
+        self.max_version_history = 100
+        self.recent_change_limit = 10000
+        self.prefetch_batch_size = 5000
+        self.conflict_resolution_strategy = ConflictResolutionStrategy.LATEST_WINS
+
+        # Durable change log with the record_id -> content hash index
+        self.change_store = ChangeLogStore(Path(change_log_dir) if change_log_dir else default_change_log_dir())
+
+        # Recent changes and versions kept in memory for statistics
+        self.change_log: Deque[ChangeRecord] = deque(maxlen=self.recent_change_limit)
         self.version_store: Dict[str, List[DataVersion]] = defaultdict(list)
         self.conflict_store: List[ConflictRecord] = []
         self.consistency_manager = DataConsistencyManager()
 
-        # Caches for performance
-        self.content_hash_cache: Dict[str, str] = {}
         self.last_sync_timestamps: Dict[str, datetime] = {}
 
-        # Configuration
-        self.max_version_history = 100
-        self.conflict_resolution_strategy = ConflictResolutionStrategy.LATEST_WINS
-
         logger.info("IncrementalProcessor initialized")
 
+    async def close(self):
+        """Flush the change log and persist the content-hash index."""
+        await self.change_store.close()
+
     async def process_incremental_update(self,
                                        content_type: ContentType,
                                        record_id: str,
@@ -229,61 +241,121 @@ class IncrementalProcessor:
         Returns:
             Dictionary with update results and metadata
         """
+        results = await self.process_incremental_updates(content_type, [(record_id, new_data)], source)
+        return results[0]
+
+    async def process_incremental_updates(self,
+                                        content_type: ContentType,
+                                        updates: List[Tuple[str, Dict[str, Any]]],
+                                        source: str = "manual") -> List[Dict[str, Any]]:
+        """
+        Process a batch of incremental updates.
+
+        Unchanged records are detected from the persisted content-hash index
+        without touching the databases. Existing rows for the rest are
+        prefetched with one query per database per batch, and changes are
+        written with one statement group per column set.
+
+        Args:
+            content_type: Type of content being updated
+            updates: (record_id, new_data) pairs
+            source: Source of the updates
+
+        Returns:
+            One result dictionary per update, in input order
+        """
+        await self.change_store.open()
+
+        results = []
+        for start in range(0, len(updates), self.prefetch_batch_size):
+            batch = updates[start:start + self.prefetch_batch_size]
+            results.extend(await self._process_update_batch(content_type, batch, source))
+
+        await self.change_store.flush()
+        return results
+
+    async def _process_update_batch(self,
+                                    content_type: ContentType,
+                                    batch: List[Tuple[str, Dict[str, Any]]],
+                                    source: str) -> List[Dict[str, Any]]:
+        """Detect, resolve and apply one prefetch batch of updates."""
         start_time = datetime.now()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
 
-        try:
-            # 1. Retrieve existing data
-            existing_data = await self._get_existing_data(content_type, record_id)
+        def elapsed() -> float:
+            return (datetime.now() - start_time).total_seconds()
 
-            # 2. Calculate content hash for change detection
+        # 1. Skip records whose content hash is unchanged since the last logged change
+        pending = []
+        for position, (record_id, new_data) in enumerate(batch):
             new_content_hash = self._calculate_content_hash(new_data)
-            existing_hash = existing_data.get('content_hash') if existing_data else None
-
-            # 3. Check if data actually changed
-            if existing_hash == new_content_hash:
+            if self.change_store.content_hash(record_id) == new_content_hash:
                 logger.debug(f"No changes detected for {record_id}")
-                return {
-                    'status': 'no_change',
-                    'record_id': record_id,
-                    'processing_time': (datetime.now() - start_time).total_seconds()
-                }
-
-            # 4. Detect conflicts
-            conflicts = await self._detect_conflicts(content_type, record_id, new_data, existing_data)
-
-            # 5. Resolve conflicts if any
-            if conflicts:
-                resolved_data = await self._resolve_conflicts(conflicts, new_data, existing_data)
+                results[position] = {'status': 'no_change', 'record_id': record_id, 'processing_time': elapsed()}
             else:
-                resolved_data = new_data
+                pending.append((position, record_id, new_data, new_content_hash))
+
+        # 2. Retrieve existing data for the remaining records in one round trip per database
+        existing_rows = await self._get_existing_data_batch(
+            content_type, list(dict.fromkeys(record_id for _, record_id, _, _ in pending))
+        )
+
+        # 3. Detect and resolve conflicts, create versions
+        staged = []
+        latest_data: Dict[str, Dict[str, Any]] = {}
+        first_change_type: Dict[str, ChangeType] = {}
+        for position, record_id, new_data, new_content_hash in pending:
+            try:
+                # An earlier update of the same record in this batch is the existing data
+                existing_data = latest_data.get(record_id) or existing_rows.get(str(record_id))
+                existing_hash = existing_data.get('content_hash') if existing_data else None
+                if existing_hash == new_content_hash:
+                    logger.debug(f"No changes detected for {record_id}")
+                    results[position] = {'status': 'no_change', 'record_id': record_id,
+                                         'processing_time': elapsed()}
+                    continue
+
+                conflicts = await self._detect_conflicts(content_type, record_id, new_data, existing_data)
+                if conflicts:
+                    resolved_data = await self._resolve_conflicts(conflicts, new_data, existing_data)
+                else:
+                    resolved_data = new_data
+
+                version = await self._create_version(record_id, resolved_data, existing_data, source)
+                change_type = ChangeType.UPDATE if existing_data else ChangeType.INSERT
 
-            # 6. Create version record
-            version = await self._create_version(record_id, resolved_data, existing_data, source)
+                first_change_type.setdefault(record_id, change_type)
+                latest_data[record_id] = resolved_data
+                staged.append((position, record_id, new_content_hash, existing_data, resolved_data,
+                               version, change_type, conflicts))
+                await self._store_version(record_id, version)
 
-            # 7. Determine change type
-            change_type = ChangeType.UPDATE if existing_data else ChangeType.INSERT
+            except Exception as e:
+                logger.error(f"Incremental update failed for {record_id}: {e}")
+                results[position] = {'status': 'error', 'record_id': record_id, 'error': str(e),
+                                     'processing_time': elapsed()}
 
-            # 8. Apply changes to databases
-            apply_results = await self._apply_changes(
-                content_type, record_id, resolved_data, existing_data, change_type
-            )
+        # 4. Apply the final state of each record to both databases
+        apply_results = await self._apply_changes_batch(content_type, [
+            (record_id, data, first_change_type[record_id]) for record_id, data in latest_data.items()
+        ])
 
-            # 9. Update version store and change log
-            await self._record_change(change_type, content_type, record_id, existing_data, resolved_data, source)
-            await self._store_version(record_id, version)
+        # 5. Log changes, validate consistency and report
+        table_name = self._get_table_name(content_type)
+        for (position, record_id, new_content_hash, existing_data, resolved_data,
+             version, change_type, conflicts) in staged:
+            record_apply_results = apply_results.get(record_id, {})
+            # Only an applied change may short-circuit future identical updates
+            applied = all(result['status'] == 'success' for result in record_apply_results.values())
 
-            # 10. Validate consistency
-            consistency_issues = await self.consistency_manager.validate_consistency(
-                self._get_table_name(content_type), record_id
-            )
+            await self._record_change(change_type, content_type, record_id, existing_data, resolved_data,
+                                      source, version=version,
+                                      content_hash=new_content_hash if applied else None)
 
-            # 11. Update caches
-            self.content_hash_cache[record_id] = new_content_hash
+            consistency_issues = await self.consistency_manager.validate_consistency(table_name, record_id)
             self.last_sync_timestamps[record_id] = datetime.now()
 
-            processing_time = (datetime.now() - start_time).total_seconds()
-
-            result = {
+            results[position] = {
                 'status': 'success',
                 'change_type': change_type.value,
                 'record_id': record_id,
@@ -291,45 +363,41 @@ class IncrementalProcessor:
                 'conflicts_detected': len(conflicts),
                 'conflicts_resolved': len([c for c in conflicts if c.resolved]),
                 'consistency_issues': consistency_issues,
-                'apply_results': apply_results,
-                'processing_time': processing_time
+                'apply_results': record_apply_results,
+                'processing_time': elapsed()
             }
+            logger.debug(f"Incremental update completed for {record_id}: {change_type.value}")
 
-            logger.info(f"Incremental update completed for {record_id}: {change_type.value}")
-            return result
-
-        except Exception as e:
-            logger.error(f"Incremental update failed for {record_id}: {e}")
-            return {
-                'status': 'error',
-                'record_id': record_id,
-                'error': str(e),
-                'processing_time': (datetime.now() - start_time).total_seconds()
-            }
+        return results
 
-    async def _get_existing_data(self, content_type: ContentType, record_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve existing data for a record."""
-        table_name = self._get_table_name(content_type)
+    async def _get_existing_data_batch(self,
+                                       content_type: ContentType,
+                                       record_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve existing data for many records, keyed by str(original_id)."""
+        existing: Dict[str, Dict[str, Any]] = {}
+        if not record_ids:
+            return existing
 
         # Try PostgreSQL first
         try:
-            query = f"SELECT * FROM {table_name} WHERE original_id = $1"
-            records = await postgres_db.execute_query(query, (record_id,))
-            if records:
-                return records[0]
+            table_name = self._get_table_name(content_type)
+            query = f"SELECT * FROM {table_name} WHERE original_id = ANY($1)"
+            for row in await postgres_db.execute_query(query, ([str(r) for r in record_ids],)):
+                existing[str(row['original_id'])] = row
         except Exception as e:
             logger.warning(f"Failed to retrieve from PostgreSQL: {e}")
 
-        # Try MongoDB as fallback
-        try:
-            collection_name = self._get_collection_name(content_type)
-            record = await mongodb.find_one(collection_name, {"original_id": record_id})
-            if record:
-                return record
-        except Exception as e:
-            logger.warning(f"Failed to retrieve from MongoDB: {e}")
+        # Try MongoDB as fallback for records not found
+        missing = [record_id for record_id in record_ids if str(record_id) not in existing]
+        if missing:
+            try:
+                collection_name = self._get_collection_name(content_type)
+                for document in await mongodb.find_many(collection_name, {"original_id": {"$in": missing}}):
+                    existing.setdefault(str(document['original_id']), document)
+            except Exception as e:
+                logger.warning(f"Failed to retrieve from MongoDB: {e}")
 
-        return None
+        return existing
 
     def _calculate_content_hash(self, data: Dict[str, Any]) -> str:
         """Calculate a hash of the content for change detection."""
@@ -506,6 +574,8 @@ class IncrementalProcessor:
         parent_version = None
         if record_id in self.version_store and self.version_store[record_id]:
             parent_version = self.version_store[record_id][-1].version_id
+        else:
+            parent_version = self.change_store.latest_version(record_id)
 
         version = DataVersion(
             version_id=str(uuid.uuid4()),
@@ -522,88 +592,80 @@ class IncrementalProcessor:
 
         return version
 
-    async def _apply_changes(self,
-                           content_type: ContentType,
-                           record_id: str,
-                           new_data: Dict[str, Any],
-                           existing_data: Optional[Dict[str, Any]],
-                           change_type: ChangeType) -> Dict[str, Any]:
-        """Apply changes to both PostgreSQL and MongoDB."""
-        results = {}
-
-        # Apply to PostgreSQL
-        try:
-            if change_type == ChangeType.INSERT:
-                result = await self._insert_to_postgres(content_type, record_id, new_data)
-            else:
-                result = await self._update_postgres(content_type, record_id, new_data)
-            results['postgresql'] = {'status': 'success', 'result': result}
-        except Exception as e:
-            results['postgresql'] = {'status': 'error', 'error': str(e)}
+    async def _apply_changes_batch(self,
+                                   content_type: ContentType,
+                                   changes: List[Tuple[str, Dict[str, Any], ChangeType]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Apply changes to both PostgreSQL and MongoDB.
 
-        # Apply to MongoDB
-        try:
-            if change_type == ChangeType.INSERT:
-                result = await self._insert_to_mongodb(content_type, record_id, new_data)
-            else:
-                result = await self._update_mongodb(content_type, record_id, new_data)
-            results['mongodb'] = {'status': 'success', 'result': result}
-        except Exception as e:
-            results['mongodb'] = {'status': 'error', 'error': str(e)}
+        Changes are grouped by change type and column set; each group is one
+        executemany on PostgreSQL and one bulk write on MongoDB.
 
-        return results
+        Returns:
+            Per-record results keyed by record_id
+        """
+        results: Dict[str, Dict[str, Any]] = {record_id: {} for record_id, _, _ in changes}
+        groups: Dict[Tuple[ChangeType, Tuple[str, ...]], List[Tuple[str, Dict[str, Any]]]] = defaultdict(list)
+        for record_id, data, change_type in changes:
+            groups[(change_type, tuple(data))].append((record_id, data))
 
-    async def _insert_to_postgres(self, content_type: ContentType, record_id: str, data: Dict[str, Any]) -> str:
-        """Insert new record to PostgreSQL."""
         table_name = self._get_table_name(content_type)
+        collection_name = self._get_collection_name(content_type)
 
-        # Build insert query dynamically
-        fields = list(data.keys())
-        placeholders = [f"${i+1}" for i in range(len(fields))]
-        values = list(data.values())
-
-        query = f"""
-        INSERT INTO {table_name} ({', '.join(fields)})
-        VALUES ({', '.join(placeholders)})
-        RETURNING original_id
-        """
-
-        result = await postgres_db.execute_command(query, tuple(values))
-        return result
+        for (change_type, columns), members in groups.items():
+            # Apply to PostgreSQL
+            try:
+                if change_type == ChangeType.INSERT:
+                    query = self._build_insert_query(table_name, columns)
+                    params = [tuple(data[c] for c in columns) for _, data in members]
+                else:
+                    query, value_columns = self._build_update_query(table_name, columns)
+                    params = [tuple(data[c] for c in value_columns) + (record_id,) for record_id, data in members]
+                await postgres_db.execute_many(query, params)
+                postgres_result = {'status': 'success', 'result': f"{len(members)} rows"}
+            except Exception as e:
+                postgres_result = {'status': 'error', 'error': str(e)}
+
+            # Apply to MongoDB (copies: the driver adds _id to inserted documents)
+            try:
+                if change_type == ChangeType.INSERT:
+                    inserted = await mongodb.insert_many(collection_name, [dict(data) for _, data in members])
+                    mongo_result = {'status': 'success', 'result': f"{len(inserted)} documents"}
+                else:
+                    written = await mongodb.bulk_upsert(
+                        collection_name,
+                        [dict(data, original_id=data.get('original_id', record_id)) for record_id, data in members],
+                        key_fields=['original_id']
+                    )
+                    mongo_result = {'status': 'success', 'result': written}
+            except Exception as e:
+                mongo_result = {'status': 'error', 'error': str(e)}
 
-    async def _update_postgres(self, content_type: ContentType, record_id: str, data: Dict[str, Any]) -> str:
-        """Update existing record in PostgreSQL."""
-        table_name = self._get_table_name(content_type)
+            for record_id, _ in members:
+                results[record_id] = {'postgresql': postgres_result, 'mongodb': mongo_result}
 
-        # Build update query
-        set_clauses = []
-        values = []
-        for i, (key, value) in enumerate(data.items()):
-            if key != 'original_id':  # Don't update the ID
-                set_clauses.append(f"{key} = ${i+1}")
-                values.append(value)
+        return results
 
-        values.append(record_id)  # For WHERE clause
+    @staticmethod
+    def _build_insert_query(table_name: str, columns: Tuple[str, ...]) -> str:
+        """INSERT statement for one column set."""
+        placeholders = [f"${i + 1}" for i in range(len(columns))]
+        return f"""
+        INSERT INTO {table_name} ({', '.join(columns)})
+        VALUES ({', '.join(placeholders)})
+        """
 
+    @staticmethod
+    def _build_update_query(table_name: str, columns: Tuple[str, ...]) -> Tuple[str, List[str]]:
+        """UPDATE statement for one column set; returns the query and its value columns (record_id last)."""
+        value_columns = [c for c in columns if c != 'original_id']  # Don't update the ID
+        set_clauses = [f"{column} = ${i + 1}" for i, column in enumerate(value_columns)]
         query = f"""
         UPDATE {table_name}
         SET {', '.join(set_clauses)}
-        WHERE original_id = ${len(values)}
+        WHERE original_id = ${len(value_columns) + 1}
         """
-
-        result = await postgres_db.execute_command(query, tuple(values))
-        return result
-
-    async def _insert_to_mongodb(self, content_type: ContentType, record_id: str, data: Dict[str, Any]) -> str:
-        """Insert new document to MongoDB."""
-        collection_name = self._get_collection_name(content_type)
-        return await mongodb.insert_one(collection_name, data)
-
-    async def _update_mongodb(self, content_type: ContentType, record_id: str, data: Dict[str, Any]) -> int:
-        """Update existing document in MongoDB."""
-        collection_name = self._get_collection_name(content_type)
-        filter_dict = {"original_id": record_id}
-        return await mongodb.update_one(collection_name, filter_dict, data)
+        return query, value_columns
 
     async def _record_change(self,
                            change_type: ChangeType,
@@ -611,7 +673,9 @@ class IncrementalProcessor:
                            record_id: str,
                            old_data: Optional[Dict[str, Any]],
                            new_data: Dict[str, Any],
-                           source: str):
+                           source: str,
+                           version: Optional[DataVersion] = None,
+                           content_hash: Optional[str] = None):
         """Record the change in the change log."""
         change_record = ChangeRecord(
             change_id=str(uuid.uuid4()),
@@ -627,9 +691,29 @@ class IncrementalProcessor:
 
         self.change_log.append(change_record)
 
-        # Keep only recent changes
-        if len(self.change_log) > 10000:
-            self.change_log = self.change_log[-5000:]
+        entry = {
+            'change_id': change_record.change_id,
+            'change_type': change_type.value,
+            'table_name': change_record.table_name,
+            'record_id': record_id,
+            'timestamp': change_record.timestamp.isoformat(),
+            'source': source,
+            'metadata': change_record.metadata,
+            'old_data': old_data,
+            'new_data': new_data,
+            'content_hash': content_hash,
+        }
+        if version:
+            entry['version_id'] = version.version_id
+            entry['version'] = {
+                'content_hash': version.content_hash,
+                'timestamp': version.timestamp.isoformat(),
+                'author': version.author,
+                'parent_version': version.parent_version,
+                'change_count': len(version.changes),
+                'metadata': version.metadata
+            }
+        await self.change_store.append(entry)
 
     async def _store_version(self, record_id: str, version: DataVersion):
         """Store version in version store."""
@@ -651,53 +735,41 @@ class IncrementalProcessor:
                                record_id: Optional[str] = None,
                                since: Optional[datetime] = None,
                                limit: int = 100) -> List[Dict[str, Any]]:
-        """Get change history with optional filtering."""
-        changes = self.change_log
+        """Get change history (newest first) from the change log with optional filtering."""
+        await self.change_store.open()
 
-        # Filter by record ID
-        if record_id:
-            changes = [c for c in changes if c.record_id == record_id]
+        history = []
+        for entry in self.change_store.iter_entries(newest_first=True):
+            # Filter by record ID
+            if record_id and entry['record_id'] != record_id:
+                continue
 
-        # Filter by time
-        if since:
-            changes = [c for c in changes if c.timestamp >= since]
+            # Filter by time (the log is in time order)
+            if since and datetime.fromisoformat(entry['timestamp']) < since:
+                break
 
-        # Sort by timestamp (newest first) and limit
-        changes.sort(key=lambda c: c.timestamp, reverse=True)
-        changes = changes[:limit]
+            history.append({
+                key: entry[key]
+                for key in ('change_id', 'change_type', 'table_name', 'record_id', 'timestamp', 'source', 'metadata')
+            })
+            if len(history) >= limit:
+                break
 
-        # Convert to serializable format
-        return [
-            {
-                'change_id': c.change_id,
-                'change_type': c.change_type.value,
-                'table_name': c.table_name,
-                'record_id': c.record_id,
-                'timestamp': c.timestamp.isoformat(),
-                'source': c.source,
-                'metadata': c.metadata
-            }
-            for c in changes
-        ]
+        return history
 
     async def get_version_history(self, record_id: str) -> List[Dict[str, Any]]:
-        """Get version history for a specific record."""
-        if record_id not in self.version_store:
-            return []
+        """Get version history (oldest first) for a specific record from the change log."""
+        await self.change_store.open()
 
-        versions = self.version_store[record_id]
-        return [
-            {
-                'version_id': v.version_id,
-                'content_hash': v.content_hash,
-                'timestamp': v.timestamp.isoformat(),
-                'author': v.author,
-                'parent_version': v.parent_version,
-                'change_count': len(v.changes),
-                'metadata': v.metadata
-            }
-            for v in versions
-        ]
+        versions = []
+        for entry in self.change_store.iter_entries(newest_first=True):
+            if entry['record_id'] == record_id and 'version_id' in entry:
+                versions.append({'version_id': entry['version_id'], **entry['version']})
+                if len(versions) >= self.max_version_history:
+                    break
+
+        versions.reverse()
+        return versions
 
     async def get_unresolved_conflicts(self) -> List[Dict[str, Any]]:
         """Get list of unresolved conflicts."""
@@ -761,6 +833,6 @@ class IncrementalProcessor:
             'total_versions': sum(len(versions) for versions in self.version_store.values()),
             'total_conflicts': len(self.conflict_store),
             'unresolved_conflicts': len([c for c in self.conflict_store if not c.resolved]),
-            'cache_size': len(self.content_hash_cache),
+            'cache_size': len(self.change_store),
             'last_sync_timestamps': len(self.last_sync_timestamps)
         }
\ No newline at end of file
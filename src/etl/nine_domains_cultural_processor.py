@@ -219,8 +219,17 @@ class NineDomainsCulturalProcessor:
             }
         }
 
-    async def process_nine_domains_text(self, text: str, novel_id: UUID) -> CulturalFrameworkBatch:
-        """处理九域文化框架文本"""
+    async def process_nine_domains_text(self, text: str, novel_id: UUID,
+                                        analyze_relations: bool = True) -> CulturalFrameworkBatch:
+        """
+        处理九域文化框架文本
+
+        Args:
+            text: 九域文化文本
+            novel_id: 小说ID
+            analyze_relations: 是否分析实体关系；分块处理时各块跳过，
+                               合并后由 analyze_batch_relations 统一分析一次
+        """
         logger.info(f"开始处理九域文化文本，长度: {len(text)}")
 
         try:
@@ -237,10 +246,10 @@ class NineDomainsCulturalProcessor:
                 cultural_sections.extend(sections)
 
             # 4. 创建批量数据
-            batch = await self._create_batch_data(cultural_sections, novel_id)
+            batch = await self._create_batch_data(cultural_sections, novel_id, analyze_relations)
 
             # 5. 增强数据质量
-            batch = await self._enhance_batch_data(batch, cleaned_text)
+            batch = await self._enhance_batch_data(batch, cleaned_text, analyze_relations)
 
             # 6. 验证数据
             validation_result = await self._validate_cultural_data(batch)
@@ -385,7 +394,8 @@ class NineDomainsCulturalProcessor:
         logger.info(f"{domain_name} 解析出 {len(sections)} 个维度段落")
         return sections
 
-    async def _create_batch_data(self, cultural_sections: List[CulturalSection], novel_id: UUID) -> CulturalFrameworkBatch:
+    async def _create_batch_data(self, cultural_sections: List[CulturalSection], novel_id: UUID,
+                                 analyze_relations: bool = True) -> CulturalFrameworkBatch:
         """创建批量数据"""
         batch = CulturalFrameworkBatch()
         entity_registry = {}  # 避免重复实体
@@ -409,11 +419,18 @@ class NineDomainsCulturalProcessor:
         batch.concepts.extend(concepts)
 
         # 5. 分析实体关系
-        relations = await self._analyze_entity_relations(batch.entities, novel_id)
-        batch.relations.extend(relations)
+        if analyze_relations:
+            relations = await self._analyze_entity_relations(batch.entities, novel_id)
+            batch.relations.extend(relations)
 
         return batch
 
+    async def analyze_batch_relations(self, batch: CulturalFrameworkBatch, novel_id: UUID) -> CulturalFrameworkBatch:
+        """分析批次实体间的关系 (用于合并后的分块结果，实体需已去重)"""
+        relations = await self._analyze_entity_relations(batch.entities, novel_id)
+        batch.relations.extend(relations)
+        return await self._enhance_relationship_network(batch)
+
     def _create_framework(self, section: CulturalSection, novel_id: UUID) -> CulturalFrameworkCreate:
         """创建文化框架"""
         # 提取关键要素
@@ -1095,7 +1112,8 @@ class NineDomainsCulturalProcessor:
 
         return {"relation_type": None, "description": "", "strength": 0.0, "context": ""}
 
-    async def _enhance_batch_data(self, batch: CulturalFrameworkBatch, original_text: str) -> CulturalFrameworkBatch:
+    async def _enhance_batch_data(self, batch: CulturalFrameworkBatch, original_text: str,
+                                  analyze_relations: bool = True) -> CulturalFrameworkBatch:
         """增强批量数据质量"""
         # 1. 去重处理
         batch = self._deduplicate_batch_data(batch)
@@ -1104,7 +1122,8 @@ class NineDomainsCulturalProcessor:
         batch = await self._enhance_entity_descriptions(batch, original_text)
 
         # 3. 完善关系网络
-        batch = await self._enhance_relationship_network(batch)
+        if analyze_relations:
+            batch = await self._enhance_relationship_network(batch)
 
         # 4. 优化标签和分类
         batch = self._optimize_tags_and_categories(batch)
@@ -4,19 +4,168 @@
 
 import re
 import json
-from typing import Dict, List, Tuple, Set, Optional, Any
+from typing import Dict, List, Tuple, Set, Optional, Any, Pattern
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 import logging
 
 from database.models.cultural_framework_models import DomainType, EntityType
+from .entity_consolidation import best_by_key
+from .gazetteer import Gazetteer, GazetteerHit, GazetteerIndex, distinct_terms
 
 logger = logging.getLogger(__name__)
 
 
+# 九域词典: 各域的签名实体、层级标记、机构、文化物品、仪式和禁用词
+DOMAIN_SPECIFIC_RULES: Dict[DomainType, Dict[str, List[str]]] = {
+    DomainType.HUMAN_DOMAIN: {
+        "signature_entities": ["链籍", "环祖", "乡祭", "缚司", "县府", "宗门驻坊"],
+        "hierarchy_markers": ["黄籍", "灰籍", "黑籍", "良籍", "苦役", "罪籍"],
+        "institutions": ["县府", "宗门", "缚司", "巡链司"],
+        "cultural_items": ["链票", "环印", "家谱"],
+        "rituals": ["归环礼", "拾链礼", "祖灵续籍祭"],
+        "forbidden_terms": ["魔祭", "血池", "虚空", "噬魂"]
+    },
+
+    DomainType.HEAVEN_DOMAIN: {
+        "signature_entities": ["天命王朝", "龙阙", "司天监", "御史台"],
+        "hierarchy_markers": ["王侯", "世家", "官品", "天命"],
+        "institutions": ["王朝", "朝廷", "官府", "御史台"],
+        "cultural_items": ["龙印", "天符", "诏书"],
+        "rituals": ["登基大典", "天祭", "朝会"],
+        "forbidden_terms": ["血契", "魔化", "野性"]
+    },
+
+    DomainType.WILD_DOMAIN: {
+        "signature_entities": ["野人", "萨满", "图腾", "部落", "长老"],
+        "hierarchy_markers": ["族长", "萨满", "猎手", "勇士"],
+        "institutions": ["部落", "萨满会", "长老院"],
+        "cultural_items": ["图腾", "骨器", "兽皮"],
+        "rituals": ["成人礼", "狩猎祭", "图腾祭"],
+        "forbidden_terms": ["链籍", "官府", "文书"]
+    },
+
+    DomainType.UNDERWORLD_DOMAIN: {
+        "signature_entities": ["冥司殿", "渡链僧", "镇魂器", "冥籍", "阴兵"],
+        "hierarchy_markers": ["冥官", "渡僧", "守魂", "引路"],
+        "institutions": ["冥司殿", "冥府", "渡魂院"],
+        "cultural_items": ["镇魂器", "冥籍", "渡魂珠", "归环文"],
+        "rituals": ["超度仪", "引魂礼", "冥祭"],
+        "forbidden_terms": ["血契", "魔化", "活人"]
+    },
+
+    DomainType.DEMON_DOMAIN: {
+        "signature_entities": ["血契", "魔祭", "噬魂", "血池", "魔典"],
+        "hierarchy_markers": ["魔主", "血仆", "祭品", "堕落者"],
+        "institutions": ["血殿", "魔教", "噬魂会"],
+        "cultural_items": ["血契", "魔典", "噬魂器", "血符"],
+        "rituals": ["血祭", "魔化仪", "献祭典"],
+        "forbidden_terms": ["环祖", "归环", "净化"]
+    },
+
+    DomainType.VOID_DOMAIN: {
+        "signature_entities": ["虚空", "无为", "空明", "超脱", "道境"],
+        "hierarchy_markers": ["悟者", "空修", "虚行", "道人"],
+        "institutions": ["虚观", "空门", "道院"],
+        "cultural_items": ["空明珠", "虚道经", "无为印"],
+        "rituals": ["悟道会", "虚空祭", "超脱仪"],
+        "forbidden_terms": ["血肉", "欲望", "执着"]
+    },
+
+    DomainType.SEA_DOMAIN: {
+        "signature_entities": ["港市", "商会", "航海", "岛屿", "潮汐"],
+        "hierarchy_markers": ["船长", "商主", "水手", "岛主"],
+        "institutions": ["商会", "港务", "船帮"],
+        "cultural_items": ["航海图", "潮汐表", "海图"],
+        "rituals": ["下水礼", "祭海神", "丰收节"],
+        "forbidden_terms": ["内陆", "山民", "旱地"]
+    },
+
+    DomainType.SOURCE_DOMAIN: {
+        "signature_entities": ["守源会", "源流", "古籍", "秘典", "源力"],
+        "hierarchy_markers": ["源师", "典守", "研习者", "守秘"],
+        "institutions": ["守源会", "典藏阁", "源学院"],
+        "cultural_items": ["古籍", "秘典", "源石", "源符"],
+        "rituals": ["传承礼", "启源仪", "守秘誓"],
+        "forbidden_terms": ["破坏", "亵渎", "泄露"]
+    }
+}
+
+# 实体本身命中词典类别时的域得分
+CATEGORY_SCORES = {
+    "signature_entities": 10,
+    "hierarchy_markers": 8,
+    "institutions": 6,
+    "cultural_items": 6,
+    "rituals": 6,
+}
+
+
+@lru_cache(maxsize=1)
+def get_domain_gazetteer() -> Gazetteer:
+    """九域词典编译后的共享匹配器 (每个进程只编译一次)"""
+    gazetteer = Gazetteer()
+    gazetteer.add_lexicon(DOMAIN_SPECIFIC_RULES)
+    return gazetteer.compile()
+
+
+# 实体类型一致性检查的合并正则
+TYPE_CONSISTENCY_PATTERNS = {
+    EntityType.ORGANIZATION: re.compile(r'(?:管理|控制|负责|设立)|(?:府|司|院|会|殿)'),
+    EntityType.CONCEPT: re.compile(r'(?:理论|概念|原理|规则)|(?:制|法|道|术)'),
+    EntityType.ITEM: re.compile(r'(?:使用|制作|持有)|(?:器|票|印|珠)'),
+    EntityType.RITUAL: re.compile(r'(?:举行|参与|庆祝)|(?:礼|祭|节|仪)'),
+}
+
+# 属性关键词: {属性名: {取值: [关键词]}}
+ATTRIBUTE_KEYWORDS = {
+    "scale": {
+        "大型": ["庞大", "巨大", "宏大", "巨型", "超大"],
+        "中型": ["中等", "适中", "一般", "标准"],
+        "小型": ["小型", "微型", "精小", "袖珍", "迷你"]
+    },
+    "temporal": {
+        "古代": ["古代", "古时", "远古", "上古", "古老"],
+        "现代": ["现代", "当前", "如今", "现在", "当今"],
+        "传统": ["传统", "悠久", "历史", "世代"]
+    },
+    "importance": {
+        "核心": ["核心", "根本", "基础", "关键"],
+        "重要": ["重要", "主要", "重大", "显著"],
+        "次要": ["次要", "辅助", "附属", "补充"]
+    },
+    "status": {
+        "活跃": ["活跃", "运行", "使用", "流行"],
+        "衰落": ["衰落", "废弃", "过时", "消失"],
+        "禁忌": ["禁忌", "禁止", "严禁", "不允许"]
+    },
+}
+
+ATTRIBUTE_KEYWORD_PATTERNS = {
+    attr_name: [
+        (value, re.compile('|'.join(re.escape(keyword) for keyword in keywords)))
+        for value, keywords in values.items()
+    ]
+    for attr_name, values in ATTRIBUTE_KEYWORDS.items()
+}
+
+ORG_SCALE_PATTERNS = [
+    (re.compile(r'(?:共|总共|拥有).*?(\d+).*?(?:人|员|众)'), "member_count"),
+    (re.compile(r'(?:设有|下辖|管辖).*?(\d+).*?(?:个|处|部)'), "sub_units"),
+]
+LEVEL_COUNT_PATTERN = re.compile(r'(?:分为|共有|设有).*?(\d+).*?(?:等|级|层)')
+EXCHANGE_RATE_PATTERN = re.compile(r'(\d+).*?(?:等于|换|兑).*?(\d+)')
+
+
 @dataclass
 class ExtractionRule:
-    """提取规则"""
+    """
+    提取规则
+
+    patterns 在创建时编译一次；设置 gazetteer_category 的规则不走正则，
+    直接取词典扫描中 domain_specific 域该类别的命中。
+    """
     name: str
     patterns: List[str]
     entity_type: EntityType
@@ -24,6 +173,15 @@ class ExtractionRule:
     confidence_boost: float = 0.0
     context_requirements: List[str] = field(default_factory=list)
     exclusion_patterns: List[str] = field(default_factory=list)
+    gazetteer_category: Optional[str] = None
+    compiled_patterns: List[Pattern] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        for pattern in self.patterns:
+            try:
+                self.compiled_patterns.append(re.compile(pattern, re.IGNORECASE))
+            except re.error as e:
+                logger.warning(f"正则表达式错误 in rule {self.name}: {e}")
 
 
 @dataclass
@@ -50,79 +208,8 @@ class NineDomainsEntityExtractor:
     def initialize_domain_rules(self):
         """初始化域特定规则"""
 
-        self.domain_specific_rules = {
-            DomainType.HUMAN_DOMAIN: {
-                "signature_entities": ["链籍", "环祖", "乡祭", "缚司", "县府", "宗门驻坊"],
-                "hierarchy_markers": ["黄籍", "灰籍", "黑籍", "良籍", "苦役", "罪籍"],
-                "institutions": ["县府", "宗门", "缚司", "巡链司"],
-                "cultural_items": ["链票", "环印", "家谱"],
-                "rituals": ["归环礼", "拾链礼", "祖灵续籍祭"],
-                "forbidden_terms": ["魔祭", "血池", "虚空", "噬魂"]
-            },
-
-            DomainType.HEAVEN_DOMAIN: {
-                "signature_entities": ["天命王朝", "龙阙", "司天监", "御史台"],
-                "hierarchy_markers": ["王侯", "世家", "官品", "天命"],
-                "institutions": ["王朝", "朝廷", "官府", "御史台"],
-                "cultural_items": ["龙印", "天符", "诏书"],
-                "rituals": ["登基大典", "天祭", "朝会"],
-                "forbidden_terms": ["血契", "魔化", "野性"]
-            },
-
-            DomainType.WILD_DOMAIN: {
-                "signature_entities": ["野人", "萨满", "图腾", "部落", "长老"],
-                "hierarchy_markers": ["族长", "萨满", "猎手", "勇士"],
-                "institutions": ["部落", "萨满会", "长老院"],
-                "cultural_items": ["图腾", "骨器", "兽皮"],
-                "rituals": ["成人礼", "狩猎祭", "图腾祭"],
-                "forbidden_terms": ["链籍", "官府", "文书"]
-            },
-
-            DomainType.UNDERWORLD_DOMAIN: {
-                "signature_entities": ["冥司殿", "渡链僧", "镇魂器", "冥籍", "阴兵"],
-                "hierarchy_markers": ["冥官", "渡僧", "守魂", "引路"],
-                "institutions": ["冥司殿", "冥府", "渡魂院"],
-                "cultural_items": ["镇魂器", "冥籍", "渡魂珠", "归环文"],
-                "rituals": ["超度仪", "引魂礼", "冥祭"],
-                "forbidden_terms": ["血契", "魔化", "活人"]
-            },
-
-            DomainType.DEMON_DOMAIN: {
-                "signature_entities": ["血契", "魔祭", "噬魂", "血池", "魔典"],
-                "hierarchy_markers": ["魔主", "血仆", "祭品", "堕落者"],
-                "institutions": ["血殿", "魔教", "噬魂会"],
-                "cultural_items": ["血契", "魔典", "噬魂器", "血符"],
-                "rituals": ["血祭", "魔化仪", "献祭典"],
-                "forbidden_terms": ["环祖", "归环", "净化"]
-            },
-
-            DomainType.VOID_DOMAIN: {
-                "signature_entities": ["虚空", "无为", "空明", "超脱", "道境"],
-                "hierarchy_markers": ["悟者", "空修", "虚行", "道人"],
-                "institutions": ["虚观", "空门", "道院"],
-                "cultural_items": ["空明珠", "虚道经", "无为印"],
-                "rituals": ["悟道会", "虚空祭", "超脱仪"],
-                "forbidden_terms": ["血肉", "欲望", "执着"]
-            },
-
-            DomainType.SEA_DOMAIN: {
-                "signature_entities": ["港市", "商会", "航海", "岛屿", "潮汐"],
-                "hierarchy_markers": ["船长", "商主", "水手", "岛主"],
-                "institutions": ["商会", "港务", "船帮"],
-                "cultural_items": ["航海图", "潮汐表", "海图"],
-                "rituals": ["下水礼", "祭海神", "丰收节"],
-                "forbidden_terms": ["内陆", "山民", "旱地"]
-            },
-
-            DomainType.SOURCE_DOMAIN: {
-                "signature_entities": ["守源会", "源流", "古籍", "秘典", "源力"],
-                "hierarchy_markers": ["源师", "典守", "研习者", "守秘"],
-                "institutions": ["守源会", "典藏阁", "源学院"],
-                "cultural_items": ["古籍", "秘典", "源石", "源符"],
-                "rituals": ["传承礼", "启源仪", "守秘誓"],
-                "forbidden_terms": ["破坏", "亵渎", "泄露"]
-            }
-        }
+        self.domain_specific_rules = DOMAIN_SPECIFIC_RULES
+        self.gazetteer = get_domain_gazetteer()
 
     def initialize_entity_rules(self):
         """初始化实体提取规则"""
@@ -240,7 +327,7 @@ class NineDomainsEntityExtractor:
             ),
         ]
 
-        # 域特定规则
+        # 域特定规则 (签名实体由词典匹配，不再为每个域单独扫描文本)
         for domain, domain_info in self.domain_specific_rules.items():
             # 为每个域创建特定的提取规则
             signature_pattern = '|'.join(re.escape(entity) for entity in domain_info["signature_entities"])
@@ -250,7 +337,8 @@ class NineDomainsEntityExtractor:
                     patterns=[f'({signature_pattern})'],
                     entity_type=EntityType.ORGANIZATION,
                     domain_specific=domain,
-                    confidence_boost=0.5
+                    confidence_boost=0.5,
+                    gazetteer_category="signature_entities"
                 )
                 self.extraction_rules.append(rule)
 
@@ -271,33 +359,66 @@ class NineDomainsEntityExtractor:
             r'^[一二三四五六七八九十]+$',  # 纯中文数字
             r'^[的了在是我有和就不人都一上也很到说要去你会着没有看好自己这]+$',  # 常见停用词
         ]
+        self.exclusion_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in self.exclusion_patterns))
 
     def extract_entities(self, text: str, target_domain: Optional[DomainType] = None) -> List[ExtractedEntity]:
         """提取实体"""
-        entities = []
-        text_length = len(text)
-
         # 预处理文本
         cleaned_text = self._preprocess_text(text)
 
+        entities = self._collect_entities(cleaned_text, target_domain)
+
+        # 后处理
+        entities = self._post_process_entities(entities, cleaned_text, target_domain)
+
+        logger.info(f"提取到 {len(entities)} 个实体")
+        return entities
+
+    def extract_window_entities(self, text: str, core_start: int, core_end: int,
+                                target_domain: Optional[DomainType] = None) -> List[ExtractedEntity]:
+        """
+        提取窗口文本中起始位置落在核心区 [core_start, core_end) 内的实体
+
+        供分块处理使用: 窗口两侧的重叠部分只提供上下文，实体归属于核心区所在的块，
+        相邻块之间不会重复。结果未做类型数量限制，合并所有块后再调用 merge_entities。
+        """
+        cleaned_text = self._preprocess_text(text)
+
+        # 预处理会压缩空白，核心区边界按预处理后的前缀长度换算
+        core_span = (
+            len(self._preprocess_text(text[:core_start])),
+            len(self._preprocess_text(text[:core_end]))
+        )
+        return self._collect_entities(cleaned_text, target_domain, core_span)
+
+    def merge_entities(self, entities: List[ExtractedEntity],
+                       target_domain: Optional[DomainType] = None) -> List[ExtractedEntity]:
+        """合并多个窗口提取的实体: 全局去重后做排序和类型数量限制"""
+        entities = self._deduplicate_entities(entities)
+        return self._post_process_entities(entities, "", target_domain)
+
+    def _collect_entities(self, cleaned_text: str, target_domain: Optional[DomainType],
+                          core_span: Optional[Tuple[int, int]] = None) -> List[ExtractedEntity]:
+        """应用所有提取规则，返回去重和验证后的实体"""
+        entities = []
+
+        # 单次扫描得到全部词典命中，供所有规则和上下文判定共用
+        text_hits = self.gazetteer.index(cleaned_text)
+
         # 应用提取规则
         for rule in self.extraction_rules:
             # 如果指定了目标域，跳过不匹配的域特定规则
             if target_domain and rule.domain_specific and rule.domain_specific != target_domain:
                 continue
 
-            rule_entities = self._apply_extraction_rule(cleaned_text, rule, target_domain)
+            rule_entities = self._apply_extraction_rule(cleaned_text, rule, target_domain, text_hits)
+            if core_span:
+                rule_entities = [e for e in rule_entities if core_span[0] <= e.position[0] < core_span[1]]
             entities.extend(rule_entities)
 
         # 去重和验证
         entities = self._deduplicate_entities(entities)
-        entities = self._validate_entities(entities, cleaned_text)
-
-        # 后处理
-        entities = self._post_process_entities(entities, cleaned_text, target_domain)
-
-        logger.info(f"提取到 {len(entities)} 个实体")
-        return entities
+        return self._validate_entities(entities, cleaned_text, text_hits)
 
     def _preprocess_text(self, text: str) -> str:
         """预处理文本"""
@@ -319,53 +440,59 @@ class NineDomainsEntityExtractor:
 
         return text
 
-    def _apply_extraction_rule(self, text: str, rule: ExtractionRule, target_domain: Optional[DomainType]) -> List[ExtractedEntity]:
+    def _apply_extraction_rule(self, text: str, rule: ExtractionRule, target_domain: Optional[DomainType],
+                               text_hits: Optional[GazetteerIndex] = None) -> List[ExtractedEntity]:
         """应用提取规则"""
         entities = []
+        if text_hits is None:
+            text_hits = self.gazetteer.index(text)
 
-        for pattern in rule.patterns:
-            try:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
+        for matched_text, start_pos, end_pos in self._iter_rule_matches(text, rule, text_hits):
+            entity_text = matched_text.strip()
 
-                for match in matches:
-                    entity_text = match.group(1).strip()
+            # 基础验证
+            if not self._is_valid_entity_text(entity_text):
+                continue
 
-                    # 基础验证
-                    if not self._is_valid_entity_text(entity_text):
-                        continue
+            # 提取上下文及其中的词典命中
+            context_start, context_end = self._context_span(text, start_pos, end_pos)
+            context = text[context_start:context_end].strip()
+            context_hits = text_hits.window(context_start, context_end)
 
-                    # 提取位置和上下文
-                    start_pos = match.start(1)
-                    end_pos = match.end(1)
-                    context = self._extract_context(text, start_pos, end_pos)
+            # 识别实体所属域
+            entity_domain = self._identify_entity_domain(entity_text, context, target_domain, context_hits)
 
-                    # 识别实体所属域
-                    entity_domain = self._identify_entity_domain(entity_text, context, target_domain)
+            # 计算置信度
+            confidence = self._calculate_confidence(entity_text, rule, context, entity_domain, context_hits)
 
-                    # 计算置信度
-                    confidence = self._calculate_confidence(entity_text, rule, context, entity_domain)
+            # 提取属性
+            attributes = self._extract_entity_attributes(entity_text, context, rule.entity_type, entity_domain)
 
-                    # 提取属性
-                    attributes = self._extract_entity_attributes(entity_text, context, rule.entity_type, entity_domain)
+            entity = ExtractedEntity(
+                text=entity_text,
+                entity_type=rule.entity_type,
+                domain=entity_domain,
+                confidence=confidence,
+                position=(start_pos, end_pos),
+                context=context,
+                attributes=attributes,
+                extraction_rule=rule.name
+            )
 
-                    entity = ExtractedEntity(
-                        text=entity_text,
-                        entity_type=rule.entity_type,
-                        domain=entity_domain,
-                        confidence=confidence,
-                        position=(start_pos, end_pos),
-                        context=context,
-                        attributes=attributes,
-                        extraction_rule=rule.name
-                    )
+            entities.append(entity)
 
-                    entities.append(entity)
+        return entities
 
-            except re.error as e:
-                logger.warning(f"正则表达式错误 in rule {rule.name}: {e}")
-                continue
+    def _iter_rule_matches(self, text: str, rule: ExtractionRule, text_hits: GazetteerIndex):
+        """产出规则匹配的 (文本, 起始, 结束)"""
+        if rule.gazetteer_category:
+            for hit in text_hits.select(rule.domain_specific, rule.gazetteer_category):
+                yield hit.term, hit.start, hit.end
+            return
 
-        return entities
+        for pattern in rule.compiled_patterns:
+            for match in pattern.finditer(text):
+                yield match.group(1), match.start(1), match.end(1)
 
     def _is_valid_entity_text(self, text: str) -> bool:
         """验证实体文本"""
@@ -378,72 +505,55 @@ class NineDomainsEntityExtractor:
             return False
 
         # 排除模式检查
-        for pattern in self.exclusion_patterns:
-            if re.match(pattern, text):
-                return False
+        if self.exclusion_regex.match(text):
+            return False
 
         return True
 
-    def _extract_context(self, text: str, start_pos: int, end_pos: int, window: int = 80) -> str:
-        """提取上下文"""
+    def _context_span(self, text: str, start_pos: int, end_pos: int, window: int = 80) -> Tuple[int, int]:
+        """上下文窗口的起止位置"""
         context_start = max(0, start_pos - window)
         context_end = min(len(text), end_pos + window)
 
-        context = text[context_start:context_end]
-
         # 确保上下文的完整性
         if context_start > 0:
-            # 找到前一个句号或段落开始
-            prev_boundary = text.rfind('。', 0, start_pos)
-            if prev_boundary != -1 and start_pos - prev_boundary < window * 2:
+            # 找到前一个句号或段落开始 (只需在 window * 2 范围内查找)
+            prev_boundary = text.rfind('。', max(0, start_pos - window * 2 + 1), start_pos)
+            if prev_boundary != -1:
                 context_start = prev_boundary + 1
-                context = text[context_start:context_end]
 
-        return context.strip()
+        return context_start, context_end
 
-    def _identify_entity_domain(self, entity_text: str, context: str, target_domain: Optional[DomainType]) -> Optional[DomainType]:
+    def _extract_context(self, text: str, start_pos: int, end_pos: int, window: int = 80) -> str:
+        """提取上下文"""
+        context_start, context_end = self._context_span(text, start_pos, end_pos, window)
+        return text[context_start:context_end].strip()
+
+    def _identify_entity_domain(self, entity_text: str, context: str, target_domain: Optional[DomainType],
+                                context_hits: Optional[List[GazetteerHit]] = None) -> Optional[DomainType]:
         """识别实体所属域"""
         if target_domain:
             # 如果指定了目标域，优先使用
             return target_domain
 
-        domain_scores = {}
-
-        for domain, domain_info in self.domain_specific_rules.items():
-            score = 0
-
-            # 检查签名实体
-            if entity_text in domain_info["signature_entities"]:
-                score += 10
-
-            # 检查层级标记
-            if entity_text in domain_info["hierarchy_markers"]:
-                score += 8
+        if context_hits is None:
+            context_hits = self.gazetteer.find_all(context)
 
-            # 检查机构类型
-            if entity_text in domain_info["institutions"]:
-                score += 6
+        raw_scores = {domain: 0 for domain in self.domain_specific_rules}
 
-            # 检查文化物品
-            if entity_text in domain_info["cultural_items"]:
-                score += 6
+        # 实体本身属于某域的签名实体、层级标记、机构、文化物品或仪式
+        for domain, category in self.gazetteer.lookup(entity_text):
+            raw_scores[domain] += CATEGORY_SCORES.get(category, 0)
 
-            # 检查仪式活动
-            if entity_text in domain_info["rituals"]:
-                score += 6
+        # 上下文中的域特征词 (每个不同的词计一次)
+        for domain, terms in distinct_terms(context_hits, "signature_entities").items():
+            raw_scores[domain] += 2 * len(terms)
 
-            # 检查上下文中的域特征词
-            for signature in domain_info["signature_entities"]:
-                if signature in context:
-                    score += 2
+        # 禁用词汇（负分）
+        for domain, terms in distinct_terms(context_hits, "forbidden_terms").items():
+            raw_scores[domain] -= 5 * len(terms)
 
-            # 检查禁用词汇（负分）
-            for forbidden in domain_info["forbidden_terms"]:
-                if forbidden in context:
-                    score -= 5
-
-            if score > 0:
-                domain_scores[domain] = score
+        domain_scores = {domain: score for domain, score in raw_scores.items() if score > 0}
 
         # 返回得分最高的域
         if domain_scores:
@@ -451,7 +561,8 @@ class NineDomainsEntityExtractor:
 
         return None
 
-    def _calculate_confidence(self, entity_text: str, rule: ExtractionRule, context: str, domain: Optional[DomainType]) -> float:
+    def _calculate_confidence(self, entity_text: str, rule: ExtractionRule, context: str, domain: Optional[DomainType],
+                              context_hits: Optional[List[GazetteerHit]] = None) -> float:
         """计算置信度"""
         confidence = 0.5  # 基础置信度
 
@@ -475,13 +586,13 @@ class NineDomainsEntityExtractor:
 
         # 域特征支持
         if domain and domain in self.domain_specific_rules:
-            domain_info = self.domain_specific_rules[domain]
-            signature_support = sum(1 for sig in domain_info["signature_entities"] if sig in context)
+            if context_hits is None:
+                context_hits = self.gazetteer.find_all(context)
+            signature_support = len(distinct_terms(context_hits, "signature_entities").get(domain, ()))
             confidence += signature_support * 0.03
 
         # 专有名词加成
-        if entity_text in [entity for domain_info in self.domain_specific_rules.values()
-                          for entity in domain_info["signature_entities"]]:
+        if any(category == "signature_entities" for _, category in self.gazetteer.lookup(entity_text)):
             confidence += 0.2
 
         return min(confidence, 1.0)
@@ -494,106 +605,45 @@ class NineDomainsEntityExtractor:
             "length": len(entity_text)
         }
 
-        # 规模属性
-        scale_keywords = {
-            "大型": ["庞大", "巨大", "宏大", "巨型", "超大"],
-            "中型": ["中等", "适中", "一般", "标准"],
-            "小型": ["小型", "微型", "精小", "袖珍", "迷你"]
-        }
-
-        for scale, keywords in scale_keywords.items():
-            if any(keyword in context for keyword in keywords):
-                attributes["scale"] = scale
-                break
-
-        # 时间属性
-        time_keywords = {
-            "古代": ["古代", "古时", "远古", "上古", "古老"],
-            "现代": ["现代", "当前", "如今", "现在", "当今"],
-            "传统": ["传统", "悠久", "历史", "世代"]
-        }
-
-        for time_period, keywords in time_keywords.items():
-            if any(keyword in context for keyword in keywords):
-                attributes["temporal"] = time_period
-                break
-
-        # 重要性属性
-        importance_keywords = {
-            "核心": ["核心", "根本", "基础", "关键"],
-            "重要": ["重要", "主要", "重大", "显著"],
-            "次要": ["次要", "辅助", "附属", "补充"]
-        }
-
-        for importance, keywords in importance_keywords.items():
-            if any(keyword in context for keyword in keywords):
-                attributes["importance"] = importance
-                break
-
-        # 状态属性
-        status_keywords = {
-            "活跃": ["活跃", "运行", "使用", "流行"],
-            "衰落": ["衰落", "废弃", "过时", "消失"],
-            "禁忌": ["禁忌", "禁止", "严禁", "不允许"]
-        }
-
-        for status, keywords in status_keywords.items():
-            if any(keyword in context for keyword in keywords):
-                attributes["status"] = status
-                break
+        # 规模、时间、重要性、状态属性 (每组取第一个命中的取值)
+        for attr_name, value_patterns in ATTRIBUTE_KEYWORD_PATTERNS.items():
+            for value, pattern in value_patterns:
+                if pattern.search(context):
+                    attributes[attr_name] = value
+                    break
 
         # 特定于实体类型的属性
         if entity_type == EntityType.ORGANIZATION:
             # 组织规模
-            org_scale_patterns = [
-                (r'(?:共|总共|拥有).*?(\d+).*?(?:人|员|众)', "member_count"),
-                (r'(?:设有|下辖|管辖).*?(\d+).*?(?:个|处|部)', "sub_units")
-            ]
-
-            for pattern, attr_name in org_scale_patterns:
-                match = re.search(pattern, context)
+            for pattern, attr_name in ORG_SCALE_PATTERNS:
+                match = pattern.search(context)
                 if match:
                     attributes[attr_name] = match.group(1)
 
         elif entity_type == EntityType.SYSTEM:
             # 等级数量
-            level_pattern = r'(?:分为|共有|设有).*?(\d+).*?(?:等|级|层)'
-            match = re.search(level_pattern, context)
+            match = LEVEL_COUNT_PATTERN.search(context)
             if match:
                 attributes["level_count"] = match.group(1)
 
         elif entity_type == EntityType.CURRENCY:
             # 汇率信息
-            rate_pattern = r'(\d+).*?(?:等于|换|兑).*?(\d+)'
-            match = re.search(rate_pattern, context)
+            match = EXCHANGE_RATE_PATTERN.search(context)
             if match:
                 attributes["exchange_rate"] = f"{match.group(1)}:{match.group(2)}"
 
         return attributes
 
     def _deduplicate_entities(self, entities: List[ExtractedEntity]) -> List[ExtractedEntity]:
-        """去重实体"""
-        seen = set()
-        unique_entities = []
-
-        for entity in entities:
-            # 创建唯一键
-            key = (entity.text, entity.entity_type, entity.domain)
-
-            if key not in seen:
-                seen.add(key)
-                unique_entities.append(entity)
-            else:
-                # 如果有重复，保留置信度更高的
-                for i, existing in enumerate(unique_entities):
-                    if (existing.text, existing.entity_type, existing.domain) == key:
-                        if entity.confidence > existing.confidence:
-                            unique_entities[i] = entity
-                        break
-
-        return unique_entities
-
-    def _validate_entities(self, entities: List[ExtractedEntity], text: str) -> List[ExtractedEntity]:
+        """去重实体 (同一文本/类型/域保留置信度最高的)"""
+        return best_by_key(
+            entities,
+            key=lambda entity: (entity.text, entity.entity_type, entity.domain),
+            score=lambda entity: entity.confidence
+        )
+
+    def _validate_entities(self, entities: List[ExtractedEntity], text: str,
+                           text_hits: Optional[GazetteerIndex] = None) -> List[ExtractedEntity]:
         """验证实体"""
         valid_entities = []
 
@@ -603,7 +653,7 @@ class NineDomainsEntityExtractor:
                 continue
 
             # 域一致性检查
-            if entity.domain and not self._validate_domain_consistency(entity, text):
+            if entity.domain and not self._validate_domain_consistency(entity, text, text_hits):
                 # 降低置信度而不是完全排除
                 entity.confidence *= 0.7
 
@@ -617,34 +667,31 @@ class NineDomainsEntityExtractor:
 
         return valid_entities
 
-    def _validate_domain_consistency(self, entity: ExtractedEntity, text: str) -> bool:
+    def _validate_domain_consistency(self, entity: ExtractedEntity, text: str,
+                                     text_hits: Optional[GazetteerIndex] = None) -> bool:
         """验证域一致性"""
         if not entity.domain:
             return True
 
-        domain_info = self.domain_specific_rules.get(entity.domain)
-        if not domain_info:
+        if entity.domain not in self.domain_specific_rules:
             return True
 
-        # 检查是否存在禁用词汇
-        for forbidden in domain_info["forbidden_terms"]:
-            if forbidden in entity.context:
-                return False
+        if text_hits is not None:
+            context_hits = text_hits.window(*self._context_span(text, *entity.position))
+        else:
+            context_hits = self.gazetteer.find_all(entity.context)
 
-        return True
+        # 检查是否存在禁用词汇
+        return not any(
+            hit.domain == entity.domain and hit.category == "forbidden_terms"
+            for hit in context_hits
+        )
 
     def _validate_entity_type_consistency(self, entity: ExtractedEntity) -> bool:
         """验证实体类型一致性"""
         # 简化的类型一致性检查
-        type_patterns = {
-            EntityType.ORGANIZATION: [r'(?:管理|控制|负责|设立)', r'(?:府|司|院|会|殿)'],
-            EntityType.CONCEPT: [r'(?:理论|概念|原理|规则)', r'(?:制|法|道|术)'],
-            EntityType.ITEM: [r'(?:使用|制作|持有)', r'(?:器|票|印|珠)'],
-            EntityType.RITUAL: [r'(?:举行|参与|庆祝)', r'(?:礼|祭|节|仪)']
-        }
-
-        patterns = type_patterns.get(entity.entity_type, [])
-        return any(re.search(pattern, entity.context) for pattern in patterns)
+        pattern = TYPE_CONSISTENCY_PATTERNS.get(entity.entity_type)
+        return pattern is not None and pattern.search(entity.context) is not None
 
     def _post_process_entities(self, entities: List[ExtractedEntity], text: str, target_domain: Optional[DomainType]) -> List[ExtractedEntity]:
         """后处理实体"""
@@ -4,6 +4,11 @@
 
 import asyncio
 import logging
+import pickle
+import re
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from uuid import UUID, uuid4
@@ -15,6 +20,10 @@ from .nine_domains_entity_extractor import NineDomainsEntityExtractor
 from .cross_domain_analyzer import CrossDomainAnalyzer
 from .cultural_data_validator import CulturalDataValidator
 from .cultural_data_importer import CulturalDataImporter, DatabaseConnectionManager
+from .chunked_processing import (
+    NINE_DOMAINS_HEADING_PATTERN, ChunkProcessors, ChunkResult, ChunkResultCache,
+    init_chunk_worker, process_chunk_in_worker, iter_text_chunks, merge_chunk_batches, process_text_chunk
+)
 
 from database.models.cultural_framework_models import (
     CulturalFrameworkBatch, DomainType, CulturalDimension
@@ -40,6 +49,12 @@ class NineDomainsPipeline:
         self.data_validator = CulturalDataValidator()
         self.db_manager = DatabaseConnectionManager()
         self.data_importer = None  # 延迟初始化
+        self.chunk_processors = ChunkProcessors(
+            cultural_processor=self.cultural_processor,
+            entity_extractor=self.entity_extractor,
+            cross_domain_analyzer=self.cross_domain_analyzer
+        )
+        self._chunk_executor: Optional[ProcessPoolExecutor] = None
 
         logger.info("处理组件初始化完成")
 
@@ -53,6 +68,9 @@ class NineDomainsPipeline:
             "validation_level": "NORMAL",
             "max_concurrent_processing": 3,
             "chunk_size": 5000,  # 文本分块大小
+            "enable_chunked_processing": True,  # 超过 chunk_size 的文本分块处理
+            "chunk_overlap": 400,  # 块窗口两侧的上下文重叠长度
+            "chunk_cache_size": 256,  # 块结果缓存条数，重新处理编辑后的文档时复用
             "enable_auto_fix": True,
             "save_intermediate_results": True,
             "output_detailed_logs": True
@@ -62,6 +80,8 @@ class NineDomainsPipeline:
         if self.config:
             self.settings.update(self.config)
 
+        self.chunk_cache = ChunkResultCache(self.settings["chunk_cache_size"])
+
         logger.info(f"处理设置: {self.settings}")
 
     async def process_cultural_text(self, text: str, novel_id: UUID,
@@ -175,11 +195,22 @@ class NineDomainsPipeline:
         """核心处理流程"""
         logger.info(f"开始核心处理 [{process_id}]")
 
-        # 1. 九域文化处理
-        batch_data = await self.cultural_processor.process_nine_domains_text(text, novel_id)
+        chunk_results = None
+        chunk_stats = None
+        if self.settings["enable_chunked_processing"] and len(text) > self.settings["chunk_size"]:
+            # 分块处理: 1. 九域文化处理 和 2. 增强实体提取 按块进行后合并
+            chunk_results, chunk_stats = await self._process_chunks(text, novel_id, process_id)
+            batch_data = merge_chunk_batches([result.batch for _, result in chunk_results])
+            batch_data = await self.cultural_processor.analyze_batch_relations(batch_data, novel_id)
+            enhanced_entities = self.entity_extractor.merge_entities(
+                [entity for _, result in chunk_results for entity in result.entities]
+            )
+        else:
+            # 1. 九域文化处理
+            batch_data = await self.cultural_processor.process_nine_domains_text(text, novel_id)
 
-        # 2. 增强实体提取
-        enhanced_entities = self.entity_extractor.extract_entities(text)
+            # 2. 增强实体提取
+            enhanced_entities = self.entity_extractor.extract_entities(text)
 
         # 将增强的实体合并到批次数据中
         for extracted_entity in enhanced_entities:
@@ -191,9 +222,12 @@ class NineDomainsPipeline:
         # 3. 跨域关系分析
         cross_domain_result = None
         if self.settings["enable_cross_domain_analysis"]:
-            cross_domain_result = self.cross_domain_analyzer.analyze_cross_domain_relationships(
-                text, batch_data.entities
-            )
+            if chunk_results is not None:
+                cross_domain_result = self._merge_cross_domain_results(text, chunk_results, batch_data.entities)
+            else:
+                cross_domain_result = self.cross_domain_analyzer.analyze_cross_domain_relationships(
+                    text, batch_data.entities
+                )
 
             # 将跨域关系添加到批次数据
             if cross_domain_result.get("cross_domain_relations"):
@@ -208,7 +242,8 @@ class NineDomainsPipeline:
             "relations_extracted": len(batch_data.relations),
             "plot_hooks_extracted": len(batch_data.plot_hooks),
             "concepts_extracted": len(batch_data.concepts),
-            "cross_domain_analysis": cross_domain_result is not None
+            "cross_domain_analysis": cross_domain_result is not None,
+            "chunking": chunk_stats
         }
 
         logger.info(f"核心处理完成 [{process_id}]，提取实体: {len(batch_data.entities)}")
@@ -219,6 +254,109 @@ class NineDomainsPipeline:
             "stats": stats
         }
 
+    async def _process_chunks(self, text: str, novel_id: UUID,
+                              process_id: str) -> Tuple[List[Tuple[int, ChunkResult]], Dict[str, int]]:
+        """
+        分块处理文本
+
+        未变化的块直接取缓存结果；其余块提交到进程池并发处理，同时在途的块数有上限，
+        结果按块顺序返回。进程池不可用时在当前进程内处理。
+
+        Returns:
+            ([(块窗口起始位置, 块结果)], 分块统计)
+        """
+        enable_cross_domain = self.settings["enable_cross_domain_analysis"]
+        executor = self._get_chunk_executor()
+        max_pending = self.settings["max_concurrent_processing"] * 2
+        loop = asyncio.get_running_loop()
+
+        results: List[Optional[Tuple[int, ChunkResult]]] = []
+        pending = deque()  # (结果序号, 缓存键, 块, future)
+        stats = {"chunks_total": 0, "chunks_reused": 0, "chunks_processed": 0}
+
+        async def process_inline(chunk, key) -> ChunkResult:
+            result = await process_text_chunk(chunk, novel_id, self.chunk_processors, enable_cross_domain)
+            self.chunk_cache.put(key, result)
+            return result
+
+        async def drain_oldest():
+            nonlocal executor
+            slot, key, chunk, future = pending.popleft()
+            try:
+                payload = await future
+                self.chunk_cache.put_serialized(key, payload)
+                result = pickle.loads(payload)
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning(f"分块工作进程不可用，改为进程内处理 [{process_id}]: {e}")
+                executor = None
+                self._shutdown_chunk_executor()
+                result = await process_inline(chunk, key)
+            results[slot] = (chunk.start, result)
+
+        for chunk in iter_text_chunks(text, self.settings["chunk_size"], self.settings["chunk_overlap"],
+                                      NINE_DOMAINS_HEADING_PATTERN):
+            stats["chunks_total"] += 1
+            key = chunk.content_hash(novel_id, enable_cross_domain)
+            cached = self.chunk_cache.get(key)
+            if cached is not None:
+                stats["chunks_reused"] += 1
+                results.append((chunk.start, cached))
+                continue
+
+            stats["chunks_processed"] += 1
+            results.append(None)
+            if executor is None:
+                results[-1] = (chunk.start, await process_inline(chunk, key))
+                continue
+
+            future = loop.run_in_executor(executor, process_chunk_in_worker, chunk, novel_id, enable_cross_domain)
+            pending.append((len(results) - 1, key, chunk, future))
+            if len(pending) >= max_pending:
+                await drain_oldest()
+
+        while pending:
+            await drain_oldest()
+
+        logger.info(
+            f"分块处理完成 [{process_id}]，共 {stats['chunks_total']} 块，"
+            f"复用缓存 {stats['chunks_reused']} 块"
+        )
+        return results, stats
+
+    def _merge_cross_domain_results(self, text: str, chunk_results: List[Tuple[int, ChunkResult]],
+                                    entities: List[Any]) -> Dict[str, Any]:
+        """合并各块的域提及和跨域关系，再统一做冲突、交流和网络分析"""
+        domain_mentions = defaultdict(list)
+        cross_relations = []
+
+        for chunk_start, result in chunk_results:
+            for domain, mentions in result.domain_mentions.items():
+                domain_mentions[domain].extend(
+                    (start + chunk_start, end + chunk_start, context) for start, end, context in mentions
+                )
+            cross_relations.extend(result.cross_relations)
+
+        return self.cross_domain_analyzer.summarize_cross_domain_relationships(
+            text, cross_relations, entities,
+            {domain: domain_mentions[domain] for domain in DomainType if domain in domain_mentions}
+        )
+
+    def _get_chunk_executor(self) -> Optional[ProcessPoolExecutor]:
+        """获取分块处理进程池 (并发数不大于1时不使用进程池)"""
+        workers = self.settings["max_concurrent_processing"]
+        if workers <= 1:
+            return None
+        if self._chunk_executor is None:
+            self._chunk_executor = ProcessPoolExecutor(max_workers=workers, initializer=init_chunk_worker)
+            logger.info(f"启动 {workers} 个分块处理进程")
+        return self._chunk_executor
+
+    def _shutdown_chunk_executor(self):
+        """关闭分块处理进程池"""
+        if self._chunk_executor is not None:
+            self._chunk_executor.shutdown(wait=False, cancel_futures=True)
+            self._chunk_executor = None
+
     async def _postprocess_data(self, batch_data: CulturalFrameworkBatch, novel_id: UUID,
                                process_id: str) -> Dict[str, Any]:
         """后处理数据"""
@@ -287,8 +425,8 @@ class NineDomainsPipeline:
 
     def _basic_text_cleaning(self, text: str) -> str:
         """基础文本清洗"""
-        # 移除多余空白
-        cleaned = re.sub(r'\s+', ' ', text)
+        # 移除多余空白 (保留换行，域/维度标题和段落依赖行结构)
+        cleaned = re.sub(r'[ \t]+', ' ', text)
         cleaned = re.sub(r'\n\s*\n', '\n\n', cleaned)
 
         # 标准化标点符号
@@ -299,26 +437,11 @@ class NineDomainsPipeline:
         return cleaned.strip()
 
     def _split_text_into_chunks(self, text: str) -> List[str]:
-        """将文本分割成块"""
-        chunks = []
-        chunk_size = self.settings["chunk_size"]
-
-        # 按段落分割
-        paragraphs = text.split('\n\n')
-        current_chunk = ""
-
-        for paragraph in paragraphs:
-            if len(current_chunk + paragraph) <= chunk_size:
-                current_chunk += paragraph + '\n\n'
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = paragraph + '\n\n'
-
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-
-        return chunks
+        """将文本分割成块 (与分块处理使用相同的段落边界)"""
+        return [
+            chunk.core_text.strip()
+            for chunk in iter_text_chunks(text, self.settings["chunk_size"])
+        ]
 
     def _convert_extracted_entity(self, extracted_entity, novel_id: UUID):
         """转换提取的实体格式"""
@@ -553,6 +676,7 @@ class NineDomainsPipeline:
 
     async def close(self):
         """关闭资源"""
+        self._shutdown_chunk_executor()
         if self.db_manager:
             await self.db_manager.close()
         logger.info("处理管道资源已关闭")
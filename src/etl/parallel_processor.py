@@ -0,0 +1,214 @@
+"""
+Parallel record processing for the ETL pipeline
+
+Text cleaning, jieba segmentation, regex entity extraction and validation are
+pure CPU work; run on the event loop they serialize the whole pipeline and
+starve the loaders. This module runs that transform stage in a process pool:
+
+- Each worker builds its TextProcessor / EntityExtractor / DataValidator once
+  (jieba dictionaries and compiled entity patterns are loaded per process, not
+  per record)
+- Record batches are split into chunks so IPC overhead is paid per chunk
+- Chunk results are yielded back in input order as soon as they are ready
+"""
+
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .types import ContentType, PipelineConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecordOutcome:
+    """Result of transforming one raw record."""
+    record_id: Any
+    processed: Optional[Dict[str, Any]] = None  # None if the record was dropped
+    entities_count: int = 0
+    validation_errors: Optional[List[Any]] = None  # set if validation failed
+    error: Optional[str] = None  # set if processing raised
+
+
+@dataclass
+class RecordProcessors:
+    """The per-process set of CPU-stage processors."""
+    text_processor: Any
+    entity_extractor: Any
+    data_validator: Any
+    enable_entity_extraction: bool = True
+    enable_validation: bool = True
+
+    @classmethod
+    def from_config(cls, config: PipelineConfig) -> "RecordProcessors":
+        """Build processors from pipeline configuration."""
+        from .text_processor import TextProcessor
+        from .entity_extractor import EntityExtractor
+        from .data_validator import DataValidator
+
+        return cls(
+            text_processor=TextProcessor(
+                enable_chinese_segmentation=config.chinese_segmentation,
+                traditional_to_simplified=config.traditional_to_simplified
+            ),
+            entity_extractor=EntityExtractor(),
+            data_validator=DataValidator(),
+            enable_entity_extraction=config.enable_entity_extraction,
+            enable_validation=config.enable_validation
+        )
+
+
+async def transform_record(record: Dict[str, Any],
+                           content_type: ContentType,
+                           processors: RecordProcessors) -> RecordOutcome:
+    """
+    Clean, extract entities from and validate a single record.
+
+    Shared by the in-process path and the worker processes so both produce
+    identical processed records.
+
+    Args:
+        record: Raw record with 'id', 'content' and optional 'metadata'
+        content_type: Type of content being processed
+        processors: Processors to run the record through
+
+    Returns:
+        RecordOutcome describing the processed record or why it was dropped
+    """
+    record_id = record.get('id')
+    try:
+        # 1. Text preprocessing and cleaning
+        cleaned_text = await processors.text_processor.clean_text(record.get('content', ''))
+
+        # 2. Entity extraction (if enabled)
+        entities = []
+        if processors.enable_entity_extraction:
+            entities = await processors.entity_extractor.extract_entities(cleaned_text, content_type)
+
+        # 3. Data validation (if enabled)
+        if processors.enable_validation:
+            validation_result = await processors.data_validator.validate_record(record, content_type)
+            if not validation_result.is_valid:
+                return RecordOutcome(
+                    record_id=record_id,
+                    entities_count=len(entities),
+                    validation_errors=validation_result.issues
+                )
+
+        # 4. Prepare processed record
+        processed_record = {
+            'original_id': record_id,
+            'content_type': content_type.value,
+            'original_content': record.get('content'),
+            'cleaned_content': cleaned_text,
+            'entities': entities,
+            'metadata': record.get('metadata', {}),
+            'processed_at': datetime.now().isoformat(),
+            'pipeline_version': '1.0'
+        }
+        return RecordOutcome(record_id=record_id, processed=processed_record,
+                             entities_count=len(entities))
+
+    except Exception as e:
+        return RecordOutcome(record_id=record_id, error=str(e))
+
+
+# Per-process state, populated by the pool initializer
+_worker_processors: Optional[RecordProcessors] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_worker(config: PipelineConfig):
+    """Process pool initializer: load dictionaries and patterns once per worker."""
+    global _worker_processors, _worker_loop
+    _worker_processors = RecordProcessors.from_config(config)
+    _worker_loop = asyncio.new_event_loop()
+
+
+def _process_chunk_in_worker(records: List[Dict[str, Any]], content_type_value: str) -> List[RecordOutcome]:
+    """Transform a chunk of records inside a worker process."""
+    content_type = ContentType(content_type_value)
+
+    async def run_chunk():
+        return [await transform_record(record, content_type, _worker_processors) for record in records]
+
+    return _worker_loop.run_until_complete(run_chunk())
+
+
+class ParallelRecordProcessor:
+    """
+    Runs the CPU-bound transform stage in a process pool.
+
+    Usage:
+        processor = ParallelRecordProcessor(config)
+        async for outcome in processor.process(batch, ContentType.PLOT):
+            ...
+        processor.shutdown()
+    """
+
+    def __init__(self, config: PipelineConfig):
+        self.config = config
+        self.workers = max(1, config.processing_workers)
+        self.chunk_size = max(1, config.processing_chunk_size)
+        # Chunks in flight; enough to keep every worker busy while results drain
+        self.max_pending = self.workers * 2
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.config,)
+            )
+            logger.info(f"Started {self.workers} text processing workers")
+        return self._executor
+
+    def _chunks(self, records: List[Dict[str, Any]]):
+        for start in range(0, len(records), self.chunk_size):
+            yield records[start:start + self.chunk_size]
+
+    async def process(self,
+                      records: List[Dict[str, Any]],
+                      content_type: ContentType) -> AsyncIterator[RecordOutcome]:
+        """
+        Transform records in worker processes.
+
+        Args:
+            records: Raw records to transform
+            content_type: Type of content being processed
+
+        Yields:
+            RecordOutcome for every record, in input order
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pending = deque()
+        chunks = self._chunks(records)
+
+        try:
+            for chunk in chunks:
+                pending.append(loop.run_in_executor(
+                    executor, _process_chunk_in_worker, chunk, content_type.value
+                ))
+                if len(pending) >= self.max_pending:
+                    for outcome in await pending.popleft():
+                        yield outcome
+
+            while pending:
+                for outcome in await pending.popleft():
+                    yield outcome
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -10,20 +10,23 @@ Manages the entire ETL pipeline including:
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, field
 from enum import Enum
+from concurrent.futures.process import BrokenProcessPool
 import json
 from pathlib import Path
 
 from database.connections.postgresql import postgres_db
 from database.connections.mongodb import mongodb
-from .types import ContentType, PipelineConfig, ProcessingMetrics, PipelineStatus
+from .types import ContentType, PipelineConfig, ProcessingMetrics, PipelineStatus, LoadBatchMetrics
 from .text_processor import TextProcessor
 from .entity_extractor import EntityExtractor
 from .data_validator import DataValidator
 from .stream_processor import StreamProcessor
+from .parallel_processor import ParallelRecordProcessor, RecordOutcome, RecordProcessors, transform_record
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +41,16 @@ class PipelineManager:
     - Incremental updates with checkpointing
     - Data quality validation
     - Entity extraction and relationship mapping
-    - Dual database output (PostgreSQL + MongoDB)
+    - Dual database output (PostgreSQL + MongoDB) with buffered bulk loads
     """
 
+    POSTGRES_COLUMNS = [
+        'original_id', 'content_type', 'original_content', 'cleaned_content',
+        'entities_count', 'metadata', 'processed_at', 'pipeline_version'
+    ]
+    POSTGRES_CONFLICT_COLUMNS = ['original_id', 'content_type']
+    POSTGRES_UPDATE_COLUMNS = ['cleaned_content', 'entities_count', 'processed_at']
+
     def __init__(self, config: PipelineConfig = None):
         self.config = config or PipelineConfig()
         self.status = PipelineStatus.PENDING
@@ -54,11 +64,28 @@ class PipelineManager:
         self.entity_extractor = EntityExtractor()
         self.data_validator = DataValidator()
         self.stream_processor = StreamProcessor()
+        self.record_processors = RecordProcessors(
+            text_processor=self.text_processor,
+            entity_extractor=self.entity_extractor,
+            data_validator=self.data_validator,
+            enable_entity_extraction=self.config.enable_entity_extraction,
+            enable_validation=self.config.enable_validation
+        )
+
+        # CPU-bound transform stage runs off the event loop when workers are configured
+        self.parallel_processor: Optional[ParallelRecordProcessor] = None
+        if self.config.processing_workers > 0:
+            self.parallel_processor = ParallelRecordProcessor(self.config)
 
         # Checkpoint management
         self.checkpoint_file = Path("pipeline_checkpoint.json")
         self.last_checkpoint = self._load_checkpoint()
 
+        # Bulk load buffers, flushed by size or age
+        self._load_buffers: Dict[ContentType, List[Dict[str, Any]]] = {}
+        self._load_buffered_since: Dict[ContentType, float] = {}
+        self._load_lock = asyncio.Lock()
+
         # Pipeline callbacks
         self.on_batch_complete: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
@@ -128,8 +155,9 @@ class PipelineManager:
                     await self._process_batch_data(batch_data, content_type)
                     self.metrics.processed_records += len(batch_data)
 
-                    # Save checkpoint periodically
+                    # Save checkpoint periodically (only after buffered records are loaded)
                     if (batch_idx + len(batch_data)) % self.config.checkpoint_interval == 0:
+                        await self.flush_loads(content_type)
                         await self._save_batch_checkpoint(content_type, batch_idx + len(batch_data))
 
                     # Call batch complete callback
@@ -143,6 +171,8 @@ class PipelineManager:
                     if self.on_error:
                         await self.on_error(e, batch_data)
 
+            await self.flush_loads(content_type)
+
             self.metrics.end_time = datetime.now()
             self.metrics.calculate_rate()
             self.status = PipelineStatus.COMPLETED
@@ -177,113 +207,161 @@ class PipelineManager:
 
     async def _process_batch_data(self, batch_data: List[Dict[str, Any]], content_type: ContentType):
         """Process a batch of data through the pipeline."""
-        processed_data = []
-
-        for record in batch_data:
-            try:
-                # 1. Text preprocessing and cleaning
-                cleaned_text = await self.text_processor.clean_text(record.get('content', ''))
-
-                # 2. Entity extraction (if enabled)
-                entities = []
-                if self.config.enable_entity_extraction:
-                    entities = await self.entity_extractor.extract_entities(
-                        cleaned_text, content_type
-                    )
-                    self.metrics.extracted_entities += len(entities)
-
-                # 3. Data validation (if enabled)
-                if self.config.enable_validation:
-                    validation_result = await self.data_validator.validate_record(
-                        record, content_type
-                    )
-                    if not validation_result.is_valid:
-                        self.metrics.validation_errors += 1
-                        logger.warning(f"Validation failed for record {record.get('id')}: "
-                                     f"{validation_result.errors}")
-                        continue
-
-                # 4. Prepare processed record
-                processed_record = {
-                    'original_id': record.get('id'),
-                    'content_type': content_type.value,
-                    'original_content': record.get('content'),
-                    'cleaned_content': cleaned_text,
-                    'entities': entities,
-                    'metadata': record.get('metadata', {}),
-                    'processed_at': datetime.now().isoformat(),
-                    'pipeline_version': '1.0'
-                }
-
-                processed_data.append(processed_record)
+        outcomes = await self._transform_records(batch_data, content_type)
 
-            except Exception as e:
-                logger.error(f"Failed to process record {record.get('id')}: {e}")
-                continue
+        processed_data = []
+        for outcome in outcomes:
+            self.metrics.extracted_entities += outcome.entities_count
+
+            if outcome.error is not None:
+                logger.error(f"Failed to process record {outcome.record_id}: {outcome.error}")
+            elif outcome.validation_errors is not None:
+                self.metrics.validation_errors += 1
+                logger.warning(f"Validation failed for record {outcome.record_id}: "
+                             f"{outcome.validation_errors}")
+            else:
+                processed_data.append(outcome.processed)
 
         # 5. Load to databases
         await self._load_processed_data(processed_data, content_type)
 
+    async def _transform_records(self, batch_data: List[Dict[str, Any]],
+                                 content_type: ContentType) -> List[RecordOutcome]:
+        """Run clean/extract/validate, in worker processes when configured."""
+        if self.parallel_processor is not None:
+            try:
+                return [outcome async for outcome in self.parallel_processor.process(batch_data, content_type)]
+            except (OSError, BrokenProcessPool) as e:
+                logger.warning(f"Text processing workers unavailable, falling back to in-process: {e}")
+                self.parallel_processor.shutdown(wait=False)
+                self.parallel_processor = None
+
+        return [await transform_record(record, content_type, self.record_processors)
+                for record in batch_data]
+
     async def _load_processed_data(self, processed_data: List[Dict[str, Any]], content_type: ContentType):
-        """Load processed data to target databases."""
+        """Buffer processed data and bulk load it once a batch is full or stale."""
         if not processed_data:
             return
 
-        try:
-            # Load to PostgreSQL (structured data)
-            if self.config.output_postgres:
-                await self._load_to_postgres(processed_data, content_type)
+        buffer = self._load_buffers.setdefault(content_type, [])
+        if not buffer:
+            self._load_buffered_since[content_type] = time.monotonic()
+        buffer.extend(processed_data)
+
+        age = time.monotonic() - self._load_buffered_since[content_type]
+        if len(buffer) >= self.config.load_batch_size or age >= self.config.load_flush_interval:
+            await self.flush_loads(content_type)
+
+    async def flush_loads(self, content_type: Optional[ContentType] = None):
+        """Load all buffered records (for one content type or all) to target databases."""
+        async with self._load_lock:
+            content_types = [content_type] if content_type else list(self._load_buffers)
+
+            for ctype in content_types:
+                records = self._load_buffers.pop(ctype, [])
+                buffered_since = self._load_buffered_since.pop(ctype, None)
+
+                for start in range(0, len(records), self.config.load_batch_size):
+                    batch = records[start:start + self.config.load_batch_size]
+                    try:
+                        # Load to PostgreSQL (structured data)
+                        if self.config.output_postgres:
+                            await self._load_to_postgres(batch, ctype)
+
+                        # Load to MongoDB (document storage)
+                        if self.config.output_mongodb:
+                            await self._load_to_mongodb(batch, ctype)
+
+                    except Exception as e:
+                        logger.error(f"Failed to load {len(batch)} processed records: {e}")
+                        self._restore_load_buffer(ctype, records[start:], buffered_since)
+                        raise
+
+    def _restore_load_buffer(self, content_type: ContentType, records: List[Dict[str, Any]],
+                             buffered_since: Optional[float]):
+        """Put records from a failed load back in front of anything buffered since, for the next flush.
+
+        Both targets upsert by (original_id, content_type), so reloading a batch that
+        one target already accepted is harmless.
+        """
+        buffer = self._load_buffers.setdefault(content_type, [])
+        buffer[:0] = records
+        since = [t for t in (buffered_since, self._load_buffered_since.get(content_type)) if t is not None]
+        self._load_buffered_since[content_type] = min(since) if since else time.monotonic()
+
+    async def _periodic_flush(self):
+        """Flush partially filled load buffers that exceeded the flush interval."""
+        while True:
+            await asyncio.sleep(self.config.load_flush_interval)
+            now = time.monotonic()
+            stale = [
+                ctype for ctype, since in list(self._load_buffered_since.items())
+                if now - since >= self.config.load_flush_interval
+            ]
+            for ctype in stale:
+                try:
+                    await self.flush_loads(ctype)
+                except Exception as e:
+                    logger.error(f"Periodic load flush failed for {ctype.value}: {e}")
+                    if self.on_error:
+                        await self.on_error(e, [])
 
-            # Load to MongoDB (document storage)
-            if self.config.output_mongodb:
-                await self._load_to_mongodb(processed_data, content_type)
+    @staticmethod
+    def _dedupe_by_key(processed_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the latest record per (original_id, content_type)."""
+        latest = {}
+        for record in processed_data:
+            latest[(str(record['original_id']), record['content_type'])] = record
+        return list(latest.values())
 
-        except Exception as e:
-            logger.error(f"Failed to load processed data: {e}")
-            raise
+    def _record_load(self, target: str, collection: str, rows: int, started: float):
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.metrics.record_load(LoadBatchMetrics(
+            target=target, collection=collection, rows=rows, latency_ms=latency_ms
+        ))
+        logger.debug(f"Loaded {rows} rows into {target}.{collection} in {latency_ms:.1f} ms")
 
     async def _load_to_postgres(self, processed_data: List[Dict[str, Any]], content_type: ContentType):
-        """Load processed data to PostgreSQL."""
+        """Load processed data to PostgreSQL with COPY into a staging table and one merge."""
         table_name = f"processed_{content_type.value}"
+        started = time.perf_counter()
+
+        records = [
+            (
+                str(record['original_id']),
+                record['content_type'],
+                record['original_content'],
+                record['cleaned_content'],
+                len(record['entities']),
+                json.dumps(record['metadata'], ensure_ascii=False),
+                datetime.fromisoformat(record['processed_at']),
+                record['pipeline_version']
+            )
+            for record in self._dedupe_by_key(processed_data)
+        ]
 
-        # Prepare INSERT statement (simplified)
-        insert_query = f"""
-        INSERT INTO {table_name}
-        (original_id, content_type, original_content, cleaned_content,
-         entities_count, metadata, processed_at, pipeline_version)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        ON CONFLICT (original_id, content_type)
-        DO UPDATE SET
-            cleaned_content = EXCLUDED.cleaned_content,
-            entities_count = EXCLUDED.entities_count,
-            processed_at = EXCLUDED.processed_at
-        """
-
-        async with postgres_db.get_connection() as conn:
-            for record in processed_data:
-                await conn.execute(
-                    insert_query,
-                    record['original_id'],
-                    record['content_type'],
-                    record['original_content'],
-                    record['cleaned_content'],
-                    len(record['entities']),
-                    json.dumps(record['metadata']),
-                    record['processed_at'],
-                    record['pipeline_version']
-                )
+        rows = await postgres_db.copy_upsert(
+            table_name,
+            self.POSTGRES_COLUMNS,
+            records,
+            conflict_columns=self.POSTGRES_CONFLICT_COLUMNS,
+            update_columns=self.POSTGRES_UPDATE_COLUMNS
+        )
+        self._record_load('postgres', table_name, rows, started)
 
     async def _load_to_mongodb(self, processed_data: List[Dict[str, Any]], content_type: ContentType):
-        """Load processed data to MongoDB."""
+        """Load processed data to MongoDB with a single unordered bulk upsert."""
         collection_name = f"processed_{content_type.value}"
+        started = time.perf_counter()
 
         # Use upsert for incremental updates
-        for record in processed_data:
-            await mongodb.update_one(
-                collection_name,
-                {"original_id": record['original_id'], "content_type": record['content_type']},
-                record
-            )
+        result = await mongodb.bulk_upsert(
+            collection_name,
+            self._dedupe_by_key(processed_data),
+            key_fields=['original_id', 'content_type']
+        )
+        self._record_load('mongodb', collection_name, result['matched'] + result['upserted'], started)
 
     async def _save_batch_checkpoint(self, content_type: ContentType, position: int):
         """Save batch processing checkpoint."""
@@ -300,7 +378,12 @@ class PipelineManager:
             raise ValueError("Streaming is disabled in configuration")
 
         logger.info(f"Starting streaming pipeline for {content_type.value}")
-        await self.stream_processor.start_stream(content_type, source_config, self._process_stream_data)
+        flush_task = asyncio.create_task(self._periodic_flush())
+        try:
+            await self.stream_processor.start_stream(content_type, source_config, self._process_stream_data)
+        finally:
+            flush_task.cancel()
+            await self.flush_loads()
 
     async def _process_stream_data(self, data: Dict[str, Any], content_type: ContentType):
         """Process streaming data."""
@@ -322,6 +405,12 @@ class PipelineManager:
             self.status = PipelineStatus.RUNNING
             logger.info("Pipeline execution resumed")
 
+    def shutdown_workers(self):
+        """Stop text processing worker processes, if any."""
+        if self.parallel_processor is not None:
+            self.parallel_processor.shutdown()
+            logger.info("Text processing workers stopped")
+
     def get_pipeline_status(self) -> Dict[str, Any]:
         """Get current pipeline status and metrics."""
         return {
@@ -333,11 +422,18 @@ class PipelineManager:
                 'failed_records': self.metrics.failed_records,
                 'extracted_entities': self.metrics.extracted_entities,
                 'validation_errors': self.metrics.validation_errors,
-                'processing_rate': self.metrics.processing_rate
+                'processing_rate': self.metrics.processing_rate,
+                'loaded_rows': self.metrics.loaded_rows,
+                'load_batches': self.metrics.load_batch_count,
+                'load_time_ms': round(self.metrics.load_time_ms, 2)
             },
             'config': {
                 'batch_size': self.config.batch_size,
+                'load_batch_size': self.config.load_batch_size,
+                'load_flush_interval': self.config.load_flush_interval,
                 'max_workers': self.config.max_workers,
+                'processing_workers': self.config.processing_workers,
+                'processing_chunk_size': self.config.processing_chunk_size,
                 'enable_streaming': self.config.enable_streaming,
                 'enable_validation': self.config.enable_validation,
                 'enable_entity_extraction': self.config.enable_entity_extraction
@@ -13,15 +13,16 @@ Advanced streaming data processing system including:
 import asyncio
 import logging
 import json
-from typing import Dict, List, Any, Optional, Callable, Union, AsyncGenerator
+from typing import Dict, List, Any, Optional, Callable, Union, AsyncGenerator, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 import uuid
-from collections import deque, defaultdict
+import heapq
+import math
+from collections import Counter, deque, defaultdict
 import weakref
 from concurrent.futures import ThreadPoolExecutor
-import threading
 import time
 
 from .types import ContentType, PipelineConfig
@@ -31,6 +32,8 @@ from .data_validator import DataValidator
 
 logger = logging.getLogger(__name__)
 
+WATERMARK_MODES = ("processing_time", "event_time")
+
 
 class StreamEventType(Enum):
     """Types of streaming events."""
@@ -72,9 +75,26 @@ class StreamWindow:
     window_id: str
     start_time: datetime
     end_time: datetime
-    events: List[StreamEvent] = field(default_factory=list)
+    events: List[StreamEvent] = field(default_factory=list)  # bounded sample, see max_retained_events
     is_closed: bool = False
     processed: bool = False
+    event_count: int = 0
+    content_types: Counter = field(default_factory=Counter)
+    sources: Counter = field(default_factory=Counter)
+    first_event_time: Optional[datetime] = None
+    last_event_time: Optional[datetime] = None
+
+    def add_event(self, event: StreamEvent, max_retained_events: int = 0):
+        """Fold an event into the window aggregates."""
+        self.event_count += 1
+        self.content_types[event.content_type.value] += 1
+        self.sources[event.source] += 1
+        if self.first_event_time is None or event.timestamp < self.first_event_time:
+            self.first_event_time = event.timestamp
+        if self.last_event_time is None or event.timestamp > self.last_event_time:
+            self.last_event_time = event.timestamp
+        if len(self.events) < max_retained_events:
+            self.events.append(event)
 
 
 @dataclass
@@ -90,146 +110,343 @@ class StreamMetrics:
 
 
 class StreamBuffer:
-    """Thread-safe buffer for stream events with backpressure control."""
+    """
+    Bounded asyncio buffer for stream events with backpressure control.
+
+    All waiting happens on the event loop (no executor threads). Producers on
+    other threads use put_threadsafe(). Backpressure engages when the buffer
+    reaches the high watermark and is released once consumers drain it to the
+    low watermark; producers can await wait_for_capacity() to follow it.
+    After close() puts are refused and consumers drain what is left without
+    waiting.
+    """
 
-    def __init__(self, max_size: int = 10000, high_watermark: float = 0.8):
+    def __init__(self, max_size: int = 10000, high_watermark: float = 0.8, low_watermark: float = 0.5):
         self.max_size = max_size
         self.high_watermark = high_watermark
-        self.buffer = deque()
-        self.lock = threading.Lock()
-        self.not_full = threading.Condition(self.lock)
-        self.not_empty = threading.Condition(self.lock)
-        self._size = 0
+        self.low_watermark = min(low_watermark, high_watermark)
+        self.buffer: deque = deque()
+        self._high_mark = max(1, int(max_size * high_watermark))
+        self._low_mark = int(max_size * self.low_watermark)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Event state: not_empty / not_full mirror the buffer size, item_added
+        # wakes batch consumers lingering for more items
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._item_added = asyncio.Event()
+        self._capacity_available = asyncio.Event()
+        self._capacity_available.set()
+
+        self.backpressure_active = False
+        self.backpressure_engaged_count = 0
+        self.closed = False
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Bind the event loop that thread-safe producers hand events to."""
+        self._loop = loop
+
+    def open(self):
+        """Accept events again after close()."""
+        self.closed = False
+        self._item_added.clear()
+        if not self.buffer:
+            self._not_empty.clear()
+        if self.backpressure_active:
+            self._capacity_available.clear()
+
+    def close(self):
+        """Refuse further puts and wake every waiting producer and consumer."""
+        self.closed = True
+        self._not_empty.set()
+        self._not_full.set()
+        self._item_added.set()
+        self._capacity_available.set()
+
+    def _append(self, event: StreamEvent):
+        self.buffer.append(event)
+        size = len(self.buffer)
+
+        self._not_empty.set()
+        self._item_added.set()
+        if size >= self.max_size:
+            self._not_full.clear()
+        if size >= self._high_mark and not self.backpressure_active:
+            self.backpressure_active = True
+            self.backpressure_engaged_count += 1
+            self._capacity_available.clear()
+            logger.warning(f"Stream buffer reached high watermark ({size}/{self.max_size}), applying backpressure")
+
+    def _drain(self, max_items: int) -> List[StreamEvent]:
+        count = min(max_items, len(self.buffer))
+        popleft = self.buffer.popleft
+        events = [popleft() for _ in range(count)]
+        size = len(self.buffer)
+
+        if size == 0:
+            self._not_empty.clear()
+        if size < self.max_size:
+            self._not_full.set()
+        if self.backpressure_active and size <= self._low_mark:
+            self.backpressure_active = False
+            self._capacity_available.set()
+            logger.debug(f"Stream buffer drained to {size}, backpressure released")
+        return events
+
+    def put_nowait(self, event: StreamEvent) -> bool:
+        """Add event if there is room; never waits."""
+        if self.closed or len(self.buffer) >= self.max_size:
+            return False
+        self._append(event)
+        return True
 
     async def put(self, event: StreamEvent, timeout: float = 5.0) -> bool:
-        """Add event to buffer with timeout."""
-        def _put():
-            with self.not_full:
-                if not self.not_full.wait_for(lambda: self._size < self.max_size, timeout=timeout):
-                    return False
-                self.buffer.append(event)
-                self._size += 1
-                self.not_empty.notify()
-                return True
-
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _put)
+        """Add event to buffer, waiting up to timeout seconds for room; False if closed."""
+        if self.closed:
+            return False
+        if len(self.buffer) < self.max_size:
+            self._append(event)
+            return True
+
+        async def wait_not_full():
+            while len(self.buffer) >= self.max_size and not self.closed:
+                await self._not_full.wait()
+
+        try:
+            await asyncio.wait_for(wait_not_full(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        if self.closed:
+            return False
+        self._append(event)
+        return True
+
+    def put_threadsafe(self, event: StreamEvent, timeout: float = 5.0) -> bool:
+        """Add event from a non-event-loop thread (e.g. a file watcher); blocks that thread while full."""
+        if self._loop is None:
+            raise RuntimeError("StreamBuffer is not bound to an event loop")
+        future = asyncio.run_coroutine_threadsafe(self.put(event, timeout), self._loop)
+        try:
+            return future.result(timeout + 1.0)
+        except Exception:
+            future.cancel()
+            return False
 
     async def get(self, timeout: float = 1.0) -> Optional[StreamEvent]:
         """Get event from buffer with timeout."""
-        def _get():
-            with self.not_empty:
-                if not self.not_empty.wait_for(lambda: self._size > 0, timeout=timeout):
-                    return None
-                event = self.buffer.popleft()
-                self._size -= 1
-                self.not_full.notify()
-                return event
-
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, _get)
+        events = await self.get_many(max_items=1, timeout=timeout)
+        return events[0] if events else None
+
+    async def get_many(self,
+                       max_items: int = 100,
+                       max_wait: float = 0.0,
+                       timeout: Optional[float] = 1.0) -> List[StreamEvent]:
+        """
+        Drain a micro-batch of events.
+
+        Args:
+            max_items: Maximum events to return
+            max_wait: Once the first event is available, how long to linger for
+                the batch to fill up (0 returns whatever is buffered)
+            timeout: How long to wait for the first event (None waits forever)
+
+        Returns:
+            Up to max_items events in arrival order; empty on timeout, or
+            immediately once the buffer is closed and drained
+        """
+        if not self.buffer and not self.closed:
+            try:
+                await asyncio.wait_for(self._not_empty.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+        if max_wait > 0 and len(self.buffer) < max_items and not self.closed:
+            async def wait_for_batch():
+                while len(self.buffer) < max_items and not self.closed:
+                    self._item_added.clear()
+                    await self._item_added.wait()
+
+            try:
+                await asyncio.wait_for(wait_for_batch(), max_wait)
+            except asyncio.TimeoutError:
+                pass
+
+        return self._drain(max_items)
+
+    async def wait_for_capacity(self, timeout: Optional[float] = None) -> bool:
+        """Wait until backpressure is released; False on timeout."""
+        if not self.backpressure_active:
+            return True
+        try:
+            await asyncio.wait_for(self._capacity_available.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
 
     def is_high_watermark(self) -> bool:
         """Check if buffer is at high watermark."""
-        with self.lock:
-            return self._size >= (self.max_size * self.high_watermark)
+        return len(self.buffer) >= self._high_mark
 
     def size(self) -> int:
         """Get current buffer size."""
-        with self.lock:
-            return self._size
+        return len(self.buffer)
 
     def clear(self):
         """Clear the buffer."""
-        with self.lock:
-            self.buffer.clear()
-            self._size = 0
-            self.not_full.notify_all()
+        self._drain(len(self.buffer))
 
 
 class WindowManager:
-    """Manages time-based windows for stream processing."""
+    """
+    Manages sliding time windows for stream processing.
+
+    Windows are identified by their slot (start time divided by the slide
+    interval), so the windows containing an event are computed from its
+    timestamp instead of searched for: window_size / slide_interval slots
+    per event regardless of how many windows exist. Open windows are kept
+    in a heap ordered by end time; advancing the watermark closes windows
+    from the top of the heap, and processed windows are retired from a
+    second heap the same way. Windows hold running aggregates rather than
+    their events.
+
+    Watermark modes:
+    - processing_time: wall clock minus allowed_lateness
+    - event_time: latest event timestamp seen minus allowed_lateness
+
+    Events whose windows have all passed the watermark are late; they are
+    counted and not added to any window.
+    """
+
+    def __init__(self,
+                 window_size: timedelta,
+                 slide_interval: timedelta,
+                 allowed_lateness: timedelta = timedelta(0),
+                 watermark_mode: str = "processing_time",
+                 max_retained_events: int = 0):
+        if watermark_mode not in WATERMARK_MODES:
+            raise ValueError(f"Unknown watermark mode: {watermark_mode}")
+        if window_size.total_seconds() <= 0 or slide_interval.total_seconds() <= 0:
+            raise ValueError("Window size and slide interval must be positive")
 
-    def __init__(self, window_size: timedelta, slide_interval: timedelta):
         self.window_size = window_size
         self.slide_interval = slide_interval
+        self.allowed_lateness = allowed_lateness
+        self.watermark_mode = watermark_mode
+        self.max_retained_events = max_retained_events
+
+        self._size = window_size.total_seconds()
+        self._slide = slide_interval.total_seconds()
+        self._lateness = allowed_lateness.total_seconds()
+
+        # All tracked windows by id; open windows by slot
         self.windows: Dict[str, StreamWindow] = {}
+        self._open: Dict[int, StreamWindow] = {}
+        self._open_heap: List[Tuple[float, int]] = []  # (end epoch, slot)
+        self._ready: Dict[str, StreamWindow] = {}  # closed, not yet processed, in end order
+        self._processed_heap: List[Tuple[float, str]] = []  # (end epoch, window_id)
+
+        self.watermark = float("-inf")
+        self._max_event_time = float("-inf")
+        self.late_events = 0
         self.lock = asyncio.Lock()
 
     async def add_event(self, event: StreamEvent) -> List[str]:
-        """Add event to appropriate windows and return affected window IDs."""
+        """Add event to its windows and return affected window IDs (empty for a late event)."""
+        event_time = event.timestamp.timestamp()
+
         async with self.lock:
+            if event_time > self._max_event_time:
+                self._max_event_time = event_time
+            self._advance_watermark()
+
             affected_windows = []
+            first_slot = math.floor((event_time - self._size) / self._slide) + 1
+            last_slot = math.floor(event_time / self._slide)
 
-            # Find all windows that should contain this event
-            for window_id, window in self.windows.items():
-                if (window.start_time <= event.timestamp < window.end_time and
-                    not window.is_closed):
-                    window.events.append(event)
-                    affected_windows.append(window_id)
-
-            # Create new window if needed
-            current_time = datetime.now()
-            window_start = self._align_to_slide_interval(event.timestamp)
-            window_id = f"window_{window_start.isoformat()}"
-
-            if window_id not in self.windows:
-                window_end = window_start + self.window_size
-                new_window = StreamWindow(
-                    window_id=window_id,
-                    start_time=window_start,
-                    end_time=window_end,
-                    events=[event]
-                )
-                self.windows[window_id] = new_window
-                affected_windows.append(window_id)
+            for slot in range(first_slot, last_slot + 1):
+                window = self._open.get(slot)
+                if window is None:
+                    if slot * self._slide + self._size <= self.watermark:
+                        continue  # already closed
+                    window = self._open_window(slot)
+                window.add_event(event, self.max_retained_events)
+                affected_windows.append(window.window_id)
 
-            # Close expired windows
-            expired_windows = []
-            for window_id, window in self.windows.items():
-                if current_time >= window.end_time and not window.is_closed:
-                    window.is_closed = True
-                    expired_windows.append(window_id)
+            if not affected_windows:
+                self.late_events += 1
 
             return affected_windows
 
     async def get_ready_windows(self) -> List[StreamWindow]:
         """Get windows that are ready for processing."""
         async with self.lock:
-            ready_windows = []
-            current_time = datetime.now()
-
-            for window in self.windows.values():
-                if (window.is_closed and not window.processed and
-                    current_time >= window.end_time):
-                    ready_windows.append(window)
-
-            return ready_windows
+            self._advance_watermark()
+            return list(self._ready.values())
 
     async def mark_window_processed(self, window_id: str):
         """Mark a window as processed."""
         async with self.lock:
-            if window_id in self.windows:
-                self.windows[window_id].processed = True
+            window = self._ready.pop(window_id, None)
+            if window is not None:
+                window.processed = True
+                heapq.heappush(self._processed_heap, (window.end_time.timestamp(), window_id))
 
     async def cleanup_old_windows(self, retention_period: timedelta):
         """Remove old processed windows."""
         async with self.lock:
-            cutoff_time = datetime.now() - retention_period
-            to_remove = []
+            cutoff = time.time() - retention_period.total_seconds()
+            while self._processed_heap and self._processed_heap[0][0] < cutoff:
+                _, window_id = heapq.heappop(self._processed_heap)
+                del self.windows[window_id]
 
-            for window_id, window in self.windows.items():
-                if window.processed and window.end_time < cutoff_time:
-                    to_remove.append(window_id)
+    @property
+    def active_window_count(self) -> int:
+        """Windows not yet processed (open or ready)."""
+        return len(self._open) + len(self._ready)
 
-            for window_id in to_remove:
-                del self.windows[window_id]
+    def get_stats(self) -> Dict[str, Any]:
+        """Window bookkeeping counters."""
+        return {
+            'open_windows': len(self._open),
+            'ready_windows': len(self._ready),
+            'tracked_windows': len(self.windows),
+            'late_events': self.late_events,
+            'watermark': datetime.fromtimestamp(self.watermark).isoformat()
+                         if self.watermark != float("-inf") else None
+        }
+
+    def _open_window(self, slot: int) -> StreamWindow:
+        start = slot * self._slide
+        window_start = datetime.fromtimestamp(start)
+        window = StreamWindow(
+            window_id=f"window_{window_start.isoformat()}",
+            start_time=window_start,
+            end_time=datetime.fromtimestamp(start + self._size)
+        )
+        self._open[slot] = window
+        self.windows[window.window_id] = window
+        heapq.heappush(self._open_heap, (start + self._size, slot))
+        return window
+
+    def _advance_watermark(self):
+        """Move the watermark forward and close every window ending at or before it."""
+        if self.watermark_mode == "event_time":
+            reference = self._max_event_time
+        else:
+            reference = time.time()
+        self.watermark = max(self.watermark, reference - self._lateness)
+
+        while self._open_heap and self._open_heap[0][0] <= self.watermark:
+            _, slot = heapq.heappop(self._open_heap)
+            window = self._open.pop(slot)
+            window.is_closed = True
+            self._ready[window.window_id] = window
 
     def _align_to_slide_interval(self, timestamp: datetime) -> datetime:
         """Align timestamp to slide interval boundary."""
-        seconds = int(self.slide_interval.total_seconds())
-        aligned_epoch = (int(timestamp.timestamp()) // seconds) * seconds
-        return datetime.fromtimestamp(aligned_epoch)
+        slot = math.floor(timestamp.timestamp() / self._slide)
+        return datetime.fromtimestamp(slot * self._slide)
 
 
 class StreamProcessor:
@@ -258,11 +475,15 @@ class StreamProcessor:
             max_size=self.config.batch_size * 10,
             high_watermark=0.8
         )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_task: Optional[asyncio.Task] = None
 
         # Window management
         self.window_manager = WindowManager(
-            window_size=timedelta(minutes=5),
-            slide_interval=timedelta(minutes=1)
+            window_size=timedelta(seconds=self.config.window_size),
+            slide_interval=timedelta(seconds=self.config.window_slide),
+            allowed_lateness=timedelta(seconds=self.config.window_allowed_lateness),
+            watermark_mode=self.config.window_watermark
         )
 
         # Worker management
@@ -272,6 +493,7 @@ class StreamProcessor:
         # Stream sources and handlers
         self.stream_sources: Dict[str, Any] = {}
         self.event_handlers: Dict[StreamEventType, List[Callable]] = defaultdict(list)
+        self.batch_event_handlers: Dict[StreamEventType, List[Callable]] = defaultdict(list)
 
         # Metrics and monitoring
         self.metrics = StreamMetrics()
@@ -295,12 +517,15 @@ class StreamProcessor:
 
         self.is_running = True
         self.shutdown_event.clear()
+        self._loop = asyncio.get_running_loop()
+        self.event_buffer.bind_loop(self._loop)
+        self.event_buffer.open()
 
         logger.info(f"Starting stream processing for {content_type.value}")
 
         try:
             # Start core processing tasks
-            processing_task = asyncio.create_task(self._process_event_loop())
+            processing_task = self._event_task = asyncio.create_task(self._process_event_loop())
             window_task = asyncio.create_task(self._process_window_loop())
             metrics_task = asyncio.create_task(self._metrics_loop())
             error_task = asyncio.create_task(self._error_handling_loop())
@@ -347,18 +572,20 @@ class StreamProcessor:
         file_patterns = config.get('patterns', ['*.txt', '*.md'])
 
         class FileEventHandler(watchdog.events.FileSystemEventHandler):
+            """Runs on the watchdog thread; hands events to the loop thread-safely."""
+
             def __init__(self, processor):
                 self.processor = processor
 
             def on_modified(self, event):
                 if not event.is_directory:
-                    asyncio.create_task(self._handle_file_change(event.src_path, 'modified'))
+                    self._handle_file_change(event.src_path, 'modified')
 
             def on_created(self, event):
                 if not event.is_directory:
-                    asyncio.create_task(self._handle_file_change(event.src_path, 'created'))
+                    self._handle_file_change(event.src_path, 'created')
 
-            async def _handle_file_change(self, file_path: str, change_type: str):
+            def _handle_file_change(self, file_path: str, change_type: str):
                 try:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         content = f.read()
@@ -373,7 +600,7 @@ class StreamProcessor:
                         metadata={'change_type': change_type}
                     )
 
-                    await self.processor.add_event(event)
+                    self.processor.add_event_threadsafe(event)
 
                 except Exception as e:
                     logger.error(f"Failed to process file change {file_path}: {e}")
@@ -472,38 +699,82 @@ class StreamProcessor:
                 logger.error(f"Message queue ingestion failed: {e}")
                 await asyncio.sleep(poll_interval * 2)  # Back off on error
 
-    async def add_event(self, event: StreamEvent) -> bool:
-        """Add event to processing stream."""
-        if self.event_buffer.is_high_watermark():
+    async def add_event(self, event: StreamEvent, timeout: float = 5.0) -> bool:
+        """
+        Add event to processing stream.
+
+        While the buffer is above its high watermark the producer waits for
+        consumers to drain it (up to timeout) before enqueueing.
+        """
+        if self.event_buffer.backpressure_active:
             self.metrics.backpressure_events += 1
-            logger.warning("Stream buffer at high watermark, applying backpressure")
+            await self.event_buffer.wait_for_capacity(timeout)
 
-        success = await self.event_buffer.put(event, timeout=5.0)
+        success = await self.event_buffer.put(event, timeout=timeout)
         if not success:
             logger.error(f"Failed to add event {event.event_id} to buffer (timeout)")
             await self._handle_dropped_event(event)
 
         return success
 
+    def add_event_threadsafe(self, event: StreamEvent, timeout: float = 5.0) -> bool:
+        """Add event from a thread other than the event loop's; blocks the caller under backpressure."""
+        if self._loop is None:
+            raise RuntimeError("Stream processor is not running")
+        future = asyncio.run_coroutine_threadsafe(self.add_event(event, timeout), self._loop)
+        try:
+            return future.result(timeout * 2 + 1.0)
+        except Exception as e:
+            future.cancel()
+            logger.error(f"Failed to hand off event {event.event_id}: {e}")
+            return False
+
     async def _process_event_loop(self):
-        """Main event processing loop."""
-        while not self.shutdown_event.is_set():
+        """Main event processing loop: drains micro-batches from the buffer, then what is left on shutdown."""
+        while not self.shutdown_event.is_set() or self.event_buffer.size():
             try:
-                event = await self.event_buffer.get(timeout=1.0)
-                if event:
-                    await self._process_single_event(event)
+                events = await self.event_buffer.get_many(
+                    max_items=self.config.stream_batch_size,
+                    max_wait=self.config.stream_batch_max_wait,
+                    timeout=1.0
+                )
+                if events:
+                    await self._process_event_batch(events)
 
             except Exception as e:
                 logger.error(f"Event processing loop error: {e}")
+                if self.shutdown_event.is_set():
+                    break
                 await asyncio.sleep(1)
 
-    async def _process_single_event(self, event: StreamEvent):
-        """Process a single stream event."""
+    async def _process_event_batch(self, events: List[StreamEvent]):
+        """Process a micro-batch: per-event processing, then batch handlers per event type."""
+        processed_by_type: Dict[StreamEventType, List[StreamEvent]] = defaultdict(list)
+
+        for event in events:
+            if await self._process_single_event(event):
+                processed_by_type[event.event_type].append(event)
+
+        for event_type, batch in processed_by_type.items():
+            for handler in self.batch_event_handlers.get(event_type, []):
+                try:
+                    await handler(batch)
+                except Exception as e:
+                    logger.error(f"Batch event handler failed: {e}")
+
+    async def _process_single_event(self, event: StreamEvent) -> bool:
+        """Process a single stream event; returns whether it succeeded."""
         start_time = time.time()
 
         try:
             # Add to windows
             affected_windows = await self.window_manager.add_event(event)
+            if not affected_windows and self.config.window_late_events == "dead_letter":
+                self.dead_letter_queue.append({
+                    'event': event.__dict__,
+                    'error': 'Late event',
+                    'timestamp': datetime.now().isoformat()
+                })
 
             # Process event data
             content = event.data.get('content', '')
@@ -557,10 +828,13 @@ class StreamProcessor:
             else:
                 self.metrics.average_latency = (self.metrics.average_latency * 0.9 + processing_time * 0.1)
 
+            return True
+
         except Exception as e:
             logger.error(f"Failed to process event {event.event_id}: {e}")
             self.metrics.events_failed += 1
             await self._handle_event_error(event, e)
+            return False
 
     async def _process_window_loop(self):
         """Process completed time windows."""
@@ -583,19 +857,23 @@ class StreamProcessor:
 
     async def _process_window(self, window: StreamWindow):
         """Process a completed time window."""
-        if not window.events:
+        if not window.event_count:
             return
 
-        logger.debug(f"Processing window {window.window_id} with {len(window.events)} events")
+        logger.debug(f"Processing window {window.window_id} with {window.event_count} events")
 
         # Aggregate window statistics
         window_stats = {
             'window_id': window.window_id,
             'start_time': window.start_time,
             'end_time': window.end_time,
-            'event_count': len(window.events),
-            'content_types': list(set(e.content_type.value for e in window.events)),
-            'sources': list(set(e.source for e in window.events))
+            'event_count': window.event_count,
+            'content_types': list(window.content_types),
+            'sources': list(window.sources),
+            'content_type_counts': dict(window.content_types),
+            'source_counts': dict(window.sources),
+            'first_event_time': window.first_event_time,
+            'last_event_time': window.last_event_time
         }
 
         # Call window handlers
@@ -605,7 +883,7 @@ class StreamProcessor:
             except Exception as e:
                 logger.error(f"Window handler failed: {e}")
 
-        self.metrics.active_windows = len([w for w in self.window_manager.windows.values() if not w.processed])
+        self.metrics.active_windows = self.window_manager.active_window_count
 
     async def _metrics_loop(self):
         """Update processing metrics."""
@@ -654,12 +932,13 @@ class StreamProcessor:
         event.retry_count += 1
 
         if event.retry_count <= event.max_retries:
-            # Retry after delay
+            # Retry after delay, without holding up the consumer loop
             retry_delay = min(2 ** event.retry_count, 60)  # Exponential backoff, max 60 seconds
             logger.warning(f"Retrying event {event.event_id} in {retry_delay} seconds (attempt {event.retry_count})")
 
-            await asyncio.sleep(retry_delay)
-            await self.add_event(event)
+            retry_task = asyncio.create_task(self._retry_event(event, retry_delay))
+            self.processing_tasks.add(retry_task)
+            retry_task.add_done_callback(self.processing_tasks.discard)
         else:
             # Move to dead letter queue
             logger.error(f"Event {event.event_id} exceeded max retries, moving to dead letter queue")
@@ -669,6 +948,11 @@ class StreamProcessor:
                 'timestamp': datetime.now().isoformat()
             })
 
+    async def _retry_event(self, event: StreamEvent, delay: float):
+        """Re-enqueue a failed event after a backoff delay."""
+        await asyncio.sleep(delay)
+        await self.add_event(event)
+
     async def _handle_dropped_event(self, event: StreamEvent):
         """Handle events that couldn't be added to buffer."""
         logger.error(f"Dropping event {event.event_id} due to buffer overflow")
@@ -678,14 +962,23 @@ class StreamProcessor:
             'timestamp': datetime.now().isoformat()
         })
 
-    def add_event_handler(self, event_type: StreamEventType, handler: Callable):
-        """Add event handler for specific event types."""
-        self.event_handlers[event_type].append(handler)
+    def add_event_handler(self, event_type: StreamEventType, handler: Callable, batch: bool = False):
+        """
+        Add event handler for specific event types.
+
+        Args:
+            event_type: Event type to handle
+            handler: Async callable taking one StreamEvent, or a list of them if batch
+            batch: Call the handler once per micro-batch with all processed events of this type
+        """
+        handlers = self.batch_event_handlers if batch else self.event_handlers
+        handlers[event_type].append(handler)
 
     def remove_event_handler(self, event_type: StreamEventType, handler: Callable):
         """Remove event handler."""
-        if handler in self.event_handlers[event_type]:
-            self.event_handlers[event_type].remove(handler)
+        for handlers in (self.event_handlers, self.batch_event_handlers):
+            if handler in handlers[event_type]:
+                handlers[event_type].remove(handler)
 
     async def stop_stream(self):
         """Stop stream processing gracefully."""
@@ -695,6 +988,12 @@ class StreamProcessor:
 
     async def _cleanup(self):
         """Cleanup resources."""
+        # Refuse new events and let the consumer process the buffered ones
+        self.event_buffer.close()
+        if self._event_task is not None:
+            await asyncio.gather(self._event_task, return_exceptions=True)
+            self._event_task = None
+
         # Cancel all processing tasks
         for task in self.processing_tasks:
             if not task.done():
@@ -728,8 +1027,10 @@ class StreamProcessor:
             'buffer_status': {
                 'size': self.event_buffer.size(),
                 'max_size': self.event_buffer.max_size,
-                'high_watermark': self.event_buffer.is_high_watermark()
+                'high_watermark': self.event_buffer.is_high_watermark(),
+                'backpressure_active': self.event_buffer.backpressure_active
             },
+            'windows': self.window_manager.get_stats(),
             'dead_letter_queue_size': len(self.dead_letter_queue),
             'active_tasks': len([t for t in self.processing_tasks if not t.done()])
         }
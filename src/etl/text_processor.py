@@ -15,11 +15,11 @@ import logging
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
-import jieba
-import jieba.posseg as pseg
 from opencc import OpenCC
 import unicodedata
 
+from database.segmentation import get_segmentation_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -218,9 +218,13 @@ class TextProcessor:
 
         self.normalizer = ChineseTextNormalizer()
 
+        # Shared jieba segmentation service: the combined dictionary is
+        # warm-started from a snapshot and results are cached across runs
+        self.segmenter = get_segmentation_service()
+
         # Initialize jieba with custom dictionary if provided
         if custom_dict_path:
-            jieba.load_userdict(custom_dict_path)
+            self.segmenter.load_dictionary(user_dicts=[custom_dict_path])
 
         # Load novel-specific terms
         self._load_novel_terms()
@@ -244,8 +248,8 @@ class TextProcessor:
             "灵石", "灵药", "功法", "神通", "法宝", "灵器", "法器",
         ]
 
-        for term in novel_terms:
-            jieba.add_word(term, freq=1000)  # High frequency for better recognition
+        # High frequency for better recognition
+        self.segmenter.load_dictionary(terms=novel_terms, freq=1000)
 
     async def clean_text(self, text: str, text_type: TextType = TextType.NARRATIVE) -> str:
         """
@@ -318,14 +322,14 @@ class TextProcessor:
 
         if enable_pos_tagging and self.config.enable_pos_tagging:
             # Segment with POS tagging
-            words = pseg.cut(text)
+            words = self.segmenter.pos_cut(text)
             for word, flag in words:
                 if word.strip():  # Skip empty segments
                     segments.append(word)
                     pos_tags.append((word, flag))
         else:
             # Simple segmentation
-            words = jieba.cut(text)
+            words = self.segmenter.cut(text)
             segments = [word for word in words if word.strip()]
 
         return segments, pos_tags
@@ -471,8 +475,7 @@ class TextProcessor:
 
     def add_custom_terms(self, terms: List[str], freq: int = 1000):
         """Add custom terms to the segmentation dictionary."""
-        for term in terms:
-            jieba.add_word(term, freq=freq)
+        self.segmenter.load_dictionary(terms=terms, freq=freq)
         logger.info(f"Added {len(terms)} custom terms to dictionary")
 
     def get_processing_stats(self) -> Dict[str, Any]:
@@ -491,5 +494,6 @@ class TextProcessor:
             'jieba_status': {
                 'dictionary_loaded': True,
                 'custom_terms_added': True,
+                'segmentation': self.segmenter.get_stats(),
             }
         }
\ No newline at end of file
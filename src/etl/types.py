@@ -2,10 +2,14 @@
 Common types and enums for the ETL pipeline.
 """
 
+from collections import deque
 from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Deque, Optional
+
+# Most recent load batches kept in ProcessingMetrics.load_batches (streaming runs indefinitely)
+LOAD_BATCH_HISTORY = 1000
 
 
 class ContentType(Enum):
@@ -54,6 +58,23 @@ class PipelineConfig:
     output_mongodb: bool = True
     checkpoint_interval: int = 1000  # records
 
+    # Bulk load settings
+    load_batch_size: int = 1000  # records per COPY / bulk_write
+    load_flush_interval: float = 5.0  # seconds a partial load batch may wait
+
+    # Stream processing settings
+    stream_batch_size: int = 100  # max events drained per micro-batch
+    stream_batch_max_wait: float = 0.05  # seconds a partial micro-batch may linger
+    window_size: float = 300.0  # seconds per sliding window
+    window_slide: float = 60.0  # seconds between window starts
+    window_allowed_lateness: float = 0.0  # seconds a window stays open past its end
+    window_watermark: str = "processing_time"  # or "event_time"
+    window_late_events: str = "drop"  # or "dead_letter"
+
+    # Text processing stage
+    processing_workers: int = 0  # worker processes for clean/extract/validate; 0 = run in-process
+    processing_chunk_size: int = 25  # records sent to a worker per task
+
     # Chinese text processing specific settings
     chinese_segmentation: bool = True
     traditional_to_simplified: bool = False
@@ -61,6 +82,16 @@ class PipelineConfig:
     normalize_whitespace: bool = True
 
 
+@dataclass
+class LoadBatchMetrics:
+    """Metrics for one bulk load batch."""
+    target: str  # "postgres" or "mongodb"
+    collection: str
+    rows: int
+    latency_ms: float
+    loaded_at: datetime = field(default_factory=datetime.now)
+
+
 @dataclass
 class ProcessingMetrics:
     """Metrics for pipeline execution."""
@@ -71,6 +102,17 @@ class ProcessingMetrics:
     extracted_entities: int = 0
     validation_errors: int = 0
     processing_rate: float = 0.0  # records per second
+    loaded_rows: int = 0
+    load_time_ms: float = 0.0
+    load_batch_count: int = 0
+    load_batches: Deque[LoadBatchMetrics] = field(default_factory=lambda: deque(maxlen=LOAD_BATCH_HISTORY))
+
+    def record_load(self, batch: LoadBatchMetrics):
+        """Record a completed bulk load batch (totals cover every batch, details only recent ones)."""
+        self.load_batches.append(batch)
+        self.load_batch_count += 1
+        self.loaded_rows += batch.rows
+        self.load_time_ms += batch.latency_ms
 
     def calculate_rate(self):
         """Calculate processing rate."""
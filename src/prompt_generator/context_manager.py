@@ -1,15 +1,23 @@
 """
 上下文窗口管理器
 管理Claude的上下文窗口，优化token使用
+
+- token数按内容哈希缓存，相同内容只编码一次
+- 每个类别一个按优先级排序的堆，修剪时从各类别堆顶取最低优先级项，O(C + log n)
+- 类别优先级调整记录为偏移量，不改变类别内顺序，无需重排或重新计算token
+- 按类别缓存渲染结果，只有内容变化的类别才重新拼接
 """
 
 from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
 from dataclasses import dataclass
 try:
     import tiktoken
 except ImportError:
     tiktoken = None
+import hashlib
 import heapq
+import itertools
 import logging
 
 logger = logging.getLogger(__name__)
@@ -51,6 +59,10 @@ class ContextWindowManager:
         "optional_details": 30
     }
 
+    # token计数缓存（进程内共享）：(编码名, 内容哈希) -> token数
+    TOKEN_CACHE_SIZE = 50000
+    _token_cache: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+
     def __init__(self, model: str = "cl100k_base"):
         """
         初始化上下文管理器
@@ -58,19 +70,37 @@ class ContextWindowManager:
         Args:
             model: tokenizer模型名称
         """
-        try:
-            self.encoder = tiktoken.get_encoding(model)
-        except:
-            # 如果无法获取指定编码，使用默认的cl100k_base
-            self.encoder = tiktoken.get_encoding("cl100k_base")
+        self.encoder = None
+        if tiktoken is not None:
+            try:
+                self.encoder = tiktoken.get_encoding(model)
+            except Exception:
+                # 如果无法获取指定编码，使用默认的cl100k_base
+                try:
+                    self.encoder = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    logger.warning(f"Tokenizer unavailable, estimating token counts: {e}")
+        self.encoding_name = self.encoder.name if self.encoder else "estimate"
+
+        self._items: Dict[int, ContextItem] = {}  # 按添加顺序
+        self._category_items: Dict[str, Dict[int, ContextItem]] = {}
+        # 类别堆：(优先级 - 类别偏移, 序号)，堆顶为类别内最先淘汰的项
+        self._category_heaps: Dict[str, List[Tuple[int, int]]] = {}
+        self._category_offsets: Dict[str, int] = {}
+        self._rendered_blocks: Dict[str, Tuple[int, int, str]] = {}
+        self._sequence = itertools.count()
 
-        self.context_items: List[ContextItem] = []
         self.current_tokens = 0
         self.categories_count = {}
 
+    @property
+    def context_items(self) -> List[ContextItem]:
+        """全部上下文项（按添加顺序）"""
+        return list(self._items.values())
+
     def count_tokens(self, text: str) -> int:
         """
-        计算文本的token数量
+        计算文本的token数量（按内容哈希缓存）
 
         Args:
             text: 要计算的文本
@@ -78,9 +108,24 @@ class ContextWindowManager:
         Returns:
             token数量
         """
+        key = (self.encoding_name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+        cache = ContextWindowManager._token_cache
+        tokens = cache.get(key)
+        if tokens is not None:
+            cache.move_to_end(key)
+            return tokens
+
+        tokens = self._encode_length(text)
+        cache[key] = tokens
+        if len(cache) > self.TOKEN_CACHE_SIZE:
+            cache.popitem(last=False)
+        return tokens
+
+    def _encode_length(self, text: str) -> int:
+        """实际计算token数量"""
         try:
             return len(self.encoder.encode(text))
-        except:
+        except Exception:
             # 粗略估算：中文约1.5字符/token，英文约4字符/token
             chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
             english_chars = len(text) - chinese_chars
@@ -135,15 +180,54 @@ class ContextWindowManager:
         if self.current_tokens + tokens > self.MAX_TOKENS - self.RESERVED_TOKENS:
             self._prune_context(tokens)
 
-        self.context_items.append(item)
-        self.current_tokens += tokens
-
-        # 更新类别计数
-        self.categories_count[category] = self.categories_count.get(category, 0) + 1
+        self._insert_item(item)
 
         logger.debug(f"Added {category} context: {tokens} tokens, priority {priority}")
         return True
 
+    def _insert_item(self, item: ContextItem):
+        """将上下文项加入存储和所在类别的堆"""
+        item_id = next(self._sequence)
+        category = item.category
+        offset = self._category_offsets.get(category, 0)
+
+        self._items[item_id] = item
+        self._category_items.setdefault(category, {})[item_id] = item
+        heapq.heappush(self._category_heaps.setdefault(category, []), (item.priority - offset, item_id))
+        self._rendered_blocks.pop(category, None)
+
+        self.current_tokens += item.tokens
+        self.categories_count[category] = self.categories_count.get(category, 0) + 1
+
+    def _pop_lowest_priority(self, floor: int) -> Optional[ContextItem]:
+        """
+        取出优先级最低的上下文项
+
+        各类别堆顶中有效优先级（堆键 + 类别偏移）最小者，同优先级先添加的先淘汰。
+        有效优先级不低于 floor 时不取出，返回None。
+        """
+        best = None
+        for category, heap in self._category_heaps.items():
+            if not heap:
+                continue
+            key, item_id = heap[0]
+            candidate = (key + self._category_offsets.get(category, 0), item_id, category)
+            if best is None or candidate < best:
+                best = candidate
+
+        if best is None or best[0] >= floor:
+            return None
+
+        _, item_id, category = best
+        heapq.heappop(self._category_heaps[category])
+        item = self._items.pop(item_id)
+        del self._category_items[category][item_id]
+        self._rendered_blocks.pop(category, None)
+
+        self.current_tokens -= item.tokens
+        self.categories_count[category] -= 1
+        return item
+
     def _prune_context(self, required_tokens: int):
         """
         修剪上下文以腾出空间
@@ -157,30 +241,18 @@ class ContextWindowManager:
         if need_to_free <= 0:
             return
 
-        # 按优先级排序（低优先级在前）
-        self.context_items.sort(key=lambda x: x.priority)
-
         freed_tokens = 0
-        items_to_remove = []
+        removed_count = 0
 
-        for item in self.context_items:
-            # 不删除高优先级内容
-            if item.priority >= 80:
+        # 从低优先级开始删除，不删除高优先级（>=80）内容
+        while freed_tokens < need_to_free:
+            item = self._pop_lowest_priority(floor=80)
+            if item is None:
                 break
-
-            items_to_remove.append(item)
             freed_tokens += item.tokens
+            removed_count += 1
 
-            if freed_tokens >= need_to_free:
-                break
-
-        # 删除选中的项
-        for item in items_to_remove:
-            self.context_items.remove(item)
-            self.current_tokens -= item.tokens
-            self.categories_count[item.category] -= 1
-
-        logger.info(f"Pruned {len(items_to_remove)} items, freed {freed_tokens} tokens")
+        logger.info(f"Pruned {removed_count} items, freed {freed_tokens} tokens")
 
     def _compress_content(self, content: str, category: str) -> str:
         """
@@ -225,26 +297,41 @@ class ContextWindowManager:
         """
         获取优化后的完整上下文
 
+        类别按其最高优先级排序，类别内按优先级排序；
+        类别块渲染后缓存，只有内容变化的类别才重新拼接。
+
         Returns:
             优化后的上下文文本
         """
-        # 按优先级排序
-        sorted_items = sorted(self.context_items, key=lambda x: x.priority, reverse=True)
-
-        # 组织上下文
-        context_parts = []
-        current_category = None
-
-        for item in sorted_items:
-            # 添加类别标题
-            if item.category != current_category:
-                if item.category != "general":
-                    context_parts.append(f"\n## {self._get_category_title(item.category)}\n")
-                current_category = item.category
-
-            context_parts.append(item.content)
+        ordered_categories = []
+        for category, heap in self._category_heaps.items():
+            if not heap:
+                continue
+            top_key, top_id, block = self._render_category(category)
+            ordered_categories.append(
+                (-(top_key + self._category_offsets.get(category, 0)), top_id, block)
+            )
+        ordered_categories.sort(key=lambda entry: entry[:2])
+
+        return "\n".join(block for _, _, block in ordered_categories)
+
+    def _render_category(self, category: str) -> Tuple[int, int, str]:
+        """
+        渲染（或取缓存的）单个类别的上下文块
 
-        return "\n".join(context_parts)
+        Returns:
+            (类别内最高优先级项的堆键, 其序号, 渲染文本)
+        """
+        rendered = self._rendered_blocks.get(category)
+        if rendered is None:
+            entries = sorted(self._category_heaps[category], key=lambda entry: (-entry[0], entry[1]))
+            items = self._category_items[category]
+            parts = [items[item_id].content for _, item_id in entries]
+            if category != "general":
+                parts.insert(0, f"\n## {self._get_category_title(category)}\n")
+            rendered = (entries[0][0], entries[0][1], "\n".join(parts))
+            self._rendered_blocks[category] = rendered
+        return rendered
 
     def _get_category_title(self, category: str) -> str:
         """获取类别标题"""
@@ -275,7 +362,7 @@ class ContextWindowManager:
             "max_tokens": self.MAX_TOKENS,
             "reserved_tokens": self.RESERVED_TOKENS,
             "usage_percentage": (self.current_tokens / (self.MAX_TOKENS - self.RESERVED_TOKENS)) * 100,
-            "items_count": len(self.context_items),
+            "items_count": len(self._items),
             "categories": self.categories_count,
             "priority_distribution": self._get_priority_distribution()
         }
@@ -292,7 +379,7 @@ class ContextWindowManager:
             "optional (<30)": 0
         }
 
-        for item in self.context_items:
+        for item in self._items.values():
             if item.priority > 90:
                 distribution["critical (>90)"] += 1
             elif item.priority > 70:
@@ -308,7 +395,11 @@ class ContextWindowManager:
 
     def clear(self):
         """清空上下文"""
-        self.context_items.clear()
+        self._items.clear()
+        self._category_items.clear()
+        self._category_heaps.clear()
+        self._category_offsets.clear()
+        self._rendered_blocks.clear()
         self.current_tokens = 0
         self.categories_count.clear()
         logger.info("Context cleared")
@@ -320,12 +411,16 @@ class ContextWindowManager:
         Args:
             category: 要删除的类别
         """
-        items_to_remove = [item for item in self.context_items if item.category == category]
+        items_to_remove = self._category_items.pop(category, {})
 
-        for item in items_to_remove:
-            self.context_items.remove(item)
+        for item_id, item in items_to_remove.items():
+            del self._items[item_id]
             self.current_tokens -= item.tokens
 
+        self._category_heaps.pop(category, None)
+        self._category_offsets.pop(category, None)
+        self._rendered_blocks.pop(category, None)
+
         if category in self.categories_count:
             del self.categories_count[category]
 
@@ -383,9 +478,10 @@ class ContextWindowManager:
             category: 类别
             adjustment: 调整值（正值提高，负值降低）
         """
-        for item in self.context_items:
-            if item.category == category:
-                item.priority += adjustment
+        # 整个类别统一偏移，类别内顺序和堆结构不变，渲染缓存仍然有效
+        self._category_offsets[category] = self._category_offsets.get(category, 0) + adjustment
+        for item in self._category_items.get(category, {}).values():
+            item.priority += adjustment
 
         logger.debug(f"Adjusted {category} priority by {adjustment}")
 
@@ -398,7 +494,7 @@ class ContextWindowManager:
         """
         export_data = []
 
-        for item in self.context_items:
+        for item in self._items.values():
             export_data.append({
                 "content": item.content,
                 "priority": item.priority,
@@ -6,11 +6,12 @@
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from uuid import UUID
+import asyncio
 import json
 import logging
 from dataclasses import dataclass, asdict
 
-from database.data_access import get_novel_manager
+from database.data_access import get_novel_manager, get_global_manager
 from database.models import *
 from .context_manager import ContextWindowManager
 from .template_engine import PromptTemplateEngine
@@ -61,10 +62,6 @@ class NovelPromptGenerator:
         global_manager = get_global_manager()
         self.project = await global_manager.get_project(self.novel_info.project_id)
 
-        # 预加载常用数据
-        self.domains = await self.novel_manager.get_domains()
-        self.law_chains = await self.novel_manager.get_law_chains()
-
         logger.info(f"Loaded novel data for: {self.novel_info.title}")
 
     async def generate_creation_prompt(
@@ -93,27 +90,23 @@ class NovelPromptGenerator:
         if not self._initialized:
             await self.initialize()
 
-        # 1. 收集世界观设定
-        worldbuilding = await self._get_worldbuilding_context()
-
-        # 2. 获取角色信息
-        characters = await self._get_character_profiles(focus_characters or [])
-
-        # 3. 提取法则链规则
-        law_chains_context = await self._get_law_chains_context(scene_type)
-
-        # 4. 获取前情提要
-        previous_context = await self._get_previous_chapters_summary(
-            chapter_number,
-            previous_chapters
+        # 1-6. 并发收集世界观设定、角色信息、法则链规则、前情提要、冲突框架和剧情钩子
+        (
+            worldbuilding,
+            characters,
+            law_chains_context,
+            previous_context,
+            conflicts,
+            story_hooks
+        ) = await asyncio.gather(
+            self._get_worldbuilding_context(),
+            self._get_character_profiles(focus_characters or []),
+            self._get_law_chains_context(scene_type),
+            self._get_previous_chapters_summary(chapter_number, previous_chapters),
+            self._get_active_conflicts(chapter_number),
+            self._get_relevant_story_hooks(scene_type, focus_characters)
         )
 
-        # 5. 构建冲突框架
-        conflicts = await self._get_active_conflicts(chapter_number)
-
-        # 6. 获取剧情钩子
-        story_hooks = await self._get_relevant_story_hooks(scene_type, focus_characters)
-
         # 7. 构建各个prompt组件
         system_prompt = self._build_system_prompt(worldbuilding, law_chains_context)
 
@@ -123,7 +116,8 @@ class NovelPromptGenerator:
             characters=characters,
             conflicts=conflicts,
             previous_context=previous_context,
-            story_hooks=story_hooks
+            story_hooks=story_hooks,
+            target_length=target_length
         )
 
         constraints = self._build_constraints(target_length, scene_type)
@@ -161,7 +155,13 @@ class NovelPromptGenerator:
         )
 
     async def _get_worldbuilding_context(self) -> Dict[str, Any]:
-        """获取世界观设定上下文"""
+        """获取世界观设定上下文（按小说版本缓存，调用方不应修改返回值）"""
+        return await self.novel_manager.get_cached_context(
+            "worldbuilding", self._build_worldbuilding_context
+        )
+
+    async def _build_worldbuilding_context(self) -> Dict[str, Any]:
+        """构建世界观设定上下文"""
         context = {
             "novel_title": self.novel_info.title,
             "novel_description": self.novel_info.description,
@@ -172,7 +172,7 @@ class NovelPromptGenerator:
         }
 
         # 添加域信息
-        for domain in self.domains:
+        for domain in await self.novel_manager.get_domains():
             domain_info = {
                 "name": domain.name,
                 "type": domain.domain_type,
@@ -194,63 +194,62 @@ class NovelPromptGenerator:
         return context
 
     async def _get_character_profiles(self, character_ids: List[str]) -> List[Dict[str, Any]]:
-        """获取角色档案"""
-        profiles = []
+        """获取角色档案（单次批量查询）"""
+        if not character_ids:
+            return []
 
+        try:
+            characters = await self.novel_manager.get_characters_by_ids(character_ids)
+        except Exception as e:
+            logger.warning(f"Failed to load characters {character_ids}: {e}")
+            return []
+
+        found_ids = {str(character.id) for character in characters}
         for char_id in character_ids:
-            try:
-                character = await self.novel_manager.get_character(char_id)
-
-                # 获取角色的法则链掌握情况
-                character_chains = []
-                # 这里需要实际的查询，暂时模拟
-
-                profile = {
-                    "id": character.id,
-                    "name": character.name,
-                    "type": character.character_type,
-                    "basic_info": character.basic_info or {},
-                    "personality": character.personality or {},
-                    "abilities": character.abilities or [],
-                    "relationships": character.relationships or {},
-                    "current_state": character.current_state or {},
-                    "law_chains": character_chains,
-                    "tags": character.tags
-                }
-                profiles.append(profile)
+            if str(char_id) not in found_ids:
+                logger.warning(f"Failed to load character {char_id}: not found")
 
-            except Exception as e:
-                logger.warning(f"Failed to load character {char_id}: {e}")
+        profiles = []
+        for character in characters:
+            # 获取角色的法则链掌握情况
+            character_chains = []
+            # 这里需要实际的查询，暂时模拟
+
+            profile = {
+                "id": character.id,
+                "name": character.name,
+                "type": character.character_type,
+                "basic_info": character.basic_info or {},
+                "personality": character.personality or {},
+                "abilities": character.abilities or [],
+                "relationships": character.relationships or {},
+                "current_state": character.current_state or {},
+                "law_chains": character_chains,
+                "tags": character.tags
+            }
+            profiles.append(profile)
 
         return profiles
 
     async def _get_law_chains_context(self, scene_type: str) -> Dict[str, Any]:
         """获取法则链上下文"""
+        available_chains = await self.novel_manager.get_cached_context(
+            "law_chains", self._build_available_chains
+        )
+
         context = {
-            "available_chains": [],
+            "available_chains": available_chains,
             "scene_relevant_chains": [],
             "combination_rules": [],
             "restrictions": []
         }
 
-        # 获取所有法则链
-        for chain in self.law_chains:
-            chain_info = {
-                "name": chain.name,
-                "type": chain.chain_type,
-                "description": chain.description,
-                "power_level": chain.power_level,
-                "rarity": chain.rarity,
-                "effects": chain.effects or [],
-                "cost": chain.cost or {}
-            }
-            context["available_chains"].append(chain_info)
-
-            # 根据场景类型筛选相关法则链
-            if scene_type == "battle" and chain.chain_type in ["offensive", "defensive"]:
-                context["scene_relevant_chains"].append(chain.name)
-            elif scene_type == "exploration" and chain.chain_type in ["spatial", "perception"]:
-                context["scene_relevant_chains"].append(chain.name)
+        # 根据场景类型筛选相关法则链
+        for chain_info in available_chains:
+            if scene_type == "battle" and chain_info["type"] in ["offensive", "defensive"]:
+                context["scene_relevant_chains"].append(chain_info["name"])
+            elif scene_type == "exploration" and chain_info["type"] in ["spatial", "perception"]:
+                context["scene_relevant_chains"].append(chain_info["name"])
 
         # 添加组合规则
         context["combination_rules"] = [
@@ -268,6 +267,21 @@ class NovelPromptGenerator:
 
         return context
 
+    async def _build_available_chains(self) -> List[Dict[str, Any]]:
+        """构建全部法则链信息（按小说版本缓存）"""
+        return [
+            {
+                "name": chain.name,
+                "type": chain.chain_type,
+                "description": chain.description,
+                "power_level": chain.power_level,
+                "rarity": chain.rarity,
+                "effects": chain.effects or [],
+                "cost": chain.cost or {}
+            }
+            for chain in await self.novel_manager.get_law_chains()
+        ]
+
     async def _get_previous_chapters_summary(
         self,
         current_chapter: int,
@@ -278,31 +292,34 @@ class NovelPromptGenerator:
             # 默认获取前3章
             previous_chapters = list(range(max(1, current_chapter - 3), current_chapter))
 
-        summaries = []
+        # 各章节段落并发查询
+        chapter_segments = await asyncio.gather(
+            *(self.novel_manager.get_chapter_segments(chapter_num) for chapter_num in previous_chapters),
+            return_exceptions=True
+        )
 
-        for chapter_num in previous_chapters:
-            try:
-                # 查询章节内容
-                segments = await self.novel_manager.get_chapter_segments(chapter_num)
+        summaries = []
 
-                if segments:
-                    # 提取关键信息
-                    chapter_summary = f"第{chapter_num}章要点：\n"
+        for chapter_num, segments in zip(previous_chapters, chapter_segments):
+            if isinstance(segments, Exception):
+                logger.warning(f"Failed to get chapter {chapter_num} summary: {segments}")
+                continue
 
-                    # 获取主要事件
-                    main_events = [s for s in segments if s.segment_type == "plot"]
-                    if main_events:
-                        chapter_summary += f"- 主要事件：{main_events[0].content[:100]}...\n"
+            if segments:
+                # 提取关键信息
+                chapter_summary = f"第{chapter_num}章要点：\n"
 
-                    # 获取角色发展
-                    char_development = [s for s in segments if "character" in s.tags]
-                    if char_development:
-                        chapter_summary += f"- 角色发展：有重要角色成长\n"
+                # 获取主要事件
+                main_events = [s for s in segments if s.segment_type == "plot"]
+                if main_events:
+                    chapter_summary += f"- 主要事件：{main_events[0].content[:100]}...\n"
 
-                    summaries.append(chapter_summary)
+                # 获取角色发展
+                char_development = [s for s in segments if "character" in s.tags]
+                if char_development:
+                    chapter_summary += f"- 角色发展：有重要角色成长\n"
 
-            except Exception as e:
-                logger.warning(f"Failed to get chapter {chapter_num} summary: {e}")
+                summaries.append(chapter_summary)
 
         return "\n".join(summaries) if summaries else "这是故事的开始。"
 
@@ -393,9 +410,8 @@ class NovelPromptGenerator:
         """构建系统提示词"""
 
         # 使用模板引擎
-        template = self.template_engine.get_template("system_prompt")
-
-        return template.format(
+        return self.template_engine.render(
+            "system_prompt",
             novel_title=worldbuilding["novel_title"],
             novel_description=worldbuilding["novel_description"],
             author=worldbuilding["author"],
@@ -413,21 +429,22 @@ class NovelPromptGenerator:
         characters: List[Dict[str, Any]],
         conflicts: List[Dict[str, Any]],
         previous_context: str,
-        story_hooks: List[Dict[str, Any]]
+        story_hooks: List[Dict[str, Any]],
+        target_length: int = 2000
     ) -> str:
         """构建用户提示词"""
 
-        # 获取场景模板
-        template = self.template_engine.get_template(f"scene_{scene_type}")
-
-        return template.format(
+        # 使用场景模板
+        return self.template_engine.render(
+            f"scene_{scene_type}",
             chapter_number=chapter_number,
             scene_type=self._translate_scene_type(scene_type),
             previous_context=previous_context,
             characters=self._format_characters(characters),
             conflicts=self._format_conflicts(conflicts),
             story_hooks=self._format_story_hooks(story_hooks),
-            scene_requirements=self._get_scene_requirements(scene_type)
+            scene_requirements=self._get_scene_requirements(scene_type),
+            word_count=target_length
         )
 
     def _build_constraints(self, target_length: int, scene_type: str) -> Dict[str, Any]:
@@ -4,11 +4,12 @@ AI小说创作工作流
 """
 
 from typing import Dict, List, Optional, Any, Callable, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from datetime import datetime
 import asyncio
 import json
 import logging
+import re
 
 from .core import NovelPromptGenerator, PromptComponents
 from .quality_validator import QualityValidator, ValidationResult
@@ -49,17 +50,31 @@ class CreationResult:
     metadata: Dict[str, Any]
 
 
+@dataclass
+class ScenePlan:
+    """章节规划中的单个场景"""
+    scene_number: int
+    scene_type: str
+    target_length: int
+    characters: Optional[List[str]]
+    brief: str
+    depends_on: List[int]
+
+
 class CreationWorkflow:
     """创作工作流"""
 
     MAX_RETRIES = 3
     MAX_ITERATIONS = 5
+    BRIEF_LENGTH = 120  # 单个场景简介的最大字数
+    SUMMARY_LENGTH = 300  # 场景间传递的摘要最大字数
 
     def __init__(
         self,
         novel_id: str,
         claude_api: Optional[Callable] = None,
-        use_real_api: bool = None
+        use_real_api: bool = None,
+        max_concurrent_scenes: Optional[int] = None
     ):
         """
         初始化工作流
@@ -68,12 +83,16 @@ class CreationWorkflow:
             novel_id: 小说ID
             claude_api: Claude API调用函数（已弃用，保留以兼容）
             use_real_api: 是否使用真实API（None时根据配置自动判断）
+            max_concurrent_scenes: 规划模式下同时生成的场景数（None时使用配置的并发请求数）
         """
         self.novel_id = novel_id
         self.prompt_generator = NovelPromptGenerator(novel_id)
         self.validator = QualityValidator()
         self.tasks = {}
         self.results = {}
+        self.scene_semaphore = asyncio.Semaphore(
+            max_concurrent_scenes or config.max_concurrent_requests
+        )
 
         # 初始化Claude客户端
         if use_real_api is None:
@@ -103,7 +122,8 @@ class CreationWorkflow:
         self,
         chapter_number: int,
         scenes: List[Dict[str, Any]],
-        batch_mode: bool = False
+        batch_mode: bool = False,
+        planner_mode: bool = False
     ) -> Dict[str, Any]:
         """
         创作一个完整章节
@@ -112,10 +132,14 @@ class CreationWorkflow:
             chapter_number: 章节号
             scenes: 场景列表 [{"type": "narrative", "length": 2000, ...}]
             batch_mode: 是否批量模式
+            planner_mode: 是否使用规划模式（先规划场景依赖，互不依赖的场景并发生成）
 
         Returns:
             章节创作结果
         """
+        if planner_mode:
+            return await self._create_chapter_planned(chapter_number, scenes, batch_mode)
+
         chapter_content = []
         chapter_results = []
         total_tokens = 0
@@ -165,6 +189,203 @@ class CreationWorkflow:
             "individual_results": chapter_results
         }
 
+    async def _create_chapter_planned(
+        self,
+        chapter_number: int,
+        scenes: List[Dict[str, Any]],
+        batch_mode: bool
+    ) -> Dict[str, Any]:
+        """
+        规划模式创作章节
+
+        先生成每个场景的简介和依赖关系，再按依赖并发生成场景：
+        每个场景只等待自己依赖的场景，并只接收章节提纲和这些场景的短摘要，
+        而不是整章已生成的正文。全部完成后按场景顺序拼接并整体验证。
+
+        Args:
+            chapter_number: 章节号
+            scenes: 场景列表，可选字段 depends_on（依赖的场景序号）、brief（场景简介）
+            batch_mode: 是否批量模式（非批量模式下依赖失败的场景不再生成）
+
+        Returns:
+            章节创作结果
+        """
+        start_time = datetime.now()
+        plans = self._plan_chapter(scenes)
+        outline = "\n".join(f"{plan.scene_number}. {plan.brief}" for plan in plans)
+        summaries: Dict[int, str] = {}
+        scene_tasks: Dict[int, asyncio.Task] = {}
+
+        logger.info(f"Starting planned chapter {chapter_number} creation with {len(scenes)} scenes")
+
+        async def run_scene(plan: ScenePlan) -> CreationResult:
+            dependencies = [await scene_tasks[number] for number in plan.depends_on]
+            if not batch_mode and any(not result.success for result in dependencies):
+                logger.error(f"Skipping scene {plan.scene_number}: a scene it depends on failed")
+                return CreationResult(
+                    success=False, content=None, prompt_used=None, validation_score=0,
+                    iterations=0, total_tokens_used=0, time_elapsed=0,
+                    metadata={"error": "dependency failed", "scene_number": plan.scene_number}
+                )
+
+            async with self.scene_semaphore:
+                result = await self.create_scene(
+                    chapter_number=chapter_number,
+                    scene_type=plan.scene_type,
+                    target_length=plan.target_length,
+                    focus_characters=plan.characters,
+                    metadata={
+                        "scene_number": plan.scene_number,
+                        "total_scenes": len(plans),
+                        "depends_on": plan.depends_on
+                    },
+                    scene_context=self._build_scene_context(plan, outline, summaries)
+                )
+
+            if result.success:
+                summaries[plan.scene_number] = self._summarize_scene(result.content)
+            else:
+                logger.error(f"Failed to create scene {plan.scene_number}")
+            return result
+
+        # 依赖总是指向更早的场景，按顺序创建任务即可保证依赖任务已存在
+        for plan in plans:
+            scene_tasks[plan.scene_number] = asyncio.create_task(run_scene(plan))
+        results = await asyncio.gather(*scene_tasks.values())
+
+        chapter_results = [result for result in results if result.success]
+        content = "\n\n---\n\n".join(result.content for result in chapter_results)
+
+        validation = None
+        if content:
+            validation = await self.validator.validate_content(
+                content,
+                self._merge_scene_contexts(chapter_results),
+                validation_level="quick"
+            )
+
+        time_elapsed = (datetime.now() - start_time).total_seconds()
+        success_rate = len(chapter_results) / len(scenes) if scenes else 0
+
+        return {
+            "success": success_rate > 0.8,
+            "chapter_number": chapter_number,
+            "content": content,
+            "scenes_created": len(chapter_results),
+            "total_scenes": len(scenes),
+            "success_rate": success_rate,
+            "total_tokens": sum(result.total_tokens_used for result in chapter_results),
+            "time_elapsed": time_elapsed,
+            "individual_results": chapter_results,
+            "plan": [asdict(plan) for plan in plans],
+            "scene_summaries": summaries,
+            "validation_score": validation.score if validation else 0,
+            "validation_issues": validation.issues if validation else []
+        }
+
+    def _plan_chapter(self, scenes: List[Dict[str, Any]]) -> List[ScenePlan]:
+        """
+        生成场景简介和依赖关系
+
+        显式的 depends_on 优先；否则场景依赖于与其共享焦点角色的最近一个前序场景，
+        没有共享角色的场景互不依赖，可以并发生成。
+        """
+        plans = []
+        last_scene_of: Dict[str, int] = {}
+
+        for scene_number, scene_config in enumerate(scenes, 1):
+            characters = scene_config.get("characters")
+
+            if "depends_on" in scene_config:
+                depends_on = sorted({
+                    number for number in scene_config["depends_on"]
+                    if 0 < number < scene_number
+                })
+            else:
+                depends_on = sorted({
+                    last_scene_of[character] for character in characters or []
+                    if character in last_scene_of
+                })
+            for character in characters or []:
+                last_scene_of[character] = scene_number
+
+            plans.append(ScenePlan(
+                scene_number=scene_number,
+                scene_type=scene_config.get("type", "narrative"),
+                target_length=scene_config.get("length", 2000),
+                characters=characters,
+                brief=self._build_scene_brief(scene_config),
+                depends_on=depends_on
+            ))
+
+        return plans
+
+    def _build_scene_brief(self, scene_config: Dict[str, Any]) -> str:
+        """构建场景简介"""
+        parts = [
+            f"{scene_config.get('type', 'narrative')}场景，约{scene_config.get('length', 2000)}字"
+        ]
+        if scene_config.get("characters"):
+            parts.append(f"角色：{'、'.join(str(c) for c in scene_config['characters'])}")
+        description = scene_config.get("brief") or scene_config.get("summary")
+        if description:
+            parts.append(str(description))
+        return "；".join(parts)[:self.BRIEF_LENGTH]
+
+    def _build_scene_context(
+        self,
+        plan: ScenePlan,
+        outline: str,
+        summaries: Dict[int, str]
+    ) -> str:
+        """构建场景的前序内容：章节提纲加上所依赖场景的摘要"""
+        lines = [f"本章场景规划：\n{outline}", f"当前为第{plan.scene_number}个场景。"]
+        dependency_summaries = [
+            f"场景{number}摘要：{summaries[number]}"
+            for number in plan.depends_on if number in summaries
+        ]
+        if dependency_summaries:
+            lines.append("\n".join(dependency_summaries))
+        return "\n\n".join(lines)
+
+    def _summarize_scene(self, content: str) -> str:
+        """
+        抽取式场景摘要
+
+        取开头一句和结尾两句，限制在 SUMMARY_LENGTH 字以内，
+        让后续场景知道该场景的起点和结尾状态。
+        """
+        sentences = [s.strip() for s in re.split(r'(?<=[。！？!?…])\s*', content) if s.strip()]
+        if len(sentences) > 3:
+            sentences = [sentences[0], *sentences[-2:]]
+        summary = "".join(sentences)
+        if len(summary) > self.SUMMARY_LENGTH:
+            summary = summary[:self.SUMMARY_LENGTH - 1] + "…"
+        return summary
+
+    def _merge_scene_contexts(self, results: List[CreationResult]) -> Dict[str, Any]:
+        """合并各场景的prompt上下文，供整章验证使用"""
+        merged: Dict[str, Any] = {}
+        characters = []
+        seen = set()
+
+        for result in results:
+            task = self.tasks.get(result.metadata.get("task_id"))
+            if not task or not task.prompt_components:
+                continue
+            context = task.prompt_components.context
+            for key, value in context.items():
+                merged.setdefault(key, value)
+            for character in context.get("characters") or []:
+                key = json.dumps(character, ensure_ascii=False, sort_keys=True, default=str)
+                if key not in seen:
+                    seen.add(key)
+                    characters.append(character)
+
+        if characters:
+            merged["characters"] = characters
+        return merged
+
     async def create_scene(
         self,
         chapter_number: int,
@@ -172,7 +393,8 @@ class CreationWorkflow:
         target_length: int = 2000,
         focus_characters: Optional[List[str]] = None,
         previous_content: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        scene_context: Optional[str] = None
     ) -> CreationResult:
         """
         创作单个场景
@@ -184,11 +406,15 @@ class CreationWorkflow:
             focus_characters: 焦点角色
             previous_content: 前序内容
             metadata: 元数据
+            scene_context: 规划模式下的章节提纲和依赖场景摘要（长度有界），追加到用户prompt
 
         Returns:
             创作结果
         """
         task_id = f"task_{datetime.now().strftime('%Y%m%d%H%M%S')}_{chapter_number}_{scene_type}"
+        if metadata and "scene_number" in metadata:
+            # 同一章节的场景可能并发生成，用场景序号区分任务
+            task_id += f"_{metadata['scene_number']}"
         start_time = datetime.now()
 
         # 创建任务
@@ -215,6 +441,8 @@ class CreationWorkflow:
                 target_length=target_length,
                 previous_chapters=None  # 可以根据需要传入
             )
+            if scene_context:
+                prompt_components.user_prompt += f"\n\n## 本章前文\n{scene_context}"
             task.prompt_components = prompt_components
 
             # 2. 调用Claude API生成内容
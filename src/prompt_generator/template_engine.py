@@ -1,13 +1,41 @@
 """
 Prompt模板引擎
 提供灵活的prompt模板系统
+
+模板首次使用时编译为字面量/变量片段列表并按名称缓存，渲染只做片段拼接；
+全局变量的序列化结果会被缓存，批量渲染时共享的列表/字典值只序列化一次。
 """
 
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+from datetime import datetime
 import json
 import re
 from pathlib import Path
 
+VARIABLE_PATTERN = re.compile(r'\{(\w+)\}')
+
+
+class CompiledTemplate:
+    """编译后的模板：字面量片段与变量槽位"""
+
+    __slots__ = ("source", "parts", "slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        # parts 中变量位置先占位为空串，slots 记录 (位置, 变量名)
+        self.parts: List[str] = []
+        self.slots: List[Tuple[int, str]] = []
+
+        position = 0
+        for match in VARIABLE_PATTERN.finditer(source):
+            if match.start() > position:
+                self.parts.append(source[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1)))
+            self.parts.append("")
+            position = match.end()
+        if position < len(source):
+            self.parts.append(source[position:])
+
 
 class PromptTemplateEngine:
     """Prompt模板引擎"""
@@ -17,6 +45,9 @@ class PromptTemplateEngine:
         self.templates = self._load_default_templates()
         self.custom_templates = {}
         self.variables = {}
+        self._compiled: Dict[str, CompiledTemplate] = {}
+        # 全局变量名 -> (变量值, 序列化结果)
+        self._serialized_globals: Dict[str, Tuple[Any, str]] = {}
 
     def _load_default_templates(self) -> Dict[str, str]:
         """加载默认模板"""
@@ -314,6 +345,25 @@ class PromptTemplateEngine:
         """
         self.custom_templates[name] = template
 
+    def compile(self, template_name: str) -> CompiledTemplate:
+        """
+        获取编译后的模板
+
+        按模板名称缓存；模板内容被替换（自定义、导入等）后自动重新编译。
+
+        Args:
+            template_name: 模板名称
+
+        Returns:
+            编译后的模板
+        """
+        template = self.get_template(template_name)
+        compiled = self._compiled.get(template_name)
+        if compiled is None or compiled.source is not template:
+            compiled = CompiledTemplate(template)
+            self._compiled[template_name] = compiled
+        return compiled
+
     def render(self, template_name: str, **kwargs) -> str:
         """
         渲染模板
@@ -325,28 +375,73 @@ class PromptTemplateEngine:
         Returns:
             渲染后的文本
         """
-        template = self.get_template(template_name)
+        return self._render_compiled(self.compile(template_name), kwargs, {})
+
+    def render_many(self, template_name: str, variable_sets: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        用多组变量批量渲染同一个模板
 
-        # 合并全局变量和传入变量
-        variables = {**self.variables, **kwargs}
+        模板只编译一次；多组变量共享的同一列表/字典对象只序列化一次。
 
-        # 处理缺失变量
-        def replace_variable(match):
-            var_name = match.group(1)
+        Args:
+            template_name: 模板名称
+            variable_sets: 变量字典序列
+
+        Returns:
+            与变量组一一对应的渲染文本
+        """
+        compiled = self.compile(template_name)
+        shared: Dict[int, Tuple[Any, str]] = {}
+        return [self._render_compiled(compiled, variables, shared) for variables in variable_sets]
+
+    def _render_compiled(
+        self,
+        compiled: CompiledTemplate,
+        variables: Dict[str, Any],
+        shared: Dict[int, Tuple[Any, str]]
+    ) -> str:
+        """按槽位填充变量，传入变量优先于全局变量，缺失变量保留为 [变量名]"""
+        parts = compiled.parts.copy()
+        for index, var_name in compiled.slots:
             if var_name in variables:
                 value = variables[var_name]
-                # 处理不同类型的值
                 if isinstance(value, (list, dict)):
-                    return json.dumps(value, ensure_ascii=False, indent=2)
-                return str(value)
+                    # 仅在本次批量渲染内按对象复用；变量组可能来自生成器，
+                    # 之前的对象被释放后id会被复用，因此同时保存对象本身并校验
+                    cached = shared.get(id(value))
+                    if cached is None or cached[0] is not value:
+                        cached = (value, self._serialize(value))
+                        shared[id(value)] = cached
+                    parts[index] = cached[1]
+                else:
+                    parts[index] = str(value)
+            elif var_name in self.variables:
+                parts[index] = self._serialized_global(var_name)
             else:
                 # 返回占位符或默认值
-                return f"[{var_name}]"
+                parts[index] = f"[{var_name}]"
+        return "".join(parts)
 
-        # 使用正则表达式替换变量
-        rendered = re.sub(r'\{(\w+)\}', replace_variable, template)
+    @staticmethod
+    def _serialize(value: Any) -> str:
+        """将变量值转换为文本"""
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False, indent=2)
+        return str(value)
 
-        return rendered
+    def _serialized_global(self, name: str) -> str:
+        """
+        全局变量的序列化结果（缓存）
+
+        变量被重新赋值后重新序列化；原地修改列表/字典不会被察觉，
+        需重新调用 set_global_variable。
+        """
+        value = self.variables[name]
+        cached = self._serialized_globals.get(name)
+        if cached is None or cached[0] is not value:
+            cached = (value, self._serialize(value))
+            self._serialized_globals[name] = cached
+        return cached[1]
 
     def set_global_variable(self, name: str, value: Any):
         """
@@ -357,10 +452,12 @@ class PromptTemplateEngine:
             value: 变量值
         """
         self.variables[name] = value
+        self._serialized_globals.pop(name, None)
 
     def clear_global_variables(self):
         """清空全局变量"""
         self.variables.clear()
+        self._serialized_globals.clear()
 
     def create_template_from_example(
         self,
@@ -400,7 +497,7 @@ class PromptTemplateEngine:
             (是否有效, 变量列表)
         """
         # 查找所有变量
-        variables = re.findall(r'\{(\w+)\}', template)
+        variables = VARIABLE_PATTERN.findall(template)
 
         # 检查括号匹配
         open_count = template.count('{')
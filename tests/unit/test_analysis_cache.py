@@ -0,0 +1,137 @@
+"""
+Unit tests for the content-addressed analysis cache
+Tests graph fingerprints, stage keys, LRU eviction and stage reuse in the comprehensive model
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "analysis"))
+
+
+def _conflict_graph(n=60, m=150, reverse=False):
+    graph = nx.MultiDiGraph()
+    domains = ['人域', '天域', '灵域']
+    nodes = [(f"E{i}", {'domains': [domains[i % 3]], 'entity_type': ['人物', '组织'][i % 2]}) for i in range(n)]
+    edges = [
+        (f"E{j % n}", f"E{(j * 7 + 1) % n}", f"R{j}",
+         {'relation_type': ['敌对', '竞争'][j % 2], 'strength': (j % 10) / 10, 'friction_heat': 0.5})
+        for j in range(m) if j % n != (j * 7 + 1) % n
+    ]
+    edges += [(f"E{i}", f"E{(i + 1) % n}", f"C{i}", {'relation_type': '竞争', 'strength': 0.2}) for i in range(n)]
+    if reverse:
+        nodes, edges = nodes[::-1], edges[::-1]
+    graph.add_nodes_from(nodes)
+    graph.add_edges_from(edges)
+    return graph
+
+
+@pytest.mark.unit
+class TestGraphFingerprint:
+    """Test graph_fingerprint and stage_key"""
+
+    def test_insertion_order_ignored(self):
+        from analysis_cache import graph_fingerprint
+
+        assert graph_fingerprint(_conflict_graph()) == graph_fingerprint(_conflict_graph(reverse=True))
+
+        forward, backward = nx.Graph(), nx.Graph()
+        forward.add_edge("甲", "乙", strength=0.3)
+        backward.add_edge("乙", "甲", strength=0.3)
+        assert graph_fingerprint(forward) == graph_fingerprint(backward)
+
+    def test_edges_and_attributes_change_fingerprint(self):
+        """Unlike hashing the sorted node list, edge and weight changes are detected"""
+        from analysis_cache import graph_fingerprint
+
+        base = graph_fingerprint(_conflict_graph())
+
+        reweighted = _conflict_graph()
+        u, v, key = next(iter(reweighted.edges(keys=True)))
+        reweighted.edges[u, v, key]['strength'] = 0.99
+        rewired = _conflict_graph()
+        rewired.add_edge("E0", "E5", key="extra")
+
+        assert graph_fingerprint(reweighted) != base
+        assert graph_fingerprint(rewired) != base
+
+    def test_stage_key_includes_dependencies(self):
+        from analysis_cache import stage_key
+
+        key = stage_key('centrality', 'fp', {'precision': 'exact'}, {'intensity': 'a'})
+        assert key == stage_key('centrality', 'fp', {'precision': 'exact'}, {'intensity': 'a'})
+        assert key != stage_key('centrality', 'fp', {'precision': 'exact'}, {'intensity': 'b'})
+        assert key != stage_key('centrality', 'fp', {'precision': 'approximate'}, {'intensity': 'a'})
+
+
+@pytest.mark.unit
+class TestAnalysisCache:
+    """Test the on-disk LRU"""
+
+    def test_round_trip_and_eviction(self, tmp_path):
+        from analysis_cache import AnalysisCache
+
+        cache = AnalysisCache(str(tmp_path), max_bytes=10 ** 6)
+        payload = os.urandom(300_000)  # incompressible
+        for i in range(3):
+            cache.put(f"k{i}", payload)
+        assert cache.get("k0") == payload
+
+        cache.put("k3", payload)
+
+        assert len(cache) == 3
+        assert "k1" not in cache
+        assert "k0" in cache
+        assert cache.size_bytes() <= 10 ** 6
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        from analysis_cache import AnalysisCache, CACHE_SUFFIX
+
+        cache = AnalysisCache(str(tmp_path))
+        (tmp_path / f"broken{CACHE_SUFFIX}").write_bytes(b"not a pickle")
+
+        assert cache.get("broken") is None
+        assert "broken" not in cache
+        assert cache.misses == 1
+
+
+@pytest.mark.unit
+class TestComprehensiveAnalysisCache:
+    """Test stage reuse in run_comprehensive_analysis"""
+
+    def _run(self, tmp_path, **config):
+        from comprehensive_conflict_network_model import ComprehensiveConflictNetworkModel
+
+        model = ComprehensiveConflictNetworkModel(config={'cache_dir': str(tmp_path), **config})
+        model.main_network = _conflict_graph()
+        return model.run_comprehensive_analysis()
+
+    def test_unchanged_network_reuses_all_stages(self, tmp_path):
+        first = self._run(tmp_path)
+        second = self._run(tmp_path)
+
+        assert set(first['cache_status'].values()) == {'computed'}
+        assert set(second['cache_status'].values()) == {'hit'}
+        assert second['robustness_analysis'] == first['robustness_analysis']
+        assert second['summary'] == first['summary']
+
+    def test_parameter_change_only_recomputes_dependents(self, tmp_path):
+        self._run(tmp_path)
+        status = self._run(tmp_path, robustness_runs=5)['cache_status']
+
+        assert status.pop('robustness') == 'computed'
+        assert set(status.values()) == {'hit'}
+
+    def test_cached_results_match_uncached(self, tmp_path):
+        """Per-stage seeding makes results independent of which stages hit the cache"""
+        self._run(tmp_path, robustness_runs=5)
+        cached = self._run(tmp_path)
+        uncached = self._run(tmp_path, enable_caching=False)
+
+        assert uncached['cache_status']['robustness'] == 'computed'
+        assert cached['robustness_analysis'] == uncached['robustness_analysis']
+        assert cached['propagation_model'] == uncached['propagation_model']
@@ -0,0 +1,160 @@
+"""
+Unit tests for the sampled centrality engine
+Tests pivot-sampled betweenness/closeness, path bounds and power iteration against NetworkX
+"""
+
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "analysis"))
+
+
+def _max_error(estimate, reference):
+    return max(abs(estimate[node] - reference[node]) for node in reference)
+
+
+@pytest.fixture
+def conflict_graph():
+    graph = nx.gnm_random_graph(80, 200, seed=11)
+    graph = nx.relabel_nodes(graph, {i: f"节点{i}" for i in graph.nodes()})
+    graph.add_node("孤立节点")
+    return graph
+
+
+@pytest.mark.unit
+class TestSampledCentralityEngine:
+    """Test SampledCentralityEngine"""
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_all_pivots_match_exact(self, directed):
+        """With every node as a pivot the estimates equal NetworkX"""
+        from approximate_centrality import SampledCentralityEngine
+
+        graph = nx.gnm_random_graph(60, 150, seed=3, directed=directed)
+        result = SampledCentralityEngine(graph, batch_size=7).betweenness_closeness(k=1000)
+
+        assert result['error_bounds']['exact']
+        assert _max_error(result['betweenness'], nx.betweenness_centrality(graph)) < 1e-6
+        assert _max_error(result['closeness'], nx.closeness_centrality(graph)) < 1e-6
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_deep_graph_matches_exact(self, directed):
+        """Graphs deeper than MAX_BATCH_BFS_DEPTH fall back to per-source accumulation"""
+        from approximate_centrality import MAX_BATCH_BFS_DEPTH, SampledCentralityEngine
+
+        graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(3, MAX_BATCH_BFS_DEPTH + 10))
+        if directed:
+            graph = graph.to_directed()
+            graph.remove_edges_from([(u, v) for u, v in list(graph.edges()) if u > v and u % 5 == 0])
+        engine = SampledCentralityEngine(graph, batch_size=16)
+        result = engine.betweenness_closeness(k=1000)
+
+        assert engine._deep
+        assert _max_error(result['betweenness'], nx.betweenness_centrality(graph)) < 1e-9
+        assert _max_error(result['closeness'], nx.closeness_centrality(graph)) < 1e-9
+
+    @pytest.mark.slow
+    @pytest.mark.parametrize("size", [100, 140])
+    def test_large_grid_path_counts_do_not_overflow(self, size):
+        """Shortest-path counts on large grids exceed float32 without producing NaN"""
+        from approximate_centrality import SampledCentralityEngine
+
+        graph = nx.grid_2d_graph(size, size)
+        result = SampledCentralityEngine(graph).betweenness_closeness(k=8, seed=4)
+        values = np.array(list(result['betweenness'].values()))
+
+        assert np.isfinite(values).all()
+        assert values.min() >= 0
+        assert values.max() > 0
+        # Shortest paths concentrate in the middle of the grid
+        assert result['betweenness'][(size // 2, size // 2)] > result['betweenness'][(0, 0)]
+
+    def test_sampled_within_error_bound(self, conflict_graph):
+        """Sampled betweenness stays within the reported Hoeffding bound"""
+        from approximate_centrality import SampledCentralityEngine
+
+        result = SampledCentralityEngine(conflict_graph).betweenness_closeness(k=30, seed=1)
+        bound = result['error_bounds']['betweenness']
+
+        assert 0 < bound < 1
+        assert _max_error(result['betweenness'], nx.betweenness_centrality(conflict_graph)) <= bound
+        assert result['closeness']["孤立节点"] == 0.0
+
+    def test_path_statistics_bounds(self):
+        """Diameter/radius intervals contain the exact values"""
+        from approximate_centrality import SampledCentralityEngine
+
+        graph = nx.connected_watts_strogatz_graph(300, 6, 0.1, seed=1)
+        engine = SampledCentralityEngine(graph)
+        stats = engine.path_statistics(k=40, seed=2)
+        bounds = stats['error_bounds']
+
+        low, high = bounds['diameter_interval']
+        assert low <= nx.diameter(graph) <= high
+        low, high = bounds['radius_interval']
+        assert low <= nx.radius(graph) <= high
+        assert abs(stats['avg_path_length'] - nx.average_shortest_path_length(graph)) < 0.5
+
+        exact = engine.path_statistics(k=1000, seed=2)
+        assert exact['avg_path_length'] == pytest.approx(nx.average_shortest_path_length(graph))
+        assert exact['eccentricities'] == nx.eccentricity(graph)
+
+    def test_global_efficiency_within_error_bound(self, conflict_graph):
+        """Sampled efficiency stays within its bound and is exact with every node as a pivot"""
+        from approximate_centrality import SampledCentralityEngine
+
+        engine = SampledCentralityEngine(conflict_graph, batch_size=16)
+        expected = nx.global_efficiency(conflict_graph)
+
+        sampled = engine.global_efficiency(k=30, seed=1)
+        assert 0 < sampled['error_bounds']['efficiency'] < 1
+        assert abs(sampled['efficiency'] - expected) <= sampled['error_bounds']['efficiency']
+
+        exact = engine.global_efficiency(k=1000)
+        assert exact['error_bounds']['exact']
+        assert exact['efficiency'] == pytest.approx(expected)
+
+    def test_deep_graph_pivot_distances(self):
+        """Distances without a depth bound fall back to per-source BFS on deep graphs"""
+        from approximate_centrality import MAX_BATCH_BFS_DEPTH, SampledCentralityEngine
+
+        graph = nx.path_graph(MAX_BATCH_BFS_DEPTH + 10)
+        graph.add_node("孤立节点")
+        engine = SampledCentralityEngine(graph, batch_size=4)
+
+        result = engine.global_efficiency(k=1000)
+
+        assert engine._deep
+        assert result['efficiency'] == pytest.approx(nx.global_efficiency(graph))
+
+    def test_power_iteration_matches_networkx(self, conflict_graph):
+        """Sparse eigenvector/Katz/PageRank match the dict-based implementations"""
+        from approximate_centrality import SampledCentralityEngine
+
+        engine = SampledCentralityEngine(conflict_graph)
+        eigenvector, _ = engine.eigenvector()
+        katz, _ = engine.katz()
+        pagerank, info = engine.pagerank()
+
+        assert _max_error(eigenvector, nx.eigenvector_centrality(conflict_graph, max_iter=1000)) < 1e-9
+        assert _max_error(katz, nx.katz_centrality(conflict_graph, max_iter=1000)) < 1e-9
+        assert _max_error(pagerank, nx.pagerank(conflict_graph)) < 1e-9
+        assert info['iterations'] > 0
+
+    def test_katz_divergence_raises(self):
+        """alpha above 1/lambda_max fails like NetworkX"""
+        from approximate_centrality import SampledCentralityEngine
+
+        with pytest.raises(nx.PowerIterationFailedConvergence):
+            SampledCentralityEngine(nx.complete_graph(30)).katz(alpha=0.5)
+
+    def test_unknown_precision_rejected(self):
+        from approximate_centrality import validate_precision
+
+        assert validate_precision('approximate') == 'approximate'
+        with pytest.raises(ValueError):
+            validate_precision('fast')
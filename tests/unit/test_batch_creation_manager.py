@@ -0,0 +1,134 @@
+"""
+Unit tests for the batch creation scheduler
+Tests concurrent workers, token-bucket rate limiting and per-novel fairness
+"""
+
+import asyncio
+import pytest
+
+
+class _StubWorkflow:
+    """Mock-API workflow that records execution order and concurrency"""
+
+    def __init__(self, novel_id, log, delay=0.05):
+        self.novel_id = novel_id
+        self.log = log
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def create_scene(self, chapter_number, scene_type, target_length, metadata):
+        from prompt_generator.creation_workflow import CreationResult
+
+        self.log.append((self.novel_id, chapter_number))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return CreationResult(
+            success=True, content="mock", prompt_used=None, validation_score=0.9,
+            iterations=1, total_tokens_used=10, time_elapsed=self.delay, metadata={}
+        )
+
+
+def _make_manager(max_concurrent=3, rate_limit=600):
+    from batch_creation_manager import BatchCreationManager
+
+    return BatchCreationManager(
+        max_concurrent=max_concurrent, rate_limit=rate_limit,
+        use_real_api=False, enable_cost_control=False
+    )
+
+
+async def _run(manager, timeout=5):
+    runner = asyncio.create_task(manager.start())
+    await manager.wait_for_completion(timeout=timeout)
+    await manager.stop()
+    await runner
+
+
+@pytest.mark.unit
+class TestBatchCreationManager:
+    """Test BatchCreationManager scheduling"""
+
+    async def test_tasks_run_concurrently(self):
+        """Throughput scales with max_concurrent"""
+        manager = _make_manager(max_concurrent=4)
+        log = []
+        workflow = _StubWorkflow("novel-a", log, delay=0.1)
+        manager.workflows["novel-a"] = workflow
+
+        for chapter in range(8):
+            await manager.add_task("novel-a", chapter)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await _run(manager)
+
+        assert workflow.peak == 4
+        assert loop.time() - started < 0.6
+        assert manager.statistics.completed_tasks == 8
+
+    async def test_priority_then_novel_fairness(self):
+        """Higher priority first; within a priority novels alternate"""
+        from batch_creation_manager import TaskPriority
+
+        manager = _make_manager(max_concurrent=1)
+        log = []
+        for novel_id in ("novel-a", "novel-b"):
+            manager.workflows[novel_id] = _StubWorkflow(novel_id, log, delay=0)
+
+        for chapter in range(3):
+            await manager.add_task("novel-a", chapter)
+        for chapter in range(3):
+            await manager.add_task("novel-b", chapter)
+        await manager.add_task("novel-b", 99, priority=TaskPriority.HIGH)
+
+        assert manager.get_queue_info()["next_tasks"][0].endswith("_6")
+        await _run(manager)
+
+        assert log[0] == ("novel-b", 99)
+        assert [novel for novel, _ in log[1:]] == ["novel-a", "novel-b"] * 3
+
+    async def test_token_bucket_limits_rate(self):
+        """Requests beyond the burst wait for refilled tokens"""
+        from batch_creation_manager import TokenBucketRateLimiter
+
+        limiter = TokenBucketRateLimiter(rate=20, period=1.0, capacity=2)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        for _ in range(4):
+            await limiter.acquire()
+
+        # 2 burst tokens, then 2 more at 20/s
+        assert 0.08 <= loop.time() - started < 0.3
+
+    async def test_workflow_published_after_initialization(self, monkeypatch):
+        """Concurrent workers for one novel share a single, fully initialized workflow"""
+        import batch_creation_manager
+
+        class SlowWorkflow:
+            created = 0
+
+            def __init__(self, novel_id, use_real_api):
+                SlowWorkflow.created += 1
+                self.initialized = False
+
+            async def initialize(self):
+                await asyncio.sleep(0.05)
+                if SlowWorkflow.created == 1:
+                    raise RuntimeError("database unavailable")
+                self.initialized = True
+
+        monkeypatch.setattr(batch_creation_manager, "CreationWorkflow", SlowWorkflow)
+        manager = _make_manager()
+
+        with pytest.raises(RuntimeError):
+            await manager._get_workflow("novel-a")
+        assert "novel-a" not in manager.workflows
+
+        workflows = await asyncio.gather(*(manager._get_workflow("novel-a") for _ in range(5)))
+
+        assert all(workflow is workflows[0] and workflow.initialized for workflow in workflows)
+        assert SlowWorkflow.created == 2
@@ -0,0 +1,97 @@
+"""
+Unit tests for set-based bulk imports
+Tests COPY staging, SQL-side name resolution and per-phase progress reporting
+"""
+
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _mock_connection(execute_results, fetch_result=None):
+    conn = MagicMock()
+    conn.execute = AsyncMock(side_effect=execute_results)
+    conn.fetch = AsyncMock(return_value=fetch_result or [])
+    conn.copy_records_to_table = AsyncMock(return_value="COPY 0")
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+
+    conn.transaction = transaction
+    return conn
+
+
+def _importer(conn, progress):
+    from database.conflict_data_importer import ConflictDataImporter, ImportConfig
+
+    async def on_progress(phase):
+        progress.append((phase.phase, phase.processed, phase.skipped))
+
+    importer = ConflictDataImporter(ImportConfig(), progress_callback=on_progress)
+    importer.conn = conn
+    return importer
+
+
+@pytest.mark.unit
+class TestConflictBulkImport:
+    """Test ConflictDataImporter bulk import path"""
+
+    async def test_entities_copied_and_resolved_in_one_phase(self):
+        """All entities go through one COPY and one merge; names map to stored ids"""
+        existing_id = uuid.uuid4()
+        conn = _mock_connection(
+            ["SELECT 0", "INSERT 0 2"],
+            fetch_result=[{"name": "灵脉", "id": existing_id}]
+        )
+        progress = []
+        importer = _importer(conn, progress)
+        analysis_data = {
+            "conflict_elements": {"entities": [
+                {"name": "灵脉", "entity_type": "明确实体", "domains": ["人域", "天域"]},
+                {"name": "法则链", "entity_type": "制度法条", "domains": ["天域"]},
+            ]},
+            "enhanced_elements": {"entities": [{"name": "灵脉", "entity_type": "明确实体"}]},
+        }
+
+        entity_ids = await importer.bulk_import_conflict_entities(analysis_data, {"人域↔天域": uuid.uuid4()})
+
+        records = conn.copy_records_to_table.call_args.kwargs["records"]
+        assert len(records) == 3
+        assert records[1][4] == "法条制度"
+        assert conn.copy_records_to_table.await_count == 1
+        assert "ON CONFLICT (novel_id, name, entity_type) DO NOTHING" in conn.execute.call_args_list[1].args[0]
+        assert entity_ids == {"灵脉": existing_id}
+        assert importer.stats["entities_imported"] == 2
+        assert progress == [("conflict_entities", 2, 1)]
+
+    async def test_relations_resolve_names_in_sql(self):
+        """Relations are staged by name and joined against the name→id arrays"""
+        conn = _mock_connection(["SELECT 0", "ALTER TABLE", "INSERT 0 1"])
+        progress = []
+        importer = _importer(conn, progress)
+        entity_ids = {"灵脉": uuid.uuid4(), "法则链": uuid.uuid4()}
+        analysis_data = {"conflict_elements": {"relationships": [
+            {"source": "灵脉", "target": "法则链", "relationship_type": "controls"},
+            {"source": "灵脉", "target": "未知", "relationship_type": "controls"},
+        ]}}
+
+        await importer.bulk_import_conflict_relations(analysis_data, entity_ids)
+
+        records = conn.copy_records_to_table.call_args.kwargs["records"]
+        assert records[0][0] == "控制" and records[0][-2:] == ("灵脉", "法则链")
+        merge_call = conn.execute.call_args_list[2]
+        assert "unnest($2::text[], $3::uuid[])" in merge_call.args[0]
+        assert merge_call.args[2] == list(entity_ids.keys())
+        assert importer.stats["relations_imported"] == 1
+        assert progress == [("conflict_relations", 1, 1)]
+
+    async def test_failed_phase_is_recorded(self):
+        conn = _mock_connection([RuntimeError("copy failed")])
+        importer = _importer(conn, [])
+        analysis_data = {"conflict_elements": {"entities": [{"name": "灵脉"}]}}
+
+        assert await importer.bulk_import_conflict_entities(analysis_data, {}) == {}
+        assert importer.stats["entities_imported"] == 0
+        assert "copy failed" in importer.stats["errors"][0]
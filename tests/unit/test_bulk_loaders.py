@@ -0,0 +1,139 @@
+"""
+Unit tests for bulk database loaders
+Tests COPY-based upsert into PostgreSQL and bulk_write upsert into MongoDB
+"""
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _mock_connection(status="INSERT 0 3"):
+    conn = MagicMock()
+    conn.execute = AsyncMock(side_effect=["CREATE TABLE", status])
+    conn.copy_records_to_table = AsyncMock()
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+
+    conn.transaction = transaction
+    return conn
+
+
+@pytest.mark.unit
+class TestPostgresCopyUpsert:
+    """Test PostgreSQLConnection.copy_upsert"""
+
+    async def test_copy_then_single_merge(self):
+        """Records are copied to a staging table and merged in one statement"""
+        from database.connections.postgresql import PostgreSQLConnection
+
+        db = PostgreSQLConnection()
+        conn = _mock_connection()
+
+        @asynccontextmanager
+        async def get_connection():
+            yield conn
+
+        db.get_connection = get_connection
+        records = [("1", "plot", "a"), ("2", "plot", "b"), ("3", "plot", "c")]
+
+        rows = await db.copy_upsert(
+            "processed_plot", ["original_id", "content_type", "cleaned_content"], records,
+            conflict_columns=["original_id", "content_type"], update_columns=["cleaned_content"]
+        )
+
+        assert rows == 3
+        create_sql = conn.execute.call_args_list[0].args[0]
+        merge_sql = conn.execute.call_args_list[1].args[0]
+        assert "TEMP TABLE _staging_processed_plot ON COMMIT DROP" in create_sql
+        assert conn.copy_records_to_table.call_args.kwargs["records"] == records
+        assert "ON CONFLICT (original_id, content_type) DO UPDATE SET cleaned_content = EXCLUDED.cleaned_content" in merge_sql
+        assert conn.execute.await_count == 2
+
+    async def test_empty_batch_skips_database(self):
+        from database.connections.postgresql import PostgreSQLConnection
+
+        db = PostgreSQLConnection()
+        db.get_connection = MagicMock()
+
+        assert await db.copy_upsert("t", ["a"], [], ["a"], []) == 0
+        db.get_connection.assert_not_called()
+
+
+@pytest.mark.unit
+class TestMongoBulkUpsert:
+    """Test MongoDBConnection.bulk_upsert"""
+
+    async def test_single_bulk_write(self):
+        """All documents go out in one unordered bulk_write of upserts"""
+        from database.connections.mongodb import MongoDBConnection
+
+        db = MongoDBConnection()
+        collection = MagicMock()
+        collection.bulk_write = AsyncMock(
+            return_value=MagicMock(matched_count=1, modified_count=1, upserted_count=2)
+        )
+        db.get_collection = MagicMock(return_value=collection)
+        documents = [{"original_id": str(i), "content_type": "plot", "x": i} for i in range(3)]
+
+        result = await db.bulk_upsert("processed_plot", documents, ["original_id", "content_type"])
+
+        operations = collection.bulk_write.call_args.args[0]
+        assert len(operations) == 3
+        assert collection.bulk_write.await_count == 1
+        assert collection.bulk_write.call_args.kwargs == {"ordered": False}
+        assert operations[0]._filter == {"original_id": "0", "content_type": "plot"}
+        assert operations[0]._upsert is True
+        assert result == {"matched": 1, "modified": 1, "upserted": 2}
+
+
+def _records(ids):
+    return [{"original_id": str(i), "content_type": "plot"} for i in ids]
+
+
+@pytest.mark.unit
+class TestPipelineLoadBuffer:
+    """Test buffered loads in PipelineManager"""
+
+    async def test_failed_flush_keeps_records(self):
+        """Records from a failed load stay buffered and load on the next flush"""
+        from etl.pipeline_manager import PipelineManager
+        from etl.types import ContentType, PipelineConfig
+
+        manager = PipelineManager(PipelineConfig(load_batch_size=2, output_mongodb=False))
+        loaded = []
+        calls = iter([None, RuntimeError("connection lost")])
+
+        async def load(batch, content_type):
+            outcome = next(calls, None)
+            if outcome is not None:
+                raise outcome
+            loaded.extend(record["original_id"] for record in batch)
+
+        manager._load_to_postgres = load
+        manager._load_buffers[ContentType.PLOT] = _records(range(5))
+        manager._load_buffered_since[ContentType.PLOT] = 0.0
+
+        with pytest.raises(RuntimeError):
+            await manager.flush_loads(ContentType.PLOT)
+        assert loaded == ["0", "1"]
+        assert manager._load_buffers[ContentType.PLOT] == _records(range(2, 5))
+        assert manager._load_buffered_since[ContentType.PLOT] == 0.0
+
+        await manager.flush_loads(ContentType.PLOT)
+        assert loaded == ["0", "1", "2", "3", "4"]
+        assert not manager._load_buffers.get(ContentType.PLOT)
+
+    def test_load_batch_history_bounded(self):
+        """Per-batch details are capped while totals keep counting"""
+        from etl.types import LOAD_BATCH_HISTORY, LoadBatchMetrics, ProcessingMetrics
+
+        metrics = ProcessingMetrics()
+        for _ in range(LOAD_BATCH_HISTORY + 5):
+            metrics.record_load(LoadBatchMetrics(target="postgres", collection="t", rows=2, latency_ms=1.0))
+
+        assert len(metrics.load_batches) == LOAD_BATCH_HISTORY
+        assert metrics.load_batch_count == LOAD_BATCH_HISTORY + 5
+        assert metrics.loaded_rows == 2 * (LOAD_BATCH_HISTORY + 5)
@@ -0,0 +1,133 @@
+"""
+Unit tests for in-process AI cache tiers
+Tests the O(1) LRU memory tier, the semantic index and the offline embedder
+"""
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.unit
+class TestLRUMemoryCache:
+    """Test LRUMemoryCache"""
+
+    def test_evicts_least_recently_used(self):
+        from ai.cache_tiers import LRUMemoryCache
+
+        cache = LRUMemoryCache(max_items=2)
+        cache.put("a", 1, 10)
+        cache.put("b", 2, 10)
+        cache.get("a")
+
+        assert cache.put("c", 3, 10) == ["b"]
+        assert cache.keys() == ["a", "c"]
+
+    def test_byte_limit(self):
+        """Entries are evicted once the byte budget is exceeded"""
+        from ai.cache_tiers import LRUMemoryCache, estimate_size
+
+        cache = LRUMemoryCache(max_items=100, max_bytes=100)
+        for i in range(5):
+            cache.put(f"k{i}", "x" * 30, estimate_size("x" * 30))
+
+        assert len(cache) == 3
+        assert cache.total_bytes == 90
+        del cache["k4"]
+        assert cache.total_bytes == 60
+
+
+@pytest.mark.unit
+class TestSemanticIndex:
+    """Test SemanticIndex"""
+
+    def _vectors(self, n, dim=32, seed=0):
+        return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+    def test_exact_top_k(self):
+        """Brute-force search matches a reference cosine ranking"""
+        from ai.cache_tiers import SemanticIndex
+
+        vectors = self._vectors(200)
+        index = SemanticIndex(max_entries=500, ann_backend="none")
+        for i, vector in enumerate(vectors):
+            index.add(f"k{i}", vector, i)
+
+        query = vectors[17] + 0.1
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(normalized @ (query / np.linalg.norm(query)))[::-1][:3]
+
+        results = index.search(query, top_k=3)
+        assert [payload for _, _, payload in results] == expected.tolist()
+        assert index.search(query, top_k=3, min_score=1.01) == []
+
+    def test_eviction_and_removal(self):
+        """Oldest entries are evicted and removed keys never match"""
+        from ai.cache_tiers import SemanticIndex
+
+        vectors = self._vectors(10)
+        index = SemanticIndex(max_entries=5, ann_backend="none")
+        for i, vector in enumerate(vectors):
+            index.add(f"k{i}", vector, i)
+
+        assert len(index) == 5
+        assert "k4" not in index and "k9" in index
+        index.remove("k9")
+        assert all(key != "k9" for key, _, _ in index.search(vectors[9], top_k=5))
+
+    def test_ivf_index_recall(self):
+        """IVF index is built past the threshold and finds near-duplicates"""
+        from ai.cache_tiers import SemanticIndex
+
+        rng = np.random.default_rng(1)
+        centers = rng.normal(size=(50, 32)).astype(np.float32)
+        vectors = centers[rng.integers(0, 50, 3000)] + 0.2 * rng.normal(size=(3000, 32)).astype(np.float32)
+
+        index = SemanticIndex(max_entries=5000, ann_threshold=1000, ann_backend="ivf")
+        for i, vector in enumerate(vectors):
+            index.add(f"k{i}", vector, i)
+
+        assert index.ann_active
+        hits = sum(index.search(vectors[i] + 1e-3, top_k=1)[0][2] == i for i in range(0, 3000, 100))
+        assert hits >= 28
+
+    def test_default_config_builds_ann(self):
+        """With the default sizes the index fills past the ANN threshold before evicting"""
+        from ai.cache_tiers import SemanticIndex
+
+        index = SemanticIndex()
+        assert index.ann_threshold < index.max_entries
+
+        vectors = self._vectors(index.ann_threshold)
+        for i, vector in enumerate(vectors):
+            index.add(f"k{i}", vector, i)
+
+        assert index.ann_active
+        assert len(index) == index.ann_threshold
+        assert index.search(vectors[7], top_k=1)[0][2] == 7
+
+    def test_cache_manager_defaults_reach_ann(self):
+        pytest.importorskip("redis")
+        pytest.importorskip("sqlalchemy")
+        from src.ai.cache_manager import CacheManager
+        from src.ai.embedders import HashingEmbedder
+
+        manager = CacheManager(embedder=HashingEmbedder())
+
+        assert manager.semantic_cache.ann_threshold < manager.semantic_cache.max_entries
+
+
+@pytest.mark.unit
+class TestHashingEmbedder:
+    """Test the offline embedder"""
+
+    async def test_similar_prompts_score_higher(self):
+        from ai.embedders import HashingEmbedder
+
+        embedder = HashingEmbedder(dim=256)
+        base = await embedder.embed("林潜以因果链反噬炎家长老的攻击")
+        similar = await embedder.embed("林潜用因果链反噬炎家长老的攻击")
+        other = await embedder.embed("灵器坊首席器械师墨云山从天而降")
+
+        assert base.shape == (256,)
+        assert float(base @ similar) > float(base @ other)
+        assert await embedder.embed("") is None
@@ -0,0 +1,153 @@
+"""
+Unit tests for the durable change log
+Tests buffered appends, replay after restart, index snapshots and segment retention
+"""
+
+import json
+import logging
+import os
+
+import pytest
+
+
+def _store(directory, **kwargs):
+    from etl.change_log import ChangeLogStore
+    options = {"flush_interval": 0, "flush_batch_size": 10, **kwargs}
+    return ChangeLogStore(directory, **options)
+
+
+def _entry(i, content_hash=None):
+    return {"record_id": f"r{i % 5}", "content_hash": content_hash or f"h{i}", "version_id": f"v{i}"}
+
+
+@pytest.mark.unit
+class TestChangeLogStore:
+    """Test ChangeLogStore"""
+
+    async def test_append_buffers_until_batch_size(self, tmp_path):
+        store = _store(tmp_path, flush_batch_size=3)
+        await store.append(_entry(0))
+        await store.append(_entry(1))
+
+        assert store._segments() == []
+        assert store.content_hash("r1") == "h1"
+        assert [e["version_id"] for e in store.iter_entries()] == ["v1", "v0"]
+
+        await store.append(_entry(2))
+        assert store._buffer == []
+        assert [e["version_id"] for e in store.iter_entries(newest_first=False)] == ["v0", "v1", "v2"]
+        await store.close()
+
+    async def test_replay_after_restart(self, tmp_path):
+        """Entries flushed after the last snapshot are replayed on open"""
+        store = _store(tmp_path)
+        for i in range(7):
+            await store.append(_entry(i))
+        await store.close()
+
+        # Entries written after the snapshot, then a crash without close()
+        store = _store(tmp_path)
+        for i in range(7, 12):
+            await store.append(_entry(i))
+        await store.flush()
+        expected = dict(store.index)
+
+        reopened = _store(tmp_path)
+        await reopened.open()
+
+        assert reopened.index == expected
+        assert reopened.content_hash("r1") == "h11"
+        assert reopened.latest_version("r0") == "v10"
+        assert len(reopened) == 5
+        await reopened.close()
+
+    async def test_snapshot_checkpoint_skips_replayed_entries(self, tmp_path):
+        """The index snapshot records the log position; earlier entries are not re-read"""
+        store = _store(tmp_path)
+        for i in range(4):
+            await store.append(_entry(i))
+        await store.close()
+
+        snapshot = json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))
+        assert snapshot["checkpoint"] == [0, 4]
+        assert snapshot["records"]["r3"] == ["h3", "v3"]
+
+        # Entries before the checkpoint are trusted from the snapshot
+        snapshot["records"]["r3"] = ["from-snapshot", "v3"]
+        (tmp_path / "index.json").write_text(json.dumps(snapshot), encoding="utf-8")
+        reopened = _store(tmp_path)
+        await reopened.open()
+        assert reopened.content_hash("r3") == "from-snapshot"
+        await reopened.close()
+
+    async def test_corrupt_snapshot_rebuilds_from_segments(self, tmp_path):
+        store = _store(tmp_path)
+        for i in range(6):
+            await store.append(_entry(i))
+        await store.close()
+
+        (tmp_path / "index.json").write_text("{not json", encoding="utf-8")
+        reopened = _store(tmp_path)
+        await reopened.open()
+
+        assert reopened.content_hash("r0") == "h5"
+        assert reopened.content_hash("r4") == "h4"
+        await reopened.close()
+
+    @pytest.mark.parametrize("max_segments", [1, 2, 3])
+    async def test_rotation_retains_max_segments(self, tmp_path, max_segments):
+        """Retention counts the active segment"""
+        store = _store(tmp_path, segment_max_records=4, max_segments=max_segments, flush_batch_size=1)
+        for i in range(30):
+            await store.append(_entry(i))
+            assert len(store._segments()) <= max_segments
+
+        segments = store._segments()
+        assert len(segments) == max_segments
+        assert segments[-1] == store._segment_seq
+        await store.close()
+
+        # The index keeps records whose entries were dropped with old segments
+        reopened = _store(tmp_path, segment_max_records=4, max_segments=max_segments)
+        await reopened.open()
+        assert len(reopened) == 5
+        assert reopened.content_hash("r4") == "h29"
+        assert (reopened._segment_seq, reopened._segment_records) == (7, 2)
+        await reopened.close()
+
+
+@pytest.mark.unit
+class TestDefaultChangeLogDir:
+    """Test where the change log lives when no directory is configured"""
+
+    def test_env_var_used(self, tmp_path, monkeypatch):
+        from etl.change_log import default_change_log_dir
+
+        monkeypatch.setenv("CHANGE_LOG_DIR", str(tmp_path))
+
+        assert default_change_log_dir() == tmp_path
+
+    @pytest.mark.skipif(os.name == "nt", reason="XDG data directory")
+    @pytest.mark.parametrize("xdg_data_home", [True, False])
+    def test_falls_back_to_persistent_data_dir(self, tmp_path, monkeypatch, caplog, xdg_data_home):
+        from etl.change_log import default_change_log_dir
+
+        monkeypatch.delenv("CHANGE_LOG_DIR", raising=False)
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        if xdg_data_home:
+            monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+            expected = tmp_path / "data" / "novellus" / "change_log"
+        else:
+            monkeypatch.delenv("XDG_DATA_HOME", raising=False)
+            expected = tmp_path / "home" / ".local" / "share" / "novellus" / "change_log"
+
+        with caplog.at_level(logging.WARNING, logger="etl.change_log"):
+            assert default_change_log_dir() == expected
+        assert "CHANGE_LOG_DIR" in caplog.text
+
+    def test_incremental_processor_uses_default(self, tmp_path, monkeypatch):
+        from etl.incremental_processor import IncrementalProcessor
+
+        monkeypatch.setenv("CHANGE_LOG_DIR", str(tmp_path))
+
+        assert IncrementalProcessor().change_store.directory == tmp_path
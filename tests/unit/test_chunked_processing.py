@@ -0,0 +1,210 @@
+"""
+Unit tests for chunked cultural text processing
+Tests chunk boundaries and overlap, the chunk result cache, batch merging
+and that chunked processing matches processing the whole text
+"""
+
+from collections import Counter
+from uuid import uuid4
+
+import pytest
+
+TEXT = """人域｜六维文化框架
+
+A. 神话与宗教
+信条：链是"看不见的鞭子"，顺链得安、逆链遭殃。
+神祇与机构：乡祠供奉"环祖"（九环祖像），由"乡祭"掌礼；城内设祭司分坊。
+
+B. 权力与法律
+结构：县府（吏治）＋宗门驻坊（修治）双轨；大案须报天域巡链司。
+刑罚：逃籍/伪票→笞与流；传授断链术→加缚或链枷。
+
+C. 经济与技术
+产业：谷物、盐铁、陶织、驭兽农具；向宗门供童生与杂役。
+技术：环铸法、锻链术、法则工艺传承有师承制约束。
+
+D. 家庭与教育
+婚嫁：需"环印"合证，双方家谱链印验真；跨籍联姻受限。
+教育：童生入宗门习艺，成年考"链诀"定品阶。
+
+【剧情钩子】
+1. 祖灵续籍祭夜，有人盗改家谱链印，引发血脉争议。
+2. 跨域商贸中发现伪造链票，引发人域与海域的外交纠纷。
+"""
+
+
+def _chunks(text, chunk_size=120, overlap=40):
+    from etl.chunked_processing import NINE_DOMAINS_HEADING_PATTERN, iter_text_chunks
+    return list(iter_text_chunks(text, chunk_size, overlap, NINE_DOMAINS_HEADING_PATTERN))
+
+
+def _relation(description, relation_type=None):
+    from database.models.cultural_framework_models import (
+        CulturalRelationCreate, DomainType, RelationType
+    )
+    return CulturalRelationCreate(
+        novel_id=uuid4(),
+        source_entity_id=uuid4(),
+        target_entity_id=uuid4(),
+        relation_type=relation_type or RelationType.SIMILAR_TO,
+        description=description,
+        source_domain=DomainType.HUMAN_DOMAIN,
+        target_domain=DomainType.HUMAN_DOMAIN
+    )
+
+
+def _relation_counts(batch):
+    return Counter((r.relation_type, r.context or "", r.strength, r.is_cross_domain) for r in batch.relations)
+
+
+def _plot_hook(description):
+    from database.models.cultural_framework_models import DomainType, PlotHookCreate
+    return PlotHookCreate(novel_id=uuid4(), domain_type=DomainType.HUMAN_DOMAIN,
+                          title=description[:10], description=description)
+
+
+@pytest.mark.unit
+class TestIterTextChunks:
+    """Test chunk boundaries and overlap windows"""
+
+    def test_cores_tile_the_text(self):
+        """Core regions are contiguous, bounded by chunk_size and cover the whole text"""
+        chunks = _chunks(TEXT)
+
+        assert len(chunks) > 1
+        assert "".join(chunk.core_text for chunk in chunks) == TEXT
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert chunk.core_start == previous.core_end
+        assert all(chunk.core_end - chunk.core_start <= 120 for chunk in chunks)
+
+    def test_windows_extend_by_overlap(self):
+        """Windows add the overlap on both sides, clipped to the text"""
+        chunks = _chunks(TEXT, overlap=40)
+
+        for chunk in chunks:
+            assert chunk.start == max(0, chunk.core_start - 40)
+            assert chunk.end == min(len(TEXT), chunk.core_end + 40)
+            assert chunk.text == TEXT[chunk.start:chunk.end]
+        assert chunks[0].start == 0
+        assert chunks[-1].end == len(TEXT)
+
+    def test_chunks_carry_enclosing_headings(self):
+        """Each chunk records the domain and dimension headings before its core"""
+        chunks = _chunks(TEXT)
+        later = next(chunk for chunk in chunks if chunk.core_start > TEXT.index("C. 经济与技术"))
+
+        assert later.heading.startswith("人域｜六维文化框架\n")
+        assert later.heading.splitlines()[-1][0] in "CD"
+
+    def test_edit_only_changes_nearby_hashes(self):
+        """Editing the last paragraph leaves earlier chunk hashes unchanged"""
+        edited = TEXT.replace("外交纠纷", "外交风波")
+        before = [chunk.content_hash() for chunk in _chunks(TEXT)]
+        after = [chunk.content_hash() for chunk in _chunks(edited)]
+
+        assert before[:-2] == after[:-2]
+        assert before != after
+
+
+@pytest.mark.unit
+class TestChunkResultCache:
+    """Test the content-hash chunk result cache"""
+
+    def test_hit_returns_independent_copy(self):
+        from etl.chunked_processing import ChunkResultCache
+
+        cache = ChunkResultCache(max_entries=4)
+        cache.put("key", {"entities": ["环祖"]})
+        first = cache.get("key")
+        first["entities"].append("乡祭")
+
+        assert cache.get("key") == {"entities": ["环祖"]}
+        assert cache.get("missing") is None
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_least_recently_used_evicted(self):
+        from etl.chunked_processing import ChunkResultCache
+
+        cache = ChunkResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+
+@pytest.mark.unit
+class TestMergeChunkBatches:
+    """Test merging per-chunk batches"""
+
+    def test_relations_and_plot_hooks_deduplicated(self):
+        """Relations and plot hooks repeated across chunks are kept once"""
+        from database.models.cultural_framework_models import CulturalFrameworkBatch, RelationType
+        from etl.chunked_processing import merge_chunk_batches
+
+        first = CulturalFrameworkBatch(
+            relations=[_relation("环祖与乡祭同属机构")],
+            plot_hooks=[_plot_hook("祖灵续籍祭夜，有人盗改家谱链印，引发血脉争议")]
+        )
+        second = CulturalFrameworkBatch(
+            relations=[_relation("环祖与乡祭同属机构"),
+                       _relation("环祖与乡祭同属机构", RelationType.RELATED_TO)],
+            plot_hooks=[_plot_hook("祖灵续籍祭夜，有人盗改家谱链印，引发血脉争议"),
+                        _plot_hook("跨域商贸中发现伪造链票，引发人域与海域的外交纠纷")]
+        )
+
+        merged = merge_chunk_batches([first, second])
+
+        assert len(merged.relations) == 2
+        assert len(merged.plot_hooks) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+class TestChunkedPipeline:
+    """Test chunked processing against processing the whole text"""
+
+    async def test_chunked_matches_unchunked(self):
+        """Chunked processing yields the same entities, relations and plot hooks as one pass"""
+        from etl.nine_domains_pipeline import NineDomainsPipeline
+
+        novel_id = uuid4()
+        settings = {"max_concurrent_processing": 1, "chunk_size": 300, "chunk_overlap": 400}
+
+        async def core(chunked):
+            pipeline = NineDomainsPipeline({**settings, "enable_chunked_processing": chunked})
+            result = await pipeline._core_processing(TEXT, novel_id, "test")
+            await pipeline.close()
+            return result
+
+        whole = await core(False)
+        chunked = await core(True)
+        expected, batch = whole["batch_data"], chunked["batch_data"]
+
+        assert chunked["stats"]["chunking"]["chunks_total"] > 1
+        assert sorted((e.name, e.entity_type) for e in batch.entities) == \
+            sorted((e.name, e.entity_type) for e in expected.entities)
+        # Entity-pair descriptions name the pair in entity order, so compare them by kind
+        assert _relation_counts(batch) == _relation_counts(expected)
+        assert sorted(r.description for r in batch.relations if r.is_cross_domain and not r.context) == \
+            sorted(r.description for r in expected.relations if r.is_cross_domain and not r.context)
+        assert sorted(h.description for h in batch.plot_hooks) == \
+            sorted(h.description for h in expected.plot_hooks)
+
+    async def test_reprocessing_reuses_chunks(self):
+        """Re-running on the same text takes every chunk from the cache without duplicating results"""
+        from etl.nine_domains_pipeline import NineDomainsPipeline
+
+        novel_id = uuid4()
+        pipeline = NineDomainsPipeline({"max_concurrent_processing": 1, "chunk_size": 300})
+        first = await pipeline._core_processing(TEXT, novel_id, "first")
+        second = await pipeline._core_processing(TEXT, novel_id, "second")
+        await pipeline.close()
+
+        chunking = second["stats"]["chunking"]
+        assert chunking["chunks_reused"] == chunking["chunks_total"]
+        assert len(second["batch_data"].relations) == len(first["batch_data"].relations)
+        assert len(second["batch_data"].plot_hooks) == len(first["batch_data"].plot_hooks)
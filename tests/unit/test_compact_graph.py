@@ -0,0 +1,160 @@
+"""
+Unit tests for the CSR-backed compact graph
+Tests round-tripping, the zero-copy scipy adapter, and that engines and model stages
+give the same results on a CompactGraph as on the equivalent NetworkX graph
+"""
+
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "analysis"))
+
+
+@pytest.fixture
+def conflict_graph():
+    rng = np.random.default_rng(5)
+    domains = ['人域', '天域', '灵域', '荒域']
+    graph = nx.MultiDiGraph()
+    for i in range(80):
+        graph.add_node(f"E{i}", entity_type=['关键角色', '核心资源'][i % 2],
+                       domains=list(rng.choice(domains, size=i % 3, replace=False)),
+                       importance_weight=float(i % 4))
+    for j in range(240):
+        u, v = rng.integers(0, 80, size=2)
+        graph.add_edge(f"E{u}", f"E{v}", key=f"R{j}", relation_type=['敌对', '竞争', '依赖'][j % 3],
+                       strength=float(rng.random()), friction_heat=float(rng.random()))
+    return graph
+
+
+@pytest.mark.unit
+class TestCompactGraph:
+    """Test CompactGraph construction and kernels"""
+
+    @pytest.mark.parametrize("graph_class", [nx.MultiDiGraph, nx.DiGraph, nx.MultiGraph, nx.Graph])
+    def test_round_trip(self, conflict_graph, graph_class):
+        from compact_graph import CompactGraph
+
+        graph = graph_class(conflict_graph)
+        compact = CompactGraph.from_networkx(graph)
+        restored = compact.to_networkx()
+
+        assert compact.number_of_edges() == graph.number_of_edges()
+        assert set(restored.nodes()) == set(graph.nodes())
+        assert sorted(restored.edges()) == sorted(graph.edges())
+        for node, data in graph.nodes(data=True):
+            assert restored.nodes[node]['domains'] == data['domains']
+            assert restored.nodes[node]['entity_type'] == data['entity_type']
+        if graph.is_multigraph():
+            for u, v, key, data in graph.edges(keys=True, data=True):
+                assert restored.edges[u, v, key]['strength'] == pytest.approx(data['strength'], abs=1e-6)
+
+    def test_scipy_adapter_is_zero_copy(self, conflict_graph):
+        from compact_graph import CompactGraph, scipy_adjacency
+
+        compact = CompactGraph.from_networkx(nx.DiGraph(conflict_graph))
+        matrix = compact.to_scipy('strength')
+
+        assert np.shares_memory(matrix.data, compact.edge_columns['strength'])
+        assert np.shares_memory(matrix.indices, compact.indices)
+        assert np.shares_memory(matrix.indptr, compact.indptr)
+
+        # Parallel edges are summed like nx.to_scipy_sparse_array
+        _, adjacency = scipy_adjacency(CompactGraph.from_networkx(conflict_graph))
+        expected = nx.to_scipy_sparse_array(conflict_graph, weight=None)
+        assert abs(adjacency - expected).sum() == 0
+
+    def test_structure_kernels_match_networkx(self, conflict_graph):
+        from compact_graph import CompactGraph, community_statistics, domain_mixing
+
+        undirected = conflict_graph.to_undirected()
+        compact = CompactGraph.from_networkx(conflict_graph).to_undirected()
+
+        assert compact.degree_centrality() == nx.degree_centrality(undirected)
+        assert compact.density() == pytest.approx(nx.density(undirected))
+        assert compact.number_connected_components() == nx.number_connected_components(undirected)
+        assert compact.global_efficiency() == pytest.approx(nx.global_efficiency(undirected))
+
+        communities = {label: list(undirected.nodes())[label::3] for label in range(3)}
+        densities, _ = community_statistics(compact, communities)
+        for label, nodes in communities.items():
+            assert densities[label] == pytest.approx(nx.density(undirected.subgraph(nodes)))
+
+        cross, intra, domain_list, _ = domain_mixing(compact)
+        shared = sum(1 for u, v in undirected.edges()
+                     if set(undirected.nodes[u]['domains']) & set(undirected.nodes[v]['domains']))
+        assert (cross, intra) == (undirected.number_of_edges() - shared, shared)
+        assert domain_list == sorted({d for _, ds in undirected.nodes(data='domains') for d in ds})
+
+
+@pytest.mark.unit
+class TestCompactGraphAnalysis:
+    """Test that the analysis code paths accept a CompactGraph directly"""
+
+    def _model(self):
+        from comprehensive_conflict_network_model import ComprehensiveConflictNetworkModel
+
+        return ComprehensiveConflictNetworkModel(config={'enable_caching': False})
+
+    def _run(self, model, method, graph):
+        model._rng = np.random.default_rng(0)
+        np.random.seed(0)
+        return method(graph)
+
+    def test_propagation_and_robustness_match(self, conflict_graph):
+        from compact_graph import CompactGraph
+
+        compact = CompactGraph.from_networkx(conflict_graph)
+        model = self._model()
+
+        expected = self._run(model, model.model_conflict_propagation, conflict_graph)
+        actual = self._run(model, model.model_conflict_propagation, compact)
+        assert actual.propagation_reach == expected.propagation_reach
+        assert actual.cascade_size_distribution == expected.cascade_size_distribution
+        assert abs(actual.influence_matrix - expected.influence_matrix).max() < 1e-6
+        for source, paths in expected.propagation_paths.items():
+            assert {target: len(path) for target, path in actual.propagation_paths[source].items()} == \
+                   {target: len(path) for target, path in paths.items()}
+
+        expected = self._run(model, model.analyze_network_robustness, conflict_graph)
+        actual = self._run(model, model.analyze_network_robustness, compact)
+        assert actual.random_attack_threshold == expected.random_attack_threshold
+        assert actual.targeted_attack_threshold == expected.targeted_attack_threshold
+        assert actual.vulnerability_scores == expected.vulnerability_scores
+        assert actual.resilience_metrics == pytest.approx(expected.resilience_metrics)
+
+    def test_communities_match(self, conflict_graph):
+        from compact_graph import CompactGraph
+
+        model = self._model()
+        expected = self._run(model, model.discover_communities, conflict_graph)
+        actual = self._run(model, model.discover_communities, CompactGraph.from_networkx(conflict_graph))
+
+        assert actual.spectral_communities == expected.spectral_communities
+        assert actual.community_densities == pytest.approx(expected.community_densities)
+        assert actual.community_conductance == pytest.approx(expected.community_conductance)
+        assert actual.cross_domain_edges == expected.cross_domain_edges
+        assert np.array_equal(actual.domain_mixing_matrix, expected.domain_mixing_matrix)
+        assert actual.bridge_nodes == expected.bridge_nodes
+
+    def test_build_compact_network_matches_main_network(self):
+        from compact_graph import CompactGraph
+
+        model = self._model()
+        model.load_data({
+            'entities': [{'id': f"E{i}", 'name': f"实体{i}", 'entity_type': '关键角色',
+                          'domains': ['人域'], 'coordinates': [0, 0]} for i in range(5)],
+            'relations': [{'id': f"R{i}", 'source_entity_id': f"E{i}", 'target_entity_id': f"E{(i + 1) % 6}",
+                           'relation_type': '敌对', 'strength': 0.5} for i in range(5)]
+        })
+
+        compact = model.build_compact_network()
+        reference = CompactGraph.from_networkx(model.build_main_network())
+
+        assert compact.nodes() == reference.nodes()
+        assert np.array_equal(compact.indptr, reference.indptr)
+        assert np.array_equal(compact.indices, reference.indices)
+        assert list(compact.edge_keys) == list(reference.edge_keys)
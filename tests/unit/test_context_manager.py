@@ -0,0 +1,73 @@
+"""
+Unit tests for ContextWindowManager
+Tests token-count caching, priority pruning and cached category rendering
+"""
+
+import pytest
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    from prompt_generator import context_manager
+
+    # Estimated token counts; no tokenizer download
+    monkeypatch.setattr(context_manager, "tiktoken", None)
+    monkeypatch.setattr(context_manager.ContextWindowManager, "_token_cache", context_manager.OrderedDict())
+    return context_manager.ContextWindowManager()
+
+
+@pytest.mark.unit
+class TestContextWindowManager:
+    """Test context store operations"""
+
+    def test_token_counts_cached_by_content(self, manager, monkeypatch):
+        calls = []
+        encode = manager._encode_length
+        monkeypatch.setattr(manager, "_encode_length", lambda text: calls.append(text) or encode(text))
+
+        manager.add_context("林潜缓缓睁开双眼" * 10, category="current_scene")
+        manager.add_context("林潜缓缓睁开双眼" * 10, category="previous_context")
+        manager.optimize_for_chapter(12)
+
+        assert len(calls) == 1
+        assert manager.get_total_tokens() == 2 * manager.count_tokens("林潜缓缓睁开双眼" * 10)
+
+    def test_prune_evicts_lowest_priority_first(self, manager):
+        manager.MAX_TOKENS, manager.RESERVED_TOKENS = 100, 0
+        manager.add_context("甲" * 45, category="active_conflicts")  # 30 tokens, priority 80
+        manager.add_context("乙" * 30, category="optional_details")  # 20 tokens, priority 30
+        manager.add_context("丙" * 30, category="background_info")   # 20 tokens, priority 40
+        manager.add_context("丁" * 30, category="background_info")
+
+        manager.add_context("戊" * 45, category="current_scene")
+
+        categories = [item.category for item in manager.context_items]
+        assert categories == ["active_conflicts", "background_info", "current_scene"]
+        assert manager.get_total_tokens() == 80
+        assert manager.categories_count["optional_details"] == 0
+
+    def test_rendering_groups_categories_and_reuses_blocks(self, manager):
+        manager.add_context("世界观甲", category="worldbuilding")
+        manager.add_context("前情乙", category="previous_context")
+        manager.add_context("世界观丙", category="worldbuilding", priority=76)
+        manager.add_context("系统丁", category="general", priority=100)
+
+        text = manager.get_optimized_context()
+        assert text.index("系统丁") < text.index("世界观丙") < text.index("世界观甲") < text.index("前情乙")
+        assert text.count("## 世界观背景") == 1
+
+        worldbuilding_block = manager._rendered_blocks["worldbuilding"]
+        manager.optimize_for_chapter(12)  # previous_context +10, worldbuilding -10
+        text = manager.get_optimized_context()
+
+        assert text.index("前情乙") < text.index("世界观丙")
+        assert manager._rendered_blocks["worldbuilding"] is worldbuilding_block
+        assert [item.priority for item in manager.context_items][:3] == [65, 80, 66]
+
+    def test_remove_category(self, manager):
+        manager.add_context("角色甲", category="main_characters")
+        manager.add_context("钩子乙", category="story_hooks")
+        manager.remove_category("main_characters")
+
+        assert manager.get_optimized_context().strip() == "## 剧情钩子\n\n钩子乙"
+        assert manager.get_total_tokens() == manager.count_tokens("钩子乙")
@@ -0,0 +1,122 @@
+"""
+Unit tests for the chapter planner in CreationWorkflow
+Tests scene dependencies, concurrent generation and summary threading
+"""
+
+import asyncio
+import pytest
+
+
+def _make_workflow(monkeypatch, delay=0.05, max_concurrent_scenes=3):
+    from prompt_generator import creation_workflow
+    from prompt_generator.creation_workflow import CreationWorkflow, CreationResult
+
+    # Prompts are never built: create_scene is replaced below
+    monkeypatch.setattr(creation_workflow, "NovelPromptGenerator", lambda novel_id: None)
+    workflow = CreationWorkflow("novel-a", use_real_api=False, max_concurrent_scenes=max_concurrent_scenes)
+    workflow.calls = {}
+    workflow.active = 0
+    workflow.peak = 0
+
+    async def create_scene(chapter_number, scene_type, target_length, focus_characters,
+                           metadata, previous_content=None, scene_context=None):
+        scene_number = metadata["scene_number"]
+        workflow.calls[scene_number] = scene_context
+        workflow.active += 1
+        workflow.peak = max(workflow.peak, workflow.active)
+        await asyncio.sleep(delay)
+        workflow.active -= 1
+        content = f"场景{scene_number}开始。" + "中间情节。" * 50 + f"场景{scene_number}结束。"
+        return CreationResult(
+            success=True, content=content, prompt_used=None, validation_score=80,
+            iterations=1, total_tokens_used=10, time_elapsed=delay, metadata=dict(metadata)
+        )
+
+    workflow.create_scene = create_scene
+    return workflow
+
+
+SCENES = [
+    {"type": "narrative", "characters": ["林潜"], "brief": "林潜出关"},
+    {"type": "dialogue", "characters": ["炎烈"]},
+    {"type": "battle", "characters": ["林潜", "炎烈"]},
+    {"type": "narrative", "characters": ["墨云山"]},
+]
+
+
+@pytest.mark.unit
+class TestChapterPlanner:
+    """Test planner-mode chapter creation"""
+
+    def test_dependencies_follow_shared_characters(self, monkeypatch):
+        workflow = _make_workflow(monkeypatch)
+        plans = workflow._plan_chapter(SCENES + [{"type": "narrative", "depends_on": [4, 9]}])
+
+        assert [plan.depends_on for plan in plans] == [[], [], [1, 2], [], [4]]
+        assert "林潜出关" in plans[0].brief
+
+    async def test_independent_scenes_run_concurrently(self, monkeypatch):
+        workflow = _make_workflow(monkeypatch, delay=0.1)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await workflow.create_chapter(1, SCENES, planner_mode=True)
+
+        # Scenes 1, 2 and 4 in parallel, then scene 3
+        assert loop.time() - started < 0.35
+        assert workflow.peak == 3
+        assert result["scenes_created"] == 4
+        assert result["content"].index("场景1开始") < result["content"].index("场景4开始")
+
+    async def test_only_dependency_summaries_are_threaded(self, monkeypatch):
+        workflow = _make_workflow(monkeypatch)
+        await workflow.create_chapter(1, SCENES, planner_mode=True)
+
+        context = workflow.calls[3]
+        assert "场景1摘要：场景1开始。" in context
+        assert "场景2摘要" in context
+        assert "场景4" not in context.split("当前为第3个场景。")[1]
+        assert len(context) < 2 * workflow.SUMMARY_LENGTH + 500
+        assert "摘要" not in workflow.calls[1].split("当前为第1个场景。")[1]
+
+
+class _PromptGenerator:
+    """Builds fixed prompts so create_scene runs without a database"""
+
+    def __init__(self, novel_id):
+        self.novel_id = novel_id
+
+    async def generate_creation_prompt(self, **kwargs):
+        from prompt_generator.core import PromptComponents
+        return PromptComponents(system_prompt="系统", user_prompt="创作场景", context={},
+                                constraints={}, style_guide={}, metadata={})
+
+    async def export_prompt(self, components):
+        return components.user_prompt
+
+
+@pytest.mark.unit
+class TestScenePrompts:
+    """Test what create_scene adds to the user prompt"""
+
+    @pytest.mark.parametrize("planner_mode", [False, True])
+    async def test_only_planner_appends_chapter_context(self, monkeypatch, planner_mode):
+        from prompt_generator import creation_workflow
+        from prompt_generator.creation_workflow import CreationWorkflow
+
+        monkeypatch.setattr(creation_workflow, "NovelPromptGenerator", _PromptGenerator)
+        prompts = []
+
+        async def claude_api(system_prompt, user_prompt, max_tokens):
+            prompts.append(user_prompt)
+            return {"content": "林潜踏入天域。" * 100, "tokens_used": 10}
+
+        workflow = CreationWorkflow("novel-a", claude_api=claude_api, use_real_api=False)
+        await workflow.create_chapter(1, SCENES, planner_mode=planner_mode)
+
+        assert len(prompts) >= len(SCENES)
+        if planner_mode:
+            assert all("## 本章前文" in prompt for prompt in prompts)
+            assert max(map(len, prompts)) < 2 * workflow.SUMMARY_LENGTH + 500
+        else:
+            assert prompts == ["创作场景"] * len(prompts)
@@ -0,0 +1,153 @@
+"""
+Unit tests for the entity consolidation helpers
+Tests best_by_key, resolve_overlaps and nearby_pairs against the quadratic
+implementations they replaced, on overlapping and adjacent spans
+"""
+
+import random
+from dataclasses import dataclass
+
+import pytest
+
+
+@dataclass(frozen=True)
+class Mention:
+    text: str
+    start: int
+    end: int
+    confidence: float
+
+
+def _random_mentions(seed, count=200, text_length=400):
+    rng = random.Random(seed)
+    mentions = []
+    for _ in range(count):
+        start = rng.randrange(text_length)
+        # Short spans over a small alphabet give many duplicates, overlaps and touching spans
+        end = start + rng.randint(1, 4)
+        mentions.append(Mention(rng.choice("林炎墨云山"), start, end, rng.choice([0.5, 0.6, 0.7, 0.8])))
+    return mentions
+
+
+def _reference_best_by_key(items, key, score):
+    """Previous deduplication: rescan the unique list for every duplicate"""
+    seen = set()
+    unique = []
+    for item in items:
+        item_key = key(item)
+        if item_key not in seen:
+            seen.add(item_key)
+            unique.append(item)
+        else:
+            for i, existing in enumerate(unique):
+                if key(existing) == item_key:
+                    if score(item) > score(existing):
+                        unique[i] = item
+                    break
+    return unique
+
+
+def _reference_resolve_overlaps(items, start, end, score):
+    """Previous overlap filter"""
+    if not items:
+        return []
+    ordered = sorted(items, key=start)
+    filtered = [ordered[0]]
+    for item in ordered[1:]:
+        if start(item) < end(filtered[-1]):
+            if score(item) > score(filtered[-1]):
+                filtered[-1] = item
+        else:
+            filtered.append(item)
+    return filtered
+
+
+def _reference_nearby_pairs(items, position, max_distance):
+    """Previous co-occurrence scan over every pair"""
+    pairs = []
+    for i, first in enumerate(items):
+        for second in items[i + 1:]:
+            if abs(position(first) - position(second)) < max_distance:
+                pairs.append((first, second))
+    return pairs
+
+
+@pytest.mark.unit
+class TestBestByKey:
+    """Test best_by_key"""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_quadratic_reference(self, seed):
+        from etl.entity_consolidation import best_by_key
+
+        mentions = _random_mentions(seed)
+        key = lambda m: (m.text, m.end - m.start)
+        score = lambda m: m.confidence
+
+        assert best_by_key(mentions, key, score) == _reference_best_by_key(mentions, key, score)
+
+    def test_survivor_keeps_first_slot_and_ties_keep_earlier(self):
+        from etl.entity_consolidation import best_by_key
+
+        mentions = [Mention("林", 0, 1, 0.5), Mention("炎", 2, 3, 0.9), Mention("林", 5, 6, 0.8),
+                    Mention("林", 8, 9, 0.8)]
+
+        result = best_by_key(mentions, lambda m: m.text, lambda m: m.confidence)
+
+        assert result == [Mention("林", 5, 6, 0.8), Mention("炎", 2, 3, 0.9)]
+
+
+@pytest.mark.unit
+class TestResolveOverlaps:
+    """Test resolve_overlaps"""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_quadratic_reference(self, seed):
+        from etl.entity_consolidation import resolve_overlaps
+
+        mentions = _random_mentions(seed)
+        spans = (lambda m: m.start, lambda m: m.end, lambda m: m.confidence)
+
+        result = resolve_overlaps(mentions, *spans)
+
+        assert result == _reference_resolve_overlaps(mentions, *spans)
+        assert all(first.end <= second.start for first, second in zip(result, result[1:]))
+
+    def test_adjacent_spans_are_kept(self):
+        """A span ending where the next starts does not overlap it"""
+        from etl.entity_consolidation import resolve_overlaps
+
+        mentions = [Mention("炎烈", 2, 4, 0.5), Mention("林潜", 0, 2, 0.5), Mention("烈火", 3, 5, 0.9)]
+
+        result = resolve_overlaps(mentions, lambda m: m.start, lambda m: m.end, lambda m: m.confidence)
+
+        assert result == [Mention("林潜", 0, 2, 0.5), Mention("烈火", 3, 5, 0.9)]
+
+    def test_empty(self):
+        from etl.entity_consolidation import resolve_overlaps
+
+        assert resolve_overlaps([], lambda m: m.start, lambda m: m.end, lambda m: m.confidence) == []
+
+
+@pytest.mark.unit
+class TestNearbyPairs:
+    """Test nearby_pairs"""
+
+    @pytest.mark.parametrize("max_distance", [1, 3, 25, 1000])
+    def test_matches_quadratic_reference(self, max_distance):
+        from etl.entity_consolidation import nearby_pairs
+
+        mentions = _random_mentions(seed=max_distance, count=150)
+
+        result = list(nearby_pairs(mentions, lambda m: m.start, max_distance))
+
+        assert result == _reference_nearby_pairs(mentions, lambda m: m.start, max_distance)
+
+    def test_distance_threshold_is_exclusive(self):
+        from etl.entity_consolidation import nearby_pairs
+
+        mentions = [Mention("林", 100, 101, 1.0), Mention("炎", 0, 1, 1.0), Mention("墨", 100, 101, 1.0)]
+
+        result = list(nearby_pairs(mentions, lambda m: m.start, 100))
+
+        assert result == [(mentions[0], mentions[2])]
@@ -0,0 +1,83 @@
+"""
+Unit tests for federated content search
+Tests concurrent backend fan-out, pagination pushdown and per-backend timeouts
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+
+def _make_manager():
+    from database.data_access import NovelDataManager
+
+    manager = NovelDataManager(uuid4(), MagicMock())
+    manager.pg_repo = MagicMock()
+    manager.mongo_repo = MagicMock()
+    manager.pg_repo.search_content_segments_page = AsyncMock(return_value=(["seg"], 120))
+    manager.mongo_repo.search_characters = AsyncMock(return_value=["char"])
+    manager.mongo_repo.search_locations = AsyncMock(return_value=["loc"])
+    manager.mongo_repo.search_knowledge_base = AsyncMock(return_value=["kb"])
+    manager.mongo_repo.count_text_matches = AsyncMock(return_value=7)
+    return manager
+
+
+@pytest.mark.unit
+class TestFederatedSearch:
+    """Test NovelDataManager.federated_search"""
+
+    async def test_pagination_pushed_down(self):
+        """skip/limit reach every backend and totals are reported"""
+        manager = _make_manager()
+
+        results = await manager.federated_search("法则链", skip=60, limit=20)
+
+        assert set(results) == {"segments", "characters", "locations", "knowledge"}
+        assert results["segments"]["items"] == ["seg"]
+        assert results["segments"]["total"] == 120
+        assert results["segments"]["status"] == "ok"
+        assert manager.pg_repo.search_content_segments_page.call_args.args[2:] == (60, 20)
+        assert manager.mongo_repo.search_characters.call_args.kwargs == {"skip": 60, "limit": 20}
+        assert results["knowledge"]["total"] == 7
+
+    async def test_backends_run_concurrently(self):
+        """Latency is bounded by the slowest backend, not the sum"""
+        manager = _make_manager()
+
+        async def slow_page(*args, **kwargs):
+            await asyncio.sleep(0.2)
+            return ["x"]
+
+        manager.mongo_repo.search_characters = slow_page
+        manager.mongo_repo.search_locations = slow_page
+        manager.mongo_repo.search_knowledge_base = slow_page
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await manager.federated_search("法则链")
+        assert loop.time() - started < 0.5
+
+    async def test_timeout_isolated_per_backend(self):
+        """A timed-out backend does not fail the whole search"""
+        manager = _make_manager()
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        manager.mongo_repo.search_locations = hang
+
+        results = await manager.federated_search("法则链", timeout=0.05)
+
+        assert results["locations"]["status"] == "timeout"
+        assert results["locations"]["items"] == []
+        assert results["segments"]["status"] == "ok"
+
+    async def test_content_types_filter(self):
+        """Only requested backends are queried"""
+        manager = _make_manager()
+
+        results = await manager.federated_search("法则链", content_types=["segments"])
+
+        assert list(results) == ["segments"]
+        manager.mongo_repo.search_characters.assert_not_called()
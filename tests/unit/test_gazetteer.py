@@ -0,0 +1,114 @@
+"""
+Unit tests for the Aho-Corasick gazetteer
+Tests overlapping and nested (longest) matches against a brute-force scan,
+with both pyahocorasick and the pure-Python automaton
+"""
+
+import random
+
+import pytest
+
+
+TERMS = {
+    "人域": {"signature_entities": ["环祖", "九环祖像", "祖像", "乡祭"], "rituals": ["祖灵续籍祭", "续籍"]},
+    "天域": {"signature_entities": ["巡链司", "链"], "forbidden_terms": ["断链术", "链术"]},
+    "海域": {"signature_entities": ["环祖"]},
+}
+
+TEXT = "乡祠供奉环祖（九环祖像），祖灵续籍祭夜，天域巡链司查禁断链术与锻链术。"
+
+
+def _brute_force(terms, text):
+    return sorted(
+        (term, start, start + len(term))
+        for term in set(terms)
+        for start in range(len(text))
+        if text.startswith(term, start)
+    )
+
+
+@pytest.fixture(params=["pyahocorasick", "fallback"])
+def gazetteer_module(request, monkeypatch):
+    from etl import gazetteer
+
+    if request.param == "pyahocorasick":
+        monkeypatch.setattr(gazetteer, "ahocorasick", pytest.importorskip("ahocorasick"))
+        monkeypatch.setattr(gazetteer, "AHOCORASICK_AVAILABLE", True)
+    else:
+        monkeypatch.setattr(gazetteer, "AHOCORASICK_AVAILABLE", False)
+    return gazetteer
+
+
+def _gazetteer(module, lexicon=TERMS):
+    gazetteer = module.Gazetteer()
+    gazetteer.add_lexicon(lexicon)
+    return gazetteer.compile()
+
+
+@pytest.mark.unit
+class TestGazetteer:
+    """Test Gazetteer matching"""
+
+    def test_overlapping_matches_all_reported(self, gazetteer_module):
+        gazetteer = _gazetteer(gazetteer_module)
+        terms = [term for categories in TERMS.values() for group in categories.values() for term in group]
+
+        matches = sorted(gazetteer.iter_matches(TEXT))
+
+        assert matches == _brute_force(terms, TEXT)
+
+    def test_nested_terms_include_longest(self, gazetteer_module):
+        """A term nested in a longer one is reported alongside it, at its own span"""
+        gazetteer = _gazetteer(gazetteer_module)
+        start = TEXT.index("九环祖像")
+
+        spans = {(term, s, e) for term, s, e in gazetteer.iter_matches(TEXT) if start <= s and e <= start + 4}
+
+        assert spans == {("九环祖像", start, start + 4), ("环祖", start + 1, start + 3),
+                         ("祖像", start + 2, start + 4)}
+        longest = max(spans, key=lambda span: span[2] - span[1])
+        assert longest[0] == "九环祖像"
+
+    def test_hits_cover_every_domain_and_category(self, gazetteer_module):
+        gazetteer = _gazetteer(gazetteer_module)
+        first = TEXT.index("环祖")
+
+        hits = [hit for hit in gazetteer.find_all(TEXT) if hit.start == first and hit.term == "环祖"]
+
+        assert {(hit.domain, hit.category) for hit in hits} == {
+            ("人域", "signature_entities"), ("海域", "signature_entities")
+        }
+        assert gazetteer.lookup("链术") == [("天域", "forbidden_terms")]
+
+    def test_index_window_and_select(self, gazetteer_module):
+        index = _gazetteer(gazetteer_module).index(TEXT)
+        start = TEXT.index("巡链司")
+
+        window = index.window(start, start + 3)
+
+        assert {hit.term for hit in window} == {"巡链司", "链"}
+        assert {hit.term for hit in index.select("天域", "forbidden_terms")} == {"断链术", "链术"}
+
+    def test_add_term_recompiles(self, gazetteer_module):
+        gazetteer = _gazetteer(gazetteer_module)
+        assert "锻链术" not in {term for term, _, _ in gazetteer.iter_matches(TEXT)}
+
+        gazetteer.add_term("锻链术", "天域", "technologies")
+
+        assert ("锻链术", TEXT.index("锻链术"), TEXT.index("锻链术") + 3) in set(gazetteer.iter_matches(TEXT))
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_random_terms_match_brute_force(self, gazetteer_module, seed):
+        """Terms over a tiny alphabet share prefixes and suffixes heavily"""
+        rng = random.Random(seed)
+        terms = ["".join(rng.choice("环链祖") for _ in range(rng.randint(1, 5))) for _ in range(40)]
+        text = "".join(rng.choice("环链祖像") for _ in range(300))
+        gazetteer = gazetteer_module.Gazetteer()
+        for term in terms:
+            gazetteer.add_term(term, "人域", "signature_entities")
+
+        assert sorted(gazetteer.compile().iter_matches(text)) == _brute_force(terms, text)
+
+    def test_empty_inputs(self, gazetteer_module):
+        assert list(gazetteer_module.Gazetteer().iter_matches(TEXT)) == []
+        assert list(_gazetteer(gazetteer_module).iter_matches("")) == []
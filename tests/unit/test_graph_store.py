@@ -0,0 +1,188 @@
+"""
+Unit tests for the incremental conflict network store
+Tests that entity/relation deltas leave the main graph, projections and aggregates
+identical to a from-scratch rebuild, and that the change feed reports affected nodes
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "analysis"))
+
+DOMAINS = ['人域', '天域', '灵域', '荒域']
+ENTITY_TYPES = ['关键角色', '核心资源', '法条制度']
+RELATION_TYPES = ['敌对', '竞争', '依赖']
+
+
+def _entity(rng, i):
+    return {
+        'id': f"E{i}",
+        'name': f"实体{i}",
+        'entity_type': rng.choice(ENTITY_TYPES),
+        'domains': rng.sample(DOMAINS, rng.randint(0, 2)),
+        'importance': rng.choice(['高', '中', '低']),
+    }
+
+
+def _relation(rng, j, n):
+    return {
+        'id': f"R{j}",
+        'source_entity_id': f"E{rng.randrange(n)}",
+        'target_entity_id': f"E{rng.randrange(n)}",
+        'relation_type': rng.choice(RELATION_TYPES),
+        'strength': round(rng.random(), 2),
+    }
+
+
+def _graph_state(graph):
+    if graph.is_multigraph():
+        edges = {(u, v, k): d for u, v, k, d in graph.edges(keys=True, data=True)}
+    elif not graph.is_directed():
+        edges = {frozenset((u, v)): d for u, v, d in graph.edges(data=True)}
+    else:
+        edges = {(u, v): d for u, v, d in graph.edges(data=True)}
+    return dict(graph.nodes(data=True)), edges
+
+
+def _random_deltas(analyzer, rng, rounds=25, n=40):
+    """Apply random add/update/remove batches, including relations to missing entities"""
+    next_relation = 0
+    for _ in range(rounds):
+        entities = [_entity(rng, rng.randrange(n)) for _ in range(rng.randint(0, 4))]
+        relations = []
+        for _ in range(rng.randint(0, 8)):
+            relation_id = rng.randrange(next_relation + 1) if rng.random() < 0.3 else next_relation
+            relations.append(_relation(rng, relation_id, n))
+            next_relation = max(next_relation, relation_id + 1)
+        analyzer.apply_network_changes(
+            entities=entities,
+            relations=relations,
+            removed_entity_ids=[f"E{rng.randrange(n)}" for _ in range(rng.randint(0, 2))],
+            removed_relation_ids=[f"R{rng.randrange(next_relation + 1)}" for _ in range(rng.randint(0, 2))],
+        )
+
+
+@pytest.mark.unit
+class TestIncrementalGraphStore:
+    """Test IncrementalGraphStore through the analyzers"""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_deltas_match_rebuild(self, seed):
+        from conflict_network_analyzer import ConflictNetworkAnalyzer
+
+        rng = random.Random(seed)
+        analyzer = ConflictNetworkAnalyzer()
+        analyzer.apply_network_changes(entities=[_entity(rng, i) for i in range(30)])
+        domain_networks = analyzer.build_domain_networks()
+        type_networks = analyzer.build_type_networks()
+        relation_networks = analyzer.build_relation_networks()
+
+        _random_deltas(analyzer, rng)
+
+        rebuilt = ConflictNetworkAnalyzer()
+        rebuilt.entities_df, rebuilt.relations_df = analyzer.entities_df, analyzer.relations_df
+        rebuilt.build_main_network()
+
+        assert _graph_state(analyzer.main_network) == _graph_state(rebuilt.main_network)
+        for live, fresh in [(domain_networks, rebuilt.build_domain_networks()),
+                            (type_networks, rebuilt.build_type_networks()),
+                            (relation_networks, rebuilt.build_relation_networks())]:
+            assert live.keys() == fresh.keys()
+            for key in fresh:
+                assert _graph_state(live[key]) == _graph_state(fresh[key])
+
+        store = analyzer.graph_store
+        graph = analyzer.main_network
+        assert store.degree == dict(graph.degree())
+        for node, strength in graph.degree(weight='strength'):
+            assert store.strength[node] == pytest.approx(strength)
+
+    def test_multigraph_deltas_match_rebuild(self):
+        from comprehensive_conflict_network_model import ComprehensiveConflictNetworkModel
+
+        rng = random.Random(7)
+        model = ComprehensiveConflictNetworkModel(config={'enable_caching': False})
+        model.apply_network_changes(entities=[_entity(rng, i) for i in range(30)])
+        _random_deltas(model, rng)
+
+        rebuilt = ComprehensiveConflictNetworkModel(config={'enable_caching': False})
+        rebuilt.entities_df, rebuilt.relations_df = model.entities_df, model.relations_df
+        rebuilt.build_main_network()
+
+        assert _graph_state(model.main_network) == _graph_state(rebuilt.main_network)
+        assert model.graph_store.degree == dict(model.main_network.degree())
+
+    @pytest.mark.parametrize("graph_class", [nx.Graph, nx.DiGraph])
+    def test_store_deltas_match_rebuild(self, graph_class):
+        """Relations in either direction between a pair share one undirected edge"""
+        from graph_store import IncrementalGraphStore, relation_type_key
+
+        for seed in range(100):
+            rng = random.Random(seed)
+            store = IncrementalGraphStore(graph_class)
+            projections = store.edge_projection('relation_type', relation_type_key)
+            for _ in range(15):
+                store.apply(
+                    entities=[(f"E{rng.randrange(6)}", {'importance': rng.random()}) for _ in range(rng.randint(0, 2))],
+                    relations=[(f"R{rng.randrange(20)}", f"E{rng.randrange(6)}", f"E{rng.randrange(6)}",
+                                {'relation_type': rng.choice(RELATION_TYPES), 'strength': rng.random()})
+                               for _ in range(rng.randint(0, 4))],
+                    removed_entities=[f"E{rng.randrange(6)}" for _ in range(rng.randint(0, 1))],
+                    removed_relations=[f"R{rng.randrange(20)}" for _ in range(rng.randint(0, 2))],
+                )
+
+            rebuilt = IncrementalGraphStore(graph_class)
+            rebuilt.apply(entities=list(store.graph.nodes(data=True)),
+                          relations=[(relation_id, *relation) for relation_id, relation in store.relations.items()])
+
+            assert _graph_state(store.graph) == _graph_state(rebuilt.graph), seed
+            assert store.degree == dict(store.graph.degree())
+            fresh = rebuilt.edge_projection('relation_type', relation_type_key)
+            assert projections.keys() == fresh.keys()
+            for key in fresh:
+                assert _graph_state(projections[key]) == _graph_state(fresh[key])
+
+    def test_change_feed(self):
+        from graph_store import IncrementalGraphStore
+
+        store = IncrementalGraphStore(max_changes=3)
+        received = []
+        store.subscribe(received.append)
+
+        store.apply(relations=[('R1', 'A', 'B', {'strength': 0.5})])
+        assert store.graph.number_of_edges() == 0  # endpoints pending
+        start = store.sequence
+
+        changes = store.apply(entities=[('A', {}), ('B', {}), ('C', {})])
+        assert [c.operation for c in changes] == ['entity_added'] * 3
+        assert set(changes[1].nodes) == {'A', 'B'}  # pending relation materialized
+        assert received[-1] == changes
+        assert store.affected_nodes(start) == {'A', 'B', 'C'}
+        assert store.strength == {'A': 0.5, 'B': 0.5, 'C': 0.0}
+
+        store.apply(removed_entities=['B'])
+        assert store.graph.number_of_edges() == 0
+        assert store.affected_nodes(start + 3) == {'A', 'B'}
+        assert store.changes_since(0) is None  # history truncated
+        assert 'R1' in store.relations
+
+    def test_adopts_directly_assigned_graph(self):
+        from conflict_network_analyzer import ConflictNetworkAnalyzer
+
+        analyzer = ConflictNetworkAnalyzer()
+        graph = nx.DiGraph()
+        graph.add_node('A', entity_type='关键角色', domains=['人域'])
+        graph.add_node('B', entity_type='关键角色', domains=['人域'])
+        analyzer.main_network = graph
+        domain_networks = analyzer.build_domain_networks()
+
+        analyzer.apply_network_changes(relations=[{
+            'id': 'R1', 'source_entity_id': 'A', 'target_entity_id': 'B', 'relation_type': '敌对'
+        }])
+
+        assert analyzer.main_network is graph
+        assert domain_networks['人域'].has_edge('A', 'B')
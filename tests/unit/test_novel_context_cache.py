@@ -0,0 +1,60 @@
+"""
+Unit tests for the versioned novel context cache
+Tests cache hits, write invalidation and single-flight loading
+"""
+
+import asyncio
+import pytest
+
+
+@pytest.mark.unit
+class TestNovelContextCache:
+    """Test NovelContextCache"""
+
+    async def test_cached_until_invalidated(self):
+        from database.data_access import NovelContextCache
+
+        cache = NovelContextCache()
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return {"domains": len(loads)}
+
+        assert await cache.get_or_load("novel-a", "worldbuilding", loader) == {"domains": 1}
+        assert await cache.get_or_load("novel-a", "worldbuilding", loader) == {"domains": 1}
+        assert await cache.get_or_load("novel-b", "worldbuilding", loader) == {"domains": 2}
+
+        cache.invalidate("novel-a")
+        assert await cache.get_or_load("novel-a", "worldbuilding", loader) == {"domains": 3}
+        assert await cache.get_or_load("novel-b", "worldbuilding", loader) == {"domains": 2}
+
+    async def test_concurrent_misses_load_once(self):
+        from database.data_access import NovelContextCache
+
+        cache = NovelContextCache()
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return "context"
+
+        results = await asyncio.gather(*(cache.get_or_load("novel-a", "law_chains", loader) for _ in range(5)))
+
+        assert results == ["context"] * 5
+        assert len(loads) == 1
+
+    async def test_write_during_load_is_not_cached(self):
+        from database.data_access import NovelContextCache
+
+        cache = NovelContextCache()
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            cache.invalidate("novel-a")  # a write lands while the context is being built
+            return len(loads)
+
+        assert await cache.get_or_load("novel-a", "worldbuilding", loader) == 1
+        assert await cache.get_or_load("novel-a", "worldbuilding", lambda: asyncio.sleep(0, result="fresh")) == "fresh"
@@ -0,0 +1,84 @@
+"""
+Unit tests for the process-pool transform stage
+Tests output ordering, per-record errors and failures raised in worker processes
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+def _records(count):
+    return [
+        {"id": i, "content": f"第{i}章，林潜在天域修炼。" * (1 + i % 7), "metadata": {"chapter": i}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def processor():
+    from etl.parallel_processor import ParallelRecordProcessor
+    from etl.types import PipelineConfig
+
+    config = PipelineConfig(processing_workers=2, processing_chunk_size=3, enable_validation=False)
+    processor = ParallelRecordProcessor(config)
+    yield processor
+    processor.shutdown()
+
+
+async def _collect(processor, records, content_type=None):
+    from etl.types import ContentType
+    # CHARACTER avoids the other content types' post-processing branches
+    return [outcome async for outcome in processor.process(records, content_type or ContentType.CHARACTER)]
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+class TestParallelRecordProcessor:
+    """Test ParallelRecordProcessor"""
+
+    async def test_outcomes_follow_input_order(self, processor):
+        """Outcomes come back in input order across chunks and more chunks than max_pending"""
+        records = _records(40)
+
+        outcomes = await _collect(processor, records)
+
+        assert len(records) > processor.chunk_size * processor.max_pending
+        assert [outcome.record_id for outcome in outcomes] == list(range(40))
+        assert all(outcome.error is None for outcome in outcomes)
+        assert [outcome.processed["metadata"] for outcome in outcomes] == [{"chapter": i} for i in range(40)]
+
+    async def test_matches_in_process_transform(self, processor):
+        from etl.parallel_processor import RecordProcessors, transform_record
+        from etl.types import ContentType
+
+        records = _records(6)
+        local = RecordProcessors.from_config(processor.config)
+        expected = [await transform_record(record, ContentType.CHARACTER, local) for record in records]
+
+        outcomes = await _collect(processor, records)
+
+        strip = lambda outcome: {k: v for k, v in outcome.processed.items() if k != "processed_at"}
+        assert [strip(outcome) for outcome in outcomes] == [strip(outcome) for outcome in expected]
+
+    async def test_record_error_reported_in_place(self, processor):
+        """A record that fails to transform yields an error outcome without stopping its chunk"""
+        records = _records(5)
+        records[2]["content"] = 12345
+
+        outcomes = await _collect(processor, records)
+
+        assert [outcome.record_id for outcome in outcomes] == list(range(5))
+        assert outcomes[2].processed is None
+        assert outcomes[2].error
+        assert all(outcomes[i].processed for i in (0, 1, 3, 4))
+
+    async def test_worker_exception_propagates(self, processor):
+        """An exception raised in a worker surfaces to the caller and the pool stays usable"""
+        from etl.types import ContentType
+
+        with pytest.raises(ValueError):
+            await _collect(processor, _records(10), SimpleNamespace(value="not-a-content-type"))
+
+        outcomes = await _collect(processor, _records(4), ContentType.CHARACTER)
+        assert [outcome.record_id for outcome in outcomes] == list(range(4))
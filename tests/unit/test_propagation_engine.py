@@ -0,0 +1,161 @@
+"""
+Unit tests for the sparse conflict propagation engine
+Tests batched SIR and cascade simulation against per-node reference loops
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import networkx as nx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src" / "analysis"))
+
+
+def _reference_sir(graph, source, intensity, beta, gamma, spontaneous, steps=50):
+    """Per-node SIR loop the engine replaces"""
+    nodes = list(graph.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    susceptible = np.ones(len(nodes))
+    infected = np.zeros(len(nodes))
+    recovered = np.zeros(len(nodes))
+    infected[index[source]] = intensity
+    susceptible[index[source]] = 1 - intensity
+
+    timeline = []
+    for _ in range(steps):
+        timeline.append(infected.sum())
+        new_infected = np.zeros(len(nodes))
+        new_recovered = gamma * infected
+        for i, node in enumerate(nodes):
+            if infected[i] > 0:
+                for neighbor in graph.neighbors(node):
+                    j = index[neighbor]
+                    new_infected[j] += min(beta * infected[i] * susceptible[j], susceptible[j])
+            new_infected[i] += spontaneous * susceptible[i]
+        infected = np.clip(infected + new_infected - new_recovered, 0, 1)
+        susceptible = np.clip(susceptible - new_infected - new_recovered * 0.5, 0, 1)
+        recovered = np.clip(recovered + new_recovered, 0, 1)
+    return np.array(timeline)
+
+
+def _reference_cascade_sizes(graph, seeds, beta, rng):
+    """Per-seed independent cascade with a fresh coin for every transmission attempt"""
+    successors = graph.successors if graph.is_directed() else graph.neighbors
+    sizes = []
+    for seed in seeds:
+        infected = {seed}
+        frontier = [seed]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for neighbor in successors(node):
+                    if neighbor not in infected and rng.random() < beta:
+                        infected.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        sizes.append(len(infected))
+    return np.array(sizes)
+
+
+@pytest.fixture
+def conflict_graph():
+    graph = nx.gnm_random_graph(60, 180, seed=7, directed=True)
+    return nx.relabel_nodes(graph, {i: f"entity_{i}" for i in graph})
+
+
+@pytest.mark.unit
+class TestSparsePropagationEngine:
+    """Test SparsePropagationEngine"""
+
+    def test_sir_matches_reference(self, conflict_graph):
+        """Batched SIR reproduces the per-node loop for every source"""
+        from propagation_engine import SparsePropagationEngine
+
+        engine = SparsePropagationEngine(conflict_graph, batch_size=16)
+        sources = list(conflict_graph.nodes())[:20]
+        intensities = np.linspace(0.01, 0.1, len(sources))
+
+        timelines, peaks = engine.simulate_sir(sources, intensities, 0.3, 0.1, 0.05)
+
+        for i, source in enumerate(sources):
+            expected = _reference_sir(conflict_graph, source, intensities[i], 0.3, 0.1, 0.05)
+            np.testing.assert_allclose(timelines[i], expected, atol=1e-9)
+            assert peaks[i] == np.argmax(expected)
+
+    def test_cascade_bounds(self, conflict_graph):
+        """Cascades contain the seed and never exceed the reachable set"""
+        from propagation_engine import SparsePropagationEngine
+
+        engine = SparsePropagationEngine(conflict_graph, batch_size=8)
+        seeds = list(conflict_graph.nodes())
+        sizes = engine.simulate_cascades(seeds, 0.5, rng=np.random.default_rng(0))
+
+        for seed, size in zip(seeds, sizes):
+            assert 1 <= size <= len(nx.descendants(conflict_graph, seed)) + 1
+
+        full = engine.simulate_cascades(seeds, 1.0, rng=np.random.default_rng(0))
+        assert [int(s) for s in full] == [len(nx.descendants(conflict_graph, s)) + 1 for s in seeds]
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_cascade_distribution_matches_reference(self, directed):
+        """Shared live-edge samples give the same cascade size distribution as per-seed coins"""
+        from propagation_engine import SparsePropagationEngine
+
+        graph = nx.gnm_random_graph(300, 900 if directed else 600, seed=5, directed=directed)
+        seeds = list(graph.nodes()) * 10
+        engine = SparsePropagationEngine(graph, batch_size=30)
+
+        sizes = engine.simulate_cascades(seeds, 0.35, rng=np.random.default_rng(1))
+        expected = _reference_cascade_sizes(graph, seeds, 0.35, random.Random(1))
+
+        assert sizes.mean() == pytest.approx(expected.mean(), rel=0.1)
+        large = graph.number_of_nodes() * 0.2
+        assert np.mean(sizes > large) == pytest.approx(np.mean(expected > large), abs=0.05)
+
+    def test_reachable_within(self, conflict_graph):
+        """Reach counts match cutoff-limited BFS"""
+        from propagation_engine import SparsePropagationEngine
+
+        engine = SparsePropagationEngine(conflict_graph, batch_size=7)
+        reach = engine.reachable_within(list(conflict_graph.nodes()), cutoff=3)
+
+        for node in conflict_graph.nodes():
+            expected = len(nx.single_source_shortest_path_length(conflict_graph, node, cutoff=3)) - 1
+            assert reach[node] == expected
+
+    def test_influence_matrix_is_sparse(self, conflict_graph):
+        """Influence matrix keeps only edge entries and takes the stronger direction"""
+        from propagation_engine import SparsePropagationEngine
+
+        engine = SparsePropagationEngine(conflict_graph)
+        matrix = engine.influence_matrix(0.4)
+
+        assert matrix.nnz <= 2 * conflict_graph.number_of_edges()
+        u, v = next(iter(conflict_graph.edges()))
+        i, j = engine.node_index[u], engine.node_index[v]
+        assert matrix[i, j] == pytest.approx(0.5 * 0.4)
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+class TestPropagationModelScaling:
+    """Test that the propagation stage stays near-linear in graph size"""
+
+    def test_50k_nodes_in_seconds(self):
+        from comprehensive_conflict_network_model import ComprehensiveConflictNetworkModel
+
+        graph = nx.gnm_random_graph(50000, 150000, seed=1)
+        model = ComprehensiveConflictNetworkModel(config={'enable_caching': False})
+
+        started = time.perf_counter()
+        result = model.model_conflict_propagation(graph)
+        elapsed = time.perf_counter() - started
+
+        # Seeding a cascade and an SIR run from every node took over ten minutes here
+        assert elapsed < 30
+        assert sum(result.cascade_size_distribution.values()) == model.cascade_simulations
+        assert len(result.propagation_timeline) <= model.sir_state_budget // graph.number_of_nodes()
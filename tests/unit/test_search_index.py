@@ -0,0 +1,69 @@
+"""
+Unit tests for the Chinese full-text search index
+Tests jieba-based tokenization and search_vector maintenance
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+
+@pytest.mark.unit
+class TestChineseSearchTokenizer:
+    """Test tokenization used for search_vector and queries"""
+
+    def test_index_text_splits_chinese(self):
+        """Chinese text is split into separate lexemes"""
+        from database.search_index import ChineseSearchTokenizer
+
+        tokenizer = ChineseSearchTokenizer()
+        lexemes = tokenizer.to_index_text("法则链断裂之后").split()
+
+        assert len(lexemes) > 1
+        assert "法则" in lexemes
+
+    def test_query_tokens_are_covered_by_index(self):
+        """Every query lexeme must exist in the index of the same text"""
+        from database.search_index import ChineseSearchTokenizer
+
+        tokenizer = ChineseSearchTokenizer()
+        text = "林逸踏入天域，感受到法则链断裂的余波"
+        index_lexemes = set(tokenizer.to_index_text(text).split())
+
+        for lexeme in tokenizer.to_query_text("法则链断裂").split():
+            assert lexeme in index_lexemes
+
+    def test_punctuation_and_case_normalized(self):
+        """Punctuation is dropped and latin text lowercased"""
+        from database.search_index import ChineseSearchTokenizer
+
+        tokenizer = ChineseSearchTokenizer()
+        assert tokenizer.to_query_text("，。！") == ""
+        assert "chain" in tokenizer.to_index_text("Chain!").split()
+
+    def test_bigram_fallback(self):
+        """Bigram fallback when jieba is unavailable"""
+        from database.search_index import ChineseSearchTokenizer
+
+        tokens = ChineseSearchTokenizer._bigram_cut("法则链 abc")
+        assert tokens == ["法则", "则链", "abc"]
+
+
+@pytest.mark.unit
+class TestSearchIndexer:
+    """Test search_vector maintenance"""
+
+    async def test_index_content_segment(self):
+        """Segment index update passes tokenized title and content"""
+        from database.search_index import SearchIndexer
+
+        conn = MagicMock()
+        conn.execute = AsyncMock()
+        segment_id = uuid4()
+
+        await SearchIndexer().index_content_segment(conn, segment_id, "第一章", "法则链断裂")
+
+        query, *args = conn.execute.call_args.args
+        assert "search_vector" in query
+        assert args[0] == segment_id
+        assert "法则" in args[2].split()
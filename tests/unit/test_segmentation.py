@@ -0,0 +1,104 @@
+"""
+Unit tests for the jieba segmentation service
+Tests result caching, dictionary signatures, snapshots and LRU eviction
+"""
+
+import pytest
+
+TEXT = (
+    "林逸踏入天域，感受到法则链断裂的余波。\n"
+    "天命王朝的祭司议会宣布封锁灵脉，港市商会为此争执不休。\n"
+    "\n"
+    "第二段：断链术被列为禁术，链籍制度随之动摇，人域各县府人心惶惶。\n"
+)
+
+
+@pytest.fixture
+def jieba():
+    """jieba is optional for the service; its tests are skipped without it"""
+    return pytest.importorskip("jieba")
+
+
+def _service(tmp_path, **kwargs):
+    from database.segmentation import SegmentationService
+    return SegmentationService(cache_dir=str(tmp_path), **kwargs)
+
+
+@pytest.mark.unit
+@pytest.mark.usefixtures("jieba")
+class TestSegmentationService:
+    """Test cached segmentation"""
+
+    def test_results_match_jieba(self, tmp_path, jieba):
+        """Cached and uncached results are identical to segmenting the whole text"""
+        import jieba.posseg as pseg
+
+        service = _service(tmp_path)
+        expected = [(pair.word, pair.flag) for pair in pseg.cut(TEXT)]
+
+        assert service.pos_cut(TEXT) == expected
+        assert service.pos_cut(TEXT) == expected
+        assert service.cut(TEXT) == list(jieba.cut(TEXT))
+        assert service.cut_for_search(TEXT) == list(jieba.cut_for_search(TEXT))
+
+    def test_unchanged_blocks_skip_segmentation(self, tmp_path):
+        """Re-segmenting an edited text only segments the edited paragraph"""
+        service = _service(tmp_path)
+        service.cut(TEXT)
+        segmented = service.stats['blocks_segmented']
+
+        edited = TEXT.replace("人心惶惶", "人心浮动")
+        service.cut(edited)
+
+        assert service.stats['blocks_segmented'] == segmented + 1
+        assert service.stats['blocks_cached'] == 1
+
+    def test_cache_shared_between_instances(self, tmp_path):
+        """A new service (e.g. another process) reuses results on disk"""
+        _service(tmp_path).pos_cut(TEXT)
+
+        service = _service(tmp_path)
+        service.pos_cut(TEXT)
+
+        assert service.stats['blocks_segmented'] == 0
+        assert service.cache.hits == 2
+
+    def test_dictionary_changes_update_signature(self, tmp_path):
+        """New terms change the signature; reloading the same terms does not"""
+        service = _service(tmp_path)
+        before = service.dictionary_signature
+
+        service.load_dictionary(terms=["裂世九域"], freq=1000)
+        after = service.dictionary_signature
+        service.load_dictionary(terms=["裂世九域"], freq=1000)
+
+        assert after != before
+        assert service.dictionary_signature == after
+
+    def test_snapshot_round_trip(self, tmp_path, jieba):
+        """A written dictionary snapshot loads back into jieba"""
+        service = _service(tmp_path)
+        jieba.initialize()
+        words = list(jieba.cut(TEXT))
+
+        service._write_snapshot("signature")
+        assert service.stats['dictionary_snapshot'] == 'written'
+        assert service._load_snapshot("signature")
+        assert list(jieba.cut(TEXT)) == words
+        assert not service._load_snapshot("other")
+
+
+@pytest.mark.unit
+class TestSegmentationCache:
+    """Test the on-disk LRU"""
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        from database.segmentation import SegmentationCache
+
+        cache = SegmentationCache(str(tmp_path / "segments.sqlite3"), max_entries=10)
+        cache.put_many({bytes([i]): b"v" for i in range(5)})
+        cache.get_many([bytes([0])])
+        cache.put_many({bytes([i]): b"v" for i in range(5, 11)})
+
+        assert len(cache) == 10
+        assert cache.get_many([bytes([0]), bytes([1])]) == {bytes([0]): b"v"}
@@ -0,0 +1,162 @@
+"""
+Unit tests for the stream event buffer
+Tests backpressure at capacity and the high watermark, thread-safe producers,
+and flushing buffered events when the buffer or stream is closed
+"""
+
+import asyncio
+import threading
+import uuid
+from datetime import datetime
+
+import pytest
+
+
+def _event(i):
+    from etl.stream_processor import StreamEvent, StreamEventType
+    from etl.types import ContentType
+    return StreamEvent(event_id=str(i), event_type=StreamEventType.CONTENT_ADDED,
+                       content_type=ContentType.PLOT, timestamp=datetime.now(),
+                       data={}, source="test")
+
+
+def _buffer(max_size=4, **kwargs):
+    from etl.stream_processor import StreamBuffer
+    return StreamBuffer(max_size=max_size, **kwargs)
+
+
+@pytest.mark.unit
+class TestStreamBufferBackpressure:
+    """Test producers waiting on a full buffer"""
+
+    async def test_put_blocks_at_capacity_until_drained(self):
+        buffer = _buffer(max_size=3)
+        for i in range(3):
+            assert await buffer.put(_event(i))
+
+        producer = asyncio.create_task(buffer.put(_event(3), timeout=5))
+        await asyncio.sleep(0.05)
+        assert not producer.done()
+        assert not buffer.put_nowait(_event(99))
+
+        first = await buffer.get()
+        assert await producer
+        assert first.event_id == "0"
+        assert [e.event_id for e in await buffer.get_many(max_items=10)] == ["1", "2", "3"]
+
+    async def test_put_times_out_while_full(self):
+        buffer = _buffer(max_size=1)
+        await buffer.put(_event(0))
+
+        assert not await buffer.put(_event(1), timeout=0.05)
+        assert buffer.size() == 1
+
+    async def test_watermarks_engage_and_release(self):
+        """Backpressure engages at the high watermark and releases at the low watermark"""
+        buffer = _buffer(max_size=10, high_watermark=0.8, low_watermark=0.5)
+        for i in range(8):
+            buffer.put_nowait(_event(i))
+        assert buffer.backpressure_active
+
+        waiter = asyncio.create_task(buffer.wait_for_capacity(timeout=5))
+        await buffer.get_many(max_items=2)
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await buffer.get_many(max_items=1)
+        assert await waiter
+        assert not buffer.backpressure_active
+        assert buffer.backpressure_engaged_count == 1
+
+    async def test_threadsafe_producer_blocks_its_thread(self):
+        buffer = _buffer(max_size=2)
+        buffer.bind_loop(asyncio.get_running_loop())
+        results = []
+
+        producer = threading.Thread(
+            target=lambda: results.extend(buffer.put_threadsafe(_event(i), timeout=5) for i in range(5))
+        )
+        producer.start()
+        received = []
+        while len(received) < 5:
+            received.extend(await buffer.get_many(max_items=1, timeout=5))
+            await asyncio.sleep(0.01)
+        await asyncio.to_thread(producer.join)
+
+        assert results == [True] * 5
+        assert [e.event_id for e in received] == ["0", "1", "2", "3", "4"]
+
+
+@pytest.mark.unit
+class TestStreamBufferClose:
+    """Test closing the buffer"""
+
+    async def test_close_refuses_puts_and_releases_blocked_producers(self):
+        buffer = _buffer(max_size=2)
+        buffer.put_nowait(_event(0))
+        buffer.put_nowait(_event(1))
+        producer = asyncio.create_task(buffer.put(_event(2), timeout=5))
+        await asyncio.sleep(0.01)
+
+        buffer.close()
+
+        assert await asyncio.wait_for(producer, 1) is False
+        assert not buffer.put_nowait(_event(3))
+        assert not await buffer.put(_event(4))
+
+    async def test_consumers_drain_without_waiting_after_close(self):
+        buffer = _buffer(max_size=10)
+        for i in range(3):
+            buffer.put_nowait(_event(i))
+        consumer = asyncio.create_task(buffer.get_many(max_items=10, max_wait=5))
+        idle = _buffer()
+        idle_consumer = asyncio.create_task(idle.get_many(timeout=None))
+        await asyncio.sleep(0.01)
+
+        buffer.close()
+        idle.close()
+
+        assert [e.event_id for e in await asyncio.wait_for(consumer, 1)] == ["0", "1", "2"]
+        assert await asyncio.wait_for(idle_consumer, 1) == []
+        assert await asyncio.wait_for(buffer.get_many(timeout=None), 1) == []
+
+    async def test_reopen_accepts_events(self):
+        buffer = _buffer()
+        buffer.close()
+        buffer.open()
+
+        assert await buffer.put(_event(0))
+        assert await buffer.get_many(timeout=0.05) != []
+        assert await buffer.get_many(timeout=0.05) == []
+
+
+@pytest.mark.unit
+class TestStreamProcessorShutdown:
+    """Test that stopping the stream processes already-buffered events"""
+
+    async def test_stop_flushes_buffered_events(self):
+        from etl.stream_processor import StreamEventType, StreamProcessor
+        from etl.types import ContentType, PipelineConfig
+
+        processor = StreamProcessor(PipelineConfig(stream_batch_size=5, stream_batch_max_wait=0))
+        handled = []
+
+        async def handler(events):
+            handled.extend(event.event_id for event in events)
+            await asyncio.sleep(0.01)
+
+        processor.add_event_handler(StreamEventType.CONTENT_ADDED, handler, batch=True)
+        stream = asyncio.create_task(processor.start_stream(ContentType.PLOT, {"type": "custom"}))
+        await asyncio.sleep(0.05)
+
+        ids = [str(uuid.uuid4()) for _ in range(40)]
+        for event_id in ids:
+            event = _event(0)
+            event.event_id = event_id
+            assert await processor.add_event(event)
+        await processor.stop_stream()
+        await asyncio.wait_for(stream, 10)
+
+        assert handled == ids
+        assert processor.event_buffer.size() == 0
+        assert not await processor.add_event(_event(1), timeout=0.05)
@@ -0,0 +1,164 @@
+"""
+Unit tests for the sliding window manager
+Tests window assignment, watermark-driven closing, late arrivals and eviction
+of processed windows
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+BASE = 1_700_000_000  # aligned to every slide interval used below
+
+
+def _event(seconds, source="test"):
+    from etl.stream_processor import StreamEvent, StreamEventType
+    from etl.types import ContentType
+    return StreamEvent(event_id=str(seconds), event_type=StreamEventType.CONTENT_ADDED,
+                       content_type=ContentType.PLOT, timestamp=datetime.fromtimestamp(seconds),
+                       data={}, source=source)
+
+
+def _manager(size=60, slide=20, lateness=0, mode="event_time"):
+    from etl.stream_processor import WindowManager
+    return WindowManager(timedelta(seconds=size), timedelta(seconds=slide),
+                         allowed_lateness=timedelta(seconds=lateness), watermark_mode=mode)
+
+
+def _starts(manager, window_ids):
+    return sorted(manager.windows[window_id].start_time.timestamp() - BASE for window_id in window_ids)
+
+
+@pytest.mark.unit
+class TestWindowAssignment:
+    """Test which windows an event lands in"""
+
+    async def test_event_lands_in_size_over_slide_windows(self):
+        manager = _manager()
+
+        affected = await manager.add_event(_event(BASE + 100))
+
+        assert _starts(manager, affected) == [60, 80, 100]
+        assert manager.active_window_count == 3
+
+    async def test_window_boundaries_are_half_open(self):
+        manager = _manager()
+
+        affected = await manager.add_event(_event(BASE + 120))
+
+        # [60, 120) excludes its end
+        assert _starts(manager, affected) == [80, 100, 120]
+
+    async def test_aggregates_instead_of_events(self):
+        manager = _manager(size=20, slide=20)
+        await manager.add_event(_event(BASE + 1, source="a"))
+        await manager.add_event(_event(BASE + 5, source="b"))
+        affected = await manager.add_event(_event(BASE + 3, source="a"))
+
+        window = manager.windows[affected[0]]
+        assert window.event_count == 3
+        assert window.sources == {"a": 2, "b": 1}
+        assert window.first_event_time.timestamp() == BASE + 1
+        assert window.last_event_time.timestamp() == BASE + 5
+        assert window.events == []
+
+
+@pytest.mark.unit
+class TestWatermark:
+    """Test event-time and processing-time watermarks"""
+
+    async def test_event_time_watermark_closes_windows(self):
+        manager = _manager(lateness=10)
+        await manager.add_event(_event(BASE + 0))
+        await manager.add_event(_event(BASE + 75))
+
+        ready = await manager.get_ready_windows()
+
+        # Watermark 65: windows ending at or before it are ready, in end order
+        assert manager.watermark == BASE + 65
+        assert [window.end_time.timestamp() - BASE for window in ready] == [20, 40, 60]
+        assert all(window.is_closed for window in ready)
+        assert not any(window.is_closed for window in manager._open.values())
+
+    async def test_late_arrival_within_allowed_lateness(self):
+        """An event behind the latest one still joins windows the watermark has not passed"""
+        manager = _manager(lateness=10)
+        await manager.add_event(_event(BASE + 0))
+        await manager.add_event(_event(BASE + 65))
+
+        affected = await manager.add_event(_event(BASE + 59))
+
+        assert _starts(manager, affected) == [0, 20, 40]
+        assert manager.late_events == 0
+
+    async def test_late_arrival_past_watermark_is_dropped(self):
+        manager = _manager(lateness=10)
+        await manager.add_event(_event(BASE + 0))
+        await manager.add_event(_event(BASE + 75))
+        counts = {window_id: window.event_count for window_id, window in manager.windows.items()}
+
+        assert await manager.add_event(_event(BASE + 1)) == []
+        # Only windows the watermark has not passed take a partially late event
+        assert _starts(manager, await manager.add_event(_event(BASE + 50))) == [20, 40]
+
+        assert manager.late_events == 1
+        assert all(manager.windows[window_id].event_count == count
+                   for window_id, count in counts.items() if manager.windows[window_id].is_closed)
+
+    async def test_watermark_never_moves_back(self):
+        manager = _manager()
+        await manager.add_event(_event(BASE + 200))
+        await manager.add_event(_event(BASE + 10))
+
+        assert manager.watermark == BASE + 200
+        assert manager.get_stats()['late_events'] == 1
+
+    async def test_processing_time_watermark(self):
+        manager = _manager(mode="processing_time")
+        now = time.time()
+
+        assert await manager.add_event(_event(now - 3600)) == []
+        assert len(await manager.add_event(_event(now))) == 3
+        assert manager.late_events == 1
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError):
+            _manager(mode="ingestion_time")
+
+
+@pytest.mark.unit
+class TestWindowEviction:
+    """Test retiring processed windows"""
+
+    async def test_only_processed_windows_past_retention_evicted(self):
+        manager = _manager()
+        await manager.add_event(_event(BASE + 0))
+        await manager.add_event(_event(BASE + 200))
+        ready = await manager.get_ready_windows()
+        processed, pending = ready[:2], ready[2:]
+
+        for window in processed:
+            await manager.mark_window_processed(window.window_id)
+        await manager.cleanup_old_windows(timedelta(hours=1))
+
+        assert pending
+        assert all(window.window_id not in manager.windows for window in processed)
+        assert all(window.window_id in manager.windows for window in pending)
+        assert [window.window_id for window in await manager.get_ready_windows()] == \
+            [window.window_id for window in pending]
+        assert manager.active_window_count == len(pending) + 3
+
+    async def test_recent_processed_windows_retained(self):
+        manager = _manager(size=1, slide=1)
+        now = time.time()
+        await manager.add_event(_event(now - 5))
+        await manager.add_event(_event(now))
+        ready = await manager.get_ready_windows()
+
+        await manager.mark_window_processed(ready[0].window_id)
+        await manager.cleanup_old_windows(timedelta(hours=1))
+
+        assert ready[0].window_id in manager.windows
+        assert ready[0].processed
+        assert manager.get_stats()['ready_windows'] == 0
@@ -0,0 +1,79 @@
+"""
+Unit tests for PromptTemplateEngine
+Tests compiled rendering, template recompilation and serialization caching
+"""
+
+import json
+import re
+import pytest
+
+
+def _reference_render(template, variables):
+    """Regex substitution the compiled renderer must match"""
+    def replace(match):
+        name = match.group(1)
+        if name not in variables:
+            return f"[{name}]"
+        value = variables[name]
+        return json.dumps(value, ensure_ascii=False, indent=2) if isinstance(value, (list, dict)) else str(value)
+    return re.sub(r'\{(\w+)\}', replace, template)
+
+
+@pytest.fixture
+def engine():
+    from prompt_generator.template_engine import PromptTemplateEngine
+    return PromptTemplateEngine()
+
+
+@pytest.mark.unit
+class TestPromptTemplateEngine:
+    """Test template compilation and rendering"""
+
+    def test_matches_regex_rendering(self, engine):
+        engine.set_global_variable("novel_title", "裂世九域")
+        variables = {"chapter_number": 17, "characters": [{"name": "林潜"}], "conflicts": {"炎家": "复仇"}}
+
+        for name in engine.list_templates()["default"] + ["missing_template"]:
+            expected = _reference_render(engine.get_template(name), {**engine.variables, **variables})
+            assert engine.render(name, **variables) == expected
+
+        engine.add_custom_template("edge", "{a}{b}}{{c}x{d")
+        assert engine.render("edge", a=1, c=3) == _reference_render("{a}{b}}{{c}x{d", {"a": 1, "c": 3})
+
+    def test_replaced_template_is_recompiled(self, engine):
+        engine.add_custom_template("greeting", "你好，{name}")
+        assert engine.render("greeting", name="林潜") == "你好，林潜"
+
+        engine.add_custom_template("greeting", "再见，{name}")
+        assert engine.render("greeting", name="林潜") == "再见，林潜"
+
+    def test_global_serialization_memoized(self, engine, monkeypatch):
+        calls = []
+        serialize = engine._serialize
+        monkeypatch.setattr(engine, "_serialize", lambda value: calls.append(value) or serialize(value))
+
+        engine.set_global_variable("characters", ["林潜", "炎烈"])
+        engine.render("scene_battle")
+        engine.render("scene_dialogue")
+        assert len(calls) == 1
+
+        engine.set_global_variable("characters", ["墨云山"])
+        assert '"墨云山"' in engine.render("scene_battle")
+        assert len(calls) == 2
+
+    def test_render_many(self, engine):
+        shared = [{"name": "林潜"}]
+        variable_sets = [{"chapter_number": i, "characters": shared} for i in range(1, 4)]
+
+        rendered = engine.render_many("scene_battle", variable_sets)
+
+        assert rendered == [engine.render("scene_battle", **variables) for variables in variable_sets]
+        assert "第3章" in rendered[2]
+
+    def test_render_many_from_generator(self, engine):
+        """Objects freed between variable sets cannot alias by id"""
+        variable_sets = ({"chapter_number": i, "characters": [{"name": f"角色{i}"}]} for i in range(2000))
+
+        rendered = engine.render_many("scene_battle", variable_sets)
+
+        assert all(f'"角色{i}"' in text and f"第{i}章" in text for i, text in enumerate(rendered))